@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""
+性能基准测试
+
+使用本地模拟上游（不访问真实 DeepSeek API）评估各项优化的效果。
+运行方式：python -m benchmarks.<脚本名>
+"""
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+并行分节生成基准测试
+
+对比单次补全与并行分节生成两种模式的整体耗时（wall-clock）与首 Token 时间。
+模拟上游：整篇翻译生成「分节数 × 每节 Token 数」个 Token，单个分节请求只生成「每节 Token 数」个。
+
+运行方式：
+    python -m benchmarks.bench_parallel_sections --ttft 0.3 --tokens-per-section 80 --runs 3
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("DEEPSEEK_API_KEY", "benchmark")
+
+from benchmarks.mock_upstream import MockAsyncOpenAI  # noqa: E402
+from src.models import TranslationDirection  # noqa: E402
+from src.prompts import SECTION_INSTRUCTION, get_prompt_sections  # noqa: E402
+from src.services.model_router import ModelRouter  # noqa: E402
+from src.services.translator import Translator  # noqa: E402
+
+CONTENT = "我们需要一个智能推荐功能，提升用户停留时长，并支持按兴趣标签实时调整推荐结果。"
+SECTION_MARK = SECTION_INSTRUCTION.split("{title}")[-1]
+
+
+async def _measure(translator: Translator, parallel: bool) -> tuple[float, float]:
+    """执行一次翻译，返回 (首 Token 时间, 总耗时)"""
+    direction = TranslationDirection.PRODUCT_TO_DEV
+    stream_func = translator.translate_stream_parallel if parallel else translator.translate_stream
+    started_at = time.perf_counter()
+    ttft = None
+    async for chunk in stream_func(CONTENT, direction):
+        # 并行模式的分节标题由本地直接输出，不计入首 Token 时间
+        if ttft is None and not chunk.startswith("## "):
+            ttft = time.perf_counter() - started_at
+        if chunk.startswith("[ERROR]"):
+            raise RuntimeError(chunk)
+    return ttft or 0.0, time.perf_counter() - started_at
+
+
+async def main(args: argparse.Namespace) -> None:
+    sections = len(get_prompt_sections(TranslationDirection.PRODUCT_TO_DEV.value))
+
+    def tokens_for(messages: list[dict]) -> int:
+        if messages[-1]["content"].endswith(SECTION_MARK):
+            return args.tokens_per_section
+        return args.tokens_per_section * sections
+
+    translator = Translator(model_router=ModelRouter(routes=[], default_model="mock-model"))
+    translator.client = MockAsyncOpenAI(
+        ttft=args.ttft, token_interval=args.token_interval, tokens_for=tokens_for
+    )
+
+    print(f"sections={sections}, tokens_per_section={args.tokens_per_section}, "
+          f"ttft={args.ttft}s, token_interval={args.token_interval}s, runs={args.runs}")
+    results = {}
+    for mode, parallel in (("single", False), ("parallel", True)):
+        samples = [await _measure(translator, parallel) for _ in range(args.runs)]
+        ttft = statistics.median(sample[0] for sample in samples)
+        total = statistics.median(sample[1] for sample in samples)
+        results[mode] = total
+        print(f"{mode:>8}: ttft={ttft:.3f}s  wall_clock={total:.3f}s")
+    print(f" speedup: {results['single'] / results['parallel']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="并行分节生成基准测试")
+    parser.add_argument("--ttft", type=float, default=0.3, help="模拟首 Token 延迟（秒）")
+    parser.add_argument("--token-interval", type=float, default=0.005, help="模拟 Token 间隔（秒）")
+    parser.add_argument("--tokens-per-section", type=int, default=80, help="每个分节生成的 Token 数")
+    parser.add_argument("--runs", type=int, default=3, help="每种模式的运行次数（取中位数）")
+    asyncio.run(main(parser.parse_args()))
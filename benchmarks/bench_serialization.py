@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+SSE 帧序列化基准测试
+
+对比三种帧构造方式的单帧 CPU 耗时：
+- baseline: f-string 拼接 str（json.dumps(ensure_ascii=False)），再由框架编码为 bytes
+- stdlib:   本项目序列化层的标准库回退实现，直接输出 bytes
+- orjson:   本项目序列化层的 orjson 实现（需安装 orjson）
+
+运行方式：
+    python -m benchmarks.bench_serialization --frames 200000
+"""
+
+import argparse
+import json
+import time
+
+from src.utils import serialization
+
+TEXT_CHUNK = "推荐使用基于用户行为的协同过滤算法，"
+META = {"detected_direction": "product_to_dev", "confidence": 0.92, "reasoning": "内容描述了用户需求和业务目标"}
+SECTION = {"index": 2, "text": TEXT_CHUNK}
+
+
+def _baseline(kind: str):
+    if kind == "text":
+        return lambda: f"data: {TEXT_CHUNK}\n\n".encode("utf-8")
+    if kind == "meta":
+        return lambda: f"data: [META] {json.dumps(META, ensure_ascii=False)}\n\n".encode("utf-8")
+    return lambda: f"event: section_delta\ndata: {json.dumps(SECTION, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+def _fast(kind: str):
+    if kind == "text":
+        return lambda: serialization.sse_data(TEXT_CHUNK)
+    if kind == "meta":
+        return lambda: serialization.sse_meta(META)
+    return lambda: serialization.sse_event("section_delta", SECTION)
+
+
+def _per_frame_ns(func, frames: int) -> float:
+    """测量单帧平均 CPU 时间（纳秒）"""
+    started_at = time.process_time_ns()
+    for _ in range(frames):
+        func()
+    return (time.process_time_ns() - started_at) / frames
+
+
+def main(args: argparse.Namespace) -> None:
+    backends = ["stdlib"]
+    orjson_module = serialization.orjson
+    if orjson_module is not None:
+        backends.append("orjson")
+
+    print(f"frames={args.frames}")
+    print(f"{'frame':>10} {'baseline':>10} " + " ".join(f"{b:>10}" for b in backends) + "  (ns/frame)")
+    for kind in ("text", "meta", "section"):
+        baseline = _per_frame_ns(_baseline(kind), args.frames)
+        row = [f"{kind:>10}", f"{baseline:>10.0f}"]
+        for backend in backends:
+            serialization.orjson = orjson_module if backend == "orjson" else None
+            try:
+                cost = _per_frame_ns(_fast(kind), args.frames)
+            finally:
+                serialization.orjson = orjson_module
+            row.append(f"{cost:>10.0f}")
+        print(" ".join(row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SSE 帧序列化基准测试")
+    parser.add_argument("--frames", type=int, default=200000, help="每种帧的测量次数")
+    main(parser.parse_args())
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+跨进程缓存命中率基准测试
+
+模拟 N 个 worker 进程处理同一批重复请求（请求轮询分配到各 worker），
+对比进程内 memory 后端与共享 sqlite 后端的缓存命中率随 worker 数的变化。
+
+运行方式：
+    python -m benchmarks.bench_shared_cache --workers 1 2 4 8 --documents 50 --requests 2000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import multiprocessing
+
+os.environ.setdefault("DEEPSEEK_API_KEY", "benchmark")
+
+from src.services.cache import create_cache_backend, make_cache_key  # noqa: E402
+
+
+def _run_worker(backend_name: str, path: str, documents: list[int]) -> tuple[int, int]:
+    """单个 worker：依次处理分配到的请求，未命中时写入缓存，返回 (命中数, 请求数)"""
+    backend = create_cache_backend(backend_name, path)
+    hits = 0
+    for document in documents:
+        key = make_cache_key("translation", "product_to_dev", "mock-model", "bench", str(document))
+        if backend.get(key) is not None:
+            hits += 1
+        else:
+            backend.set(key, f"translation-{document}", ttl=3600)
+    backend.close()
+    return hits, len(documents)
+
+
+def measure(backend_name: str, workers: int, requests: list[int]) -> float:
+    """在指定 worker 数下运行一轮，返回整体命中率"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite3")
+        # 预先建表，避免多个进程同时初始化
+        create_cache_backend(backend_name, path).close()
+        shards = [requests[i::workers] for i in range(workers)]
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.starmap(_run_worker, [(backend_name, path, shard) for shard in shards])
+    hits = sum(result[0] for result in results)
+    total = sum(result[1] for result in results)
+    return hits / total
+
+
+def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    requests = [rng.randrange(args.documents) for _ in range(args.requests)]
+    ideal = 1 - len(set(requests)) / len(requests)
+    print(f"documents={args.documents}, requests={args.requests}, ideal_hit_rate={ideal:.3f}")
+    for backend_name in ("memory", "sqlite"):
+        for workers in args.workers:
+            hit_rate = measure(backend_name, workers, requests)
+            print(f"{backend_name:>7} workers={workers:<3} hit_rate={hit_rate:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="跨进程缓存命中率基准测试")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="worker 数列表")
+    parser.add_argument("--documents", type=int, default=50, help="不同文档数")
+    parser.add_argument("--requests", type=int, default=2000, help="总请求数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    main(parser.parse_args())
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+SSE 流式压缩基准测试
+
+按固定 Token 间隔输出一段中文 Markdown（每个 Token 一个 SSE 帧），对比不同合并窗口下：
+- 传输字节数与压缩率
+- 刷新次数（即写出的数据块数）
+- 首块延迟与平均额外延迟（帧产生到所在数据块写出的时间）
+
+运行方式：
+    python -m benchmarks.bench_sse_compression --token-interval 0.02
+"""
+
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+from src.utils import sse_data
+from src.utils.compression import gzip_stream
+
+SAMPLE_PATH = Path(__file__).parent.parent / "README.md"
+
+
+async def _frames(tokens: list[str], interval: float, produced_at: list[float]):
+    for index, token in enumerate(tokens):
+        if index:
+            await asyncio.sleep(interval)
+        produced_at.append(time.perf_counter())
+        yield sse_data(token)
+
+
+async def _run(tokens: list[str], interval: float, window_ms: float) -> dict:
+    produced_at: list[float] = []
+    sizes, written_at = [], []
+    async for piece in gzip_stream(_frames(tokens, interval, produced_at), flush_interval=window_ms / 1000):
+        sizes.append(len(piece))
+        written_at.append((time.perf_counter(), len(produced_at)))
+
+    # 每帧的延迟：帧产生到包含该帧的第一个数据块写出
+    delays, block = [], 0
+    for index, produced in enumerate(produced_at):
+        while written_at[block][1] <= index:
+            block += 1
+        delays.append(written_at[block][0] - produced)
+    return {
+        "bytes": sum(sizes),
+        "flushes": len(sizes),
+        "first_ms": delays[0] * 1000,
+        "avg_delay_ms": sum(delays) / len(delays) * 1000,
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    text = SAMPLE_PATH.read_text(encoding="utf-8")[:args.chars]
+    tokens = [text[i:i + args.token_chars] for i in range(0, len(text), args.token_chars)]
+    raw = sum(len(sse_data(token)) for token in tokens)
+
+    print(f"tokens={len(tokens)}, token_interval={args.token_interval}s, raw_bytes={raw}")
+    print(f"{'window_ms':>10} {'bytes':>8} {'ratio':>7} {'flushes':>8} {'first_ms':>9} {'avg_delay_ms':>13}")
+    for window_ms in args.windows:
+        result = asyncio.run(_run(tokens, args.token_interval, window_ms))
+        print(
+            f"{window_ms:>10.0f} {result['bytes']:>8} {result['bytes'] / raw:>7.2f} {result['flushes']:>8} "
+            f"{result['first_ms']:>9.1f} {result['avg_delay_ms']:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SSE 流式压缩基准测试")
+    parser.add_argument("--chars", type=int, default=3000, help="输出文本长度（字符）")
+    parser.add_argument("--token-chars", type=int, default=3, help="每个 Token 的字符数")
+    parser.add_argument("--token-interval", type=float, default=0.02, help="Token 间隔（秒）")
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 50, 100, 200], help="合并窗口（毫秒）")
+    main(parser.parse_args())
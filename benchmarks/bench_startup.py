@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+冷启动基准测试
+
+测量两项指标：
+1. `python -X importtime -c "import src.app"` 的总导入耗时与耗时最多的顶层模块
+2. 从启动 uvicorn 进程到 `GET /api/health` 首次返回 200 的耗时
+
+结果可追加写入 JSONL 文件（附带 git 提交号与时间），用于跟踪冷启动耗时的变化趋势。
+
+运行方式：
+    python -m benchmarks.bench_startup --runs 5 --output benchmarks/results/startup.jsonl
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ENV = {**os.environ, "DEEPSEEK_API_KEY": os.environ.get("DEEPSEEK_API_KEY", "benchmark")}
+
+
+def measure_import(top: int) -> tuple[float, list[tuple[str, float]]]:
+    """运行一次 -X importtime，返回 (总导入耗时秒, 耗时最多的模块列表)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.app"],
+        cwd=PROJECT_ROOT, env=ENV, capture_output=True, text=True, check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((len(name) - len(name.lstrip()), name.strip(), int(cumulative) / 1e6))
+
+    # importtime 先输出子模块再输出父模块：src.app 之前、上一个顶层模块之后的条目都由它导入
+    end = next(i for i, entry in enumerate(entries) if entry[1] == "src.app")
+    start = end
+    while start > 0 and entries[start - 1][0] > entries[end][0]:
+        start -= 1
+    total = entries[end][2]
+    children = [(name, seconds) for depth, name, seconds in entries[start:end] if depth == entries[end][0] + 2]
+    children.sort(key=lambda m: m[1], reverse=True)
+    return total, children[:top]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_health(timeout: float) -> float:
+    """启动 uvicorn 进程，返回首次健康检查成功的耗时（秒）"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/health"
+    started_at = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started_at < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started_at
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise TimeoutError(f"health check did not return 200 within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(args: argparse.Namespace) -> None:
+    import_samples, top_modules = [], []
+    for _ in range(args.runs):
+        total, top_modules = measure_import(args.top)
+        import_samples.append(total)
+    health_samples = [measure_first_health(args.timeout) for _ in range(args.runs)]
+
+    import_time = statistics.median(import_samples)
+    first_health = statistics.median(health_samples)
+    print(f"runs={args.runs}")
+    print(f"import src.app:       {import_time * 1000:8.1f} ms (median)")
+    print(f"first health 200:     {first_health * 1000:8.1f} ms (median)")
+    print("top imports (cumulative, last run):")
+    for name, seconds in top_modules:
+        print(f"  {name:<32} {seconds * 1000:8.1f} ms")
+
+    if args.output:
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "runs": args.runs,
+            "import_ms": round(import_time * 1000, 1),
+            "first_health_ms": round(first_health * 1000, 1),
+            "top_imports_ms": {name: round(seconds * 1000, 1) for name, seconds in top_modules},
+        }
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with output.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        print(f"result appended to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="冷启动基准测试")
+    parser.add_argument("--runs", type=int, default=5, help="运行次数（取中位数）")
+    parser.add_argument("--top", type=int, default=10, help="列出耗时最多的顶层导入数")
+    parser.add_argument("--timeout", type=float, default=30.0, help="等待健康检查成功的超时（秒）")
+    parser.add_argument("--output", help="结果追加写入的 JSONL 文件")
+    main(parser.parse_args())
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+模拟上游模块
+
+提供与 AsyncOpenAI 接口形状一致的本地模拟客户端，按可配置的首 Token 延迟和
+Token 间隔输出流式分块，用于在无网络、无 API Key 的环境下进行可重复的基准测试。
+"""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+# 输出时间表：[(相对调用开始的时间偏移（秒）, 文本), ...]
+Schedule = list[tuple[float, str]]
+
+
+def _chunk(content: Optional[str] = None, finish_reason: Optional[str] = None, usage=None):
+    """构造与 OpenAI 流式分块形状一致的对象"""
+    choices = []
+    if content is not None or finish_reason is not None:
+        choices = [SimpleNamespace(delta=SimpleNamespace(content=content), finish_reason=finish_reason)]
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+def _usage(prompt_tokens: int, completion_tokens: int):
+    """构造 usage 对象"""
+    return SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=prompt_tokens + completion_tokens,
+        prompt_cache_hit_tokens=0,
+        prompt_cache_miss_tokens=prompt_tokens,
+    )
+
+
+class MockCompletions:
+    """模拟 chat.completions 接口"""
+
+    def __init__(
+        self,
+        ttft: float = 0.2,
+        token_interval: float = 0.005,
+        tokens_for: Callable[[list[dict]], int] = None,
+        token_text: str = "测",
+        reply_for: Callable[[list[dict]], str] = None,
+        schedule_for: Callable[[list[dict]], Optional[Schedule]] = None,
+    ):
+        """初始化模拟接口
+
+        Args:
+            ttft: 首 Token 延迟（秒）
+            token_interval: 相邻 Token 间隔（秒）
+            tokens_for: 根据消息列表决定生成 Token 数的函数，默认 200
+            token_text: 每个 Token 输出的文本
+            reply_for: 非流式调用时根据消息列表生成完整回复的函数
+            schedule_for: 流式调用时根据消息列表返回输出时间表的函数（返回 None 时按 ttft / token_interval 输出），
+                用于按录制的节奏回放
+        """
+        self.ttft = ttft
+        self.token_interval = token_interval
+        self.tokens_for = tokens_for or (lambda messages: 200)
+        self.token_text = token_text
+        self.reply_for = reply_for or (lambda messages: "")
+        self.schedule_for = schedule_for or (lambda messages: None)
+        self.calls: list[dict] = []
+
+    async def create(self, *, model: str, messages: list[dict], stream: bool = False, **kwargs):
+        """模拟补全调用"""
+        self.calls.append({"model": model, "messages": messages, "stream": stream, **kwargs})
+        prompt_tokens = sum(len(message["content"]) for message in messages)
+
+        if not stream:
+            await asyncio.sleep(self.ttft)
+            reply = self.reply_for(messages)
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=reply), finish_reason="stop")],
+                usage=_usage(prompt_tokens, len(reply)),
+            )
+
+        schedule = self.schedule_for(messages)
+        if schedule is not None:
+            return self._replay(schedule, prompt_tokens)
+
+        tokens = self.tokens_for(messages)
+        max_tokens = kwargs.get("max_tokens")
+        if max_tokens is not None:
+            tokens = min(tokens, max_tokens)
+        include_usage = bool((kwargs.get("stream_options") or {}).get("include_usage"))
+        return self._stream(tokens, prompt_tokens, include_usage)
+
+    async def _stream(self, tokens: int, prompt_tokens: int, include_usage: bool):
+        """按设定节奏输出分块"""
+        await asyncio.sleep(self.ttft)
+        for index in range(tokens):
+            if index:
+                await asyncio.sleep(self.token_interval)
+            yield _chunk(self.token_text)
+        yield _chunk(finish_reason="stop")
+        if include_usage:
+            yield _chunk(usage=_usage(prompt_tokens, tokens))
+
+
+    async def _replay(self, schedule: Schedule, prompt_tokens: int):
+        """按时间表输出分块"""
+        started_at = asyncio.get_running_loop().time()
+        for offset, text in schedule:
+            delay = started_at + offset - asyncio.get_running_loop().time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield _chunk(text)
+        yield _chunk(finish_reason="stop")
+        yield _chunk(usage=_usage(prompt_tokens, len(schedule)))
+
+
+class MockAsyncOpenAI:
+    """模拟 AsyncOpenAI 客户端（仅实现 chat.completions.create 与 close）"""
+
+    def __init__(self, **kwargs):
+        self.chat = SimpleNamespace(completions=MockCompletions(**kwargs))
+
+    async def close(self) -> None:
+        """与 AsyncOpenAI 保持接口一致"""
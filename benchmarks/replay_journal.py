@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+请求日志回放基准测试
+
+读取请求日志（JOURNAL_ENABLED 开启后生成的 JSONL 文件），在本地启动服务并以模拟上游替换 DeepSeek：
+- 请求按录制时的到达间隔发出（--speed 加速，0 表示全部立即发出）
+- 意图识别按录制的耗时返回录制的方向与置信度
+- 翻译按录制的输出块时间偏移与字符数输出（同样按 --speed 加速）
+- 请求内容为与原文等长的合成文本
+
+输出客户端观测到的首字时间与总耗时分布，与录制值（按 --speed 缩放）对比，差值即服务自身的开销。
+并行分节请求的上游时间线只录制了合并后的输出，回放时按单次补全发出；双向请求的两路输出按奇偶拆分；
+录制时因置信度过低被拒绝的请求回放后同样返回 400。
+
+运行方式：
+    python -m benchmarks.replay_journal data/journal/requests-*.jsonl --speed 4
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import Optional
+
+os.environ.setdefault("DEEPSEEK_API_KEY", "benchmark")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from benchmarks.mock_upstream import MockAsyncOpenAI, Schedule  # noqa: E402
+from src.app import app  # noqa: E402
+from src.config import get_settings  # noqa: E402
+from src.controllers import translate as translate_controller  # noqa: E402
+from src.prompts import get_prompts  # noqa: E402
+from src.services import IntentRouter, ModelRouter, ResultCache, Translator, create_cache_backend  # noqa: E402
+
+# 合成内容中标记录制记录序号，模拟上游据此查找对应的时间线
+_MARKER = re.compile(r"#(\d+)#")
+
+
+def load_journal(paths: list[Path]) -> list[dict]:
+    """读取请求日志（可传入多个进程的文件与轮转文件），按到达时间排序"""
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    records.sort(key=lambda record: record["ts"])
+    return records
+
+
+def synthetic_content(index: int, length: int) -> str:
+    """生成与原文等长、带记录序号标记的内容"""
+    marker = f"#{index}#"
+    return marker + "需" * max(length - len(marker), 0)
+
+
+def build_schedule_for(records: list[dict], speed: float):
+    """构造模拟上游的时间表函数"""
+    scale = 1 / speed if speed > 0 else 1.0
+    prompts = get_prompts()
+
+    def schedule_for(messages: list[dict]) -> Optional[Schedule]:
+        match = _MARKER.search(messages[-1]["content"])
+        if match is None:
+            return None
+        record = records[int(match.group(1))]
+        if messages[0]["content"] == prompts.intent:
+            reply = json.dumps({
+                "direction": record.get("detected_direction") or "product_to_dev",
+                "confidence": record.get("confidence", 0.9),
+                "reasoning": "回放",
+            }, ensure_ascii=False)
+            return [((record.get("intent_ms") or 0) / 1000 * scale, reply)]
+        timeline = list(zip(record["chunk_offsets_ms"], record["chunk_sizes"]))
+        if record["direction"] == "both":
+            # 双向请求录制的是两路交错后的输出，按奇偶分给两个方向
+            timeline = timeline[0::2] if messages[0]["content"] == prompts.product_to_dev else timeline[1::2]
+        return [(offset / 1000 * scale, "测" * size) for offset, size in timeline]
+
+    return schedule_for
+
+
+async def _send(client: httpx.AsyncClient, index: int, record: dict, delay: float) -> dict:
+    """按录制的到达时间发出一个请求，返回客户端观测结果"""
+    await asyncio.sleep(delay)
+    payload = {
+        "content": synthetic_content(index, record["content_length"]),
+        "direction": record["direction"],
+        "auto_detect": record["auto_detect"],
+        "stream_format": record["stream_format"],
+    }
+    started_at = time.perf_counter()
+    first_text = None
+    status = "http_error"
+    async with client.stream("POST", "/api/translate", json=payload) as response:
+        if response.status_code == 200:
+            status = "disconnected"
+            async for line in response.aiter_lines():
+                if not line.startswith("data: ") and not line.startswith("event: section_delta"):
+                    continue
+                if line == "data: [DONE]":
+                    status = "ok"
+                elif line.startswith("data: [ERROR]"):
+                    status = "error"
+                elif first_text is None and not line.startswith("data: [META]"):
+                    first_text = time.perf_counter() - started_at
+        else:
+            await response.aread()
+            status = f"http_{response.status_code}"
+    return {
+        "status": status,
+        "ttft": first_text,
+        "total": time.perf_counter() - started_at,
+    }
+
+
+def _percentiles(values: list[float]) -> str:
+    if not values:
+        return "-"
+    if len(values) == 1:
+        return f"p50={values[0] * 1000:.0f}ms"
+    quantiles = statistics.quantiles(values, n=100, method="inclusive")
+    return f"p50={quantiles[49] * 1000:.0f}ms p95={quantiles[94] * 1000:.0f}ms p99={quantiles[98] * 1000:.0f}ms"
+
+
+async def replay(args: argparse.Namespace) -> None:
+    records = load_journal(args.journal)[:args.limit or None]
+    if not records:
+        print("no records to replay")
+        return
+
+    # 回放本身不写缓存与请求日志
+    settings = get_settings()
+    settings.journal_enabled = False
+    upstream = MockAsyncOpenAI(schedule_for=build_schedule_for(records, args.speed))
+    cache = ResultCache(create_cache_backend("none"), ttl=0)
+    translator = Translator(model_router=ModelRouter(routes=[], default_model="mock-model"), cache=cache)
+    translator.client = upstream
+    intent_router = IntentRouter(model="mock-model", cache=cache)
+    intent_router.client = upstream
+    translate_controller.get_translator = lambda: translator
+    translate_controller.get_intent_router = lambda: intent_router
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, lifespan="off", log_config=None))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    first_ts = records[0]["ts"]
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    started_at = time.perf_counter()
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=None, limits=limits) as client:
+        results = await asyncio.gather(*(
+            _send(client, index, record, (record["ts"] - first_ts) / args.speed if args.speed > 0 else 0)
+            for index, record in enumerate(records)
+        ))
+    elapsed = time.perf_counter() - started_at
+    server.should_exit = True
+    await serving
+
+    scale = 1 / args.speed if args.speed > 0 else 1.0
+    recorded_ttft = [
+        ((record.get("intent_ms") or 0) + record["first_chunk_ms"]) / 1000 * scale
+        for record in records if record.get("first_chunk_ms") is not None
+    ]
+    recorded_total = [record["total_ms"] / 1000 * scale for record in records]
+    statuses: dict[str, int] = {}
+    for result in results:
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+
+    print(f"records={len(records)}, speed={args.speed}, elapsed={elapsed:.2f}s, "
+          f"throughput={len(records) / elapsed:.1f} req/s")
+    print(f"status: {statuses}")
+    print(f"ttft   replay:   {_percentiles([r['ttft'] for r in results if r['ttft'] is not None])}")
+    print(f"ttft   recorded: {_percentiles(recorded_ttft)}")
+    print(f"total  replay:   {_percentiles([r['total'] for r in results])}")
+    print(f"total  recorded: {_percentiles(recorded_total)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="请求日志回放基准测试")
+    parser.add_argument("journal", type=Path, nargs="+", help="请求日志文件（JSONL，可传入多个）")
+    parser.add_argument("--speed", type=float, default=1.0, help="回放速度倍数，0 表示所有请求立即发出")
+    parser.add_argument("--limit", type=int, default=0, help="最多回放的记录数，0 表示全部")
+    parser.add_argument("--port", type=int, default=8765, help="本地服务端口")
+    asyncio.run(replay(parser.parse_args()))
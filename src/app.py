@@ -5,52 +5,185 @@ FastAPI 应用入口模块
 提供 Web API 服务，包括翻译接口和静态文件服务。
 """
 
+import signal
+import asyncio
 import logging
+import threading
 from pathlib import Path
+from functools import lru_cache
+from typing import Optional
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from src.config import get_settings
-from src.controllers import health_router, translate_router
-
-# 获取配置
-settings = get_settings()
+from src.config import get_settings, configure_logging
+from src.prompts import get_prompt_version
+from src.utils import FastJSONResponse, JSON_BACKEND, StaticAssets, TracingMiddleware
+from src.services import (
+    get_translator,
+    get_intent_router,
+    get_result_cache,
+    get_config_reloader,
+    get_drain_controller,
+    get_request_journal,
+    get_history_store,
+    get_usage_ledger,
+    get_tracer,
+    get_cache_warmer,
+    LoopMonitor,
+)
+from src.controllers import (
+    health_router,
+    translate_router,
+    metrics_router,
+    admin_router,
+    history_router,
+    usage_router,
+)
 
-# 配置日志
+# 配置读取与日志初始化在 lifespan 中进行，导入本模块时不读取配置、不启动日志线程
 logger = logging.getLogger(__name__)
 
-# 静态文件目录
+# 静态文件目录与构建目录（python -m src.build_assets 生成）
 STATIC_DIR = Path(__file__).parent.parent / "static"
+STATIC_BUILD_DIR = STATIC_DIR / "dist"
+
+# 源文件服务（未构建时使用）；目录在首次请求时才检查
+_source_files = StaticFiles(directory=str(STATIC_DIR), check_dir=False)
+
+
+@lru_cache()
+def get_static_assets() -> Optional[StaticAssets]:
+    """已构建的静态资源（读入内存，未构建时返回 None；在 lifespan 中预先加载）"""
+    static_assets = StaticAssets.load(STATIC_BUILD_DIR)
+    if static_assets is not None:
+        logger.info("Serving %s prebuilt static assets from %s", len(static_assets.assets), STATIC_BUILD_DIR)
+    return static_assets
+
+
+def _warm_up_clients() -> None:
+    """构造翻译器与意图路由器（首次导入 openai 较慢，在后台线程中完成）"""
+    try:
+        get_translator()
+        get_intent_router()
+        logger.info("API clients initialized")
+    except Exception:
+        logger.exception("Failed to initialize API clients")
+
+
+def _install_drain_handler() -> None:
+    """SIGTERM 时先排空进行中的流，完成后再交给 uvicorn 的信号处理执行正常关闭
+
+    uvicorn 收到 SIGTERM 后会立即停止监听，健康检查无法再返回 503；这里包装其信号处理函数，
+    在排空期间继续监听（健康检查返回 503、拒绝新的翻译请求）。排空中再次收到信号时立即关闭。
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    previous = signal.getsignal(signal.SIGTERM)
+    if not callable(previous):
+        return
+    loop = asyncio.get_running_loop()
+    drain = get_drain_controller()
+
+    def start_drain(signum, frame) -> None:
+        task = drain.drain(get_settings().shutdown_grace_seconds)
+        task.add_done_callback(lambda _: previous(signum, frame))
+
+    def handle_sigterm(signum, frame) -> None:
+        if drain.draining:
+            previous(signum, frame)
+            return
+        loop.call_soon_threadsafe(start_drain, signum, frame)
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     # 启动时
+    configure_logging()
+    settings = get_settings()
+    app.version = settings.version
     logger.info("Application starting up")
-    logger.info(f"Version: {settings.version}")
-    logger.info(f"Environment: {settings.env}, Log Level: {settings.get_log_level()}")
+    logger.info("Version: %s", settings.version)
+    logger.info("Prompt version: %s", get_prompt_version())
+    logger.info("JSON backend: %s", JSON_BACKEND)
+    logger.info("Result cache backend: %s", settings.cache_backend)
+    logger.info("Environment: %s, Log Level: %s", settings.env, settings.get_log_level())
     if not settings.deepseek_api_key:
         logger.warning("DEEPSEEK_API_KEY is not configured - translation will fail")
     else:
         logger.info("API Key configured successfully")
 
+    # 客户端在后台构造，不阻塞服务开始监听；首个请求若先到达则在请求中完成构造
+    warm_up = asyncio.create_task(asyncio.to_thread(_warm_up_clients))
+
+    # 静态资源读入内存（在线程池中读取，不阻塞事件循环）
+    await asyncio.to_thread(get_static_assets)
+
+    # 优雅停机：SIGTERM 时先排空进行中的流式翻译
+    _install_drain_handler()
+
+    # 事件循环延迟监控：采样调度延迟，阻塞过久时记录阻塞位置
+    loop_monitor = None
+    if settings.loop_monitor_interval_ms > 0:
+        loop_monitor = LoopMonitor(settings.loop_monitor_interval_ms / 1000, settings.loop_slow_callback_ms / 1000)
+        loop_monitor.start()
+
+    # 配置热加载：轮询 config.yaml 与提示词目录
+    watcher = None
+    if settings.config_reload_interval > 0:
+        watcher = asyncio.create_task(get_config_reloader().watch(settings.config_reload_interval))
+
+    # 租户用量：按间隔写入本地存储
+    usage_ledger = get_usage_ledger()
+    usage_flusher = None
+    if usage_ledger is not None:
+        usage_flusher = asyncio.create_task(usage_ledger.run(settings.usage_flush_interval_seconds))
+
+    # 缓存预热：在后台翻译最常见的输入，完成前健康检查返回未就绪
+    cache_warmer = None
+    if settings.warmup_enabled:
+        cache_warmer = get_cache_warmer()
+        cache_warmer.start(settings.warmup_source, settings.warmup_path, settings.warmup_limit)
+
     yield
 
-    # 关闭时
+    if cache_warmer is not None:
+        await cache_warmer.stop()
+    if watcher is not None:
+        watcher.cancel()
+    if not warm_up.done():
+        await warm_up
+
+    # 关闭时：未经 SIGTERM 排空（如 Ctrl+C）时在此排空，并关闭上游连接池
     logger.info("Application shutting down")
+    await get_drain_controller().drain(get_settings().shutdown_grace_seconds)
+    get_result_cache().close()
+    journal = get_request_journal()
+    if journal is not None:
+        journal.close()
+    history = get_history_store()
+    if history is not None:
+        history.close()
+    if usage_flusher is not None:
+        usage_flusher.cancel()
+        usage_ledger.close()
+    get_tracer().shutdown()
+    if loop_monitor is not None:
+        await loop_monitor.stop()
 
 
 # 创建 FastAPI 应用实例
 app = FastAPI(
     title="沟通翻译助手 API",
     description="帮助产品经理和开发工程师相互理解的 AI 翻译服务",
-    version=settings.version,
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # 配置 CORS（允许前端跨域请求）
@@ -60,20 +193,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["traceparent"],
 )
 
+# 链路追踪（最外层）：每个请求一个服务端 span，覆盖到流式响应写完为止
+app.add_middleware(TracingMiddleware, get_tracer=get_tracer)
+
 # 注册控制器路由
 app.include_router(health_router)
 app.include_router(translate_router)
-
-# 挂载静态文件服务（如果目录存在）
-if STATIC_DIR.exists():
-    app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+app.include_router(metrics_router)
+app.include_router(admin_router)
+app.include_router(history_router)
+app.include_router(usage_router)
+
+# 静态文件服务：已构建时从内存返回带哈希、预压缩的资源，否则直接返回源文件
+@app.get("/static/{path:path}", include_in_schema=False)
+async def static_file(path: str, request: Request):
+    """静态资源（已构建时内存缓存、预压缩、ETag 协商）"""
+    static_assets = get_static_assets()
+    if static_assets is None:
+        return await _source_files.get_response(path, request.scope)
+    response = static_assets.response(path, request.headers)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return response
 
 
 @app.get("/", include_in_schema=False)
-async def root():
+async def root(request: Request):
     """首页 - 返回前端页面"""
+    static_assets = get_static_assets()
+    if static_assets is not None and "index.html" in static_assets:
+        return static_assets.response("index.html", request.headers)
     index_path = STATIC_DIR / "index.html"
     if index_path.exists():
         return FileResponse(str(index_path))
@@ -83,6 +235,7 @@ async def root():
 if __name__ == "__main__":
     import uvicorn
 
+    settings = get_settings()
     is_dev = settings.env == "dev"
 
     uvicorn.run(
@@ -91,4 +244,5 @@ if __name__ == "__main__":
         port=settings.port,
         reload=is_dev,
         log_level=settings.get_log_level().lower(),
+        log_config=None,  # 不使用 uvicorn 自带的同步 handler，日志统一走 src.utils.log 的队列
     )
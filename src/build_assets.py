@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+静态资源构建脚本
+
+将 static/ 下的资源构建到 static/dist/：文件名附加内容哈希，生成 gzip / brotli 预压缩文件与清单。
+构建目录存在时应用从内存返回构建后的资源；部署前（如镜像构建阶段）执行一次即可。
+
+运行方式：
+    python -m src.build_assets
+"""
+
+import argparse
+from pathlib import Path
+
+from src.utils.assets import brotli, build_assets
+
+STATIC_DIR = Path(__file__).parent.parent / "static"
+
+
+def main(argv: list[str] = None) -> None:
+    """构建静态资源"""
+    parser = argparse.ArgumentParser(description="构建带内容哈希与预压缩的静态资源")
+    parser.add_argument("--source", type=Path, default=STATIC_DIR, help="源目录")
+    parser.add_argument("--output", type=Path, default=STATIC_DIR / "dist", help="构建目录")
+    args = parser.parse_args(argv)
+
+    manifest = build_assets(args.source, args.output)
+    for original, built in sorted(manifest.items()):
+        print(f"{original} -> {built}")
+    if brotli is None:
+        print("未安装 brotli，仅生成 gzip 预压缩文件")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,17 @@ DeepSeek API 客户端模块
 封装异步 OpenAI 兼容客户端，为翻译和意图识别服务提供统一的 API 调用接口。
 """
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from functools import lru_cache
-
-from openai import AsyncOpenAI
+from typing import TYPE_CHECKING, AsyncIterator
 
 from src.config import get_settings
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,17 +39,61 @@ class DeepSeekClient:
         self.model = model or settings.deepseek_model
         self.timeout = settings.ai_timeout
 
-        # 初始化 OpenAI 兼容客户端
+        # 初始化 OpenAI 兼容客户端（openai 包导入较慢，延迟到首次构造客户端时）
+        from openai import AsyncOpenAI
+
         self.client = AsyncOpenAI(
             api_key=self.api_key,
             base_url=self.base_url,
         )
-        logger.info(f"DeepSeekClient initialized, model={self.model}, base_url={self.base_url}")
+        logger.info("DeepSeekClient initialized, model=%s, base_url=%s", self.model, self.base_url)
 
-    def get_client(self) -> AsyncOpenAI:
+        # 租约计数：热加载替换客户端后，旧客户端在所有进行中的请求结束后再关闭
+        self._leases = 0
+        self._retired = False
+        self._close_task: "asyncio.Task | None" = None
+
+    def get_client(self) -> "AsyncOpenAI":
         """获取底层 AsyncOpenAI 客户端实例"""
         return self.client
 
+    @property
+    def active_leases(self) -> int:
+        """正在使用该客户端的请求数"""
+        return self._leases
+
+    def acquire(self) -> None:
+        """登记一个使用该客户端的请求"""
+        self._leases += 1
+
+    def release(self) -> None:
+        """注销一个请求；客户端已退役且无请求使用时在后台关闭连接"""
+        self._leases -= 1
+        if self._retired and self._leases == 0:
+            self._close_task = asyncio.get_running_loop().create_task(self._close())
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator["AsyncOpenAI"]:
+        """在请求期间持有客户端"""
+        self.acquire()
+        try:
+            yield self.client
+        finally:
+            self.release()
+
+    async def retire(self) -> None:
+        """标记客户端退役：不再分配给新请求，进行中的请求全部结束后关闭连接"""
+        self._retired = True
+        if self._leases == 0:
+            await self._close()
+
+    async def _close(self) -> None:
+        logger.info("Closing retired DeepSeekClient, model=%s", self.model)
+        try:
+            await self.client.close()
+        except Exception as e:
+            logger.warning("Failed to close DeepSeekClient: %s", e)
+
 
 @lru_cache()
 def get_deepseek_client() -> DeepSeekClient:
@@ -8,10 +8,8 @@
 
 import logging
 from pathlib import Path
-from functools import lru_cache
-from typing import Any
+from typing import Any, Optional
 
-import yaml
 from pydantic import Field
 from pydantic.fields import FieldInfo
 from pydantic_settings import (
@@ -20,9 +18,14 @@ from pydantic_settings import (
     SettingsConfigDict,
 )
 
+from src.utils.log import setup_logging
+
 # 项目根目录
 _PROJECT_ROOT = Path(__file__).parent.parent
 
+# YAML 配置文件路径
+CONFIG_PATH = _PROJECT_ROOT / "config.yaml"
+
 
 def _read_version() -> str:
     """从 VERSION 文件读取版本号"""
@@ -44,8 +47,10 @@ class YamlConfigSettingsSource(PydanticBaseSettingsSource):
         self._yaml_data = self._load_yaml()
 
     def _load_yaml(self) -> dict:
-        config_path = _PROJECT_ROOT / "config.yaml"
+        config_path = CONFIG_PATH
         if config_path.exists():
+            import yaml  # 仅在存在配置文件时导入
+
             with open(config_path, "r", encoding="utf-8") as f:
                 return yaml.safe_load(f) or {}
         return {}
@@ -86,17 +91,131 @@ class Settings(BaseSettings):
     deepseek_base_url: str = Field(default="https://api.deepseek.com")
     deepseek_model: str = Field(default="deepseek-chat")
 
+    # 模型路由规则（按顺序匹配，详见 config.yaml.example 中的 MODEL_ROUTES）
+    model_routes: list[dict[str, Any]] = Field(default_factory=list)
+
     # 服务配置
     port: int = Field(default=8080)
     log_level: str | None = Field(default=None)
+    # 日志输出格式：text / json
+    log_format: str = Field(default="text")
+    # 按 logger 名称对 INFO 及以下日志采样（0.01 表示每 100 条保留 1 条）
+    log_sampling: dict[str, float] = Field(default_factory=lambda: {"src.controllers.health": 0.01})
 
     # 输入验证配置
     content_min_length: int = Field(default=10)
     content_max_length: int = Field(default=2000)
+    # 输入 Token 预算（本地估算，约等于 2000 个中文字符）
+    content_max_tokens: int = Field(default=1200)
+
+    # 生成 Token 上限（路由未指定 max_tokens 时使用），用于截断失控的长输出
+    completion_max_tokens: int = Field(default=4096)
+    # 意图识别生成 Token 上限（仅需返回一段简短 JSON）
+    intent_max_tokens: int = Field(default=256)
 
     # AI 服务超时配置 (秒)
     ai_timeout: int = Field(default=30)
 
+    # 结果缓存：none / memory（进程内） / sqlite（多 worker 共享）
+    cache_backend: str = Field(default="none")
+    cache_path: str = Field(default=str(_PROJECT_ROOT / "data" / "cache.sqlite3"))
+    cache_ttl_seconds: int = Field(default=86400)
+    cache_max_entries: int = Field(default=10000)
+    # 过期优先（stale-while-revalidate）：缓存过期或提示词 / 模型变化后，先返回旧译文并在后台刷新
+    cache_stale_while_revalidate: bool = Field(default=False)
+    # 旧译文在失效后仍可返回的时长（秒）
+    cache_stale_ttl_seconds: int = Field(default=7 * 86400)
+    # 后台刷新的最大并发数
+    cache_refresh_concurrency: int = Field(default=2)
+
+    # 请求日志：记录请求形状与上游输出节奏（不记录原文），供回放基准测试使用
+    journal_enabled: bool = Field(default=False)
+    # 文件路径，{pid} 替换为进程号（多 worker 时各进程写各自的文件）
+    journal_path: str = Field(default=str(_PROJECT_ROOT / "data" / "journal" / "requests-{pid}.jsonl"))
+    # 内容记录方式：hash（记录 SHA-256 前缀，可识别重复请求）/ redact（只记录长度）
+    journal_content: str = Field(default="hash")
+    journal_max_bytes: int = Field(default=50 * 1024 * 1024)
+    journal_backup_count: int = Field(default=5)
+
+    # 翻译历史：保存成功完成的翻译，支持全文检索（/api/history/search）与复用
+    history_enabled: bool = Field(default=False)
+    history_path: str = Field(default=str(_PROJECT_ROOT / "data" / "history.sqlite3"))
+    # 后台批量写入：单个事务最多写入的记录数，以及收到第一条记录后最多等待的时间（毫秒）
+    history_batch_size: int = Field(default=64)
+    history_flush_interval_ms: float = Field(default=500)
+    # 最多保留的记录数（按最近使用时间淘汰），0 表示不限制
+    history_max_entries: int = Field(default=100000)
+
+    # 缓存预热：实例就绪前按频次翻译最常见的输入，写入意图识别与翻译结果缓存
+    warmup_enabled: bool = Field(default=False)
+    # 输入来源：file（JSON Lines 文件）/ history（翻译历史）/ examples（请求模型中的示例）
+    warmup_source: str = Field(default="examples")
+    warmup_path: str = Field(default=str(_PROJECT_ROOT / "data" / "warmup.jsonl"))
+    # 最多预热的条目数，0 表示不限制
+    warmup_limit: int = Field(default=100)
+    # 每秒最多发起的上游调用数，0 表示不限速
+    warmup_rate_per_second: float = Field(default=2.0)
+    # 预热最长时长（秒），超时后停止预热并标记就绪，0 表示不限制
+    warmup_timeout_seconds: float = Field(default=300)
+
+    # 租户用量与配额：按请求头 X-API-Key 识别租户，统计请求数与 Token 消耗并限制日 / 月配额
+    usage_enabled: bool = Field(default=False)
+    # 租户列表（详见 config.yaml.example 中的 TENANTS）
+    tenants: list[dict[str, Any]] = Field(default_factory=list)
+    # 拒绝未携带 API Key 的请求（否则归入匿名租户，不限配额）
+    usage_require_api_key: bool = Field(default=False)
+    # 用量存储（同一主机上的多个 worker 共享）与写入间隔（秒）
+    usage_path: str = Field(default=str(_PROJECT_ROOT / "data" / "usage.sqlite3"))
+    usage_flush_interval_seconds: float = Field(default=10)
+    # 每百万 Token 单价（用于折算费用，0 表示不计费）
+    usage_prompt_price_per_million: float = Field(default=0)
+    usage_completion_price_per_million: float = Field(default=0)
+
+    # 链路追踪：为请求的各阶段记录 span，trace ID 从 traceparent 请求头继承并写入日志与 [META]
+    tracing_enabled: bool = Field(default=False)
+    # span 导出方式：console（stderr）/ file（JSONL 文件）
+    tracing_exporter: str = Field(default="console")
+    # 文件路径，{pid} 替换为进程号
+    tracing_path: str = Field(default=str(_PROJECT_ROOT / "data" / "traces" / "spans-{pid}.jsonl"))
+    tracing_max_bytes: int = Field(default=50 * 1024 * 1024)
+    tracing_backup_count: int = Field(default=5)
+
+    # 意图识别：流式提前返回方向（reasoning 稍后以 [META] 补发）
+    intent_streaming: bool = Field(default=True)
+    # 意图识别快速模式：确定方向后立即关闭上游流，丢弃 reasoning
+    intent_fast_mode: bool = Field(default=False)
+    # 意图识别微批处理：合并窗口（毫秒）内的并发请求合并为一次补全，0 表示不合并
+    # 开启后智能模式使用非流式识别（批量结果无法逐条提前返回）
+    intent_batch_window_ms: float = Field(default=0)
+    # 单批最多合并的请求数，攒满后立即发出
+    intent_batch_max_size: int = Field(default=8)
+
+    # 外部提示词模板目录（intent.md / product_to_dev.md / dev_to_product.md），为空时使用内置模板
+    prompts_dir: str | None = Field(default=None)
+    # 热加载：轮询 config.yaml 与提示词目录的间隔（秒），0 表示不轮询
+    config_reload_interval: float = Field(default=0)
+    # 管理接口令牌（请求头 X-Admin-Token），为空时禁用管理接口
+    admin_token: str = Field(default="")
+
+    # SSE 响应 gzip 压缩（客户端 Accept-Encoding 包含 gzip 时启用，每个输出块后同步刷新）
+    sse_compression: bool = Field(default=False)
+    # SSE 压缩的合并窗口（毫秒）：窗口内的多个输出块合并后刷新一次，最多延迟该时间输出
+    sse_compression_window_ms: float = Field(default=100)
+
+    # 流式响应缓冲：全速读取上游写入缓冲区，按客户端速度写出（尽早释放上游连接）
+    # 单个流的缓冲区字节上限，0 表示不缓冲（按客户端速度拉取上游）
+    stream_buffer_max_bytes: int = Field(default=256 * 1024)
+    # 客户端停滞超时（秒）：有待写出的数据但超过该时间没有读取时断开连接
+    stream_stall_timeout_seconds: float = Field(default=30)
+
+    # 事件循环延迟监控：采样间隔（毫秒），0 表示不监控
+    loop_monitor_interval_ms: float = Field(default=100)
+    # 事件循环被阻塞超过该时长（毫秒）时记录阻塞位置的调用栈，0 表示只采样不记录
+    loop_slow_callback_ms: float = Field(default=100)
+
+    # 优雅停机：等待进行中的流式翻译完成的宽限期（秒），超时后以 [ERROR] 结束剩余的流
+    shutdown_grace_seconds: float = Field(default=25)
+
     # 应用版本（从 VERSION 文件读取）
     version: str = Field(default_factory=_read_version)
 
@@ -129,19 +248,33 @@ class Settings(BaseSettings):
         return True
 
 
-@lru_cache()
+# 当前生效的配置实例（热加载时整体替换）
+_current_settings: Optional[Settings] = None
+
+
 def get_settings() -> Settings:
-    """获取配置实例（单例模式）"""
-    return Settings()
+    """获取配置实例（单例模式，可由 reload_settings 原子替换）"""
+    global _current_settings
+    if _current_settings is None:
+        _current_settings = Settings()
+    return _current_settings
+
+
+def set_settings(settings: Settings) -> None:
+    """替换当前配置实例（配置热加载时使用，新实例需已完成校验）"""
+    global _current_settings
+    _current_settings = settings
 
 
-# 配置日志（模块加载时执行）
-_settings = get_settings()
-logging.basicConfig(
-    level=_settings.get_log_level(),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
-if not _settings.validate_config():
-    logger.warning("Configuration validation failed - API Key not set")
+
+def configure_logging() -> None:
+    """按配置初始化日志（由应用入口调用，导入本模块时不做任何配置）
+
+    日志经内存队列由后台线程写出，不阻塞事件循环。
+    """
+    settings = get_settings()
+    setup_logging(settings.get_log_level(), settings.log_format, settings.log_sampling)
+    if not settings.validate_config():
+        logger.warning("Configuration validation failed - API Key not set")
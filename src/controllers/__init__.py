@@ -3,5 +3,9 @@
 
 from src.controllers.health import router as health_router
 from src.controllers.translate import router as translate_router
+from src.controllers.metrics import router as metrics_router
+from src.controllers.admin import router as admin_router
+from src.controllers.history import router as history_router
+from src.controllers.usage import router as usage_router
 
-__all__ = ["health_router", "translate_router"]
+__all__ = ["health_router", "translate_router", "metrics_router", "admin_router", "history_router", "usage_router"]
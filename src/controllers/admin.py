@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+管理控制器
+
+提供运维管理 API 端点（需在请求头 X-Admin-Token 中携带 ADMIN_TOKEN）。
+"""
+
+import hmac
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Header
+
+from src.config import get_settings
+from src.controllers.responses import error_response
+from src.services import get_config_reloader
+
+logger = logging.getLogger(__name__)
+
+# 创建路由器
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@router.post("/reload")
+async def reload_config(x_admin_token: Optional[str] = Header(default=None)):
+    """热加载配置与提示词模板
+
+    重新读取 config.yaml 与外部提示词目录，校验通过后替换配置、提示词与上游客户端；
+    进行中的流式请求继续使用旧版本完成。
+    """
+    admin_token = get_settings().admin_token
+    if not admin_token:
+        return error_response(404, "管理接口未启用", "ADMIN_DISABLED")
+    if not hmac.compare_digest(x_admin_token or "", admin_token):
+        logger.warning("Admin reload rejected: invalid token")
+        return error_response(403, "管理令牌无效", "FORBIDDEN")
+
+    try:
+        return await get_config_reloader().reload(reason="manual")
+    except Exception as e:
+        return error_response(400, f"配置加载失败，已保留当前配置: {e}", "CONFIG_INVALID")
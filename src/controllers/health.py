@@ -10,22 +10,29 @@ import logging
 from fastapi import APIRouter
 
 from src.config import get_settings
+from src.controllers.responses import model_response
 from src.models import HealthResponse
+from src.services import get_cache_warmer, get_drain_controller
 
 logger = logging.getLogger(__name__)
 
 # 创建路由器
 router = APIRouter(prefix="/api", tags=["health"])
 
-# 获取配置
-settings = get_settings()
-
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
-    """健康检查接口"""
+    """健康检查接口
+
+    停机排空期间返回 503（status=draining），使负载均衡摘除本实例；
+    启动时的缓存预热完成前返回 503（status=warming），预热完成后才接收流量。
+    """
     logger.info("Health check requested")
+    if get_drain_controller().draining:
+        return model_response(HealthResponse(status="draining", version=get_settings().version), 503)
+    if get_cache_warmer().warming:
+        return model_response(HealthResponse(status="warming", version=get_settings().version), 503)
     return HealthResponse(
         status="healthy",
-        version=settings.version
+        version=get_settings().version
     )
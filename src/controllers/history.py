@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+翻译历史控制器
+
+提供翻译历史检索的 API 端点。
+"""
+
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+from src.controllers.responses import error_response
+from src.models import HistoryItem, HistorySearchResponse, TranslationDirection
+from src.services import get_history_store
+
+logger = logging.getLogger(__name__)
+
+# 创建路由器
+router = APIRouter(prefix="/api/history", tags=["history"])
+
+
+@router.get("/search", response_model=HistorySearchResponse)
+async def search_history(
+    q: str = Query(..., min_length=1, max_length=200, description="关键词，空白分隔的多个关键词需同时匹配"),
+    direction: Optional[TranslationDirection] = Query(None, description="只检索该方向的翻译"),
+    limit: int = Query(20, ge=1, le=100, description="最多返回的条数"),
+):
+    """检索翻译历史
+
+    在原文与译文中全文检索，按相关度排序（少于 3 个字符的关键词按最近使用时间排序）。
+    将结果的 id 作为翻译请求的 history_id，可直接输出该条译文而不调用上游。
+    """
+    history = get_history_store()
+    if history is None:
+        return error_response(404, "翻译历史未启用", "HISTORY_DISABLED")
+    entries = await history.search(q, direction, limit)
+    return HistorySearchResponse(items=[HistoryItem(**vars(entry)) for entry in entries])
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""
+指标控制器
+
+提供运行时性能指标查询的 API 端点。
+"""
+
+from fastapi import APIRouter
+
+from src.services import get_metrics
+
+# 创建路由器
+router = APIRouter(prefix="/api", tags=["metrics"])
+
+
+@router.get("/metrics")
+async def metrics_snapshot():
+    """指标快照接口
+
+    返回按路由、模型、方向分组的请求数、TTFT、总耗时与输出量等指标。
+    """
+    return get_metrics().snapshot()
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+响应构造工具
+
+各控制器共用的 JSON 响应：模型由 pydantic-core 直接序列化为 JSON bytes，
+不经过 model_dump 再由 JSONResponse 二次序列化。
+"""
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from src.models import ErrorResponse
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """构造以模型为响应体的 JSON 响应（用于需要自定义状态码的场景）"""
+    return Response(content=to_json(model), status_code=status_code, media_type="application/json")
+
+
+def error_response(status_code: int, detail: str, error_code: str) -> Response:
+    """构造错误响应"""
+    return model_response(ErrorResponse(detail=detail, error_code=error_code), status_code)
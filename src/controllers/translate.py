@@ -5,103 +5,422 @@
 提供翻译相关的 API 端点。
 """
 
-import json
+import time
+import asyncio
 import logging
+from functools import partial
+from typing import AsyncIterator, Callable, Optional
 
-from fastapi import APIRouter
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 
-from src.config import get_settings
-from src.models import TranslateRequest, ErrorResponse
-from src.services import get_translator, get_intent_router
+from src.config import Settings, get_settings
+from src.controllers.responses import error_response
+from src.models import RequestDirection, TranslateRequest, StreamFormat, TokenUsage, TranslationDirection
+from src.services import (
+    get_metrics,
+    get_translator,
+    get_intent_router,
+    get_drain_controller,
+    get_request_journal,
+    get_history_store,
+    get_usage_ledger,
+    DrainController,
+    HistoryEntry,
+    JournalRecord,
+    SectionEvent,
+    SectionParser,
+    Translator,
+)
+from src.services.drain import DRAIN_ERROR_CHUNK
+from src.services.translator import BOTH_DIRECTIONS, STALE_MARK
+from src.utils import (
+    StreamReport,
+    accepts_encoding,
+    buffered_stream,
+    current_trace_id,
+    get_current_span,
+    gzip_stream,
+    sse_data,
+    sse_event,
+    sse_meta,
+)
 
 logger = logging.getLogger(__name__)
 
 # 创建路由器
 router = APIRouter(prefix="/api", tags=["translate"])
 
-# 获取配置
-settings = get_settings()
+# 固定内容的 SSE 帧（预编码）
+_LOW_CONFIDENCE_NOTICE_FRAME = sse_data("> 系统自动识别翻译方向，如有误请手动选择")
+_EMPTY_FRAME = sse_data("")
 
 
 @router.post("/translate")
-async def translate(request: TranslateRequest):
+async def translate(request: TranslateRequest, http_request: Request):
     """执行翻译（流式输出）
 
     将输入内容根据指定方向进行翻译，返回 Server-Sent Events 流式响应。
 
     流式数据格式：
+    - 修订 ID 与追踪 ID（结果缓存 / 链路追踪开启时）: `data: [META] {"revision_id": "...", "trace_id": "..."}\\n\\n`
     - 元数据（智能模式）: `data: [META] {"detected_direction": "...", "confidence": 0.92}\\n\\n`
+    - 判断依据（流式意图识别，稍后补发）: `data: [META] {"reasoning": "..."}\\n\\n`
+    - 旧译文标记（过期优先模式返回已失效的缓存结果时，正文之前）: `data: [META] {"stale": true}\\n\\n`
     - 正常数据: `data: <text_chunk>\\n\\n`
     - 结束标记: `data: [DONE]\\n\\n`
     - 错误标记: `data: [ERROR] <message>\\n\\n`
+
+    当 stream_format=sections 时，正文改为按 Markdown 二级标题分节的具名事件
+    （元数据、结束和错误标记保持不变）：
+    - `event: section_start\\ndata: {"index": 0, "title": "技术实现建议"}\\n\\n`
+    - `event: section_delta\\ndata: {"index": 0, "text": "..."}\\n\\n`
+    - `event: section_end\\ndata: {"index": 0}\\n\\n`
+
+    direction=both 时跳过意图识别，两个方向并发翻译并交错输出带方向标签的具名事件：
+    - `event: translation_delta\\ndata: {"direction": "product_to_dev", "text": "..."}\\n\\n`
+      （stream_format=sections 时改为分节事件，负载中同样带 direction）
+    - `event: translation_end\\ndata: {"direction": "dev_to_product", "status": "done"}\\n\\n`
+      （失败时 status 为 error 并带 message）
+    - 两个方向都结束后发送 `data: [DONE]\\n\\n`
+
+    开启租户用量统计时按请求头 X-API-Key 识别租户，配额用尽时返回 429（QUOTA_EXCEEDED）。
+
+    提供 history_id 时直接输出该条历史译文（元数据中带 history_id），不做意图识别也不调用上游。
+
+    提供 previous_revision 时按段落比较上一次的原文，只重新生成受修改影响的分节，其余分节沿用上一次的结果
+    （双向模式下忽略）。
+
+    开启 sse_compression 且请求头 Accept-Encoding 包含 gzip 时，响应以 gzip 压缩，按合并窗口同步刷新。
     """
+    settings = get_settings()
+    # 请求体已完成校验（链路追踪开启时记录在请求 span 上）
+    get_current_span().add_event("request.validated")
+    trace_id = current_trace_id()
+
+    # 排空中（停机前）不再接受新的翻译请求
+    drain = get_drain_controller()
+    if drain.draining:
+        return error_response(503, "服务正在重启，请稍后重试", "SERVICE_DRAINING")
+
     # 检查 API Key 配置
     if not settings.deepseek_api_key:
         logger.error("API Key not configured")
-        return JSONResponse(
-            status_code=500,
-            content=ErrorResponse(
-                detail="服务配置错误，请联系管理员",
-                error_code="AI_SERVICE_ERROR"
-            ).model_dump()
-        )
+        return error_response(500, "服务配置错误，请联系管理员", "AI_SERVICE_ERROR")
+
+    # 租户配额：按请求头 X-API-Key 识别租户，准入时检查日 / 月配额，翻译的 Token 用量计入该租户
+    on_usage = None
+    ledger = get_usage_ledger()
+    if ledger is not None:
+        tenant = ledger.resolve(http_request.headers.get("x-api-key"))
+        if tenant is None:
+            return error_response(401, "API Key 无效或缺失", "INVALID_API_KEY")
+        exceeded = ledger.exceeded_quota(tenant)
+        if exceeded is not None:
+            logger.warning("Tenant quota exceeded, tenant=%s, quota=%s", tenant.name, exceeded)
+            get_metrics().inc("tenant_quota_rejections_total", tenant=tenant.name)
+            return error_response(429, f"已用尽{exceeded}，请稍后重试或联系管理员", "QUOTA_EXCEEDED")
+        ledger.record_request(tenant)
+        on_usage = partial(ledger.record_usage, tenant)
+        get_current_span().set_attribute("tenant", tenant.name)
+
+    # 复用翻译历史：按 ID 读取历史译文
+    history = get_history_store()
+    history_entry = None
+    if request.history_id is not None:
+        if history is None:
+            return error_response(404, "翻译历史未启用", "HISTORY_DISABLED")
+        history_entry = await history.get(request.history_id)
+        if history_entry is None:
+            return error_response(404, "翻译历史不存在", "HISTORY_NOT_FOUND")
+
+    # 请求日志（开启时记录请求形状与输出节奏）
+    journal = get_request_journal()
+    record = journal.record(request) if journal is not None else None
+
+    # 双向模式：不做意图识别，两个方向并发翻译，以带方向标签的事件复用同一个 SSE 响应
+    if request.direction == RequestDirection.BOTH and history_entry is None:
+        logger.info("Translation request received, direction: both, parallel_sections: %s", request.parallel_sections)
+        body = _generate_both_sse(get_translator(), request, drain, record, trace_id, on_usage)
+        return _sse_response(body, settings, http_request)
 
     # 确定翻译方向
-    direction = request.direction
+    direction = TranslationDirection(request.direction.value) if request.direction is not None else None
+    if history_entry is not None:
+        direction = history_entry.direction
+    confidence = None  # 意图识别置信度，手动模式下为 None
     intent_meta = None  # 用于存储意图识别元数据
+    reasoning_task = None  # 流式意图识别中仍在读取 reasoning 的后台任务
 
     # 智能模式：当 auto_detect=True 且 direction=None 时，调用意图识别
-    if request.auto_detect and request.direction is None:
+    if request.auto_detect and request.direction is None and history_entry is None:
         logger.info("Auto-detect mode enabled, detecting intent...")
         intent_router = get_intent_router()
-        intent_result = await intent_router.detect_intent(request.content)
+        # 微批处理只合并非流式识别
+        if settings.intent_streaming and not settings.intent_batch_window_ms:
+            intent_result, reasoning_task = await intent_router.detect_intent_streaming(
+                request.content, fast=settings.intent_fast_mode
+            )
+        else:
+            intent_result = await intent_router.detect_intent(request.content)
+        if record is not None:
+            record.intent_detected(intent_result)
 
         # 检查置信度
         if intent_result.confidence < 0.5:
+            if reasoning_task is not None:
+                reasoning_task.cancel()
             # 置信度过低，返回错误提示用户手动选择
-            logger.warning(f"Intent detection confidence too low: {intent_result.confidence}")
-            return JSONResponse(
-                status_code=400,
-                content=ErrorResponse(
-                    detail=f"无法确定内容类型（置信度: {intent_result.confidence:.0%}），请手动选择翻译方向",
-                    error_code="LOW_CONFIDENCE"
-                ).model_dump()
+            logger.warning("Intent detection confidence too low: %s", intent_result.confidence)
+            if record is not None:
+                record.finish("low_confidence")
+            return error_response(
+                400,
+                f"无法确定内容类型（置信度: {intent_result.confidence:.0%}），请手动选择翻译方向",
+                "LOW_CONFIDENCE"
             )
 
         direction = intent_result.direction
+        confidence = intent_result.confidence
         intent_meta = {
             "detected_direction": direction.value,
             "confidence": intent_result.confidence,
             "reasoning": intent_result.reasoning
         }
-        logger.info(f"Intent detected: {direction.value}, confidence: {intent_result.confidence:.2f}")
+        logger.info("Intent detected: %s, confidence: %.2f", direction.value, intent_result.confidence)
 
-    logger.info(f"Translation request received, direction: {direction.value}, auto_detect: {request.auto_detect}")
+    logger.info("Translation request received, direction: %s, auto_detect: %s", direction.value, request.auto_detect)
 
     # 获取翻译器并执行流式翻译
     translator = get_translator()
+    # 结果缓存开启时返回修订 ID，客户端修改内容后据此请求修订翻译
+    revision_id = translator.revision_id(request.content, direction, confidence)
+
+    # 分节模式下使用增量解析器将文本流转换为分节事件
+    section_parser = SectionParser() if request.stream_format == StreamFormat.SECTIONS else None
+
+    def text_frames(text: str) -> list[bytes]:
+        """将一段正文转换为 SSE 帧"""
+        if section_parser is None:
+            return [sse_data(text)]
+        return [_section_frame(event) for event in section_parser.feed(text)]
+
+    def reasoning_frame() -> bytes:
+        """生成补发 reasoning 的元数据帧"""
+        reasoning = reasoning_task.result() if not reasoning_task.cancelled() else ""
+        return sse_meta({"reasoning": reasoning})
 
     async def generate_sse():
-        """生成 SSE 格式的流式响应"""
-        # 如果是智能模式，先发送元数据
-        if intent_meta:
-            yield f"data: [META] {json.dumps(intent_meta, ensure_ascii=False)}\n\n"
-
-            # 中等置信度时添加提示
-            if intent_meta["confidence"] < 0.8:
-                yield "data: > 系统自动识别翻译方向，如有误请手动选择\n\n"
-                yield "data: \n\n"
-
-        # 流式翻译输出
-        async for chunk in translator.translate_stream(request.content, direction):
-            yield f"data: {chunk}\n\n"
-
-    return StreamingResponse(
-        generate_sse(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        }
+        """生成 SSE 格式的流式响应（直接输出预编码的 bytes 帧）"""
+        nonlocal reasoning_task
+        status = "disconnected"  # 未收到结束标记即退出时视为客户端断开
+        # 翻译历史开启时收集译文（复用的历史不再重复记录）
+        output_parts = [] if history is not None and history_entry is None else None
+        first_chunk_ms = None
+        # 计入进行中的流，停机排空时等待其结束
+        drain.enter()
+        try:
+            # 先发送元数据（同一时刻就绪的帧合并为一次输出，压缩时只刷新一次）
+            frames = []
+            ids = {
+                "revision_id": revision_id,
+                "trace_id": trace_id,
+                "history_id": history_entry.id if history_entry is not None else None,
+            }
+            ids = {key: value for key, value in ids.items() if value is not None}
+            if ids:
+                frames.append(sse_meta(ids))
+            # 如果是智能模式，发送意图识别结果
+            if intent_meta:
+                frames.append(sse_meta(intent_meta))
+
+                # 中等置信度时添加提示
+                if intent_meta["confidence"] < 0.8:
+                    if section_parser is None:
+                        frames += [_LOW_CONFIDENCE_NOTICE_FRAME, _EMPTY_FRAME]
+                    else:
+                        frames += text_frames("> 系统自动识别翻译方向，如有误请手动选择\n\n")
+            if frames:
+                yield b"".join(frames)
+
+            # 流式翻译输出（复用历史 / 修订翻译 / 可选并行分节生成），排空超时时由 drain.guard 以 [ERROR] 结束
+            if history_entry is not None:
+                get_metrics().inc("history_reused_total", direction=direction.value)
+                stream = _replay_history(history_entry)
+            elif request.previous_revision:
+                stream = translator.translate_stream_revision(
+                    request.content, direction, request.previous_revision, confidence, on_usage=on_usage
+                )
+            elif request.parallel_sections:
+                stream = translator.translate_stream_parallel(request.content, direction, confidence, on_usage=on_usage)
+            else:
+                stream = translator.translate_stream(request.content, direction, confidence, on_usage=on_usage)
+            if record is not None:
+                record.translation_started()
+            started_at = time.perf_counter()
+            async for chunk in drain.guard(stream):
+                frames = []
+                # reasoning 就绪后尽早补发；翻译先结束时等待其完成
+                if reasoning_task is not None and (reasoning_task.done() or chunk == "[DONE]"):
+                    await asyncio.wait([reasoning_task])
+                    frames.append(reasoning_frame())
+                    reasoning_task = None
+                if chunk == STALE_MARK:
+                    # 旧译文（后台正在刷新）：在正文之前标记，且不写入翻译历史
+                    frames.append(sse_meta({"stale": True}))
+                    output_parts = None
+                elif chunk == "[DONE]" or chunk.startswith("[ERROR]"):
+                    status = "ok" if chunk == "[DONE]" else ("aborted" if chunk == DRAIN_ERROR_CHUNK else "error")
+                    # 成功完成的翻译写入历史（放入队列，不延迟结束标记）
+                    if status == "ok" and output_parts is not None:
+                        history.record(
+                            request.content, direction, "".join(output_parts),
+                            duration_ms=round((time.perf_counter() - started_at) * 1000, 1),
+                            first_chunk_ms=first_chunk_ms,
+                        )
+                    # 结束前关闭当前分节
+                    if section_parser is not None:
+                        frames += [_section_frame(event) for event in section_parser.close()]
+                    frames.append(sse_data(chunk))
+                else:
+                    if record is not None:
+                        record.chunk(chunk)
+                    if output_parts is not None:
+                        if first_chunk_ms is None:
+                            first_chunk_ms = round((time.perf_counter() - started_at) * 1000, 1)
+                        output_parts.append(chunk)
+                    frames += text_frames(chunk)
+                if frames:
+                    yield b"".join(frames)
+        finally:
+            # 出错或客户端断开时不再等待 reasoning
+            if reasoning_task is not None:
+                reasoning_task.cancel()
+            drain.exit()
+            if record is not None:
+                record.finish(status)
+
+    return _sse_response(generate_sse(), settings, http_request)
+
+
+async def _generate_both_sse(
+    translator: Translator,
+    request: TranslateRequest,
+    drain: DrainController,
+    record: Optional[JournalRecord],
+    trace_id: Optional[str] = None,
+    on_usage: Optional[Callable[[TokenUsage], None]] = None,
+) -> AsyncIterator[bytes]:
+    """双向模式的 SSE 流：两个方向的输出按到达顺序交错，每个事件带 direction 标签"""
+    section_parsers = (
+        {direction: SectionParser() for direction in BOTH_DIRECTIONS}
+        if request.stream_format == StreamFormat.SECTIONS else None
+    )
+    status = "disconnected"
+    failed = False
+    drain.enter()
+    try:
+        if trace_id is not None:
+            yield sse_meta({"trace_id": trace_id})
+        if record is not None:
+            record.translation_started()
+        stream = translator.translate_stream_both(request.content, request.parallel_sections, on_usage=on_usage)
+        async for item in drain.guard(stream):
+            if item == DRAIN_ERROR_CHUNK:
+                status = "aborted"
+                yield sse_data(item)
+                return
+
+            direction, chunk = item
+            if chunk == STALE_MARK:
+                yield sse_meta({"direction": direction.value, "stale": True})
+                continue
+            if chunk == "[DONE]" or chunk.startswith("[ERROR]"):
+                # 单个方向结束：关闭该方向的当前分节并发送 translation_end
+                frames = []
+                if section_parsers is not None:
+                    frames += [_section_frame(event, direction) for event in section_parsers[direction].close()]
+                end = {"direction": direction.value, "status": "done"}
+                if chunk != "[DONE]":
+                    failed = True
+                    end = {"direction": direction.value, "status": "error", "message": chunk[len("[ERROR]"):].strip()}
+                frames.append(sse_event("translation_end", end))
+                yield b"".join(frames)
+                continue
+
+            if record is not None:
+                record.chunk(chunk)
+            if section_parsers is None:
+                yield sse_event("translation_delta", {"direction": direction.value, "text": chunk})
+            else:
+                frames = [_section_frame(event, direction) for event in section_parsers[direction].feed(chunk)]
+                if frames:
+                    yield b"".join(frames)
+
+        status = "error" if failed else "ok"
+        yield sse_data("[DONE]")
+    finally:
+        drain.exit()
+        if record is not None:
+            record.finish(status)
+
+
+def _sse_response(body: AsyncIterator[bytes], settings: Settings, http_request: Request) -> StreamingResponse:
+    """构造 SSE 响应（客户端支持且已开启时以 gzip 压缩）"""
+    headers = {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+    }
+    # 可选 gzip 压缩：按合并窗口同步刷新，客户端仍能增量解压
+    if settings.sse_compression and accepts_encoding(http_request.headers.get("accept-encoding", ""), "gzip"):
+        body = gzip_stream(body, flush_interval=settings.sse_compression_window_ms / 1000)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    # 缓冲放在最外层：上游与压缩全速进行，只有写出跟随客户端的速度
+    if settings.stream_buffer_max_bytes > 0:
+        body = buffered_stream(
+            body,
+            max_bytes=settings.stream_buffer_max_bytes,
+            stall_timeout=settings.stream_stall_timeout_seconds,
+            on_finish=_report_stream,
+        )
+
+    return StreamingResponse(body, media_type="text/event-stream", headers=headers)
+
+
+def _report_stream(report: StreamReport) -> None:
+    """记录单个流的上游占用时间与客户端读完时间"""
+    metrics = get_metrics()
+    metrics.observe("stream_upstream_hold_seconds", report.upstream_seconds)
+    if report.drain_seconds is not None:
+        metrics.observe("stream_client_drain_seconds", report.drain_seconds)
+    metrics.observe("stream_buffer_peak_bytes", report.peak_buffered_bytes)
+    if report.stalled:
+        metrics.inc("stream_client_stalled_total")
+    # 读取任务继承请求的上下文，当前 span 即请求 span
+    get_current_span().set_attributes({
+        "stream.upstream_hold_ms": round(report.upstream_seconds * 1000, 1),
+        "stream.client_drain_ms": round(report.drain_seconds * 1000, 1) if report.drain_seconds is not None else None,
+        "stream.bytes": report.total_bytes,
+        "stream.client_stalled": report.stalled,
+    })
+    logger.info(
+        "Stream finished, upstream_hold_ms=%.0f, client_drain_ms=%s, bytes=%s, peak_buffered_bytes=%s, stalled=%s",
+        report.upstream_seconds * 1000,
+        f"{report.drain_seconds * 1000:.0f}" if report.drain_seconds is not None else None,
+        report.total_bytes, report.peak_buffered_bytes, report.stalled,
     )
+
+
+async def _replay_history(entry: HistoryEntry) -> AsyncIterator[str]:
+    """以翻译流的形式输出一条历史译文"""
+    yield entry.output
+    yield "[DONE]"
+
+
+def _section_frame(event: SectionEvent, direction: Optional[TranslationDirection] = None) -> bytes:
+    """将分节事件编码为具名 SSE 帧（双向模式下附带方向标签）"""
+    payload = event.payload()
+    if direction is not None:
+        payload = {"direction": direction.value, **payload}
+    return sse_event(event.type, payload)
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+用量控制器
+
+提供租户用量报告的 API 端点。
+"""
+
+import hmac
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Header
+
+from src.config import get_settings
+from src.controllers.responses import error_response
+from src.models import UsageResponse
+from src.services import get_usage_ledger
+
+logger = logging.getLogger(__name__)
+
+# 创建路由器
+router = APIRouter(prefix="/api", tags=["usage"])
+
+
+@router.get("/usage", response_model=UsageResponse)
+async def usage_report(
+    x_api_key: Optional[str] = Header(default=None),
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """租户用量报告
+
+    返回当日与当月的请求数、Token 消耗、折算费用与配额。携带 X-API-Key 时只返回该租户的用量，
+    携带管理令牌 X-Admin-Token 时返回全部租户的用量。其他 worker 的用量在下一次写入后计入。
+    """
+    ledger = get_usage_ledger()
+    if ledger is None:
+        return error_response(404, "租户用量统计未启用", "USAGE_DISABLED")
+
+    admin_token = get_settings().admin_token
+    if admin_token and x_admin_token is not None:
+        if not hmac.compare_digest(x_admin_token, admin_token):
+            logger.warning("Usage report rejected: invalid admin token")
+            return error_response(403, "管理令牌无效", "FORBIDDEN")
+        return UsageResponse(tenants=ledger.report())
+
+    tenant = ledger.resolve(x_api_key)
+    if tenant is None:
+        return error_response(401, "API Key 无效或缺失", "INVALID_API_KEY")
+    return UsageResponse(tenants=ledger.report([tenant.name]))
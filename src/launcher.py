@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+生产环境启动器
+
+以多 worker 进程方式运行应用（默认 worker 数为 CPU 核数）。
+多个 worker 之间不共享进程内单例，翻译与意图识别结果需通过 SQLite 缓存后端跨进程共享。
+
+运行方式：
+    python -m src.launcher --workers 4
+"""
+
+import os
+import logging
+import argparse
+
+import uvicorn
+
+from src.config import get_settings, configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+def default_workers() -> int:
+    """默认 worker 数：CPU 核数"""
+    return os.cpu_count() or 1
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """解析命令行参数"""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="沟通翻译助手生产环境启动器")
+    parser.add_argument("--host", default="0.0.0.0", help="监听地址")
+    parser.add_argument("--port", type=int, default=settings.port, help="监听端口")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="worker 进程数，默认 CPU 核数")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] = None) -> None:
+    """启动多 worker 服务"""
+    configure_logging()
+    args = parse_args(argv)
+    settings = get_settings()
+
+    if args.workers > 1 and settings.cache_backend.lower() != "sqlite":
+        logger.warning(
+            "Running %s workers with cache_backend=%s: results are not shared across workers, "
+            "set CACHE_BACKEND=sqlite to share them",
+            args.workers, settings.cache_backend
+        )
+    logger.info("Launching %s workers on %s:%s", args.workers, args.host, args.port)
+
+    uvicorn.run(
+        "src.app:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=settings.get_log_level().lower(),
+        log_config=None,  # 不使用 uvicorn 自带的同步 handler，日志统一走 src.utils.log 的队列
+    )
+
+
+if __name__ == "__main__":
+    main()
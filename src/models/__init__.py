@@ -1,13 +1,30 @@
 # -*- coding: utf-8 -*-
 """数据模型层"""
 
-from src.models.enums import TranslationDirection
+from src.models.enums import TranslationDirection, RequestDirection, StreamFormat
 from src.models.requests import TranslateRequest
-from src.models.responses import HealthResponse, ErrorResponse
+from src.models.responses import (
+    HealthResponse,
+    ErrorResponse,
+    HistoryItem,
+    HistorySearchResponse,
+    UsagePeriod,
+    TenantUsage,
+    UsageResponse,
+)
+from src.models.usage import TokenUsage
 
 __all__ = [
     "TranslationDirection",
+    "RequestDirection",
+    "StreamFormat",
     "TranslateRequest",
     "HealthResponse",
     "ErrorResponse",
+    "HistoryItem",
+    "HistorySearchResponse",
+    "UsagePeriod",
+    "TenantUsage",
+    "UsageResponse",
+    "TokenUsage",
 ]
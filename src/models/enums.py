@@ -12,3 +12,16 @@ class TranslationDirection(str, Enum):
     """翻译方向枚举"""
     PRODUCT_TO_DEV = "product_to_dev"    # 产品需求 → 技术语言
     DEV_TO_PRODUCT = "dev_to_product"    # 技术方案 → 业务语言
+
+
+class RequestDirection(str, Enum):
+    """请求中可指定的翻译方向（在单一翻译方向之外增加双向）"""
+    PRODUCT_TO_DEV = "product_to_dev"
+    DEV_TO_PRODUCT = "dev_to_product"
+    BOTH = "both"                        # 双向：同时输出两个方向的翻译
+
+
+class StreamFormat(str, Enum):
+    """流式输出格式枚举"""
+    TEXT = "text"           # 原始文本分块: data: <text_chunk>
+    SECTIONS = "sections"   # 分节事件: event: section_start / section_delta / section_end
@@ -6,9 +6,11 @@ API 请求模型模块
 """
 
 from typing import Optional
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
-from src.models.enums import TranslationDirection
+from src.config import get_settings
+from src.models.enums import RequestDirection, StreamFormat
+from src.utils import estimate_tokens
 
 
 class TranslateRequest(BaseModel):
@@ -19,14 +21,42 @@ class TranslateRequest(BaseModel):
         max_length=2000,
         description="待翻译的原始内容"
     )
-    direction: Optional[TranslationDirection] = Field(
+    direction: Optional[RequestDirection] = Field(
         None,
-        description="翻译方向，为空时根据 auto_detect 决定行为"
+        description="翻译方向，为空时根据 auto_detect 决定行为；both 表示同时输出两个方向的翻译（不做意图识别）"
     )
     auto_detect: bool = Field(
         False,
         description="是否启用智能意图识别"
     )
+    stream_format: StreamFormat = Field(
+        StreamFormat.TEXT,
+        description="流式输出格式：text 为原始文本分块，sections 为按 Markdown 二级标题分节的事件"
+    )
+    parallel_sections: bool = Field(
+        False,
+        description="是否按提示词分节并行生成（降低整体耗时，Token 消耗略有增加）"
+    )
+    previous_revision: Optional[str] = Field(
+        None,
+        max_length=64,
+        description="上一次翻译的修订 ID（响应元数据中的 revision_id），提供时只重新生成受修改影响的分节"
+    )
+    history_id: Optional[int] = Field(
+        None,
+        ge=1,
+        description="翻译历史 ID（/api/history/search 的检索结果），提供时直接输出该条历史译文，不调用上游"
+    )
+
+    @field_validator('content')
+    @classmethod
+    def validate_content_token_budget(cls, content: str) -> str:
+        """验证：内容的估算 Token 数不超过输入预算"""
+        max_tokens = get_settings().content_max_tokens
+        tokens = estimate_tokens(content)
+        if tokens > max_tokens:
+            raise ValueError(f"内容过长（约 {tokens} Token），请控制在 {max_tokens} Token 以内")
+        return content
 
     @model_validator(mode='after')
     def validate_direction_or_auto_detect(self):
@@ -5,8 +5,12 @@ API 响应模型模块
 定义 API 响应的 Pydantic 数据模型。
 """
 
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
+from src.models.enums import TranslationDirection
+
 
 class ErrorResponse(BaseModel):
     """错误响应模型"""
@@ -29,3 +33,45 @@ class HealthResponse(BaseModel):
     """健康检查响应模型"""
     status: str = Field(..., description="服务状态")
     version: str = Field(..., description="API 版本号")
+
+
+class HistoryItem(BaseModel):
+    """翻译历史条目"""
+    id: int = Field(..., description="历史 ID（翻译请求的 history_id）")
+    direction: TranslationDirection = Field(..., description="翻译方向")
+    content: str = Field(..., description="原文")
+    output: str = Field(..., description="译文")
+    duration_ms: Optional[float] = Field(None, description="翻译耗时（毫秒）")
+    first_chunk_ms: Optional[float] = Field(None, description="首个输出块耗时（毫秒）")
+    hits: int = Field(..., description="相同原文的翻译次数")
+    created_at: float = Field(..., description="首次翻译时间（Unix 时间戳）")
+    updated_at: float = Field(..., description="最近翻译时间（Unix 时间戳）")
+
+
+class HistorySearchResponse(BaseModel):
+    """翻译历史检索响应模型"""
+    items: list[HistoryItem] = Field(default_factory=list, description="匹配的历史，按相关度排序")
+
+
+class UsagePeriod(BaseModel):
+    """租户在一个统计周期内的用量"""
+    period: str = Field(..., description="统计周期，如 2026-10-19 / 2026-10")
+    requests: int = Field(..., description="请求数")
+    prompt_tokens: int = Field(..., description="提示词 Token 数")
+    completion_tokens: int = Field(..., description="生成 Token 数")
+    total_tokens: int = Field(..., description="总 Token 数")
+    cost: float = Field(..., description="按单价折算的费用")
+    request_quota: Optional[int] = Field(None, description="请求数配额，为空表示不限制")
+    token_quota: Optional[int] = Field(None, description="Token 配额，为空表示不限制")
+
+
+class TenantUsage(BaseModel):
+    """租户用量"""
+    tenant: str = Field(..., description="租户名称")
+    day: UsagePeriod = Field(..., description="当日用量")
+    month: UsagePeriod = Field(..., description="当月用量")
+
+
+class UsageResponse(BaseModel):
+    """用量报告响应模型"""
+    tenants: list[TenantUsage] = Field(default_factory=list, description="各租户用量")
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Token 用量模型模块
+
+定义上游 API 返回的 Token 用量数据模型。
+"""
+
+from typing import Any, Iterable, Optional
+
+from pydantic import BaseModel, Field
+
+
+class TokenUsage(BaseModel):
+    """单次补全调用的 Token 用量"""
+    prompt_tokens: int = Field(0, description="提示词 Token 数")
+    completion_tokens: int = Field(0, description="生成 Token 数")
+    total_tokens: int = Field(0, description="总 Token 数")
+    prompt_cache_hit_tokens: Optional[int] = Field(None, description="命中服务端前缀缓存的提示词 Token 数")
+    prompt_cache_miss_tokens: Optional[int] = Field(None, description="未命中前缀缓存的提示词 Token 数")
+
+    @classmethod
+    def from_api(cls, usage: Any) -> Optional["TokenUsage"]:
+        """从 API 返回的 usage 对象构造用量模型
+
+        Args:
+            usage: OpenAI 兼容 API 的 usage 对象，可能为 None
+
+        Returns:
+            TokenUsage，usage 缺失或字段无效时返回 None
+        """
+        if usage is None:
+            return None
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if not isinstance(prompt_tokens, int) or not isinstance(completion_tokens, int):
+            return None
+        total_tokens = getattr(usage, "total_tokens", None)
+        if not isinstance(total_tokens, int):
+            total_tokens = prompt_tokens + completion_tokens
+
+        # DeepSeek 在 usage 顶层返回缓存命中/未命中数；OpenAI 风格则放在 prompt_tokens_details.cached_tokens
+        cache_hit = getattr(usage, "prompt_cache_hit_tokens", None)
+        cache_miss = getattr(usage, "prompt_cache_miss_tokens", None)
+        if not isinstance(cache_hit, int):
+            cache_hit = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+            cache_hit = cache_hit if isinstance(cache_hit, int) else None
+        if not isinstance(cache_miss, int):
+            cache_miss = prompt_tokens - cache_hit if cache_hit is not None else None
+
+        return cls(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=total_tokens,
+            prompt_cache_hit_tokens=cache_hit,
+            prompt_cache_miss_tokens=cache_miss,
+        )
+
+    @classmethod
+    def combine(cls, usages: Iterable["TokenUsage"]) -> Optional["TokenUsage"]:
+        """合并多次调用的用量（如并行分节生成）
+
+        Args:
+            usages: 用量列表
+
+        Returns:
+            合并后的用量，列表为空时返回 None；缓存字段仅在全部调用都返回时合并
+        """
+        usages = list(usages)
+        if not usages:
+            return None
+        cache_known = all(
+            usage.prompt_cache_hit_tokens is not None and usage.prompt_cache_miss_tokens is not None
+            for usage in usages
+        )
+        return cls(
+            prompt_tokens=sum(usage.prompt_tokens for usage in usages),
+            completion_tokens=sum(usage.completion_tokens for usage in usages),
+            total_tokens=sum(usage.total_tokens for usage in usages),
+            prompt_cache_hit_tokens=sum(u.prompt_cache_hit_tokens for u in usages) if cache_known else None,
+            prompt_cache_miss_tokens=sum(u.prompt_cache_miss_tokens for u in usages) if cache_known else None,
+        )
@@ -5,12 +5,46 @@ from src.prompts.templates import (
     INTENT_ROUTER_PROMPT,
     PRODUCT_TO_DEV_PROMPT,
     DEV_TO_PRODUCT_PROMPT,
+    PROMPT_VERSION,
+    SECTION_INSTRUCTION,
+    INTENT_BATCH_INSTRUCTION,
+    REVISION_INSTRUCTION,
+    BUILTIN_PROMPTS,
+    PROMPT_FILES,
+    PromptSet,
+    load_prompts,
+    get_prompts,
+    set_prompts,
     get_system_prompt,
+    build_messages,
+    build_intent_messages,
+    build_intent_batch_messages,
+    build_section_messages,
+    build_revision_messages,
+    get_prompt_sections,
+    get_prompt_version,
 )
 
 __all__ = [
     "INTENT_ROUTER_PROMPT",
     "PRODUCT_TO_DEV_PROMPT",
     "DEV_TO_PRODUCT_PROMPT",
+    "PROMPT_VERSION",
+    "SECTION_INSTRUCTION",
+    "INTENT_BATCH_INSTRUCTION",
+    "REVISION_INSTRUCTION",
+    "BUILTIN_PROMPTS",
+    "PROMPT_FILES",
+    "PromptSet",
+    "load_prompts",
+    "get_prompts",
+    "set_prompts",
     "get_system_prompt",
+    "build_messages",
+    "build_intent_messages",
+    "build_intent_batch_messages",
+    "build_section_messages",
+    "build_revision_messages",
+    "get_prompt_sections",
+    "get_prompt_version",
 ]
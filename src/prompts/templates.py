@@ -3,8 +3,27 @@
 提示词模板模块
 
 定义不同翻译方向的系统提示词，引导 AI 生成结构化的翻译结果。
+
+为了最大化 DeepSeek 服务端的提示词前缀缓存命中率，消息组装遵循以下约定：
+- 系统提示词是纯静态常量，不包含任何随请求变化的内容（时间、ID 等）
+- 静态内容始终在前（system），用户输入在后（user）
+- 所有调用方都通过 build_messages / build_intent_messages 组装消息，保证逐字节一致
+
+本模块中的模板为内置默认值。配置 PROMPTS_DIR 后，可从外部目录加载同名模板文件覆盖内置模板，
+并在运行时热加载（见 src/services/reloader.py）：每套模板是一个不可变的 PromptSet 快照，
+服务实例在构造时持有当前快照，热加载后进行中的请求仍使用旧快照完成。
 """
 
+import hashlib
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+# 提示词模板版本号：修改任一模板措辞时递增
+PROMPT_VERSION = "v1"
+
 # 意图识别路由提示词
 INTENT_ROUTER_PROMPT = """你是一个内容分类专家，负责判断用户输入的内容类型。
 
@@ -96,18 +115,263 @@ DEV_TO_PRODUCT_PROMPT = """你是一位产品技术顾问，擅长将技术成
 请用非技术语言回复，避免使用过多专业术语，确保业务方能够理解。"""
 
 
-def get_system_prompt(direction: str) -> str:
+def _fingerprint(*templates: str) -> str:
+    """计算模板内容的短指纹"""
+    digest = hashlib.sha256()
+    for template in templates:
+        digest.update(template.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:8]
+
+
+class PromptSet(BaseModel):
+    """一套不可变的提示词模板快照"""
+
+    model_config = ConfigDict(frozen=True)
+
+    intent: str
+    product_to_dev: str
+    dev_to_product: str
+    # 模板来源：builtin 或外部目录路径
+    source: str = "builtin"
+
+    @cached_property
+    def version(self) -> str:
+        """版本标识：版本号 + 模板内容指纹，任一模板变化都会改变该值"""
+        return f"{PROMPT_VERSION}-{_fingerprint(self.intent, self.product_to_dev, self.dev_to_product)}"
+
+    def system_prompt(self, direction: str) -> str:
+        """根据翻译方向获取对应的系统提示词"""
+        if direction == "product_to_dev":
+            return self.product_to_dev
+        elif direction == "dev_to_product":
+            return self.dev_to_product
+        else:
+            raise ValueError(f"Unknown translation direction: {direction}")
+
+
+# 内置模板
+BUILTIN_PROMPTS = PromptSet(
+    intent=INTENT_ROUTER_PROMPT,
+    product_to_dev=PRODUCT_TO_DEV_PROMPT,
+    dev_to_product=DEV_TO_PRODUCT_PROMPT,
+)
+
+# 外部模板目录中的文件名（缺失的文件使用内置模板）
+PROMPT_FILES = {
+    "intent": "intent.md",
+    "product_to_dev": "product_to_dev.md",
+    "dev_to_product": "dev_to_product.md",
+}
+
+# 当前生效的模板快照（整体替换，不做原地修改）
+_active_prompts: PromptSet = BUILTIN_PROMPTS
+
+
+def load_prompts(prompts_dir: Optional[str] = None) -> PromptSet:
+    """从外部目录加载模板，缺失或为空的文件使用内置模板
+
+    Args:
+        prompts_dir: 模板目录，为空时返回内置模板
+
+    Returns:
+        模板快照
+
+    Raises:
+        FileNotFoundError: 目录不存在时
+    """
+    if not prompts_dir:
+        return BUILTIN_PROMPTS
+    directory = Path(prompts_dir)
+    if not directory.is_dir():
+        raise FileNotFoundError(f"Prompts directory not found: {prompts_dir}")
+    templates = {}
+    for field, filename in PROMPT_FILES.items():
+        path = directory / filename
+        text = path.read_text(encoding="utf-8").strip() if path.exists() else ""
+        templates[field] = text or getattr(BUILTIN_PROMPTS, field)
+    return PromptSet(**templates, source=str(directory))
+
+
+def get_prompts() -> PromptSet:
+    """获取当前生效的模板快照"""
+    return _active_prompts
+
+
+def set_prompts(prompts: PromptSet) -> None:
+    """替换当前生效的模板快照"""
+    global _active_prompts
+    _active_prompts = prompts
+
+
+def get_system_prompt(direction: str, prompts: Optional[PromptSet] = None) -> str:
     """根据翻译方向获取对应的系统提示词
 
     Args:
         direction: 翻译方向，product_to_dev 或 dev_to_product
+        prompts: 模板快照，默认使用当前生效的模板
 
     Returns:
         对应的系统提示词
     """
-    if direction == "product_to_dev":
-        return PRODUCT_TO_DEV_PROMPT
-    elif direction == "dev_to_product":
-        return DEV_TO_PRODUCT_PROMPT
-    else:
-        raise ValueError(f"Unknown translation direction: {direction}")
+    return (prompts or get_prompts()).system_prompt(direction)
+
+
+def build_messages(direction: str, content: str, prompts: Optional[PromptSet] = None) -> list[dict[str, str]]:
+    """组装翻译请求的消息列表（前缀稳定）
+
+    Args:
+        direction: 翻译方向，product_to_dev 或 dev_to_product
+        content: 用户输入内容
+        prompts: 模板快照，默认使用当前生效的模板
+
+    Returns:
+        静态系统提示词在前、用户输入在后的消息列表
+    """
+    return [
+        {"role": "system", "content": get_system_prompt(direction, prompts)},
+        {"role": "user", "content": content},
+    ]
+
+
+def build_intent_messages(content: str, prompts: Optional[PromptSet] = None) -> list[dict[str, str]]:
+    """组装意图识别请求的消息列表（前缀稳定）
+
+    Args:
+        content: 用户输入内容
+        prompts: 模板快照，默认使用当前生效的模板
+
+    Returns:
+        静态系统提示词在前、用户输入在后的消息列表
+    """
+    return [
+        {"role": "system", "content": (prompts or get_prompts()).intent},
+        {"role": "user", "content": content},
+    ]
+
+
+# 批量意图识别时的用户消息（系统提示词不变，保证前缀与单条识别相同）
+INTENT_BATCH_INSTRUCTION = (
+    "以下是 {count} 段相互独立的内容，用 <item index=\"序号\"> 标签分隔。"
+    "请分别判断每段内容的类型，返回长度为 {count} 的 JSON 数组，按序号顺序排列，"
+    "每个元素为单条判断时的 JSON 对象，并增加 \"index\" 字段。仅返回 JSON 数组，不要其他内容。"
+)
+
+
+def build_intent_batch_messages(contents: list[str], prompts: Optional[PromptSet] = None) -> list[dict[str, str]]:
+    """组装批量意图识别请求的消息列表（前缀稳定）
+
+    Args:
+        contents: 多段用户输入内容
+        prompts: 模板快照，默认使用当前生效的模板
+
+    Returns:
+        与单条识别相同的系统提示词在前、批量指令与各段输入在后的消息列表
+    """
+    items = "\n".join(f'<item index="{index}">\n{content}\n</item>' for index, content in enumerate(contents))
+    return [
+        {"role": "system", "content": (prompts or get_prompts()).intent},
+        {"role": "user", "content": f"{INTENT_BATCH_INSTRUCTION.format(count=len(contents))}\n\n{items}"},
+    ]
+
+
+# 分节并行生成时附加在用户输入之后的指令（放在末尾，保证系统提示词与用户输入前缀不变）
+SECTION_INSTRUCTION = "请只撰写「{title}」这一部分的正文内容：不要输出该标题本身，也不要输出其他部分。"
+
+
+@lru_cache(maxsize=16)
+def _parse_sections(prompt: str) -> tuple[str, ...]:
+    """提取提示词中的二级标题"""
+    return tuple(
+        line[3:].strip()
+        for line in prompt.splitlines()
+        if line.startswith("## ")
+    )
+
+
+def get_prompt_sections(direction: str, prompts: Optional[PromptSet] = None) -> list[str]:
+    """获取翻译方向提示词中定义的输出分节标题
+
+    Args:
+        direction: 翻译方向，product_to_dev 或 dev_to_product
+        prompts: 模板快照，默认使用当前生效的模板
+
+    Returns:
+        按提示词中顺序排列的分节标题列表
+    """
+    return list(_parse_sections(get_system_prompt(direction, prompts)))
+
+
+def build_section_messages(
+    direction: str,
+    content: str,
+    title: str,
+    prompts: Optional[PromptSet] = None
+) -> list[dict[str, str]]:
+    """组装单个分节生成请求的消息列表（前缀稳定）
+
+    系统提示词与整篇翻译完全相同，分节指令追加在用户输入之后，
+    使并行的各分节请求共享同一前缀。
+
+    Args:
+        direction: 翻译方向
+        content: 用户输入内容
+        title: 需要生成的分节标题
+        prompts: 模板快照，默认使用当前生效的模板
+
+    Returns:
+        消息列表
+    """
+    return [
+        {"role": "system", "content": get_system_prompt(direction, prompts)},
+        {"role": "user", "content": f"{content}\n\n{SECTION_INSTRUCTION.format(title=title)}"},
+    ]
+
+
+# 修订翻译时附加在分节指令之后的说明（{unchanged} 为不受影响时输出的标记）
+REVISION_INSTRUCTION = (
+    "以上内容是修改后的版本。修改前该部分的内容如下：\n\n{previous}\n\n"
+    "本次修改的段落：\n{changes}\n\n"
+    "如果这些修改不影响该部分，只输出 {unchanged}，不要输出其他内容；"
+    "否则输出修改后该部分的完整正文，未受影响的内容保持原样。"
+)
+
+
+def build_revision_messages(
+    direction: str,
+    content: str,
+    title: str,
+    previous_section: str,
+    changes: str,
+    unchanged_mark: str,
+    prompts: Optional[PromptSet] = None
+) -> list[dict[str, str]]:
+    """组装修订单个分节的消息列表（前缀稳定）
+
+    系统提示词、用户输入与分节指令与并行分节生成完全相同，修订说明追加在最后。
+
+    Args:
+        direction: 翻译方向
+        content: 修改后的用户输入内容
+        title: 需要修订的分节标题
+        previous_section: 修改前该分节的正文
+        changes: 段落变更描述
+        unchanged_mark: 分节不受影响时要求模型输出的标记
+        prompts: 模板快照，默认使用当前生效的模板
+
+    Returns:
+        消息列表
+    """
+    instruction = REVISION_INSTRUCTION.format(previous=previous_section, changes=changes, unchanged=unchanged_mark)
+    messages = build_section_messages(direction, content, title, prompts)
+    messages[1]["content"] += f"\n\n{instruction}"
+    return messages
+
+
+# 内置模板的版本标识
+PROMPT_FINGERPRINT = BUILTIN_PROMPTS.version
+
+
+def get_prompt_version() -> str:
+    """获取当前生效模板的版本标识"""
+    return get_prompts().version
@@ -3,6 +3,18 @@
 
 from src.services.translator import Translator, get_translator
 from src.services.intent_router import IntentRouter, IntentResult, get_intent_router
+from src.services.metrics import MetricsRegistry, get_metrics
+from src.services.model_router import ModelRoute, ModelRouter, get_model_router
+from src.services.sections import SectionEvent, SectionParser
+from src.services.cache import ResultCache, create_cache_backend, get_result_cache, make_cache_key
+from src.services.reloader import ConfigReloader, get_config_reloader
+from src.services.drain import DrainController, get_drain_controller
+from src.services.journal import JournalRecord, RequestJournal, get_request_journal
+from src.services.tracing import get_tracer
+from src.services.history import HistoryEntry, HistoryStore, get_history_store
+from src.services.tenants import TenantConfig, UsageLedger, get_usage_ledger
+from src.services.loop_monitor import LoopMonitor
+from src.services.warmup import CacheWarmer, WarmupEntry, WarmupReport, get_cache_warmer
 
 __all__ = [
     "Translator",
@@ -10,4 +22,34 @@ __all__ = [
     "IntentRouter",
     "IntentResult",
     "get_intent_router",
+    "MetricsRegistry",
+    "get_metrics",
+    "ModelRoute",
+    "ModelRouter",
+    "get_model_router",
+    "SectionEvent",
+    "SectionParser",
+    "ResultCache",
+    "create_cache_backend",
+    "get_result_cache",
+    "make_cache_key",
+    "ConfigReloader",
+    "get_config_reloader",
+    "DrainController",
+    "get_drain_controller",
+    "JournalRecord",
+    "RequestJournal",
+    "get_request_journal",
+    "get_tracer",
+    "HistoryEntry",
+    "HistoryStore",
+    "get_history_store",
+    "TenantConfig",
+    "UsageLedger",
+    "get_usage_ledger",
+    "LoopMonitor",
+    "CacheWarmer",
+    "WarmupEntry",
+    "WarmupReport",
+    "get_cache_warmer",
 ]
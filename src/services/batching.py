@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+微批处理模块
+
+将短时间内并发到达的请求合并为一批交给处理函数：
+- 第一个请求到达后最多等待 window 秒，期间到达的请求加入同一批
+- 攒满 max_size 个请求时立即处理，不再等待
+- 处理函数按顺序返回每个请求的结果，分发给各自的等待方
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from src.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """微批处理器"""
+
+    def __init__(
+        self,
+        handler: Callable[[list[T]], Awaitable[list[R]]],
+        window: float,
+        max_size: int,
+        name: str = "batch"
+    ):
+        """初始化微批处理器
+
+        Args:
+            handler: 批处理函数，接收一批请求，按相同顺序返回结果
+            window: 合并窗口（秒）
+            max_size: 单批最大请求数
+            name: 指标标签
+        """
+        self.handler = handler
+        self.window = window
+        self.max_size = max_size
+        self.name = name
+        self.metrics = get_metrics()
+        self._pending: list[tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> R:
+        """提交一个请求并等待其结果（批处理失败时抛出处理函数的异常）"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """取出当前批次并在后台处理"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[T, asyncio.Future]]) -> None:
+        """处理一批请求并分发结果（已取消的等待方跳过）"""
+        try:
+            self.metrics.observe("micro_batch_size", len(batch), batcher=self.name)
+            results = await self.handler([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"handler returned {len(results)} results for {len(batch)} items")
+        except asyncio.CancelledError:
+            # 批处理任务被取消（如停机）时不能让等待方一直挂起
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.warning("Micro batch failed, name=%s, size=%s, error=%s", self.name, len(batch), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
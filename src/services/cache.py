@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+结果缓存模块
+
+缓存翻译结果与意图识别结果，支持三种后端：
+- none:   不缓存
+- memory: 进程内 LRU（多 worker 部署时各进程独立）
+- sqlite: 本地磁盘 SQLite（WAL 模式），同一主机上的多个 worker 进程共享
+
+缓存键由「类型 + 方向 + 模型 + 提示词版本 + 内容」哈希而成，提示词变化后旧条目自然失效。
+"""
+
+import time
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from src.config import get_settings
+from src.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# SQLite 每写入多少次清理一次过期条目
+_PURGE_EVERY_WRITES = 256
+
+
+def make_cache_key(kind: str, *parts: str) -> str:
+    """生成缓存键
+
+    Args:
+        kind: 缓存类型，如 translation / intent
+        parts: 参与哈希的其他字段（方向、模型、提示词版本、内容等）
+
+    Returns:
+        形如 "<kind>:<sha256>" 的缓存键
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return f"{kind}:{digest.hexdigest()}"
+
+
+class CacheBackend:
+    """缓存后端基类（同步接口，不缓存任何内容）"""
+
+    name = "none"
+
+    def get(self, key: str) -> Optional[str]:
+        return None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        return None
+
+    def delete(self, key: str) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+class MemoryCacheBackend(CacheBackend):
+    """进程内 LRU 缓存后端"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SqliteCacheBackend(CacheBackend):
+    """SQLite（WAL 模式）缓存后端，可被同一主机上的多个进程共享"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程的连接（每个线程一个连接）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+            (key, value, now + ttl, now),
+        )
+        self._writes += 1
+        if self._writes % _PURGE_EVERY_WRITES == 0:
+            conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+
+    def delete(self, key: str) -> None:
+        self._connect().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class ResultCache:
+    """结果缓存门面
+
+    提供异步读写接口：SQLite 后端的磁盘 I/O 在线程池中执行，不阻塞事件循环。
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        """初始化结果缓存
+
+        Args:
+            backend: 缓存后端
+            ttl: 条目有效期（秒）
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.metrics = get_metrics()
+        self._offload = isinstance(backend, SqliteCacheBackend)
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用了缓存"""
+        return self.backend.name != "none"
+
+    async def get(self, kind: str, key: str) -> Optional[str]:
+        """读取缓存条目，并记录命中/未命中指标"""
+        if not self.enabled:
+            return None
+        try:
+            if self._offload:
+                value = await asyncio.to_thread(self.backend.get, key)
+            else:
+                value = self.backend.get(key)
+        except Exception as e:
+            logger.warning("Cache read failed, kind=%s, error=%s", kind, e)
+            value = None
+        self.metrics.inc("cache_requests_total", kind=kind, result="hit" if value is not None else "miss")
+        return value
+
+    async def contains(self, key: str) -> bool:
+        """条目是否存在且未过期（不计入命中率指标，供预热等后台任务使用）"""
+        if not self.enabled:
+            return False
+        try:
+            if self._offload:
+                return await asyncio.to_thread(self.backend.get, key) is not None
+            return self.backend.get(key) is not None
+        except Exception as e:
+            logger.warning("Cache read failed, key=%s, error=%s", key, e)
+            return False
+
+    async def set(self, kind: str, key: str, value: str, ttl: float = None) -> None:
+        """写入缓存条目"""
+        if not self.enabled:
+            return
+        try:
+            if self._offload:
+                await asyncio.to_thread(self.backend.set, key, value, ttl or self.ttl)
+            else:
+                self.backend.set(key, value, ttl or self.ttl)
+        except Exception as e:
+            logger.warning("Cache write failed, kind=%s, error=%s", kind, e)
+
+    def close(self) -> None:
+        """关闭后端连接"""
+        self.backend.close()
+
+
+def create_cache_backend(backend: str, path: str = None, max_entries: int = 10000) -> CacheBackend:
+    """根据名称创建缓存后端
+
+    Args:
+        backend: 后端名称 none / memory / sqlite
+        path: SQLite 数据库文件路径
+        max_entries: 内存后端最大条目数
+
+    Returns:
+        缓存后端实例
+    """
+    backend = (backend or "none").lower()
+    if backend == "memory":
+        return MemoryCacheBackend(max_entries=max_entries)
+    if backend == "sqlite":
+        return SqliteCacheBackend(path)
+    if backend != "none":
+        logger.warning("Unknown cache backend '%s', caching disabled", backend)
+    return CacheBackend()
+
+
+@lru_cache()
+def get_result_cache() -> ResultCache:
+    """获取结果缓存实例（单例模式）"""
+    settings = get_settings()
+    backend = create_cache_backend(settings.cache_backend, settings.cache_path, settings.cache_max_entries)
+    logger.info("ResultCache initialized, backend=%s, ttl=%s", backend.name, settings.cache_ttl_seconds)
+    return ResultCache(backend, ttl=settings.cache_ttl_seconds)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+优雅停机模块
+
+部署滚动更新时进入排空（drain）模式：
+1. 健康检查返回 503，负载均衡摘除本实例；新的翻译请求返回 503
+2. 进行中的流式翻译在宽限期内继续输出直至完成
+3. 宽限期结束后仍未完成的流以 [ERROR] 标记正常结束，而不是被直接断开
+4. 关闭上游客户端连接池
+
+进行中的流数量记录在 translation_streams_in_flight 指标中。
+"""
+
+import asyncio
+import logging
+from functools import lru_cache
+from typing import AsyncIterable, AsyncIterator
+
+from src.clients import get_deepseek_client
+from src.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# 宽限期结束后仍在进行的流以该标记结束
+DRAIN_ERROR_CHUNK = "[ERROR] 服务正在重启，请稍后重新提交"
+
+# 中止剩余的流后，等待其写出 [ERROR] 帧的时间（秒）
+_ABORT_FLUSH_SECONDS = 2.0
+
+
+class DrainController:
+    """排空控制器：跟踪进行中的流并在停机时有序结束它们"""
+
+    def __init__(self):
+        self.metrics = get_metrics()
+        self.draining = False
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._abort = asyncio.Event()
+        # 正在等待上游分块的任务，以及宽限期结束时被中止的任务
+        self._readers: set[asyncio.Task] = set()
+        self._aborted: set[asyncio.Task] = set()
+        self._drain_task: "asyncio.Task[int] | None" = None
+
+    @property
+    def in_flight(self) -> int:
+        """进行中的流数量"""
+        return self._in_flight
+
+    def enter(self) -> None:
+        """登记一个开始输出的流"""
+        self._in_flight += 1
+        self._idle.clear()
+        self.metrics.set_gauge("translation_streams_in_flight", self._in_flight)
+
+    def exit(self) -> None:
+        """注销一个已结束的流"""
+        self._in_flight -= 1
+        self.metrics.set_gauge("translation_streams_in_flight", self._in_flight)
+        if self._in_flight == 0:
+            self._idle.set()
+
+    async def guard(self, chunks: AsyncIterable[str]) -> AsyncIterator[str]:
+        """转发翻译流；排空宽限期结束时停止读取上游并输出 [ERROR] 标记
+
+        逐块直接转发，不额外创建任务。宽限期结束时，排空任务取消阻塞在上游读取中的流所在的任务，
+        这里捕获该次取消（uncancel）并以 [ERROR] 标记正常结束响应。
+        """
+        iterator = chunks.__aiter__()
+        task = None
+        try:
+            while True:
+                # 调用方可能在不同任务中逐块读取（如压缩层），每次读取时取当前任务
+                task = asyncio.current_task()
+                if self._abort.is_set():
+                    self.metrics.inc("translation_streams_aborted_total")
+                    yield DRAIN_ERROR_CHUNK
+                    return
+                self._readers.add(task)
+                try:
+                    chunk = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+                except asyncio.CancelledError:
+                    # 客户端断开等其他原因的取消照常传播
+                    if task not in self._aborted:
+                        raise
+                    task.uncancel()
+                    self.metrics.inc("translation_streams_aborted_total")
+                    yield DRAIN_ERROR_CHUNK
+                    return
+                finally:
+                    self._readers.discard(task)
+                yield chunk
+        finally:
+            if task is not None:
+                self._aborted.discard(task)
+            if hasattr(iterator, "aclose"):
+                await iterator.aclose()
+
+    def drain(self, grace_seconds: float) -> "asyncio.Task[int]":
+        """进入排空模式（可重复调用，只执行一次）
+
+        Args:
+            grace_seconds: 等待进行中的流自然结束的宽限期（秒）
+
+        Returns:
+            排空任务，结果为被中止的流数量
+        """
+        if self._drain_task is None:
+            self.draining = True
+            self.metrics.set_gauge("service_draining", 1)
+            self._drain_task = asyncio.ensure_future(self._drain(grace_seconds))
+        return self._drain_task
+
+    async def _drain(self, grace_seconds: float) -> int:
+        logger.info("Draining started, in_flight=%s, grace_seconds=%s", self._in_flight, grace_seconds)
+        aborted = 0
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=grace_seconds)
+        except asyncio.TimeoutError:
+            aborted = self._in_flight
+            logger.warning("Drain grace period exceeded, aborting %s stream(s)", aborted)
+            self._abort.set()
+            for task in list(self._readers):
+                self._aborted.add(task)
+                task.cancel()
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=_ABORT_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning("%s stream(s) did not finish after abort", self._in_flight)
+
+        # 关闭上游连接池（仍持有租约的请求结束后关闭）
+        if get_deepseek_client.cache_info().currsize:
+            await get_deepseek_client().retire()
+        logger.info("Draining completed, aborted=%s", aborted)
+        return aborted
+
+
+@lru_cache()
+def get_drain_controller() -> DrainController:
+    """获取排空控制器实例（单例模式）"""
+    return DrainController()
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+翻译历史模块
+
+持久化保存成功完成的翻译（原文、方向、译文与耗时），支持全文检索与直接复用：
+- 存储：本地 SQLite（WAL 模式），同一方向的相同原文只保留最新译文并累计次数
+- 检索：FTS5 trigram 分词（中文无需分词即可按子串匹配），少于 3 个字符的关键词退化为 LIKE 查询
+- 写入：请求路径上只把记录放入内存队列，后台线程按批合并为一个事务写入，不增加流式响应的延迟
+- 读取：检索与按 ID 读取在线程池中执行，不阻塞事件循环
+"""
+
+import time
+import queue
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from src.config import get_settings
+from src.models import TranslationDirection
+from src.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# FTS5 trigram 分词可匹配的最短关键词长度
+_MIN_MATCH_LENGTH = 3
+
+# 每写入多少批清理一次超出上限的旧记录
+_PRUNE_EVERY_BATCHES = 64
+
+# 通知写入线程退出的哨兵对象
+_STOP = object()
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS history ("
+    "id INTEGER PRIMARY KEY, content_hash TEXT NOT NULL, direction TEXT NOT NULL, "
+    "content TEXT NOT NULL, output TEXT NOT NULL, duration_ms REAL, first_chunk_ms REAL, "
+    "hits INTEGER NOT NULL DEFAULT 1, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+    "UNIQUE (direction, content_hash))",
+    "CREATE INDEX IF NOT EXISTS idx_history_updated_at ON history (updated_at)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5("
+    "content, output, content='history', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN "
+    "INSERT INTO history_fts (rowid, content, output) VALUES (new.id, new.content, new.output); END",
+    "CREATE TRIGGER IF NOT EXISTS history_ad AFTER DELETE ON history BEGIN "
+    "INSERT INTO history_fts (history_fts, rowid, content, output) "
+    "VALUES ('delete', old.id, old.content, old.output); END",
+    "CREATE TRIGGER IF NOT EXISTS history_au AFTER UPDATE OF content, output ON history BEGIN "
+    "INSERT INTO history_fts (history_fts, rowid, content, output) "
+    "VALUES ('delete', old.id, old.content, old.output); "
+    "INSERT INTO history_fts (rowid, content, output) VALUES (new.id, new.content, new.output); END",
+)
+
+_UPSERT = (
+    "INSERT INTO history (content_hash, direction, content, output, duration_ms, first_chunk_ms, "
+    "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (direction, content_hash) DO UPDATE SET output = excluded.output, "
+    "duration_ms = excluded.duration_ms, first_chunk_ms = excluded.first_chunk_ms, "
+    "hits = hits + 1, updated_at = excluded.updated_at"
+)
+
+_COLUMNS = (
+    "h.id, h.direction, h.content, h.output, h.duration_ms, h.first_chunk_ms, h.hits, h.created_at, h.updated_at"
+)
+
+
+@dataclass
+class HistoryEntry:
+    """一条翻译历史"""
+
+    id: int
+    direction: TranslationDirection
+    content: str
+    output: str
+    duration_ms: Optional[float]
+    first_chunk_ms: Optional[float]
+    hits: int
+    created_at: float
+    updated_at: float
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class HistoryStore:
+    """翻译历史存储（后台线程批量写入）"""
+
+    def __init__(self, path: str, batch_size: int = 64, flush_interval: float = 1.0, max_entries: int = 0):
+        """初始化历史存储
+
+        Args:
+            path: SQLite 数据库文件路径
+            batch_size: 单个事务最多写入的记录数
+            flush_interval: 收到第一条记录后最多等待多久（秒）凑成一批
+            max_entries: 最多保留的记录数（按最近使用时间淘汰），0 表示不限制
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.metrics = get_metrics()
+        self._local = threading.local()
+        conn = self._connect()
+        for statement in _SCHEMA:
+            conn.execute(statement)
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = threading.Thread(
+            target=self._write_loop, name="history-writer", daemon=True
+        )
+        self._writer.start()
+        logger.info("HistoryStore initialized, path=%s", self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程的连接（每个线程一个连接）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record(
+        self,
+        content: str,
+        direction: TranslationDirection,
+        output: str,
+        duration_ms: Optional[float] = None,
+        first_chunk_ms: Optional[float] = None,
+    ) -> None:
+        """记录一次成功完成的翻译（放入队列，由后台线程写入）"""
+        if self._writer is not None:
+            now = time.time()
+            self._queue.put((
+                _content_hash(content), direction.value, content, output, duration_ms, first_chunk_ms, now, now
+            ))
+
+    def _write_loop(self) -> None:
+        """后台写入：收到第一条记录后在 flush_interval 内凑批，每批一个事务"""
+        conn = self._connect()
+        batches = 0
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                with conn:
+                    conn.execute("BEGIN")
+                    conn.executemany(_UPSERT, batch)
+                    batches += 1
+                    if self.max_entries and batches % _PRUNE_EVERY_BATCHES == 0:
+                        conn.execute(
+                            "DELETE FROM history WHERE id IN (SELECT id FROM history "
+                            "ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                            (self.max_entries,),
+                        )
+                self.metrics.inc("history_writes_total", len(batch))
+                self.metrics.observe("history_write_batch_size", len(batch))
+            except Exception as e:
+                logger.warning("History write failed, batch_size=%s, error=%s", len(batch), e)
+
+    def _search(self, query: str, direction: Optional[TranslationDirection], limit: int) -> list[HistoryEntry]:
+        terms = query.split()
+        if not terms:
+            return []
+        params: list = []
+        if all(len(term) >= _MIN_MATCH_LENGTH for term in terms):
+            # 每个关键词作为短语匹配（转义双引号），按 bm25 相关度排序
+            match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+            sql = (
+                f"SELECT {_COLUMNS} FROM history_fts JOIN history h ON h.id = history_fts.rowid "
+                "WHERE history_fts MATCH ?"
+            )
+            params.append(match)
+            order = "ORDER BY history_fts.rank"
+        else:
+            conditions = []
+            for term in terms:
+                conditions.append("(h.content LIKE ? ESCAPE '\\' OR h.output LIKE ? ESCAPE '\\')")
+                pattern = f"%{_escape_like(term)}%"
+                params += [pattern, pattern]
+            sql = f"SELECT {_COLUMNS} FROM history h WHERE " + " AND ".join(conditions)
+            order = "ORDER BY h.updated_at DESC"
+        if direction is not None:
+            sql += " AND h.direction = ?"
+            params.append(direction.value)
+        sql += f" {order} LIMIT ?"
+        params.append(limit)
+        return [self._to_entry(row) for row in self._connect().execute(sql, params).fetchall()]
+
+    def _get(self, entry_id: int) -> Optional[HistoryEntry]:
+        row = self._connect().execute(f"SELECT {_COLUMNS} FROM history h WHERE h.id = ?", (entry_id,)).fetchone()
+        return self._to_entry(row) if row else None
+
+    def _top(self, limit: int) -> list[HistoryEntry]:
+        rows = self._connect().execute(
+            f"SELECT {_COLUMNS} FROM history h ORDER BY h.hits DESC, h.updated_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    @staticmethod
+    def _to_entry(row: tuple) -> HistoryEntry:
+        entry_id, direction, *rest = row
+        return HistoryEntry(entry_id, TranslationDirection(direction), *rest)
+
+    async def search(
+        self,
+        query: str,
+        direction: Optional[TranslationDirection] = None,
+        limit: int = 20
+    ) -> list[HistoryEntry]:
+        """全文检索原文与译文（空白分隔的多个关键词需同时匹配）"""
+        started_at = time.perf_counter()
+        entries = await asyncio.to_thread(self._search, query, direction, limit)
+        self.metrics.observe("history_search_seconds", time.perf_counter() - started_at)
+        return entries
+
+    async def top(self, limit: int) -> list[HistoryEntry]:
+        """按翻译次数排序的最常用历史"""
+        return await asyncio.to_thread(self._top, limit)
+
+    async def get(self, entry_id: int) -> Optional[HistoryEntry]:
+        """按 ID 读取一条历史"""
+        return await asyncio.to_thread(self._get, entry_id)
+
+    def close(self) -> None:
+        """写出队列中剩余的记录，停止写入线程并关闭当前线程的连接"""
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+@lru_cache()
+def get_history_store() -> Optional[HistoryStore]:
+    """获取翻译历史实例（单例模式，未开启时返回 None）"""
+    settings = get_settings()
+    if not settings.history_enabled:
+        return None
+    return HistoryStore(
+        settings.history_path,
+        batch_size=settings.history_batch_size,
+        flush_interval=settings.history_flush_interval_ms / 1000,
+        max_entries=settings.history_max_entries,
+    )
@@ -6,20 +6,32 @@
 并返回识别结果和置信度。
 """
 
+import re
 import json
+import time
+import asyncio
 import logging
 from functools import lru_cache
+from typing import Optional
 
-from openai import OpenAIError
 from pydantic import BaseModel, Field
 
 from src.config import get_settings
-from src.prompts import INTENT_ROUTER_PROMPT
-from src.models import TranslationDirection
+from src.prompts import PromptSet, build_intent_batch_messages, build_intent_messages, get_prompts
+from src.models import TranslationDirection, TokenUsage
 from src.clients import get_deepseek_client
+from src.services.metrics import get_metrics, record_prompt_cache_usage
+from src.services.cache import ResultCache, get_result_cache, make_cache_key
+from src.services.batching import MicroBatcher
+from src.services.tracing import get_tracer
+from src.utils.tracing import get_current_span
 
 logger = logging.getLogger(__name__)
 
+# 流式增量解析用的字段匹配：数值后必须跟分隔符，确保数字已完整输出
+_DIRECTION_PATTERN = re.compile(r'"direction"\s*:\s*"([^"]*)"')
+_CONFIDENCE_PATTERN = re.compile(r'"confidence"\s*:\s*(-?[0-9]+(?:\.[0-9]+)?)(?=\s*[,}\n])')
+
 
 class IntentResult(BaseModel):
     """意图识别结果模型"""
@@ -45,26 +57,52 @@ class IntentRouter:
     使用 LLM 分析用户输入内容，判断其类型并返回识别结果。
     """
 
-    def __init__(self, api_key: str = None, base_url: str = None, model: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        base_url: str = None,
+        model: str = None,
+        cache: ResultCache = None,
+        prompts: PromptSet = None
+    ):
         """初始化意图路由器
 
         Args:
             api_key: DeepSeek API Key，默认从配置读取
             base_url: API 基础 URL，默认从配置读取
             model: 模型名称，默认从配置读取
+            cache: 结果缓存，默认使用全局缓存配置
+            prompts: 提示词模板快照，默认使用当前生效的模板
         """
         settings = get_settings()
         self.model = model or settings.deepseek_model
         self.timeout = settings.ai_timeout
+        self.max_tokens = settings.intent_max_tokens
+        self.cache = cache or get_result_cache()
+        self.prompts = prompts or get_prompts()
+        self.metrics = get_metrics()
+        self.tracer = get_tracer()
+
+        # 微批处理：合并窗口内的并发识别请求合并为一次补全
+        self.batcher: Optional[MicroBatcher[str, IntentResult]] = None
+        if settings.intent_batch_window_ms > 0 and settings.intent_batch_max_size > 1:
+            self.batcher = MicroBatcher(
+                self._classify_many,
+                window=settings.intent_batch_window_ms / 1000,
+                max_size=settings.intent_batch_max_size,
+                name="intent",
+            )
 
         # 使用共享的 DeepSeek 客户端
-        deepseek_client = get_deepseek_client()
-        self.client = deepseek_client.get_client()
-        logger.info(f"IntentRouter initialized, model={self.model}")
+        self.deepseek_client = get_deepseek_client()
+        self.client = self.deepseek_client.get_client()
+        logger.info("IntentRouter initialized, model=%s", self.model)
 
     async def detect_intent(self, content: str) -> IntentResult:
         """检测用户输入内容的意图
 
+        开启微批处理时，未命中缓存的请求在合并窗口内与其他并发请求一起识别。
+
         Args:
             content: 用户输入的原始内容
 
@@ -74,98 +112,382 @@ class IntentRouter:
         Raises:
             ValueError: 当 LLM 返回的结果无法解析时
         """
-        logger.info(f"Intent detection started, content_length={len(content)}")
-
+        logger.info("Intent detection started, content_length=%s", len(content))
+
+        attributes = {"content_length": len(content), "streaming": False, "batched": self.batcher is not None}
+        with self.tracer.start_as_current_span("intent.detect", attributes=attributes) as span:
+            result = await self._get_cached(content)
+            span.set_attribute("cache_hit", result is not None)
+            if result is None:
+                if self.batcher is not None:
+                    result = await self.batcher.submit(content)
+                else:
+                    result = await self._classify(content)
+            span.set_attributes({"direction": result.direction.value, "confidence": result.confidence})
+            return result
+
+    async def _classify(self, content: str) -> IntentResult:
+        """调用 LLM 识别单段内容（非流式），成功时写入缓存，失败时返回低置信度的默认结果"""
         try:
             # 调用 LLM 进行意图识别（非流式）
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": INTENT_ROUTER_PROMPT},
-                    {"role": "user", "content": content}
-                ],
-                stream=False,
-                temperature=0.1,  # 低温度以获得更稳定的分类结果
-            )
+            async with self.deepseek_client.lease():
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=build_intent_messages(content, self.prompts),
+                    stream=False,
+                    temperature=0.1,  # 低温度以获得更稳定的分类结果
+                    max_tokens=self.max_tokens,
+                )
+
+            # 记录 Token 用量
+            self._record_usage(TokenUsage.from_api(getattr(response, "usage", None)))
 
             # 提取响应内容
             result_text = response.choices[0].message.content.strip()
-            logger.debug(f"LLM response: {result_text}")
+            logger.debug("LLM response: %s", result_text)
 
-            # 解析 JSON 响应
+            # 解析 JSON 响应（无法解析时返回低置信度的默认结果，不写入缓存）
             intent_result = self._parse_response(result_text)
+            if intent_result is None:
+                return self._unparsed_result()
             logger.info(
-                f"Intent detected, direction={intent_result.direction.value}, "
-                f"confidence={intent_result.confidence:.2f}"
+                "Intent detected, direction=%s, confidence=%.2f",
+                intent_result.direction.value, intent_result.confidence
             )
+            await self._set_cached(content, intent_result)
             return intent_result
 
-        except OpenAIError as e:
-            logger.error(f"LLM API error during intent detection: {str(e)}")
-            # 返回默认结果，低置信度
+        except Exception as e:
+            return self._error_result(e)
+
+    async def _classify_many(self, contents: list[str]) -> list[IntentResult]:
+        """批量识别（微批处理器的处理函数）
+
+        一次补全识别整批内容，分摊系统提示词的开销并降低上游请求数；
+        响应无法按条解析时逐条识别，API 错误时整批返回低置信度的默认结果。
+        """
+        if len(contents) == 1:
+            return [await self._classify(contents[0])]
+
+        try:
+            async with self.deepseek_client.lease():
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=build_intent_batch_messages(contents, self.prompts),
+                    stream=False,
+                    temperature=0.1,
+                    max_tokens=self.max_tokens * len(contents),
+                )
+            self._record_usage(TokenUsage.from_api(getattr(response, "usage", None)))
+            results = self._parse_batch_response(response.choices[0].message.content.strip(), len(contents))
+        except Exception as e:
+            return [self._error_result(e) for _ in contents]
+
+        if results is None:
+            self.metrics.inc("intent_batch_fallback_total", model=self.model)
+            return list(await asyncio.gather(*(self._classify(content) for content in contents)))
+
+        logger.info("Intent batch detected, size=%s", len(contents))
+        await asyncio.gather(*(self._set_cached(content, result) for content, result in zip(contents, results)))
+        return results
+
+    @staticmethod
+    def _error_result(e: Exception) -> IntentResult:
+        """记录异常日志并返回低置信度的默认结果（调用方会提示用户手动选择方向）"""
+        from openai import OpenAIError  # 客户端构造时已加载
+
+        if isinstance(e, OpenAIError):
+            logger.error("LLM API error during intent detection: %s", e)
             return IntentResult(
                 direction=TranslationDirection.PRODUCT_TO_DEV,
                 confidence=0.0,
                 reasoning=f"API 错误，无法识别意图: {str(e)}"
             )
+        logger.exception("Unexpected error during intent detection: %s", e, exc_info=e)
+        return IntentResult(
+            direction=TranslationDirection.PRODUCT_TO_DEV,
+            confidence=0.0,
+            reasoning=f"识别失败: {str(e)}"
+        )
+
+    async def detect_intent_streaming(
+        self,
+        content: str,
+        fast: bool = False
+    ) -> tuple[IntentResult, Optional["asyncio.Task[str]"]]:
+        """流式检测意图，方向与置信度一旦确定立即返回
+
+        以流式方式调用 LLM 并增量解析 JSON：`direction` 和 `confidence` 通常在最初几个 Token
+        内输出，此时即可返回结果开始翻译，`reasoning` 由后台任务继续读取。
+
+        Args:
+            content: 用户输入的原始内容
+            fast: 快速模式，确定方向后立即关闭上游流并丢弃 reasoning
+
+        Returns:
+            (意图识别结果, reasoning 后台任务)。结果中的 reasoning 为空；
+            快速模式或流已读完时后台任务为 None
+        """
+        attributes = {"content_length": len(content), "streaming": True, "fast": fast}
+        with self.tracer.start_as_current_span("intent.detect", attributes=attributes) as span:
+            result, reasoning_task = await self._detect_intent_streaming(content, fast)
+            span.set_attributes({"direction": result.direction.value, "confidence": result.confidence})
+            return result, reasoning_task
+
+    async def _detect_intent_streaming(
+        self,
+        content: str,
+        fast: bool
+    ) -> tuple[IntentResult, Optional["asyncio.Task[str]"]]:
+        """流式检测意图（见 detect_intent_streaming）"""
+        from openai import OpenAIError  # 客户端构造时已加载
+
+        logger.info("Streaming intent detection started, content_length=%s, fast=%s", len(content), fast)
+        cached = await self._get_cached(content)
+        get_current_span().set_attribute("cache_hit", cached is not None)
+        if cached is not None:
+            return cached, None
+
+        started_at = time.perf_counter()
+        buffer = ""
+        stream = None
+        # 持有客户端租约直至流读取结束（交给 reasoning 后台任务时由任务结束后释放）
+        self.deepseek_client.acquire()
+        lease_handed_off = False
+
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=build_intent_messages(content, self.prompts),
+                stream=True,
+                stream_options={"include_usage": True},
+                temperature=0.1,  # 低温度以获得更稳定的分类结果
+                max_tokens=self.max_tokens,
+            )
+            iterator = stream.__aiter__()
+
+            # 读取分块直到方向和置信度都已确定
+            direction_match = confidence_match = None
+            async for chunk in iterator:
+                self._record_usage(TokenUsage.from_api(getattr(chunk, "usage", None)))
+                if not (chunk.choices and chunk.choices[0].delta.content):
+                    continue
+                buffer += chunk.choices[0].delta.content
+                direction_match = direction_match or _DIRECTION_PATTERN.search(buffer)
+                confidence_match = confidence_match or _CONFIDENCE_PATTERN.search(buffer)
+                if direction_match and confidence_match:
+                    break
+            else:
+                # 流已结束但未能提前确定，按完整文本解析（无法解析时不写入缓存）
+                intent_result = self._parse_response(buffer.strip())
+                self._observe_latency(started_at, early=False)
+                if intent_result is None:
+                    return self._unparsed_result(), None
+                await self._set_cached(content, intent_result)
+                return intent_result, None
+
+            intent_result = IntentResult(
+                direction=self._to_direction(direction_match.group(1)),
+                confidence=max(0.0, min(1.0, float(confidence_match.group(1)))),
+                reasoning="",
+            )
+            self._observe_latency(started_at, early=True)
+            logger.info(
+                "Intent resolved early, direction=%s, confidence=%.2f",
+                intent_result.direction.value, intent_result.confidence
+            )
+
+            if fast:
+                await _close_stream(stream)
+                return intent_result, None
+
+            reasoning_task = asyncio.create_task(
+                self._read_reasoning(iterator, stream, buffer, content, intent_result)
+            )
+            reasoning_task.add_done_callback(lambda _: self.deepseek_client.release())
+            lease_handed_off = True
+            return intent_result, reasoning_task
+
+        except OpenAIError as e:
+            logger.error("LLM API error during streaming intent detection: %s", e)
+            return IntentResult(
+                direction=TranslationDirection.PRODUCT_TO_DEV,
+                confidence=0.0,
+                reasoning=f"API 错误，无法识别意图: {str(e)}"
+            ), None
         except Exception as e:
-            logger.exception(f"Unexpected error during intent detection: {str(e)}")
+            logger.exception("Unexpected error during streaming intent detection: %s", e)
+            if stream is not None:
+                await _close_stream(stream)
             return IntentResult(
                 direction=TranslationDirection.PRODUCT_TO_DEV,
                 confidence=0.0,
                 reasoning=f"识别失败: {str(e)}"
-            )
+            ), None
+        finally:
+            if not lease_handed_off:
+                self.deepseek_client.release()
+
+    async def _read_reasoning(self, iterator, stream, buffer: str, content: str, early: IntentResult) -> str:
+        """读取意图识别流的剩余部分并提取 reasoning，完整结果写入缓存
 
-    def _parse_response(self, response_text: str) -> IntentResult:
+        完整文本无法解析（如被 max_tokens 截断）时沿用已确定的方向与置信度，reasoning 为空。
+        """
+        try:
+            async for chunk in iterator:
+                self._record_usage(TokenUsage.from_api(getattr(chunk, "usage", None)))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    buffer += chunk.choices[0].delta.content
+            intent_result = self._parse_response(buffer.strip()) or early
+            logger.debug("Intent reasoning received, length=%s", len(intent_result.reasoning))
+            await self._set_cached(content, intent_result)
+            return intent_result.reasoning
+        except Exception as e:
+            logger.warning("Failed to read intent reasoning: %s", e)
+            return ""
+        finally:
+            await _close_stream(stream)
+
+    async def is_cached(self, content: str) -> bool:
+        """该内容的意图识别结果是否已缓存"""
+        return await self.cache.contains(self._cache_key(content))
+
+    def _cache_key(self, content: str) -> str:
+        """生成意图识别结果的缓存键"""
+        return make_cache_key("intent", self.model, self.prompts.version, content)
+
+    async def _get_cached(self, content: str) -> Optional[IntentResult]:
+        """读取缓存的意图识别结果"""
+        if not self.cache.enabled:
+            return None
+        cached = await self.cache.get("intent", self._cache_key(content))
+        if cached is None:
+            return None
+        try:
+            intent_result = IntentResult.model_validate_json(cached)
+        except ValueError as e:
+            logger.warning("Ignoring invalid cached intent result: %s", e)
+            return None
+        logger.info(
+            "Intent cache hit, direction=%s, confidence=%.2f",
+            intent_result.direction.value, intent_result.confidence
+        )
+        return intent_result
+
+    async def _set_cached(self, content: str, intent_result: IntentResult) -> None:
+        """写入意图识别结果（仅缓存模型实际返回的结果，不缓存 API 错误降级结果）"""
+        if self.cache.enabled:
+            await self.cache.set("intent", self._cache_key(content), intent_result.model_dump_json())
+
+    def _observe_latency(self, started_at: float, early: bool) -> None:
+        """记录方向确定所需时间"""
+        self.metrics.observe(
+            "intent_resolve_seconds", time.perf_counter() - started_at, model=self.model, early=str(early).lower()
+        )
+
+    def _record_usage(self, usage: Optional[TokenUsage]) -> None:
+        """记录意图识别的 Token 用量"""
+        if usage is None:
+            return
+        self.metrics.inc("intent_prompt_tokens_total", usage.prompt_tokens, model=self.model)
+        self.metrics.inc("intent_completion_tokens_total", usage.completion_tokens, model=self.model)
+        record_prompt_cache_usage(usage, "intent", self.prompts.version)
+        logger.debug(
+            "Intent usage, prompt_tokens=%s, completion_tokens=%s, prompt_cache_hit_tokens=%s",
+            usage.prompt_tokens, usage.completion_tokens, usage.prompt_cache_hit_tokens
+        )
+
+    @staticmethod
+    def _to_direction(direction_str: str) -> TranslationDirection:
+        """将 LLM 返回的方向字符串转换为枚举，未知值默认为 product_to_dev"""
+        if direction_str == "product_to_dev":
+            return TranslationDirection.PRODUCT_TO_DEV
+        if direction_str == "dev_to_product":
+            return TranslationDirection.DEV_TO_PRODUCT
+        logger.warning("Unknown direction '%s', defaulting to product_to_dev", direction_str)
+        return TranslationDirection.PRODUCT_TO_DEV
+
+    def _result_from_data(self, data: dict) -> IntentResult:
+        """将解析后的 JSON 对象转换为识别结果"""
+        # 验证并转换 direction
+        direction = self._to_direction(data.get("direction", "product_to_dev"))
+
+        # 获取置信度，确保在有效范围内
+        confidence = float(data.get("confidence", 0.5))
+        confidence = max(0.0, min(1.0, confidence))
+
+        # 获取判断依据
+        reasoning = str(data.get("reasoning", ""))
+
+        return IntentResult(
+            direction=direction,
+            confidence=confidence,
+            reasoning=reasoning
+        )
+
+    def _parse_batch_response(self, response_text: str, count: int) -> Optional[list[IntentResult]]:
+        """解析批量识别返回的 JSON 数组（条数或序号不符、无法解析时返回 None）"""
+        try:
+            items = json.loads(_strip_code_fence(response_text))
+            if not isinstance(items, list) or len(items) != count:
+                raise ValueError(f"expected {count} items")
+            # 带序号时按序号排序，序号必须恰好覆盖 0..count-1；不带序号时按返回顺序
+            if all("index" in item for item in items):
+                items = sorted(items, key=lambda item: int(item["index"]))
+                if [int(item["index"]) for item in items] != list(range(count)):
+                    raise ValueError("index mismatch")
+            return [self._result_from_data(item) for item in items]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning("Failed to parse intent batch response: %s, response: %s", e, response_text[:200])
+            return None
+
+    def _parse_response(self, response_text: str) -> Optional[IntentResult]:
         """解析 LLM 返回的 JSON 响应
 
         Args:
             response_text: LLM 返回的原始文本
 
         Returns:
-            IntentResult: 解析后的意图识别结果
+            解析后的意图识别结果，无法解析（如输出被截断）时返回 None
         """
         try:
-            # 尝试提取 JSON（处理可能的 markdown 代码块包裹）
-            json_text = response_text
-            if "```json" in response_text:
-                json_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                json_text = response_text.split("```")[1].split("```")[0].strip()
-
-            data = json.loads(json_text)
-
-            # 验证并转换 direction
-            direction_str = data.get("direction", "product_to_dev")
-            if direction_str == "product_to_dev":
-                direction = TranslationDirection.PRODUCT_TO_DEV
-            elif direction_str == "dev_to_product":
-                direction = TranslationDirection.DEV_TO_PRODUCT
-            else:
-                logger.warning(f"Unknown direction '{direction_str}', defaulting to product_to_dev")
-                direction = TranslationDirection.PRODUCT_TO_DEV
-
-            # 获取置信度，确保在有效范围内
-            confidence = float(data.get("confidence", 0.5))
-            confidence = max(0.0, min(1.0, confidence))
-
-            # 获取判断依据
-            reasoning = str(data.get("reasoning", ""))
-
-            return IntentResult(
-                direction=direction,
-                confidence=confidence,
-                reasoning=reasoning
-            )
-
-        except (json.JSONDecodeError, KeyError, TypeError) as e:
-            logger.warning(f"Failed to parse LLM response as JSON: {str(e)}, response: {response_text[:200]}")
-            # 返回默认结果，低置信度
-            return IntentResult(
-                direction=TranslationDirection.PRODUCT_TO_DEV,
-                confidence=0.3,
-                reasoning="无法解析 LLM 响应，使用默认方向"
-            )
+            return self._result_from_data(json.loads(_strip_code_fence(response_text)))
+
+        except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+            logger.warning("Failed to parse LLM response as JSON: %s, response: %s", e, response_text[:200])
+            self.metrics.inc("intent_parse_failures_total", model=self.model)
+            return None
+
+    @staticmethod
+    def _unparsed_result() -> IntentResult:
+        """响应无法解析时的默认结果（低置信度，不写入缓存，下次请求重新识别）"""
+        return IntentResult(
+            direction=TranslationDirection.PRODUCT_TO_DEV,
+            confidence=0.3,
+            reasoning="无法解析 LLM 响应，使用默认方向"
+        )
+
+
+def _strip_code_fence(response_text: str) -> str:
+    """提取 JSON 文本（处理可能的 markdown 代码块包裹）"""
+    if "```json" in response_text:
+        return response_text.split("```json")[1].split("```")[0].strip()
+    if "```" in response_text:
+        return response_text.split("```")[1].split("```")[0].strip()
+    return response_text
+
+
+async def _close_stream(stream) -> None:
+    """关闭上游流（兼容 AsyncStream.close 与异步生成器 aclose）"""
+    close = getattr(stream, "close", None) or getattr(stream, "aclose", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if asyncio.iscoroutine(result):
+            await result
+    except Exception as e:
+        logger.debug("Failed to close intent stream: %s", e)
 
 
 @lru_cache()
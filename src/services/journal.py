@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+请求日志模块（request journal）
+
+按请求记录负载形状与上游输出节奏，写入按大小轮转的 JSONL 文件，供回放工具
+（benchmarks/replay_journal.py）在本地模拟上游上重现真实负载：
+- 请求形状：内容长度、翻译方向、是否智能识别、输出格式、是否并行分节
+- 时间线：意图识别耗时、翻译开始后每个输出块的时间偏移与字符数、总耗时、结束状态
+
+不记录原文：content 模式为 hash 时只记录内容的 SHA-256 前缀（用于识别重复请求），
+redact 时只记录长度。写文件在后台线程完成，请求路径上只把记录放入内存队列。
+"""
+
+import time
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Any, Optional
+
+from src.config import get_settings
+from src.models import TranslateRequest
+from src.services.intent_router import IntentResult
+from src.utils import JsonLineWriter
+
+logger = logging.getLogger(__name__)
+
+# 内容记录方式
+CONTENT_MODES = ("hash", "redact")
+
+# 内容哈希的十六进制长度
+_CONTENT_HASH_LENGTH = 16
+
+
+class JournalRecord:
+    """单个请求的记录（在请求结束时写入）"""
+
+    __slots__ = ("_journal", "fields", "_started_at", "_translation_started_at", "_offsets", "_sizes")
+
+    def __init__(self, journal: "RequestJournal", fields: dict[str, Any]):
+        self._journal = journal
+        self.fields = fields
+        self._started_at = time.perf_counter()
+        self._translation_started_at: Optional[float] = None
+        self._offsets: list[float] = []
+        self._sizes: list[int] = []
+
+    def intent_detected(self, intent_result: IntentResult) -> None:
+        """记录意图识别结果与耗时"""
+        self.fields["detected_direction"] = intent_result.direction.value
+        self.fields["confidence"] = intent_result.confidence
+        self.fields["intent_ms"] = _elapsed_ms(self._started_at)
+
+    def translation_started(self) -> None:
+        """记录翻译开始时间（输出块的时间偏移以此为起点）"""
+        self._translation_started_at = time.perf_counter()
+
+    def chunk(self, text: str) -> None:
+        """记录一个输出块"""
+        self._offsets.append(_elapsed_ms(self._translation_started_at or self._started_at))
+        self._sizes.append(len(text))
+
+    def finish(self, status: str) -> None:
+        """结束记录并写入日志
+
+        Args:
+            status: ok / error / aborted（停机中止）/ disconnected（客户端断开）/ 其他拒绝原因
+        """
+        self.fields["status"] = status
+        self.fields["total_ms"] = _elapsed_ms(self._started_at)
+        self.fields["first_chunk_ms"] = self._offsets[0] if self._offsets else None
+        self.fields["chunk_offsets_ms"] = self._offsets
+        self.fields["chunk_sizes"] = self._sizes
+        self._journal.write(self.fields)
+
+
+def _elapsed_ms(started_at: float) -> float:
+    return round((time.perf_counter() - started_at) * 1000, 1)
+
+
+class RequestJournal:
+    """请求日志写入器（后台线程写入按大小轮转的 JSONL 文件）"""
+
+    def __init__(self, path: str, content_mode: str = "hash", max_bytes: int = 0, backup_count: int = 0):
+        """初始化请求日志
+
+        Args:
+            path: 日志文件路径，`{pid}` 替换为进程号（多 worker 时各进程写各自的文件）
+            content_mode: hash / redact
+            max_bytes: 单个文件的最大字节数，超过后轮转，0 表示不轮转
+            backup_count: 保留的轮转文件数
+        """
+        if content_mode not in CONTENT_MODES:
+            raise ValueError(f"Unknown journal content mode: {content_mode}")
+        self.content_mode = content_mode
+        self._writer = JsonLineWriter(path, max_bytes=max_bytes, backup_count=backup_count)
+        self.path = self._writer.path
+        logger.info("RequestJournal initialized, path=%s, content=%s", self.path, content_mode)
+
+    def record(self, request: TranslateRequest) -> JournalRecord:
+        """开始记录一个翻译请求"""
+        fields: dict[str, Any] = {
+            "ts": round(time.time(), 3),
+            "content_length": len(request.content),
+            "direction": request.direction.value if request.direction else None,
+            "auto_detect": request.auto_detect,
+            "stream_format": request.stream_format.value,
+            "parallel_sections": request.parallel_sections,
+        }
+        if self.content_mode == "hash":
+            digest = hashlib.sha256(request.content.encode("utf-8")).hexdigest()
+            fields["content_sha256"] = digest[:_CONTENT_HASH_LENGTH]
+        return JournalRecord(self, fields)
+
+    def write(self, entry: dict[str, Any]) -> None:
+        """写入一条记录（放入队列，序列化与写文件由后台线程完成）"""
+        self._writer.write(entry)
+
+    def close(self) -> None:
+        """写出队列中剩余的记录并关闭文件"""
+        self._writer.close()
+
+
+@lru_cache()
+def get_request_journal() -> Optional[RequestJournal]:
+    """获取请求日志实例（单例模式，未开启时返回 None）"""
+    settings = get_settings()
+    if not settings.journal_enabled:
+        return None
+    return RequestJournal(
+        settings.journal_path,
+        content_mode=settings.journal_content,
+        max_bytes=settings.journal_max_bytes,
+        backup_count=settings.journal_backup_count,
+    )
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+事件循环延迟监控模块
+
+每个 worker 的请求处理、SSE 生成与上游流读取共用一个事件循环，任何同步操作
+（YAML 加载、大请求体校验等）都会同时拖慢所有进行中的流。本模块在生产环境中持续测量：
+- 采样任务：每隔 interval 秒 sleep 一次，实际唤醒时间与预期之差即调度延迟，
+  写入 event_loop_lag_seconds 直方图与最近一次延迟的仪表
+- 看门狗线程：采样任务超过 slow_threshold 没有按时唤醒时，说明有回调正阻塞事件循环，
+  此时抓取事件循环线程的当前调用栈写入日志（类似 asyncio debug 模式的慢回调告警，
+  但直接指出阻塞位置，且无需开启 debug 模式）
+
+延迟直方图的 p99 持续偏高时说明单个 worker 已饱和，应增加 worker 数。
+"""
+
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from typing import Optional
+
+from src.services.metrics import MetricsRegistry, get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LoopMonitor:
+    """事件循环延迟监控"""
+
+    def __init__(self, interval: float, slow_threshold: float, metrics: Optional[MetricsRegistry] = None):
+        """初始化监控
+
+        Args:
+            interval: 采样间隔（秒）
+            slow_threshold: 阻塞超过该时长（秒）时记录事件循环线程的调用栈，0 表示不启动看门狗
+            metrics: 指标注册表，默认使用全局注册表
+        """
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.metrics = metrics or get_metrics()
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0  # 采样任务最近一次唤醒的时间（看门狗线程读取）
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """在事件循环中启动采样任务与看门狗线程"""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._task = asyncio.create_task(self._sample())
+        if self.slow_threshold > 0:
+            self._stopped.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+        logger.info("Loop monitor started, interval=%s, slow_threshold=%s", self.interval, self.slow_threshold)
+
+    async def stop(self) -> None:
+        """停止采样任务与看门狗线程"""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.wait([self._task])
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _sample(self) -> None:
+        """周期性测量调度延迟"""
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self._last_beat = now
+            lag = max(0.0, now - started_at - self.interval)
+            self.metrics.observe("event_loop_lag_seconds", lag)
+            self.metrics.set_gauge("event_loop_lag_last_seconds", lag)
+            if self.slow_threshold > 0 and lag >= self.slow_threshold:
+                self.metrics.inc("event_loop_slow_callbacks_total")
+                logger.warning("Event loop blocked, lag_ms=%.0f", lag * 1000)
+
+    def _watch(self) -> None:
+        """看门狗：采样任务迟迟没有唤醒时记录事件循环线程的调用栈（每次阻塞只记录一次）"""
+        reported_beat = None
+        check_interval = min(self.interval, self.slow_threshold) / 2
+        while not self._stopped.wait(check_interval):
+            beat = self._last_beat
+            blocked = time.perf_counter() - beat - self.interval
+            if blocked >= self.slow_threshold and beat != reported_beat:
+                reported_beat = beat
+                logger.warning(
+                    "Event loop blocked for more than %.0f ms, loop thread stack:\n%s",
+                    blocked * 1000, self.loop_stack()
+                )
+
+    def loop_stack(self) -> str:
+        """事件循环线程的当前调用栈"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return ""
+        return "".join(traceback.format_stack(frame))
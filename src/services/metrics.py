@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+指标统计模块
+
+提供进程内的轻量指标注册表（计数器、仪表、直方图），
+用于观察各路由的延迟、Token 消耗等关键性能指标。
+"""
+
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Any
+
+from src.models import TokenUsage
+
+# 直方图保留的最近样本数量（用于计算分位数）
+_RESERVOIR_SIZE = 1024
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, Any]) -> LabelKey:
+    """将标签字典转换为可哈希的有序元组"""
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Histogram:
+    """直方图：记录样本的数量、总和、极值及最近样本"""
+
+    __slots__ = ("count", "total", "min", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.samples: deque[float] = deque(maxlen=_RESERVOIR_SIZE)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def quantile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    def summary(self) -> dict[str, float]:
+        if not self.count:
+            return {"count": 0, "sum": 0.0}
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "avg": round(self.total / self.count, 6),
+            "min": round(self.min, 6),
+            "max": round(self.max, 6),
+            "p50": round(self.quantile(0.5), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "p99": round(self.quantile(0.99), 6),
+        }
+
+
+class MetricsRegistry:
+    """指标注册表
+
+    所有指标按「名称 + 标签」分组存储，线程安全。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[LabelKey, float]] = {}
+        self._gauges: dict[str, dict[LabelKey, float]] = {}
+        self._histograms: dict[str, dict[LabelKey, _Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """累加计数器"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """设置仪表当前值"""
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def add_gauge(self, name: str, delta: float, **labels: Any) -> None:
+        """增减仪表当前值"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            series[key] = series.get(key, 0) + delta
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """向直方图记录一个样本"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram()
+            histogram.observe(value)
+
+    def get_counter(self, name: str, **labels: Any) -> float:
+        """读取计数器当前值（不存在时为 0）"""
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def get_gauge(self, name: str, **labels: Any) -> float:
+        """读取仪表当前值（不存在时为 0）"""
+        with self._lock:
+            return self._gauges.get(name, {}).get(_label_key(labels), 0)
+
+    def get_histogram(self, name: str, **labels: Any) -> dict[str, float]:
+        """读取直方图摘要"""
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(_label_key(labels))
+            return histogram.summary() if histogram else {"count": 0, "sum": 0.0}
+
+    def snapshot(self) -> dict[str, Any]:
+        """导出全部指标的快照"""
+        with self._lock:
+            return {
+                "counters": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self._counters.items()
+                },
+                "gauges": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self._gauges.items()
+                },
+                "histograms": {
+                    name: [{"labels": dict(key), **histogram.summary()} for key, histogram in series.items()]
+                    for name, series in self._histograms.items()
+                },
+            }
+
+    def reset(self) -> None:
+        """清空全部指标"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+@lru_cache()
+def get_metrics() -> MetricsRegistry:
+    """获取指标注册表实例（单例模式）"""
+    return MetricsRegistry()
+
+
+def record_prompt_cache_usage(usage: TokenUsage, direction: str, prompt_version: str) -> None:
+    """记录服务端提示词前缀缓存的命中情况
+
+    按方向累计命中/未命中 Token 数，并更新累计命中率仪表。
+
+    Args:
+        usage: 单次调用的 Token 用量
+        direction: 翻译方向，意图识别使用 "intent"
+        prompt_version: 提示词版本标识
+    """
+    if usage.prompt_cache_hit_tokens is None or usage.prompt_cache_miss_tokens is None:
+        return
+    metrics = get_metrics()
+    labels = {"direction": direction, "prompt_version": prompt_version}
+    metrics.inc("prompt_cache_hit_tokens_total", usage.prompt_cache_hit_tokens, **labels)
+    metrics.inc("prompt_cache_miss_tokens_total", usage.prompt_cache_miss_tokens, **labels)
+    hit = metrics.get_counter("prompt_cache_hit_tokens_total", **labels)
+    miss = metrics.get_counter("prompt_cache_miss_tokens_total", **labels)
+    if hit + miss:
+        metrics.set_gauge("prompt_cache_hit_ratio", round(hit / (hit + miss), 4), **labels)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+模型路由模块
+
+根据输入长度、翻译方向和意图识别置信度，为每个翻译请求选择
+模型、max_tokens 与 temperature，让简短或简单的输入走更便宜、更快的模型。
+"""
+
+import logging
+from functools import lru_cache
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from src.config import get_settings
+from src.models import TranslationDirection
+
+logger = logging.getLogger(__name__)
+
+# 未匹配任何路由时使用的默认路由名称
+DEFAULT_ROUTE_NAME = "default"
+
+
+class ModelRoute(BaseModel):
+    """模型路由规则
+
+    匹配条件均为可选，未设置的条件视为始终满足；按配置顺序第一个匹配的路由生效。
+    """
+    name: str = Field(..., description="路由名称，用于指标和日志")
+    model: Optional[str] = Field(None, description="模型名称，为空时使用 DEEPSEEK_MODEL")
+    max_tokens: Optional[int] = Field(None, gt=0, description="最大生成 Token 数")
+    temperature: Optional[float] = Field(None, ge=0.0, le=2.0, description="采样温度")
+
+    # 匹配条件
+    directions: list[TranslationDirection] = Field(
+        default_factory=list,
+        description="适用的翻译方向，为空表示全部方向"
+    )
+    min_length: Optional[int] = Field(None, ge=0, description="内容最小字符数（含）")
+    max_length: Optional[int] = Field(None, ge=0, description="内容最大字符数（含）")
+    min_confidence: Optional[float] = Field(
+        None,
+        ge=0.0,
+        le=1.0,
+        description="意图识别最低置信度，仅在智能模式下生效"
+    )
+
+    def matches(
+        self,
+        content_length: int,
+        direction: TranslationDirection,
+        confidence: Optional[float] = None
+    ) -> bool:
+        """判断请求是否满足该路由的全部匹配条件"""
+        if self.directions and direction not in self.directions:
+            return False
+        if self.min_length is not None and content_length < self.min_length:
+            return False
+        if self.max_length is not None and content_length > self.max_length:
+            return False
+        if (
+            self.min_confidence is not None
+            and confidence is not None
+            and confidence < self.min_confidence
+        ):
+            return False
+        return True
+
+
+class ModelRouter:
+    """模型路由器类
+
+    从配置 MODEL_ROUTES 加载路由规则，为请求选择合适的模型参数。
+    """
+
+    def __init__(self, routes: list[ModelRoute] = None, default_model: str = None):
+        """初始化模型路由器
+
+        Args:
+            routes: 路由规则列表，默认从配置读取
+            default_model: 默认模型名称，默认从配置读取
+        """
+        settings = get_settings()
+        self.default_model = default_model or settings.deepseek_model
+        if routes is None:
+            routes = [ModelRoute(**route) for route in settings.model_routes]
+        self.routes = routes
+        self.default_route = ModelRoute(name=DEFAULT_ROUTE_NAME, model=self.default_model)
+        logger.info("ModelRouter initialized, routes=%s", [route.name for route in self.routes])
+
+    def select(
+        self,
+        content: str,
+        direction: TranslationDirection,
+        confidence: Optional[float] = None
+    ) -> ModelRoute:
+        """为请求选择路由
+
+        Args:
+            content: 待翻译的内容
+            direction: 翻译方向
+            confidence: 意图识别置信度，手动指定方向时为 None
+
+        Returns:
+            ModelRoute: 命中的路由（model 已补全为实际模型名称）
+        """
+        content_length = len(content)
+        for route in self.routes:
+            if route.matches(content_length, direction, confidence):
+                if route.model is None:
+                    return route.model_copy(update={"model": self.default_model})
+                return route
+        return self.default_route
+
+
+@lru_cache()
+def get_model_router() -> ModelRouter:
+    """获取模型路由器实例（单例模式）"""
+    return ModelRouter()
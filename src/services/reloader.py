@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+配置热加载模块
+
+在不重启进程的前提下重新加载 config.yaml 与外部提示词模板，并原子替换：
+- 全局配置实例（get_settings）
+- 当前生效的提示词模板快照（get_prompts），提示词版本随之变化，缓存键自然失效
+- 上游客户端与服务单例（翻译器、意图路由器、模型路由器）
+
+进行中的请求持有旧的服务实例与客户端租约，继续使用旧配置与旧提示词完成；
+旧客户端在最后一个租约释放后关闭。可通过管理接口手动触发，或按间隔轮询文件修改时间自动触发。
+
+结果缓存、请求日志、翻译历史、租户用量、链路追踪、缓存预热与事件循环监控在启动时按配置创建，
+热加载不会重建；这些配置项变化时记录警告并在结果中列出，需重启生效。
+"""
+
+import asyncio
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+from src.config import CONFIG_PATH, Settings, configure_logging, get_settings, set_settings
+from src.prompts import PROMPT_FILES, get_prompts, load_prompts, set_prompts
+from src.clients import get_deepseek_client
+from src.services.metrics import get_metrics
+from src.services.model_router import ModelRoute, get_model_router
+from src.services.translator import get_translator
+from src.services.intent_router import get_intent_router
+
+logger = logging.getLogger(__name__)
+
+
+# 需重启生效的配置项：启动时创建、热加载不重建的组件所使用的配置（以 _ 结尾的为前缀）
+RESTART_REQUIRED_SETTINGS = (
+    "port",
+    "cache_backend",
+    "cache_path",
+    "cache_ttl_seconds",
+    "cache_max_entries",
+    "journal_",
+    "history_",
+    "warmup_",
+    "usage_",
+    "tenants",
+    "tracing_",
+    "loop_",
+    "config_reload_interval",
+)
+
+
+def restart_required(old: Settings, new: Settings) -> list[str]:
+    """列出两份配置之间变化了、但需重启才能生效的配置项"""
+    return [
+        name for name in Settings.model_fields
+        if name.startswith(RESTART_REQUIRED_SETTINGS) and getattr(old, name) != getattr(new, name)
+    ]
+
+
+def _log_config(settings: Settings) -> tuple:
+    """日志相关配置（变化时才重新初始化日志管道）"""
+    return settings.get_log_level(), settings.log_format, settings.log_sampling
+
+
+class ConfigReloader:
+    """配置与提示词热加载器"""
+
+    def __init__(self):
+        self.metrics = get_metrics()
+        self._lock = asyncio.Lock()
+        self._mtimes = self._watched_mtimes()
+
+    def _watched_paths(self) -> list[Path]:
+        """需要监视的文件：config.yaml 与提示词目录中的模板文件"""
+        paths = [CONFIG_PATH]
+        prompts_dir = get_settings().prompts_dir
+        if prompts_dir:
+            paths.extend(Path(prompts_dir) / filename for filename in PROMPT_FILES.values())
+        return paths
+
+    def _watched_mtimes(self) -> dict[str, Optional[float]]:
+        mtimes = {}
+        for path in self._watched_paths():
+            try:
+                mtimes[str(path)] = path.stat().st_mtime
+            except OSError:
+                mtimes[str(path)] = None
+        return mtimes
+
+    def changed(self) -> bool:
+        """监视的文件自上次加载以来是否有变化"""
+        return self._watched_mtimes() != self._mtimes
+
+    async def reload(self, reason: str = "manual") -> dict[str, Any]:
+        """重新加载配置与提示词并替换服务单例
+
+        新配置与模板全部校验通过后才替换；任一步骤失败时保留原配置并抛出异常。
+
+        Args:
+            reason: 触发原因（manual / file_change），用于日志与指标
+
+        Returns:
+            加载结果摘要
+        """
+        async with self._lock:
+            old_settings = get_settings()
+            old_prompts = get_prompts()
+            try:
+                # 读取 config.yaml 与提示词文件是阻塞 I/O，放到线程中执行
+                settings = await asyncio.to_thread(Settings)
+                prompts = await asyncio.to_thread(load_prompts, settings.prompts_dir)
+                for route in settings.model_routes:
+                    ModelRoute(**route)
+            except Exception as e:
+                self.metrics.inc("config_reloads_total", reason=reason, result="error")
+                logger.error("Config reload failed, reason=%s, error=%s", reason, e)
+                raise
+
+            old_client = get_deepseek_client() if get_deepseek_client.cache_info().currsize else None
+            set_settings(settings)
+            set_prompts(prompts)
+            get_deepseek_client.cache_clear()
+            get_model_router.cache_clear()
+            get_translator.cache_clear()
+            get_intent_router.cache_clear()
+            if _log_config(settings) != _log_config(old_settings):
+                configure_logging()
+            pending_restart = restart_required(old_settings, settings)
+            if pending_restart:
+                logger.warning(
+                    "Config reload: settings require a restart to take effect: %s", ", ".join(pending_restart)
+                )
+            self._mtimes = self._watched_mtimes()
+
+            # 旧客户端不再分配给新请求，进行中的请求结束后关闭
+            if old_client is not None:
+                await old_client.retire()
+
+            self.metrics.inc("config_reloads_total", reason=reason, result="ok")
+            result = {
+                "reason": reason,
+                "prompt_version": prompts.version,
+                "previous_prompt_version": old_prompts.version,
+                "prompt_source": prompts.source,
+                "model": settings.deepseek_model,
+                "in_flight_on_previous_client": old_client.active_leases if old_client else 0,
+                "restart_required": pending_restart,
+            }
+            logger.info(
+                "Config reloaded, reason=%s, prompt_version=%s -> %s, model=%s",
+                reason, old_prompts.version, prompts.version, settings.deepseek_model
+            )
+            return result
+
+    async def watch(self, interval: float) -> None:
+        """按间隔轮询监视文件的修改时间，变化时自动重新加载（作为后台任务运行）"""
+        logger.info("Config watcher started, interval=%ss", interval)
+        while True:
+            await asyncio.sleep(interval)
+            if not self.changed():
+                # 未变化的轮询也计入指标，便于确认监视任务仍在运行
+                self.metrics.inc("config_reloads_total", reason="file_change", result="unchanged")
+                continue
+            try:
+                await self.reload(reason="file_change")
+            except Exception:
+                # 加载失败时记录当前修改时间，避免对同一个错误版本反复重试
+                self._mtimes = self._watched_mtimes()
+
+
+@lru_cache()
+def get_config_reloader() -> ConfigReloader:
+    """获取配置热加载器实例（单例模式）"""
+    return ConfigReloader()
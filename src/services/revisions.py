@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+修订翻译模块
+
+用户修改少量句子后重新提交时，按段落比较新旧原文，只重新生成受影响的分节：
+- 段落：去除首尾空白后的非空行（需求文本通常一句一行或一段一行）
+- 变更段落超过全文的 MAX_CHANGED_RATIO 时视为新文档，整篇翻译
+- 上一次的翻译按提示词中的二级标题切分为各分节正文
+- 各分节请求附带旧分节正文与段落变更列表，模型判断不受影响时只输出 UNCHANGED_MARK，
+  该分节直接沿用旧正文
+"""
+
+import difflib
+from dataclasses import dataclass
+from typing import Optional
+
+# 模型判断分节不受修改影响时输出的标记
+UNCHANGED_MARK = "[UNCHANGED]"
+
+# 变更段落的字符数超过全文的该比例时不再修订（各分节请求都携带全文，大改动整篇重译更省），
+# 同时避免引用与本次内容无关的旧翻译
+MAX_CHANGED_RATIO = 0.5
+
+# 段落变更类型
+CHANGE_LABELS = {"insert": "新增", "delete": "删除", "replace": "修改"}
+
+
+@dataclass(frozen=True)
+class ParagraphChange:
+    """一处段落变更（新增时 old 为空，删除时 new 为空）"""
+
+    op: str
+    old: tuple[str, ...]
+    new: tuple[str, ...]
+
+    def describe(self) -> str:
+        """变更的文字描述（用于提示词）"""
+        old, new = "\n".join(self.old), "\n".join(self.new)
+        if self.op == "insert":
+            return f"- {CHANGE_LABELS[self.op]}：「{new}」"
+        if self.op == "delete":
+            return f"- {CHANGE_LABELS[self.op]}：「{old}」"
+        return f"- {CHANGE_LABELS[self.op]}：「{old}」→「{new}」"
+
+
+def split_paragraphs(content: str) -> list[str]:
+    """按行切分段落（忽略空行与首尾空白）"""
+    return [line.strip() for line in content.splitlines() if line.strip()]
+
+
+def diff_paragraphs(old_content: str, new_content: str) -> list[ParagraphChange]:
+    """比较新旧原文，返回段落级变更列表（无变化时为空列表）"""
+    old, new = split_paragraphs(old_content), split_paragraphs(new_content)
+    matcher = difflib.SequenceMatcher(a=old, b=new, autojunk=False)
+    return [
+        ParagraphChange(op, tuple(old[i1:i2]), tuple(new[j1:j2]))
+        for op, i1, i2, j1, j2 in matcher.get_opcodes()
+        if op != "equal"
+    ]
+
+
+def changed_ratio(changes: list[ParagraphChange], old_content: str, new_content: str) -> float:
+    """变更段落的字符数占全文的比例（新旧两侧取较大者）"""
+    old_total = sum(len(paragraph) for paragraph in split_paragraphs(old_content))
+    new_total = sum(len(paragraph) for paragraph in split_paragraphs(new_content))
+    old_changed = sum(len(paragraph) for change in changes for paragraph in change.old)
+    new_changed = sum(len(paragraph) for change in changes for paragraph in change.new)
+    return max(old_changed / old_total if old_total else 1.0, new_changed / new_total if new_total else 1.0)
+
+
+def describe_changes(changes: list[ParagraphChange]) -> str:
+    """将变更列表格式化为提示词中的文本"""
+    return "\n".join(change.describe() for change in changes)
+
+
+def split_sections(output: str, titles: list[str]) -> Optional[dict[str, str]]:
+    """将翻译结果按二级标题切分为各分节正文
+
+    Args:
+        output: 上一次的完整翻译结果
+        titles: 提示词中定义的分节标题
+
+    Returns:
+        标题 -> 正文（去除首尾空白）；任一标题缺失时返回 None
+    """
+    sections: dict[str, list[str]] = {}
+    current: Optional[list[str]] = None
+    for line in output.splitlines():
+        title = line[3:].strip() if line.startswith("## ") else None
+        if title in titles:
+            current = sections.setdefault(title, [])
+        elif current is not None:
+            # 未在提示词中定义的二级标题属于当前分节正文
+            current.append(line)
+    if any(title not in sections for title in titles):
+        return None
+    return {title: "\n".join(sections[title]).strip() for title in titles}
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown 分节解析模块
+
+在流式输出路径上增量解析 Markdown 二级标题（`## 标题`），把字符流转换为
+section_start / section_delta / section_end 事件，便于客户端按节渲染或只消费某一节。
+
+解析器只维护当前行的少量待定状态，每个分块的处理代价与分块长度成正比（O(chunk)），
+不会重新解析已累积的文本。
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+# 分节标题标记（提示词模板中各节均为二级标题）
+SECTION_MARKER = "## "
+
+SECTION_START = "section_start"
+SECTION_DELTA = "section_delta"
+SECTION_END = "section_end"
+
+
+class SectionEvent(BaseModel):
+    """分节事件"""
+    type: str = Field(..., description="事件类型：section_start / section_delta / section_end")
+    index: int = Field(..., description="分节序号，从 0 开始")
+    title: Optional[str] = Field(None, description="分节标题，仅 section_start 携带；标题前的导语为空字符串")
+    text: Optional[str] = Field(None, description="增量文本，仅 section_delta 携带")
+
+    def payload(self) -> dict:
+        """事件的 JSON 负载（不含类型字段和空值）"""
+        return self.model_dump(exclude={"type"}, exclude_none=True)
+
+
+class SectionParser:
+    """增量 Markdown 分节解析器
+
+    用法：对每个文本分块调用 feed()，流结束时调用 close()，两者均返回本次产生的事件列表。
+    """
+
+    def __init__(self, marker: str = SECTION_MARKER):
+        self.marker = marker
+        self._index = -1            # 当前分节序号，-1 表示尚未开始任何分节
+        self._open = False          # 当前是否有未结束的分节
+        self._line_start = True     # 下一个字符是否位于行首
+        self._pending = ""          # 行首尚无法判定是否为标题的字符
+        self._heading: Optional[str] = None  # 正在收集的标题文本
+        self._text: list[str] = []  # 本次 feed 中待合并输出的正文
+
+    def feed(self, chunk: str) -> list[SectionEvent]:
+        """处理一个文本分块
+
+        Args:
+            chunk: 流式输出的文本片段
+
+        Returns:
+            本分块产生的事件列表（同一分节内的正文合并为一个 section_delta）
+        """
+        events: list[SectionEvent] = []
+        marker = self.marker
+        i = 0
+        n = len(chunk)
+
+        while i < n:
+            # 正在收集标题：读到行尾为止
+            if self._heading is not None:
+                newline = chunk.find("\n", i)
+                if newline == -1:
+                    self._heading += chunk[i:]
+                    break
+                self._heading += chunk[i:newline]
+                i = newline + 1
+                self._start_section(self._heading.strip(), events)
+                self._heading = None
+                self._line_start = True
+                continue
+
+            # 行首：逐步比对标题标记，尚不能判定时暂存
+            if self._line_start:
+                take = chunk[i:i + len(marker) - len(self._pending)]
+                candidate = self._pending + take
+                if marker.startswith(candidate):
+                    i += len(take)
+                    if len(candidate) == len(marker):
+                        self._pending = ""
+                        self._heading = ""
+                        self._line_start = False
+                    else:
+                        self._pending = candidate
+                    continue
+                # 不是标题：暂存字符作为正文输出，并从当前位置继续
+                self._line_start = False
+                if self._pending:
+                    self._text.append(self._pending)
+                    self._pending = ""
+
+            # 普通正文：输出到行尾（含换行符）
+            newline = chunk.find("\n", i)
+            if newline == -1:
+                self._text.append(chunk[i:])
+                break
+            self._text.append(chunk[i:newline + 1])
+            i = newline + 1
+            self._line_start = True
+
+        self._flush_text(events)
+        return events
+
+    def close(self) -> list[SectionEvent]:
+        """结束解析，输出剩余内容并关闭当前分节"""
+        events: list[SectionEvent] = []
+        if self._heading is not None:
+            self._start_section(self._heading.strip(), events)
+            self._heading = None
+        elif self._pending:
+            self._text.append(self._pending)
+            self._pending = ""
+            self._flush_text(events)
+        if self._open:
+            events.append(SectionEvent(type=SECTION_END, index=self._index))
+            self._open = False
+        return events
+
+    def _start_section(self, title: str, events: list[SectionEvent]) -> None:
+        """结束上一分节并开始新分节"""
+        self._flush_text(events)
+        if self._open:
+            events.append(SectionEvent(type=SECTION_END, index=self._index))
+        self._index += 1
+        self._open = True
+        events.append(SectionEvent(type=SECTION_START, index=self._index, title=title))
+
+    def _flush_text(self, events: list[SectionEvent]) -> None:
+        """将暂存正文合并为一个 section_delta 事件"""
+        if not self._text:
+            return
+        text = "".join(self._text)
+        self._text.clear()
+        if not self._open:
+            # 第一个标题之前的前导空白直接丢弃（与分块边界无关），非空内容作为无标题导语分节
+            text = text.lstrip()
+            if not text:
+                return
+            self._index += 1
+            self._open = True
+            events.append(SectionEvent(type=SECTION_START, index=self._index, title=""))
+        events.append(SectionEvent(type=SECTION_DELTA, index=self._index, text=text))
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+租户用量与配额模块
+
+多个团队共用同一个 DeepSeek API Key 时，按租户统计请求数与 Token 消耗并限制配额：
+- 租户识别：请求头 X-API-Key 匹配 TENANTS 中配置的 api_key，未携带时归入匿名租户
+  （USAGE_REQUIRE_API_KEY 开启时拒绝）
+- 计数：按自然日与自然月累计请求数、提示词与生成 Token 数（来自流式响应最后一个分块的 usage），
+  并按单价折算费用
+- 配额：translate() 准入时检查日 / 月的请求数与 Token 配额，超出时返回 429
+- 存储：计数只在事件循环线程中更新内存中的增量（无锁），由后台任务按间隔合并写入本地 SQLite；
+  写入后读回全部 worker 的累计值，多 worker 部署时配额按所有进程的总用量判断
+"""
+
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from src.config import get_settings
+from src.models import TokenUsage
+from src.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# 未携带 API Key 的请求归入的租户
+ANONYMOUS_TENANT = "anonymous"
+
+# 计数字段（与存储表的列一致）
+_FIELDS = ("requests", "prompt_tokens", "completion_tokens")
+
+PeriodKey = tuple[str, str]  # (租户, 统计周期)
+
+
+class TenantConfig(BaseModel):
+    """租户配置（配额为 0 表示不限制）"""
+    name: str = Field(..., description="租户名称，用于用量报告与指标")
+    api_key: str = Field("", description="请求头 X-API-Key 的值")
+    daily_token_quota: int = Field(0, ge=0, description="每日 Token 配额（提示词 + 生成）")
+    monthly_token_quota: int = Field(0, ge=0, description="每月 Token 配额（提示词 + 生成）")
+    daily_request_quota: int = Field(0, ge=0, description="每日请求数配额")
+    monthly_request_quota: int = Field(0, ge=0, description="每月请求数配额")
+
+
+def current_periods(now: Optional[datetime] = None) -> tuple[str, str]:
+    """当前的统计周期（自然日、自然月，服务器本地时间）"""
+    now = now or datetime.now()
+    return f"day:{now:%Y-%m-%d}", f"month:{now:%Y-%m}"
+
+
+class UsageLedger:
+    """租户用量账本"""
+
+    def __init__(
+        self,
+        tenants: list[TenantConfig],
+        path: str,
+        require_api_key: bool = False,
+        prompt_price: float = 0.0,
+        completion_price: float = 0.0,
+    ):
+        """初始化用量账本
+
+        Args:
+            tenants: 租户配置
+            path: SQLite 数据库文件路径（同一主机上的多个 worker 共享）
+            require_api_key: 是否拒绝未携带 API Key 的请求
+            prompt_price: 每百万提示词 Token 的单价
+            completion_price: 每百万生成 Token 的单价
+        """
+        self.tenants = {tenant.name: tenant for tenant in tenants}
+        self._by_key = {tenant.api_key: tenant for tenant in tenants if tenant.api_key}
+        self.anonymous = None if require_api_key else TenantConfig(name=ANONYMOUS_TENANT)
+        self.prompt_price = prompt_price
+        self.completion_price = completion_price
+        self.metrics = get_metrics()
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            "tenant TEXT NOT NULL, period TEXT NOT NULL, requests INTEGER NOT NULL DEFAULT 0, "
+            "prompt_tokens INTEGER NOT NULL DEFAULT 0, completion_tokens INTEGER NOT NULL DEFAULT 0, "
+            "updated_at REAL NOT NULL, PRIMARY KEY (tenant, period))"
+        )
+
+        # 三层计数：已写入存储的累计值（含其他 worker）+ 正在写入的增量 + 尚未写入的增量
+        self._stored: dict[PeriodKey, list[int]] = self._read(current_periods())
+        self._flushing: dict[PeriodKey, list[int]] = {}
+        self._pending: dict[PeriodKey, list[int]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程的连接（每个线程一个连接）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def resolve(self, api_key: Optional[str]) -> Optional[TenantConfig]:
+        """按 API Key 识别租户（未携带时为匿名租户，无法识别时返回 None）"""
+        if not api_key:
+            return self.anonymous
+        return self._by_key.get(api_key)
+
+    def _add(self, tenant: TenantConfig, deltas: tuple[int, int, int]) -> None:
+        """累加当前日、月周期的未写入增量（仅在事件循环线程中调用）"""
+        for period in current_periods():
+            counters = self._pending.setdefault((tenant.name, period), [0, 0, 0])
+            for index, delta in enumerate(deltas):
+                counters[index] += delta
+
+    def record_request(self, tenant: TenantConfig) -> None:
+        """计入一次请求"""
+        self._add(tenant, (1, 0, 0))
+        self.metrics.inc("tenant_requests_total", tenant=tenant.name)
+
+    def record_usage(self, tenant: TenantConfig, usage: TokenUsage) -> None:
+        """计入一次补全的 Token 用量（作为翻译器的 on_usage 回调）"""
+        self._add(tenant, (0, usage.prompt_tokens, usage.completion_tokens))
+        self.metrics.inc("tenant_prompt_tokens_total", usage.prompt_tokens, tenant=tenant.name)
+        self.metrics.inc("tenant_completion_tokens_total", usage.completion_tokens, tenant=tenant.name)
+
+    def totals(self, tenant_name: str, period: str) -> list[int]:
+        """租户在某周期的累计计数 [requests, prompt_tokens, completion_tokens]"""
+        key = (tenant_name, period)
+        result = [0, 0, 0]
+        for layer in (self._stored, self._flushing, self._pending):
+            counters = layer.get(key)
+            if counters is not None:
+                result = [total + value for total, value in zip(result, counters)]
+        return result
+
+    def exceeded_quota(self, tenant: TenantConfig) -> Optional[str]:
+        """检查配额，已用尽时返回配额描述，否则返回 None"""
+        day, month = current_periods()
+        checks = (
+            (day, "每日", tenant.daily_request_quota, tenant.daily_token_quota),
+            (month, "每月", tenant.monthly_request_quota, tenant.monthly_token_quota),
+        )
+        for period, label, request_quota, token_quota in checks:
+            requests, prompt_tokens, completion_tokens = self.totals(tenant.name, period)
+            if request_quota and requests >= request_quota:
+                return f"{label}请求数配额（{request_quota}）"
+            if token_quota and prompt_tokens + completion_tokens >= token_quota:
+                return f"{label} Token 配额（{token_quota}）"
+        return None
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        """按单价折算费用"""
+        return round((prompt_tokens * self.prompt_price + completion_tokens * self.completion_price) / 1_000_000, 6)
+
+    def report(self, tenant_names: Optional[list[str]] = None) -> list[dict]:
+        """当前日、月周期的用量报告
+
+        Args:
+            tenant_names: 报告的租户，默认为全部已配置的租户及有用量的匿名租户
+        """
+        day, month = current_periods()
+        if tenant_names is None:
+            tenant_names = list(self.tenants)
+            if self.anonymous is not None and any(self.totals(ANONYMOUS_TENANT, day)):
+                tenant_names.append(ANONYMOUS_TENANT)
+        reports = []
+        for name in tenant_names:
+            tenant = self.tenants.get(name) or TenantConfig(name=name)
+            periods = {}
+            for key, period, request_quota, token_quota in (
+                ("day", day, tenant.daily_request_quota, tenant.daily_token_quota),
+                ("month", month, tenant.monthly_request_quota, tenant.monthly_token_quota),
+            ):
+                requests, prompt_tokens, completion_tokens = self.totals(name, period)
+                periods[key] = {
+                    "period": period.partition(":")[2],
+                    "requests": requests,
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                    "cost": self.cost(prompt_tokens, completion_tokens),
+                    "request_quota": request_quota or None,
+                    "token_quota": token_quota or None,
+                }
+            reports.append({"tenant": name, **periods})
+        return reports
+
+    def _write(self, deltas: dict[PeriodKey, list[int]], periods: tuple[str, str]) -> dict[PeriodKey, list[int]]:
+        """在一个事务中写入增量，并读回当前周期的累计值（在线程池中执行）"""
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO usage (tenant, period, requests, prompt_tokens, completion_tokens, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (tenant, period) DO UPDATE SET "
+                "requests = requests + excluded.requests, "
+                "prompt_tokens = prompt_tokens + excluded.prompt_tokens, "
+                "completion_tokens = completion_tokens + excluded.completion_tokens, "
+                "updated_at = excluded.updated_at",
+                [(tenant, period, *counters, now) for (tenant, period), counters in deltas.items()],
+            )
+        return self._read(periods)
+
+    def _read(self, periods: tuple[str, str]) -> dict[PeriodKey, list[int]]:
+        rows = self._connect().execute(
+            f"SELECT tenant, period, {', '.join(_FIELDS)} FROM usage WHERE period IN (?, ?)", periods
+        ).fetchall()
+        return {(tenant, period): list(counters) for tenant, period, *counters in rows}
+
+    async def flush(self) -> None:
+        """将未写入的增量合并写入存储，并刷新所有 worker 的累计值"""
+        self._flushing, self._pending = self._pending, {}
+        try:
+            self._stored = await asyncio.to_thread(self._write, self._flushing, current_periods())
+        except Exception as e:
+            logger.warning("Usage flush failed, error=%s", e)
+            # 写入失败的增量放回，下次重试
+            for key, counters in self._flushing.items():
+                pending = self._pending.setdefault(key, [0, 0, 0])
+                for index, value in enumerate(counters):
+                    pending[index] += value
+        finally:
+            self._flushing = {}
+
+    async def run(self, interval: float) -> None:
+        """按间隔写入用量（作为后台任务运行）"""
+        logger.info("Usage flusher started, interval=%ss", interval)
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+    def close(self) -> None:
+        """写入剩余的增量并关闭当前线程的连接（停机时调用）"""
+        if self._pending:
+            self._stored = self._write(self._pending, current_periods())
+            self._pending = {}
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+@lru_cache()
+def get_usage_ledger() -> Optional[UsageLedger]:
+    """获取用量账本实例（单例模式，未开启时返回 None）"""
+    settings = get_settings()
+    if not settings.usage_enabled:
+        return None
+    tenants = [TenantConfig(**tenant) for tenant in settings.tenants]
+    logger.info("UsageLedger initialized, tenants=%s", len(tenants))
+    return UsageLedger(
+        tenants,
+        settings.usage_path,
+        require_api_key=settings.usage_require_api_key,
+        prompt_price=settings.usage_prompt_price_per_million,
+        completion_price=settings.usage_completion_price_per_million,
+    )
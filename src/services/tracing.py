@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+链路追踪配置模块
+
+按配置创建全局 Tracer（span 接口见 src.utils.tracing）。
+"""
+
+import logging
+from functools import lru_cache
+
+from src.config import get_settings
+from src.utils.tracing import ConsoleSpanExporter, FileSpanExporter, SpanExporter, Tracer
+
+logger = logging.getLogger(__name__)
+
+# span 导出方式
+EXPORTERS = ("console", "file")
+
+
+@lru_cache()
+def get_tracer() -> Tracer:
+    """获取 Tracer 实例（单例模式，未开启时返回不记录的 Tracer）"""
+    settings = get_settings()
+    if not settings.tracing_enabled:
+        return Tracer(enabled=False)
+    if settings.tracing_exporter not in EXPORTERS:
+        raise ValueError(f"Unknown tracing exporter: {settings.tracing_exporter}")
+    exporter: SpanExporter
+    if settings.tracing_exporter == "file":
+        exporter = FileSpanExporter(
+            settings.tracing_path,
+            max_bytes=settings.tracing_max_bytes,
+            backup_count=settings.tracing_backup_count,
+        )
+    else:
+        exporter = ConsoleSpanExporter()
+    logger.info("Tracing enabled, exporter=%s", settings.tracing_exporter)
+    return Tracer(exporter)
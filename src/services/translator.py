@@ -5,110 +5,754 @@
 负责调用 DeepSeek API 进行双向翻译，支持流式输出。
 """
 
+import json
+import time
 import logging
 import asyncio
-from typing import AsyncGenerator
-from functools import lru_cache
-
-from openai import OpenAIError, APIConnectionError, AuthenticationError, RateLimitError
+from typing import AsyncGenerator, Callable, Optional
+from functools import lru_cache, partial
 
 from src.config import get_settings
-from src.prompts import get_system_prompt
-from src.models import TranslationDirection
+from src.prompts import (
+    PromptSet,
+    build_messages,
+    build_revision_messages,
+    build_section_messages,
+    get_prompt_sections,
+    get_prompts,
+)
+from src.models import TranslationDirection, TokenUsage
 from src.clients import get_deepseek_client
+from src.services.metrics import get_metrics, record_prompt_cache_usage
+from src.services.model_router import ModelRoute, ModelRouter, get_model_router
+from src.services.cache import ResultCache, get_result_cache, make_cache_key
+from src.services.tracing import get_tracer
+from src.services.revisions import (
+    MAX_CHANGED_RATIO,
+    UNCHANGED_MARK,
+    changed_ratio,
+    describe_changes,
+    diff_paragraphs,
+    split_sections,
+)
+from src.utils import dumps_str
 
 logger = logging.getLogger(__name__)
 
+# 表示某一路流已完成的哨兵对象（并行分节 / 双向翻译）
+_SECTION_DONE = object()
+
+# 双向翻译的两个方向（按输出顺序）
+BOTH_DIRECTIONS = (TranslationDirection.PRODUCT_TO_DEV, TranslationDirection.DEV_TO_PRODUCT)
+
+# 输出的是已失效的旧译文（过期优先模式），在正文之前输出
+STALE_MARK = "[STALE]"
+
+# 正在后台刷新的缓存键（模块级：热加载替换翻译器实例后仍能去重，每个键只刷新一次）
+_refreshing: set[str] = set()
+
+
+class _StreamStats:
+    """单次补全流的统计信息"""
+
+    __slots__ = ("chunk_count", "output_chars", "usage", "finish_reason")
+
+    def __init__(self):
+        self.chunk_count = 0
+        self.output_chars = 0
+        self.usage: Optional[TokenUsage] = None
+        self.finish_reason: Optional[str] = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.finish_reason == "length"
+
+
+class _StreamOutcome:
+    """一次翻译的完成情况（由生成函数填写，结果缓存据此决定是否写入）"""
+
+    __slots__ = ("complete",)
+
+    def __init__(self):
+        self.complete = False  # 所有补全均以 stop 正常结束（未被 max_tokens 截断）
+
+
+def _stale_key(content: str, direction: TranslationDirection) -> str:
+    """旧译文的缓存键（不含模型与提示词版本，模板或路由变化后仍能命中）"""
+    return make_cache_key("stale", direction.value, content)
+
+
+def _revision_key(cache_key: str) -> str:
+    """由结果缓存键生成修订条目的缓存键"""
+    return "revision:" + cache_key.partition(":")[2]
+
+
+def _is_unchanged(head: str) -> bool:
+    """分节开头是否为不变标记（或其前缀，需要继续缓冲）"""
+    head = head.strip()
+    return UNCHANGED_MARK.startswith(head) or head.startswith(UNCHANGED_MARK)
+
 
 class Translator:
     """翻译服务类"""
 
-    def __init__(self, api_key: str = None, base_url: str = None, model: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        base_url: str = None,
+        model: str = None,
+        model_router: ModelRouter = None,
+        cache: ResultCache = None,
+        prompts: PromptSet = None
+    ):
         """初始化翻译器
 
         Args:
             api_key: DeepSeek API Key，默认从配置读取
             base_url: API 基础 URL，默认从配置读取
             model: 模型名称，默认从配置读取
+            model_router: 模型路由器，默认使用全局路由配置
+            cache: 结果缓存，默认使用全局缓存配置
+            prompts: 提示词模板快照，默认使用当前生效的模板（热加载后新请求由新实例处理）
         """
         settings = get_settings()
         self.model = model or settings.deepseek_model
         self.timeout = settings.ai_timeout
+        self.completion_max_tokens = settings.completion_max_tokens
+        if model_router is None:
+            # 显式指定模型时不走全局路由
+            model_router = ModelRouter(default_model=model) if model else get_model_router()
+        self.model_router = model_router
+        self.cache = cache or get_result_cache()
+        self.prompts = prompts or get_prompts()
+        self.metrics = get_metrics()
+        self.tracer = get_tracer()
+        self._background_tasks: set[asyncio.Task] = set()
+
+        # 过期优先：旧译文保留时长与后台刷新并发上限
+        self.stale_while_revalidate = settings.cache_stale_while_revalidate
+        self.stale_ttl = settings.cache_stale_ttl_seconds
+        self._refresh_limit = asyncio.Semaphore(max(1, settings.cache_refresh_concurrency))
 
         # 使用共享的 DeepSeek 客户端
-        deepseek_client = get_deepseek_client()
-        self.client = deepseek_client.get_client()
-        logger.info(f"Translator initialized, model={self.model}")
+        self.deepseek_client = get_deepseek_client()
+        self.client = self.deepseek_client.get_client()
+        logger.info("Translator initialized, model=%s", self.model)
 
     async def translate_stream(
         self,
         content: str,
-        direction: TranslationDirection
+        direction: TranslationDirection,
+        confidence: Optional[float] = None,
+        on_usage: Optional[Callable[[TokenUsage], None]] = None
     ) -> AsyncGenerator[str, None]:
         """流式翻译
 
         Args:
             content: 待翻译的内容
             direction: 翻译方向
+            confidence: 意图识别置信度（智能模式），用于模型路由
+            on_usage: 收到最终 Token 用量时的回调
 
         Yields:
             翻译结果的文本片段，最后一个为 [DONE] 或 [ERROR] 标记
         """
-        logger.info(f"Translation started, direction={direction.value}, content_length={len(content)}")
+        route = self.model_router.select(content, direction, confidence)
+        async for chunk in self._with_cache(self._stream_single, content, direction, route, on_usage):
+            yield chunk
 
-        try:
-            # 获取对应方向的系统提示词
-            system_prompt = get_system_prompt(direction.value)
+    async def _stream_single(
+        self,
+        content: str,
+        direction: TranslationDirection,
+        route: ModelRoute,
+        on_usage: Optional[Callable[[TokenUsage], None]] = None,
+        outcome: Optional[_StreamOutcome] = None
+    ) -> AsyncGenerator[str, None]:
+        """单次补全流式翻译"""
+        labels = {"route": route.name, "model": route.model, "direction": direction.value, "mode": "single"}
+        logger.info(
+            "Translation started, direction=%s, content_length=%s, route=%s, model=%s",
+            direction.value, len(content), route.name, route.model
+        )
+        self.metrics.inc("translation_requests_total", **labels)
+        started_at = time.perf_counter()
+        status = "error"
+        span = self.tracer.start_span("translation.generate", attributes={"mode": "single"})
 
-            # 调用 DeepSeek API（OpenAI 兼容接口），设置超时
-            stream = await asyncio.wait_for(
-                self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": content}
-                    ],
-                    stream=True,
-                ),
-                timeout=self.timeout
-            )
+        try:
+            # 组装前缀稳定的消息（静态系统提示词在前，便于命中服务端前缀缓存）
+            messages = build_messages(direction.value, content, self.prompts)
+            stream = await self._open_stream(route, messages)
 
             # 流式输出
-            chunk_count = 0
-            async for chunk in stream:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    text = chunk.choices[0].delta.content
-                    chunk_count += 1
-                    yield text
+            stats = _StreamStats()
+            async for text in self._iter_text(stream, stats):
+                if stats.chunk_count == 1:
+                    self.metrics.observe("translation_ttft_seconds", time.perf_counter() - started_at, **labels)
+                    span.add_event("first_token")
+                yield text
 
             # 完成标记
-            logger.info(f"Translation completed successfully, chunks_sent={chunk_count}")
+            status = "ok"
+            span.set_attributes({"chunks": stats.chunk_count, "output_chars": stats.output_chars})
+            self._finish(route, labels, direction, [stats], on_usage, outcome)
             yield "[DONE]"
 
-        except AuthenticationError as e:
-            logger.error(f"Authentication failed, api_key_valid=false, error={str(e)}")
-            yield "[ERROR] API Key 无效，请检查配置"
+        except Exception as e:
+            span.record_exception(e)
+            yield self._error_chunk(e)
+
+        finally:
+            self.metrics.observe(
+                "translation_duration_seconds", time.perf_counter() - started_at, status=status, **labels
+            )
+            span.set_status(status)
+            span.end()
+
+    async def translate_stream_parallel(
+        self,
+        content: str,
+        direction: TranslationDirection,
+        confidence: Optional[float] = None,
+        on_usage: Optional[Callable[[TokenUsage], None]] = None
+    ) -> AsyncGenerator[str, None]:
+        """并行分节流式翻译
+
+        按方向提示词中定义的分节，为每一节并发发起一次补全：第一节实时输出，
+        后续分节在轮到时先输出已缓冲的内容，再继续实时输出，整体顺序与单次补全一致。
 
-        except RateLimitError as e:
-            logger.warning(f"Rate limit exceeded, error={str(e)}")
-            yield "[ERROR] 请求过于频繁，请稍后重试"
+        Args:
+            content: 待翻译的内容
+            direction: 翻译方向
+            confidence: 意图识别置信度（智能模式），用于模型路由
+            on_usage: 收到最终 Token 用量（各分节合计）时的回调
 
-        except APIConnectionError as e:
-            logger.error(f"API connection failed, error={str(e)}")
-            yield "[ERROR] 网络连接异常，请检查网络后重试"
+        Yields:
+            翻译结果的文本片段，最后一个为 [DONE] 或 [ERROR] 标记
+        """
+        route = self.model_router.select(content, direction, confidence)
+        async for chunk in self._with_cache(self._stream_parallel, content, direction, route, on_usage):
+            yield chunk
 
-        except asyncio.TimeoutError:
-            logger.error(f"Translation request timed out, timeout_seconds={self.timeout}")
-            yield "[ERROR] AI 服务响应超时，请稍后重试"
+    async def _stream_parallel(
+        self,
+        content: str,
+        direction: TranslationDirection,
+        route: ModelRoute,
+        on_usage: Optional[Callable[[TokenUsage], None]] = None,
+        outcome: Optional[_StreamOutcome] = None
+    ) -> AsyncGenerator[str, None]:
+        """并行分节流式翻译"""
+        titles = get_prompt_sections(direction.value, self.prompts)
+        if not titles:
+            # 提示词未定义分节时退化为单次补全
+            async for chunk in self._stream_single(content, direction, route, on_usage, outcome):
+                yield chunk
+            return
+
+        def messages_for(title: str) -> list[dict[str, str]]:
+            return build_section_messages(direction.value, content, title, self.prompts)
 
-        except OpenAIError as e:
-            error_msg = str(e)
-            logger.error(f"OpenAI API error, error_type={type(e).__name__}, error={error_msg}")
-            yield "[ERROR] AI 服务暂时不可用，请稍后重试"
+        async for chunk in self._stream_sections(
+            content, direction, route, on_usage, titles, messages_for, "parallel", outcome=outcome
+        ):
+            yield chunk
+
+    async def translate_stream_revision(
+        self,
+        content: str,
+        direction: TranslationDirection,
+        previous_revision: str,
+        confidence: Optional[float] = None,
+        on_usage: Optional[Callable[[TokenUsage], None]] = None
+    ) -> AsyncGenerator[str, None]:
+        """修订翻译：只重新生成受修改影响的分节
+
+        按段落比较上一次翻译的原文与本次内容，各分节并发请求时附带旧分节正文与变更列表，
+        模型判断不受影响的分节直接沿用旧正文，Token 消耗与耗时随修改量而非全文长度增长。
+        上一次的修订不存在（缓存未开启或已过期）、方向不同、修改范围过大或无法按分节切分时退化为整篇翻译。
+
+        Args:
+            content: 修改后的内容
+            direction: 翻译方向
+            previous_revision: 上一次翻译的修订 ID（见 revision_id）
+            confidence: 意图识别置信度（智能模式），用于模型路由
+            on_usage: 收到最终 Token 用量（各分节合计）时的回调
+
+        Yields:
+            翻译结果的文本片段，最后一个为 [DONE] 或 [ERROR] 标记
+        """
+        route = self.model_router.select(content, direction, confidence)
+        previous = await self._load_revision(previous_revision, direction)
+        producer = self._stream_single if previous is None else partial(self._stream_revision, previous)
+        async for chunk in self._with_cache(producer, content, direction, route, on_usage):
+            yield chunk
+
+    async def _stream_revision(
+        self,
+        previous: dict,
+        content: str,
+        direction: TranslationDirection,
+        route: ModelRoute,
+        on_usage: Optional[Callable[[TokenUsage], None]] = None,
+        outcome: Optional[_StreamOutcome] = None
+    ) -> AsyncGenerator[str, None]:
+        """按段落变更修订上一次的翻译结果"""
+        titles = get_prompt_sections(direction.value, self.prompts)
+        sections = split_sections(previous["output"], titles) if titles else None
+        if sections is None:
+            logger.info("Revision falls back to full translation, reason=sections_unavailable")
+            async for chunk in self._stream_single(content, direction, route, on_usage, outcome):
+                yield chunk
+            return
+
+        changes = diff_paragraphs(previous["content"], content)
+        if not changes:
+            # 段落没有变化（只调整了空行或首尾空白），整篇沿用
+            labels = {"route": route.name, "model": route.model, "direction": direction.value, "mode": "revision"}
+            self.metrics.inc("translation_sections_reused_total", len(titles), **labels)
+            if outcome is not None:
+                outcome.complete = True
+            yield previous["output"]
+            yield "[DONE]"
+            return
+
+        ratio = changed_ratio(changes, previous["content"], content)
+        if ratio > MAX_CHANGED_RATIO:
+            # 修改范围过大（或已是另一份文档）：逐节修订的开销超过整篇翻译
+            logger.info("Revision falls back to full translation, reason=large_edit, changed_ratio=%.2f", ratio)
+            async for chunk in self._stream_single(content, direction, route, on_usage, outcome):
+                yield chunk
+            return
+
+        described = describe_changes(changes)
+
+        def messages_for(title: str) -> list[dict[str, str]]:
+            return build_revision_messages(
+                direction.value, content, title, sections[title], described, UNCHANGED_MARK, self.prompts
+            )
+
+        async for chunk in self._stream_sections(
+            content, direction, route, on_usage, titles, messages_for, "revision", sections, outcome
+        ):
+            yield chunk
+
+    async def _stream_sections(
+        self,
+        content: str,
+        direction: TranslationDirection,
+        route: ModelRoute,
+        on_usage: Optional[Callable[[TokenUsage], None]],
+        titles: list[str],
+        messages_for: Callable[[str], list[dict[str, str]]],
+        mode: str,
+        previous_sections: Optional[dict[str, str]] = None,
+        outcome: Optional[_StreamOutcome] = None
+    ) -> AsyncGenerator[str, None]:
+        """为每个分节并发发起一次补全，按分节顺序输出
+
+        previous_sections 不为空时为修订模式：分节输出为 UNCHANGED_MARK 时沿用旧正文，
+        因此每个分节先缓冲开头，确认不是该标记后再输出。
+        """
+        labels = {"route": route.name, "model": route.model, "direction": direction.value, "mode": mode}
+        logger.info(
+            "Sectioned translation started, direction=%s, content_length=%s, "
+            "route=%s, model=%s, mode=%s, sections=%s",
+            direction.value, len(content), route.name, route.model, mode, len(titles)
+        )
+        self.metrics.inc("translation_requests_total", **labels)
+        started_at = time.perf_counter()
+        status = "error"
+        span = self.tracer.start_span("translation.generate", attributes={"mode": mode, "sections": len(titles)})
+
+        queues: list[asyncio.Queue] = [asyncio.Queue() for _ in titles]
+        stats_list = [_StreamStats() for _ in titles]
+
+        async def run_section(index: int, title: str) -> None:
+            """生成单个分节，文本、结束标记或异常依次放入该分节的队列"""
+            try:
+                stream = await self._open_stream(route, messages_for(title))
+                async for text in self._iter_text(stream, stats_list[index]):
+                    queues[index].put_nowait(text)
+                queues[index].put_nowait(_SECTION_DONE)
+            except Exception as e:
+                queues[index].put_nowait(e)
+
+        tasks = [asyncio.create_task(run_section(index, title)) for index, title in enumerate(titles)]
+
+        try:
+            first_text = True
+            reused = 0
+            for index, title in enumerate(titles):
+                yield f"## {title}\n"
+                head = "" if previous_sections is not None else None  # 修订模式下尚未确认的开头
+                while True:
+                    item = await queues[index].get()
+                    if item is _SECTION_DONE:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    if head is not None:
+                        head += item
+                        if _is_unchanged(head):
+                            continue
+                        item, head = head, None
+                    if first_text:
+                        self.metrics.observe("translation_ttft_seconds", time.perf_counter() - started_at, **labels)
+                        span.add_event("first_token")
+                        first_text = False
+                    yield item
+                if head is not None:
+                    # 整个分节都是不变标记（或为空）：沿用旧正文
+                    reused += 1
+                    if first_text:
+                        self.metrics.observe("translation_ttft_seconds", time.perf_counter() - started_at, **labels)
+                        span.add_event("first_token")
+                        first_text = False
+                    yield previous_sections[title]
+                yield "\n\n"
+
+            status = "ok"
+            span.set_attribute("chunks", sum(stats.chunk_count for stats in stats_list))
+            if previous_sections is not None:
+                span.set_attribute("sections_reused", reused)
+                self.metrics.inc("translation_sections_reused_total", reused, **labels)
+                logger.info("Revision completed, sections_reused=%s, sections_total=%s", reused, len(titles))
+            self._finish(route, labels, direction, stats_list, on_usage, outcome)
+            yield "[DONE]"
 
         except Exception as e:
-            logger.exception(f"Unexpected error during translation, error_type={type(e).__name__}, error={str(e)}")
-            yield "[ERROR] 翻译过程中发生错误，请稍后重试"
+            span.record_exception(e)
+            yield self._error_chunk(e)
+
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.metrics.observe(
+                "translation_duration_seconds", time.perf_counter() - started_at, status=status, **labels
+            )
+            span.set_status(status)
+            span.end()
+
+    async def translate_stream_both(
+        self,
+        content: str,
+        parallel_sections: bool = False,
+        on_usage: Optional[Callable[[TokenUsage], None]] = None
+    ) -> AsyncGenerator[tuple[TranslationDirection, str], None]:
+        """双向并发流式翻译
+
+        同时发起产品→开发与开发→产品两个方向的翻译，两路输出按到达顺序交错输出，
+        整体耗时约为较慢一路的耗时。
+
+        Args:
+            content: 待翻译的内容
+            parallel_sections: 每个方向是否按分节并行生成
+            on_usage: 每个方向收到最终 Token 用量时的回调
+
+        Yields:
+            (方向, 文本片段)，每个方向各以自己的 [DONE] 或 [ERROR] 标记结束
+        """
+        stream_func = self.translate_stream_parallel if parallel_sections else self.translate_stream
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def run_direction(direction: TranslationDirection) -> None:
+            """翻译单个方向，输出块与结束哨兵依次放入共享队列"""
+            try:
+                async for chunk in stream_func(content, direction, on_usage=on_usage):
+                    queue.put_nowait((direction, chunk))
+            except Exception as e:
+                queue.put_nowait((direction, self._error_chunk(e)))
+            finally:
+                queue.put_nowait((direction, _SECTION_DONE))
+
+        tasks = [asyncio.create_task(run_direction(direction)) for direction in BOTH_DIRECTIONS]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                direction, chunk = await queue.get()
+                if chunk is _SECTION_DONE:
+                    remaining -= 1
+                    continue
+                yield direction, chunk
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _with_cache(
+        self,
+        producer: Callable[..., AsyncGenerator[str, None]],
+        content: str,
+        direction: TranslationDirection,
+        route: ModelRoute,
+        on_usage: Optional[Callable[[TokenUsage], None]]
+    ) -> AsyncGenerator[str, None]:
+        """结果缓存包装：命中时直接输出缓存结果，未命中时调用上游并在成功后写入缓存
+
+        开启过期优先时，未命中但存在旧译文（缓存过期或提示词 / 模型已变化）则先输出 STALE_MARK 与旧译文，
+        并在后台重新生成、更新缓存。
+        """
+        # 生成器可能在其他任务中回收，span 不设为当前 span
+        span = self.tracer.start_span("translation", attributes={
+            "direction": direction.value, "route": route.name, "model": route.model, "content_length": len(content),
+        })
+        try:
+            # 持有客户端租约：热加载替换客户端后，旧客户端在本次请求结束后才关闭
+            async with self.deepseek_client.lease():
+                if not self.cache.enabled:
+                    span.set_attribute("cache", "disabled")
+                    async for chunk in producer(content, direction, route, on_usage):
+                        yield chunk
+                    return
+
+                key = self.cache_key(content, direction, route)
+                cached = await self.cache.get("translation", key)
+                if cached is not None:
+                    span.set_attribute("cache", "hit")
+                    logger.info("Translation cache hit, direction=%s, route=%s", direction.value, route.name)
+                    yield cached
+                    yield "[DONE]"
+                    return
+
+                stale = await self._get_stale(content, direction) if self.stale_while_revalidate else None
+                if stale is not None:
+                    span.set_attribute("cache", "stale")
+                    logger.info("Serving stale translation, direction=%s, route=%s", direction.value, route.name)
+                    self.metrics.inc("cache_stale_served_total", direction=direction.value)
+                    self._schedule_refresh(producer, content, direction, route, key)
+                    yield STALE_MARK
+                    yield stale
+                    yield "[DONE]"
+                    return
+
+                span.set_attribute("cache", "miss")
+                parts: list[str] = []
+                outcome = _StreamOutcome()
+                async for chunk in producer(content, direction, route, on_usage, outcome):
+                    if chunk == "[DONE]":
+                        # 只缓存正常结束的结果（被 max_tokens 截断的不缓存）；写入在后台进行，不延迟结束标记
+                        if outcome.complete:
+                            self._spawn(self._store(key, content, direction, "".join(parts)))
+                        else:
+                            logger.info("Incomplete translation not cached, direction=%s", direction.value)
+                    elif not chunk.startswith("[ERROR]"):
+                        parts.append(chunk)
+                    yield chunk
+        finally:
+            span.end()
+
+    async def _store(self, key: str, content: str, direction: TranslationDirection, output: str) -> None:
+        """写入翻译结果，同时保存原文供后续修订翻译比较；过期优先模式下另存一份旧译文"""
+        await self.cache.set("translation", key, output)
+        revision = {"direction": direction.value, "content": content, "output": output}
+        await self.cache.set("revision", _revision_key(key), dumps_str(revision))
+        if self.stale_while_revalidate:
+            # 旧译文比翻译结果多保留 stale_ttl，过期后的这段时间内仍可先返回
+            await self.cache.set("stale", _stale_key(content, direction), output, ttl=self.cache.ttl + self.stale_ttl)
+
+    async def _get_stale(self, content: str, direction: TranslationDirection) -> Optional[str]:
+        """读取旧译文（不存在时返回 None）"""
+        return await self.cache.get("stale", _stale_key(content, direction))
+
+    def _schedule_refresh(
+        self,
+        producer: Callable[..., AsyncGenerator[str, None]],
+        content: str,
+        direction: TranslationDirection,
+        route: ModelRoute,
+        key: str
+    ) -> None:
+        """在后台重新生成旧译文（同一缓存键已在刷新时跳过）"""
+        if key in _refreshing:
+            self.metrics.inc("cache_refresh_total", result="deduplicated")
+            return
+        _refreshing.add(key)
+        self._spawn(self._refresh(producer, content, direction, route, key))
+
+    async def _refresh(
+        self,
+        producer: Callable[..., AsyncGenerator[str, None]],
+        content: str,
+        direction: TranslationDirection,
+        route: ModelRoute,
+        key: str
+    ) -> None:
+        """后台刷新：受并发上限约束，成功后更新缓存（Token 用量不计入发起请求的租户）"""
+        try:
+            async with self._refresh_limit, self.deepseek_client.lease():
+                parts: list[str] = []
+                outcome = _StreamOutcome()
+                async for chunk in producer(content, direction, route, None, outcome):
+                    if chunk.startswith("[ERROR]"):
+                        logger.warning("Stale translation refresh failed, direction=%s, error=%s", direction.value, chunk)
+                        self.metrics.inc("cache_refresh_total", result="error")
+                        return
+                    if chunk != "[DONE]":
+                        parts.append(chunk)
+                if not outcome.complete:
+                    logger.warning("Stale translation refresh incomplete, direction=%s", direction.value)
+                    self.metrics.inc("cache_refresh_total", result="incomplete")
+                    return
+                await self._store(key, content, direction, "".join(parts))
+                self.metrics.inc("cache_refresh_total", result="ok")
+                logger.info("Stale translation refreshed, direction=%s, route=%s", direction.value, route.name)
+        except Exception as e:
+            logger.warning("Stale translation refresh failed, direction=%s, error=%s", direction.value, e)
+            self.metrics.inc("cache_refresh_total", result="error")
+        finally:
+            _refreshing.discard(key)
+
+    def cache_key(self, content: str, direction: TranslationDirection, route: ModelRoute) -> str:
+        """生成翻译结果的缓存键（包含模型与提示词版本）"""
+        return make_cache_key("translation", direction.value, route.model, self.prompts.version, content)
+
+    async def is_cached(
+        self,
+        content: str,
+        direction: TranslationDirection,
+        confidence: Optional[float] = None
+    ) -> bool:
+        """该内容的翻译结果是否已缓存（按路由选择的模型）"""
+        route = self.model_router.select(content, direction, confidence)
+        return await self.cache.contains(self.cache_key(content, direction, route))
+
+    def revision_id(
+        self,
+        content: str,
+        direction: TranslationDirection,
+        confidence: Optional[float] = None
+    ) -> Optional[str]:
+        """本次翻译结果的修订 ID（与结果缓存键对应，客户端修改内容后以此请求修订翻译）
+
+        修订依赖结果缓存保存上一次的原文与结果，缓存未开启时返回 None。
+        """
+        if not self.cache.enabled:
+            return None
+        route = self.model_router.select(content, direction, confidence)
+        return self.cache_key(content, direction, route).partition(":")[2]
+
+    async def _load_revision(self, revision_id: str, direction: TranslationDirection) -> Optional[dict]:
+        """读取修订 ID 对应的原文与翻译结果（不存在或方向不同时返回 None）"""
+        raw = await self.cache.get("revision", f"revision:{revision_id}")
+        if raw is None:
+            logger.info("Revision not found, falling back to full translation, revision_id=%s", revision_id)
+            return None
+        previous = json.loads(raw)
+        if previous["direction"] != direction.value:
+            logger.info("Revision direction mismatch, falling back to full translation, revision_id=%s", revision_id)
+            return None
+        return previous
+
+    async def wait_background_tasks(self) -> None:
+        """等待后台任务（缓存写入与过期优先刷新）全部完成"""
+        while self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+
+    def _spawn(self, coro) -> None:
+        """启动后台任务并保持引用直至完成"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _open_stream(self, route: ModelRoute, messages: list[dict[str, str]]):
+        """按路由参数发起流式补全请求"""
+        # 按路由组装请求参数，max_tokens 未配置时使用全局生成上限
+        request_kwargs = {"max_tokens": route.max_tokens or self.completion_max_tokens}
+        if route.temperature is not None:
+            request_kwargs["temperature"] = route.temperature
+
+        # 调用 DeepSeek API（OpenAI 兼容接口），设置超时；span 覆盖获取连接到收到响应头
+        with self.tracer.start_as_current_span("llm.open_stream", attributes={"model": route.model}):
+            return await asyncio.wait_for(
+                self.client.chat.completions.create(
+                    model=route.model,
+                    messages=messages,
+                    stream=True,
+                    # 在最后一个分块中返回 Token 用量
+                    stream_options={"include_usage": True},
+                    **request_kwargs,
+                ),
+                timeout=self.timeout
+            )
+
+    async def _iter_text(self, stream, stats: "_StreamStats") -> AsyncGenerator[str, None]:
+        """遍历补全流，输出文本片段并记录统计信息"""
+        async for chunk in stream:
+            stats.usage = TokenUsage.from_api(getattr(chunk, "usage", None)) or stats.usage
+            if chunk.choices and chunk.choices[0].finish_reason:
+                stats.finish_reason = chunk.choices[0].finish_reason
+            if chunk.choices and chunk.choices[0].delta.content:
+                text = chunk.choices[0].delta.content
+                stats.chunk_count += 1
+                stats.output_chars += len(text)
+                yield text
+
+    def _finish(
+        self,
+        route: ModelRoute,
+        labels: dict[str, str],
+        direction: TranslationDirection,
+        stats_list: list["_StreamStats"],
+        on_usage: Optional[Callable[[TokenUsage], None]],
+        outcome: Optional[_StreamOutcome] = None
+    ) -> None:
+        """翻译成功完成后记录指标、用量与日志，并填写完成情况"""
+        if outcome is not None:
+            outcome.complete = all(stats.finish_reason == "stop" for stats in stats_list)
+        chunk_count = sum(stats.chunk_count for stats in stats_list)
+        self.metrics.inc("translation_completion_chunks_total", chunk_count, **labels)
+        self.metrics.inc("translation_output_chars_total", sum(stats.output_chars for stats in stats_list), **labels)
+        if any(stats.truncated for stats in stats_list):
+            logger.warning("Translation truncated by max_tokens, route=%s", route.name)
+            self.metrics.inc("translation_truncated_total", **labels)
+
+        usage = TokenUsage.combine(stats.usage for stats in stats_list if stats.usage is not None)
+        if usage is not None:
+            self._record_usage(usage, labels)
+            record_prompt_cache_usage(usage, direction.value, self.prompts.version)
+            if on_usage is not None:
+                on_usage(usage)
+        logger.info(
+            "Translation completed successfully, chunks_sent=%s, route=%s, mode=%s, "
+            "prompt_tokens=%s, completion_tokens=%s, prompt_cache_hit_tokens=%s",
+            chunk_count, route.name, labels["mode"],
+            usage.prompt_tokens if usage else None,
+            usage.completion_tokens if usage else None,
+            usage.prompt_cache_hit_tokens if usage else None,
+        )
+
+    def _error_chunk(self, e: Exception) -> str:
+        """记录异常日志并转换为面向用户的 [ERROR] 标记"""
+        # 客户端构造时 openai 已加载，此处仅为延迟到运行时的名称查找
+        from openai import OpenAIError, APIConnectionError, AuthenticationError, RateLimitError
+
+        if isinstance(e, AuthenticationError):
+            logger.error("Authentication failed, api_key_valid=false, error=%s", e)
+            return "[ERROR] API Key 无效，请检查配置"
+        if isinstance(e, RateLimitError):
+            logger.warning("Rate limit exceeded, error=%s", e)
+            return "[ERROR] 请求过于频繁，请稍后重试"
+        if isinstance(e, APIConnectionError):
+            logger.error("API connection failed, error=%s", e)
+            return "[ERROR] 网络连接异常，请检查网络后重试"
+        if isinstance(e, asyncio.TimeoutError):
+            logger.error("Translation request timed out, timeout_seconds=%s", self.timeout)
+            return "[ERROR] AI 服务响应超时，请稍后重试"
+        if isinstance(e, OpenAIError):
+            logger.error("OpenAI API error, error_type=%s, error=%s", type(e).__name__, e)
+            return "[ERROR] AI 服务暂时不可用，请稍后重试"
+        logger.exception(
+            "Unexpected error during translation, error_type=%s, error=%s",
+            type(e).__name__, e, exc_info=e
+        )
+        return "[ERROR] 翻译过程中发生错误，请稍后重试"
+
+    def _record_usage(self, usage: TokenUsage, labels: dict[str, str]) -> None:
+        """将 Token 用量写入指标"""
+        self.metrics.inc("translation_prompt_tokens_total", usage.prompt_tokens, **labels)
+        self.metrics.inc("translation_completion_tokens_total", usage.completion_tokens, **labels)
+        self.metrics.observe("translation_completion_tokens", usage.completion_tokens, **labels)
 
 
 @lru_cache()
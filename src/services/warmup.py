@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+缓存预热模块
+
+部署后结果缓存为空，最常见的输入（引导示例、演示文本）会同时打到上游。预热任务在实例就绪前
+按频次从高到低依次翻译这些输入，写入意图识别与翻译结果缓存：
+- 输入来源：JSON Lines 文件、翻译历史（按翻译次数）或请求模型中的示例
+  （请求日志只记录内容哈希，无法还原原文，不能作为来源）
+- 已缓存的条目直接跳过，不调用上游；需要调用上游的条目按 rate_per_second 限速
+- 预热期间健康检查返回 503（status=warming），负载均衡在预热完成后才转发流量
+- 超过 timeout 未完成时停止预热并标记就绪，剩余条目计为跳过
+
+多 worker 部署时应使用 sqlite 缓存后端，或在启动前用命令行执行一次：
+    python -m src.warmup --source file --path data/warmup.jsonl
+"""
+
+import json
+import time
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from src.config import get_settings
+from src.models import TranslateRequest, TranslationDirection
+from src.services.history import get_history_store
+from src.services.intent_router import IntentRouter, get_intent_router
+from src.services.metrics import get_metrics
+from src.services.translator import Translator, get_translator
+
+logger = logging.getLogger(__name__)
+
+# 预热来源
+WARMUP_SOURCES = ("file", "history", "examples")
+
+# 智能模式下低于该置信度的请求会被拒绝，不预热翻译结果（与翻译接口一致）
+_MIN_CONFIDENCE = 0.5
+
+
+@dataclass
+class WarmupEntry:
+    """一条预热输入"""
+
+    content: str
+    direction: Optional[TranslationDirection] = None  # 为空时按智能模式先做意图识别
+    count: int = 1
+
+
+@dataclass
+class WarmupReport:
+    """预热结果统计"""
+
+    entries: int = 0
+    translations_warmed: int = 0
+    intents_warmed: int = 0
+    already_cached: int = 0
+    skipped: int = 0
+    failed: int = 0
+    duration_seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _parse_line(line: str) -> Optional[WarmupEntry]:
+    """解析一行 JSON：{"content": "...", "direction": "product_to_dev", "count": 12}"""
+    data = json.loads(line)
+    content = (data.get("content") or "").strip()
+    if not content:
+        return None
+    direction = data.get("direction")
+    return WarmupEntry(
+        content=content,
+        direction=TranslationDirection(direction) if direction else None,
+        count=int(data.get("count", 1)),
+    )
+
+
+def load_file_entries(path: str) -> list[WarmupEntry]:
+    """从 JSON Lines 文件读取预热输入（无法解析的行记录日志后跳过）"""
+    entries = []
+    with Path(path).open(encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = _parse_line(line)
+            except (ValueError, TypeError, AttributeError) as e:
+                logger.warning("Skipping invalid warmup line, path=%s, line=%s, error=%s", path, line_number, e)
+                continue
+            if entry is not None:
+                entries.append(entry)
+    return entries
+
+
+def example_entries() -> list[WarmupEntry]:
+    """翻译请求模型中的示例（界面与文档中展示的演示文本）"""
+    examples = TranslateRequest.model_config["json_schema_extra"]["examples"]
+    return [
+        WarmupEntry(example["content"], TranslationDirection(example["direction"]) if example.get("direction") else None)
+        for example in examples
+    ]
+
+
+def rank_entries(entries: list[WarmupEntry], limit: int) -> list[WarmupEntry]:
+    """合并重复输入并按频次从高到低排序（频次相同时保持原顺序）"""
+    merged: dict[tuple[str, Optional[TranslationDirection]], WarmupEntry] = {}
+    for entry in entries:
+        key = (entry.content, entry.direction)
+        if key in merged:
+            merged[key].count += entry.count
+        else:
+            merged[key] = WarmupEntry(entry.content, entry.direction, entry.count)
+    ranked = sorted(merged.values(), key=lambda entry: entry.count, reverse=True)
+    return ranked[:limit] if limit > 0 else ranked
+
+
+async def load_warmup_entries(source: str, path: Optional[str] = None, limit: int = 0) -> list[WarmupEntry]:
+    """按来源读取预热输入，并按频次排序
+
+    Args:
+        source: file / history / examples
+        path: 来源为 file 时的文件路径
+        limit: 最多预热的条目数，0 表示不限制
+    """
+    if source == "file":
+        entries = await asyncio.to_thread(load_file_entries, path)
+    elif source == "history":
+        history = get_history_store()
+        if history is None:
+            logger.warning("Warmup source is history but history is disabled")
+            return []
+        top = await history.top(limit or 1000)
+        entries = [WarmupEntry(entry.content, entry.direction, entry.hits) for entry in top]
+    elif source == "examples":
+        entries = example_entries()
+    else:
+        raise ValueError(f"Unknown warmup source '{source}', expected one of {', '.join(WARMUP_SOURCES)}")
+    return rank_entries(entries, limit)
+
+
+class CacheWarmer:
+    """缓存预热任务"""
+
+    def __init__(
+        self,
+        rate_per_second: float = 0.0,
+        timeout: float = 0.0,
+        translator: Optional[Translator] = None,
+        intent_router: Optional[IntentRouter] = None,
+    ):
+        """初始化预热任务
+
+        Args:
+            rate_per_second: 每秒最多发起的上游调用数，0 表示不限速
+            timeout: 预热最长时长（秒），0 表示不限制
+            translator: 翻译器，默认使用当前生效的实例
+            intent_router: 意图识别路由器，默认使用当前生效的实例
+        """
+        self.rate_per_second = rate_per_second
+        self.timeout = timeout
+        self.translator = translator
+        self.intent_router = intent_router
+        self.metrics = get_metrics()
+        self.warming = False
+        self.report: Optional[WarmupReport] = None
+        self._task: Optional[asyncio.Task] = None
+        self._next_call_at = 0.0
+
+    def start(self, source: str, path: Optional[str] = None, limit: int = 0) -> None:
+        """在后台开始预热（立即标记为预热中，健康检查在完成前返回未就绪）"""
+        self.warming = True
+        self._task = asyncio.create_task(self._warm_from(source, path, limit))
+
+    async def stop(self) -> None:
+        """取消尚未完成的预热"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.wait([self._task])
+            self._task = None
+        self.warming = False
+
+    async def _warm_from(self, source: str, path: Optional[str], limit: int) -> None:
+        try:
+            entries = await load_warmup_entries(source, path, limit)
+            await self.run(entries)
+        except Exception as e:
+            logger.warning("Cache warmup failed, source=%s, error=%s", source, e)
+        finally:
+            self.warming = False
+
+    async def _throttle(self) -> None:
+        """上游调用限速：相邻两次调用至少间隔 1 / rate_per_second 秒"""
+        if self.rate_per_second <= 0:
+            return
+        now = time.monotonic()
+        if self._next_call_at > now:
+            await asyncio.sleep(self._next_call_at - now)
+        self._next_call_at = max(now, self._next_call_at) + 1 / self.rate_per_second
+
+    async def run(self, entries: list[WarmupEntry]) -> WarmupReport:
+        """依次预热各条输入，返回统计结果"""
+        self.warming = True
+        translator = self.translator or get_translator()
+        intent_router = self.intent_router or get_intent_router()
+        report = WarmupReport(entries=len(entries))
+        started_at = time.perf_counter()
+        try:
+            if not translator.cache.enabled:
+                logger.warning("Cache warmup skipped: result cache is disabled")
+                report.skipped = len(entries)
+                return report
+            for index, entry in enumerate(entries):
+                if self.timeout and time.perf_counter() - started_at > self.timeout:
+                    report.skipped += len(entries) - index
+                    logger.warning("Cache warmup timed out, remaining=%s", len(entries) - index)
+                    break
+                try:
+                    await self._warm(entry, translator, intent_router, report)
+                except Exception as e:
+                    report.failed += 1
+                    logger.warning("Cache warmup entry failed, error=%s", e)
+            # 翻译结果在后台写入缓存，等待写完再标记就绪
+            await translator.wait_background_tasks()
+        finally:
+            report.duration_seconds = round(time.perf_counter() - started_at, 3)
+            self.report = report
+            self.warming = False
+            self.metrics.set_gauge("cache_warmup_duration_seconds", report.duration_seconds)
+            logger.info(
+                "Cache warmup finished, entries=%s, translations_warmed=%s, intents_warmed=%s, "
+                "already_cached=%s, skipped=%s, failed=%s, duration=%.1fs",
+                report.entries, report.translations_warmed, report.intents_warmed,
+                report.already_cached, report.skipped, report.failed, report.duration_seconds
+            )
+        return report
+
+    async def _warm(
+        self,
+        entry: WarmupEntry,
+        translator: Translator,
+        intent_router: IntentRouter,
+        report: WarmupReport,
+    ) -> None:
+        """预热单条输入：意图识别结果（智能模式使用）与翻译结果"""
+        # 意图识别只按内容缓存，手动选择方向的输入也可能以智能模式提交
+        if not await intent_router.is_cached(entry.content):
+            await self._throttle()
+            intent_result = await intent_router.detect_intent(entry.content)
+            if await intent_router.is_cached(entry.content):
+                report.intents_warmed += 1
+                self.metrics.inc("cache_warmup_entries_total", kind="intent", result="warmed")
+        elif entry.direction is None:
+            intent_result = await intent_router.detect_intent(entry.content)
+        else:
+            intent_result = None
+
+        direction, confidence = entry.direction, None
+        if direction is None:
+            if intent_result.confidence < _MIN_CONFIDENCE:
+                report.skipped += 1
+                return
+            direction, confidence = intent_result.direction, intent_result.confidence
+
+        if await translator.is_cached(entry.content, direction, confidence):
+            report.already_cached += 1
+            self.metrics.inc("cache_warmup_entries_total", kind="translation", result="cached")
+            return
+        await self._throttle()
+        last = None
+        async for chunk in translator.translate_stream(entry.content, direction, confidence):
+            last = chunk
+        if last == "[DONE]":
+            report.translations_warmed += 1
+            self.metrics.inc("cache_warmup_entries_total", kind="translation", result="warmed")
+        else:
+            report.failed += 1
+            self.metrics.inc("cache_warmup_entries_total", kind="translation", result="failed")
+            logger.warning("Cache warmup translation failed, direction=%s, error=%s", direction.value, last)
+
+
+@lru_cache()
+def get_cache_warmer() -> CacheWarmer:
+    """获取缓存预热任务实例（单例模式）"""
+    settings = get_settings()
+    return CacheWarmer(
+        rate_per_second=settings.warmup_rate_per_second,
+        timeout=settings.warmup_timeout_seconds,
+    )
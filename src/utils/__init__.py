@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""通用工具层：与业务无关的纯函数工具"""
+
+from src.utils.tokens import estimate_tokens
+from src.utils.jsonl import JsonLineWriter
+from src.utils.assets import StaticAssets, build_assets
+from src.utils.compression import accepts_encoding, gzip_stream
+from src.utils.backpressure import ClientStalledError, StreamReport, buffered_stream
+from src.utils.log import JsonFormatter, SamplingFilter, TextFormatter, setup_logging, shutdown_logging
+from src.utils.tracing import (
+    Span,
+    SpanContext,
+    Tracer,
+    TracingMiddleware,
+    current_trace_id,
+    format_traceparent,
+    get_current_span,
+    parse_traceparent,
+)
+from src.utils.serialization import (
+    JSON_BACKEND,
+    FastJSONResponse,
+    dumps,
+    dumps_str,
+    sse_data,
+    sse_event,
+    sse_meta,
+)
+
+__all__ = [
+    "estimate_tokens",
+    "JsonLineWriter",
+    "StaticAssets",
+    "build_assets",
+    "accepts_encoding",
+    "gzip_stream",
+    "ClientStalledError",
+    "StreamReport",
+    "buffered_stream",
+    "JsonFormatter",
+    "SamplingFilter",
+    "TextFormatter",
+    "Span",
+    "SpanContext",
+    "Tracer",
+    "TracingMiddleware",
+    "current_trace_id",
+    "format_traceparent",
+    "get_current_span",
+    "parse_traceparent",
+    "setup_logging",
+    "shutdown_logging",
+    "JSON_BACKEND",
+    "FastJSONResponse",
+    "dumps",
+    "dumps_str",
+    "sse_data",
+    "sse_event",
+    "sse_meta",
+]
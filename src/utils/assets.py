@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+静态资源模块
+
+构建期：将 static/ 下的资源复制到构建目录，文件名附加内容哈希（index.html 除外，并改写其中的引用），
+同时生成 .gz / .br 预压缩文件与 manifest.json。
+
+运行期：构建目录中的资源在启动时全部读入内存，按 Accept-Encoding 直接返回预压缩内容：
+- 带哈希的文件名内容不会变化，使用一年的 immutable 缓存
+- index.html 与未带哈希的旧文件名使用 no-cache，每次通过强 ETag 协商，未变化时返回 304
+
+构建方式：
+    python -m src.build_assets
+"""
+
+import gzip
+import json
+import shutil
+import hashlib
+import mimetypes
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Mapping, Optional
+
+from starlette.responses import Response
+
+from src.utils.compression import parse_accept_encoding
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 取决于运行环境
+    brotli = None
+
+MANIFEST_NAME = "manifest.json"
+
+# 入口页面：不加哈希（URL 固定），改写其中对其他资源的引用
+ENTRY_NAMES = frozenset({"index.html"})
+
+# 内容哈希长度（十六进制字符数）
+HASH_LENGTH = 10
+
+# 预压缩的文件类型与最小体积（过小的文件压缩后收益小于额外的请求头）
+COMPRESSIBLE_SUFFIXES = frozenset({".html", ".css", ".js", ".json", ".svg", ".txt"})
+MIN_COMPRESS_SIZE = 256
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# 编码 -> 预压缩文件后缀，按优先级排列
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def hashed_name(name: str, content: bytes) -> str:
+    """生成带内容哈希的文件名（app.js -> app.3f2a9c1b0d.js）"""
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    path = Path(name)
+    return str(path.with_name(f"{path.stem}.{digest}{path.suffix}"))
+
+
+def _write_compressed(path: Path, content: bytes) -> None:
+    """写出预压缩文件（mtime 固定为 0，相同内容的构建结果一致）"""
+    if path.suffix not in COMPRESSIBLE_SUFFIXES or len(content) < MIN_COMPRESS_SIZE:
+        return
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(content, quality=11))
+
+
+def build_assets(source_dir: Path, output_dir: Path) -> dict[str, str]:
+    """构建静态资源
+
+    Args:
+        source_dir: 源目录（static/）
+        output_dir: 构建目录，已存在时先清空
+
+    Returns:
+        清单：原文件名 -> 构建后的文件名
+    """
+    source_dir, output_dir = Path(source_dir), Path(output_dir)
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True)
+
+    sources = sorted(
+        path for path in source_dir.rglob("*")
+        if path.is_file() and output_dir not in path.parents
+    )
+    manifest: dict[str, str] = {}
+    contents: dict[str, bytes] = {}
+    for path in sources:
+        name = path.relative_to(source_dir).as_posix()
+        contents[name] = path.read_bytes()
+        if name not in ENTRY_NAMES:
+            manifest[name] = hashed_name(name, contents[name])
+
+    for name, content in contents.items():
+        if name in ENTRY_NAMES:
+            # 入口页面引用带哈希的文件名
+            text = content.decode("utf-8")
+            for original, built in manifest.items():
+                text = text.replace(f"/static/{original}", f"/static/{built}")
+            content = text.encode("utf-8")
+            manifest[name] = name
+        target = output_dir / manifest[name]
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        _write_compressed(target, content)
+
+    (output_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    return manifest
+
+
+@dataclass(frozen=True)
+class Asset:
+    """内存中的单个静态资源（原始内容与各编码的预压缩内容）"""
+
+    body: bytes
+    media_type: str
+    etag: str
+    cache_control: str
+    encoded: Mapping[str, bytes]
+
+    def select_encoding(self, accept_encoding: str) -> Optional[str]:
+        """按 Accept-Encoding 选择可用的预压缩编码（不支持时返回 None）"""
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding, _ in _ENCODINGS:
+            if encoding in self.encoded and accepted.get(encoding, accepted.get("*", 0)) > 0:
+                return encoding
+        return None
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 是否命中（按弱比较，忽略 W/ 前缀）"""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class StaticAssets:
+    """内存中的静态资源集合"""
+
+    def __init__(self, assets: dict[str, Asset]):
+        self.assets = assets
+
+    @classmethod
+    def load(cls, build_dir: Path) -> Optional["StaticAssets"]:
+        """从构建目录加载资源（未构建时返回 None）"""
+        build_dir = Path(build_dir)
+        manifest_path = build_dir / MANIFEST_NAME
+        if not manifest_path.exists():
+            return None
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+        assets = {}
+        for original, built in manifest.items():
+            path = build_dir / built
+            body = path.read_bytes()
+            encoded = {}
+            for encoding, suffix in _ENCODINGS:
+                compressed = path.with_name(path.name + suffix)
+                if compressed.exists():
+                    encoded[encoding] = compressed.read_bytes()
+            media_type, _ = mimetypes.guess_type(built)
+            media_type = media_type or "application/octet-stream"
+            if media_type.startswith("text/") or media_type == "application/javascript":
+                media_type += "; charset=utf-8"
+            etag = '"' + hashlib.sha256(body).hexdigest()[:HASH_LENGTH] + '"'
+
+            immutable = Asset(body, media_type, etag, IMMUTABLE_CACHE_CONTROL, encoded)
+            revalidate = Asset(body, media_type, etag, REVALIDATE_CACHE_CONTROL, encoded)
+            if built == original:
+                assets[original] = revalidate
+            else:
+                # 带哈希的文件名长期缓存；旧文件名仍可访问，但需要每次协商
+                assets[built] = immutable
+                assets[original] = revalidate
+        return cls(assets)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.assets
+
+    def response(self, name: str, headers: Mapping[str, str]) -> Optional[Response]:
+        """构造资源响应（资源不存在时返回 None）
+
+        Args:
+            name: 资源路径（相对 /static/）
+            headers: 请求头（读取 Accept-Encoding 与 If-None-Match）
+        """
+        asset = self.assets.get(name)
+        if asset is None:
+            return None
+
+        encoding = asset.select_encoding(headers.get("accept-encoding", ""))
+        # 不同编码是不同的表示，强 ETag 需要区分
+        etag = asset.etag if encoding is None else f'{asset.etag[:-1]}-{encoding}"'
+        response_headers = {
+            "ETag": etag,
+            "Cache-Control": asset.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=response_headers)
+
+        if encoding is not None:
+            response_headers["Content-Encoding"] = encoding
+            body = asset.encoded[encoding]
+        else:
+            body = asset.body
+        return Response(content=body, media_type=asset.media_type, headers=response_headers)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+流式响应缓冲模块
+
+SSE 响应默认按客户端的读取速度拉取上游：慢速客户端（如弱网移动端）会让上游连接
+一直占用到客户端读完为止。buffered_stream 将读取与写出解耦：
+- 后台任务全速读取输入流，写入有字节上限的缓冲区，上游结束后立即释放连接
+- 响应按客户端的速度从缓冲区取出数据
+- 缓冲区达到上限、或有待写出的数据时，客户端超过 stall_timeout 没有取走任何数据，
+  视为客户端停滞：关闭输入流、清空缓冲区并中止响应（断开连接）
+
+每个流结束时通过 on_finish 回调报告上游占用时间与客户端读完时间。
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterable, AsyncIterator, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ClientStalledError(Exception):
+    """客户端超过停滞超时没有读取数据"""
+
+
+@dataclass
+class StreamReport:
+    """单个流的缓冲统计"""
+
+    upstream_seconds: Optional[float] = None  # 读完（或中止）输入流的耗时
+    drain_seconds: Optional[float] = None     # 客户端读完全部数据的耗时（未读完时为 None）
+    total_bytes: int = 0
+    peak_buffered_bytes: int = 0
+    stalled: bool = False
+
+
+class _StreamBuffer:
+    """单个流的缓冲区与读取任务"""
+
+    def __init__(
+        self,
+        source: AsyncIterable[bytes],
+        max_bytes: int,
+        stall_timeout: float,
+        on_finish: Optional[Callable[[StreamReport], None]],
+    ):
+        self.source = source
+        self.max_bytes = max_bytes
+        self.stall_timeout = stall_timeout
+        self.on_finish = on_finish
+        self.report = StreamReport()
+        self.started_at = time.perf_counter()
+        self.chunks: deque[bytes] = deque()
+        self.buffered = 0
+        self.done = False          # 输入流已读完或读取已中止
+        self.sending = False       # 客户端正在写出取走的数据
+        self.error: Optional[BaseException] = None
+        self.consumer: Optional[asyncio.Task] = None  # 写出所在的任务
+        self._readable = asyncio.Event()  # 缓冲区有数据或读取已结束
+        self._progress = asyncio.Event()  # 客户端取走或写完了一块数据
+        self._reported = False
+
+    def finish(self) -> None:
+        """报告统计信息（只报告一次）"""
+        if not self._reported:
+            self._reported = True
+            if self.on_finish is not None:
+                self.on_finish(self.report)
+
+    async def _wait_for_progress(self) -> None:
+        """等待客户端取走数据，超时视为停滞"""
+        self._progress.clear()
+        try:
+            await asyncio.wait_for(self._progress.wait(), self.stall_timeout)
+        except asyncio.TimeoutError:
+            raise ClientStalledError(f"client stalled for {self.stall_timeout}s") from None
+
+    async def read(self) -> None:
+        """全速读取输入流写入缓冲区，缓冲区满时等待客户端"""
+        report = self.report
+        try:
+            async for chunk in self.source:
+                self.chunks.append(chunk)
+                self.buffered += len(chunk)
+                report.total_bytes += len(chunk)
+                report.peak_buffered_bytes = max(report.peak_buffered_bytes, self.buffered)
+                self._readable.set()
+                while self.buffered > self.max_bytes:
+                    await self._wait_for_progress()
+            report.upstream_seconds = time.perf_counter() - self.started_at
+            self.done = True
+            self._readable.set()
+            # 输入流已结束（上游连接已释放），客户端仍需在超时内持续读取
+            while self.chunks or self.sending:
+                await self._wait_for_progress()
+        except ClientStalledError as e:
+            report.stalled = True
+            self.error = e
+            self.chunks.clear()
+            self.buffered = 0
+            logger.warning(
+                "Client stalled, dropping stream, stall_timeout=%s, total_bytes=%s",
+                self.stall_timeout, report.total_bytes
+            )
+            self.finish()
+            # 客户端阻塞在写出中：取消写出所在的任务以断开连接
+            if self.consumer is not None and not self.consumer.done():
+                self.consumer.cancel()
+        except Exception as e:
+            self.error = e
+        finally:
+            if report.upstream_seconds is None:
+                report.upstream_seconds = time.perf_counter() - self.started_at
+            self.done = True
+            self._readable.set()
+            if hasattr(self.source, "aclose"):
+                await self.source.aclose()
+
+    async def drain(self) -> AsyncIterator[bytes]:
+        """按客户端的速度从缓冲区取出数据"""
+        reader = asyncio.create_task(self.read())
+        try:
+            while True:
+                self.consumer = asyncio.current_task()
+                if self.chunks:
+                    chunk = self.chunks.popleft()
+                    self.buffered -= len(chunk)
+                    self.sending = True
+                    self._progress.set()
+                    yield chunk
+                    self.sending = False
+                    self._progress.set()
+                    continue
+                if self.done:
+                    break
+                self._readable.clear()
+                await self._readable.wait()
+            if self.error is not None:
+                raise self.error
+            self.report.drain_seconds = time.perf_counter() - self.started_at
+        finally:
+            if not reader.done():
+                reader.cancel()
+            await asyncio.wait({reader})
+            self.finish()
+
+
+def buffered_stream(
+    source: AsyncIterable[bytes],
+    max_bytes: int,
+    stall_timeout: float,
+    on_finish: Optional[Callable[[StreamReport], None]] = None,
+) -> AsyncIterator[bytes]:
+    """以有上限的缓冲区解耦输入流的读取与响应的写出
+
+    Args:
+        source: 输入字节流（SSE 帧）
+        max_bytes: 缓冲区字节上限，超过后暂停读取输入流，等待客户端取走数据
+        stall_timeout: 客户端停滞超时（秒）
+        on_finish: 流结束时的统计回调（客户端停滞时在中止响应前调用）
+    """
+    return _StreamBuffer(source, max_bytes, stall_timeout, on_finish).drain()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+压缩模块
+
+提供 Accept-Encoding 协商与 SSE 流式 gzip 压缩。
+
+SSE 流不能整体压缩后再发送：合并后的输出块压缩后执行一次 Z_SYNC_FLUSH，
+客户端收到该块即可解压出完整的帧，增量输出不受影响；压缩字典在整个流中共享，
+后续帧可以引用前文中重复出现的内容。
+"""
+
+import zlib
+import asyncio
+from typing import AsyncIterable, AsyncIterator, Optional
+
+# gzip 格式（zlib wbits=16+15）
+_GZIP_WBITS = 31
+
+# 默认压缩级别：流式场景下每块数据量小，更高级别几乎没有收益
+SSE_GZIP_LEVEL = 6
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """解析 Accept-Encoding（gzip, br;q=0.8 -> {"gzip": 1.0, "br": 0.8}）"""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def accepts_encoding(header: str, encoding: str) -> bool:
+    """客户端是否接受该编码（q=0 表示拒绝）"""
+    accepted = parse_accept_encoding(header)
+    return accepted.get(encoding, accepted.get("*", 0)) > 0
+
+
+async def _next_chunk(iterator: AsyncIterator[bytes]) -> Optional[bytes]:
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def gzip_stream(
+    chunks: AsyncIterable[bytes],
+    level: int = SSE_GZIP_LEVEL,
+    flush_interval: float = 0.0,
+) -> AsyncIterator[bytes]:
+    """将字节流压缩为 gzip 流，按刷新间隔合并输入块后同步刷新
+
+    逐 token 输出时每块只有十几个字节，每次刷新约 5 字节的固定开销会抵消大部分压缩收益。
+    距上次刷新超过 flush_interval 时立即刷新（空闲后的第一块没有额外延迟），
+    否则继续合并后续输入块，最多延迟 flush_interval 秒输出。flush_interval 为 0 时每块都刷新。
+
+    Args:
+        chunks: 输入字节流（SSE 帧）
+        level: 压缩级别
+        flush_interval: 合并窗口（秒）
+    """
+    loop = asyncio.get_running_loop()
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _GZIP_WBITS)
+    iterator = chunks.__aiter__()
+    pending: Optional[asyncio.Future] = None
+    buffered: list[bytes] = []
+    flush_at = 0.0  # 下一次允许刷新的时间
+    try:
+        while True:
+            if not buffered:
+                if pending is not None:
+                    # 刷新后继续等待超时前发起的读取
+                    chunk, pending = await pending, None
+                else:
+                    chunk = await _next_chunk(iterator)
+            else:
+                # 有未刷新的数据：最多等到刷新时间点，超时先输出已合并的数据
+                if pending is None:
+                    pending = asyncio.ensure_future(_next_chunk(iterator))
+                done, _ = await asyncio.wait({pending}, timeout=max(flush_at - loop.time(), 0))
+                if not done:
+                    yield b"".join(buffered) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                    buffered = []
+                    flush_at = loop.time() + flush_interval
+                    continue
+                chunk, pending = pending.result(), None
+            if chunk is None:
+                break
+
+            buffered.append(compressor.compress(chunk))
+            if loop.time() >= flush_at:
+                yield b"".join(buffered) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                buffered = []
+                flush_at = loop.time() + flush_interval
+        yield b"".join(buffered) + compressor.flush()
+    finally:
+        # 客户端断开时同时关闭内层生成器，使其清理逻辑及时执行
+        if pending is not None and not pending.done():
+            pending.cancel()
+            await asyncio.wait({pending})
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
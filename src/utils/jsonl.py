@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+JSON Lines 写入工具
+
+请求日志与链路追踪的文件导出共用的写入器：调用方只把字典放入内存队列，
+序列化与写出由后台线程（QueueListener）完成，请求路径上不做文件 I/O。
+写文件时按大小轮转，路径中的 `{pid}` 替换为进程号（多 worker 时各进程写各自的文件）。
+"""
+
+import os
+import sys
+import queue
+import logging
+from logging.handlers import QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Any, Optional, TextIO
+
+from src.utils.serialization import dumps_str
+
+
+class _JsonLineFormatter(logging.Formatter):
+    """将记录中的字典序列化为单行 JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return dumps_str(record.msg)
+
+
+class JsonLineWriter:
+    """后台线程写入的 JSON Lines 写入器"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: int = 0,
+        backup_count: int = 0,
+        stream: Optional[TextIO] = None,
+    ):
+        """初始化写入器
+
+        Args:
+            path: 文件路径，`{pid}` 替换为进程号；为空时写入 stream
+            max_bytes: 单个文件的最大字节数，超过后轮转，0 表示不轮转
+            backup_count: 保留的轮转文件数
+            stream: 未指定 path 时的输出流，默认为 stderr
+        """
+        handler: logging.Handler
+        if path is not None:
+            self.path: Optional[Path] = Path(path.replace("{pid}", str(os.getpid())))
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                self.path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+            )
+        else:
+            self.path = None
+            handler = logging.StreamHandler(stream or sys.stderr)
+        handler.setFormatter(_JsonLineFormatter())
+        self._handler = handler
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener: Optional[QueueListener] = QueueListener(self._queue, handler)
+        self._listener.start()
+
+    def write(self, entry: dict[str, Any]) -> None:
+        """写入一条记录（放入队列，关闭后的写入被忽略）"""
+        if self._listener is not None:
+            self._queue.put(logging.makeLogRecord({"msg": entry}))
+
+    def close(self) -> None:
+        """写出队列中剩余的记录并关闭输出（重复调用无效）"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+            self._handler.close()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+日志模块
+
+基于 QueueHandler / QueueListener 的非阻塞日志管道：请求路径上只把日志记录放入内存队列，
+消息格式化与写 stderr 在后台线程完成，事件循环不会被日志 I/O 阻塞。
+
+- 日志调用请使用 %-风格参数（`logger.info("x=%s", x)`），被级别过滤掉的日志不会做任何格式化
+- 支持文本与 JSON 两种输出格式
+- 支持按 logger 名称对 INFO 及以下级别日志采样（如健康检查日志）
+- 链路追踪开启时，请求内的日志附带 trace_id（JSON 字段 / 文本行尾）
+"""
+
+import json
+import queue
+import atexit
+import logging
+import itertools
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, TextIO
+
+from src.utils.tracing import TraceIdFilter
+
+# 文本格式（与原 basicConfig 格式一致）
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# 由 uvicorn 自行配置 handler 的 logger，改为汇入根 logger 的队列
+_UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+# LogRecord 的标准属性，其余属性视为通过 extra 传入的结构化字段
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """将日志记录格式化为单行 JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """文本格式，带 trace_id 的记录在行尾追加该字段"""
+
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        trace_id = getattr(record, "trace_id", None)
+        return f"{message} trace_id={trace_id}" if trace_id else message
+
+
+class SamplingFilter(logging.Filter):
+    """按 logger 名称对 INFO 及以下级别日志采样
+
+    采样率 0.01 表示每 100 条保留 1 条，0 表示全部丢弃；WARNING 及以上级别始终保留。
+    规则按 logger 层级匹配：`src.controllers` 的规则同样作用于 `src.controllers.health`。
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self._intervals = {
+            name: (round(1 / rate) if rate > 0 else 0) for name, rate in rates.items() if rate < 1
+        }
+        self._counters: dict[str, itertools.count] = {}
+        self._resolved: dict[str, Optional[str]] = {}
+
+    def _rule_for(self, name: str) -> Optional[str]:
+        """查找作用于该 logger 的最近一条规则"""
+        if name not in self._resolved:
+            rule, candidate = None, name
+            while candidate:
+                if candidate in self._intervals:
+                    rule = candidate
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = rule
+        return self._resolved[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rule = self._rule_for(record.name)
+        if rule is None:
+            return True
+        interval = self._intervals[rule]
+        if interval == 0:
+            return False
+        counter = self._counters.setdefault(rule, itertools.count())
+        return next(counter) % interval == 0
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """不在调用线程格式化消息的 QueueHandler
+
+    标准 QueueHandler.prepare 会在入队前完成格式化（为了跨进程 pickle），
+    这里队列只在进程内使用，直接入队原始记录，格式化推迟到监听线程。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(
+    level: str = "INFO",
+    fmt: str = "text",
+    sample_rates: Optional[dict[str, float]] = None,
+    stream: Optional[TextIO] = None,
+) -> QueueListener:
+    """配置非阻塞日志管道（可重复调用，后一次调用替换前一次的配置）
+
+    Args:
+        level: 根 logger 日志级别
+        fmt: 输出格式 text / json
+        sample_rates: 按 logger 名称的采样率，如 {"src.controllers.health": 0.01}
+        stream: 输出流，默认 stderr
+
+    Returns:
+        已启动的 QueueListener
+    """
+    global _queue_handler, _listener
+
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter() if fmt.lower() == "json" else TextFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    if sample_rates:
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+    # trace_id 存放在调用方的上下文中，需在入队前读取
+    queue_handler.addFilter(TraceIdFilter())
+
+    root = logging.getLogger()
+    first_setup = _listener is None
+    shutdown_logging()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    # uvicorn 自带的 handler 会在事件循环中同步写 stderr，改为汇入队列
+    for name in _UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    listener = QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    if first_setup:
+        atexit.register(shutdown_logging)
+    _queue_handler, _listener = queue_handler, listener
+    return listener
+
+
+def shutdown_logging() -> None:
+    """停止监听线程并写出队列中剩余的日志（进程退出时自动调用）"""
+    global _queue_handler, _listener
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
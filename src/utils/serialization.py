@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+序列化模块
+
+提供 JSON 与 SSE 帧的快速序列化：安装了 orjson 时使用 orjson，否则回退到标准库 json。
+SSE 帧函数直接输出 UTF-8 编码的 bytes，流式响应无需再逐帧编码。
+"""
+
+import json
+from typing import Any
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于运行环境
+    orjson = None
+
+# 当前使用的 JSON 后端名称（用于日志与基准测试）
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+# 复用编码器实例：json.dumps 在传入非默认参数时每次都会新建 JSONEncoder
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_dumps_text = _ENCODER.encode
+
+
+def dumps(obj: Any) -> bytes:
+    """将对象序列化为紧凑的 UTF-8 JSON（不转义非 ASCII 字符）"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return _dumps_text(obj).encode("utf-8")
+
+
+def dumps_str(obj: Any) -> str:
+    """将对象序列化为 JSON 字符串"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return _dumps_text(obj)
+
+
+def sse_data(text: str) -> bytes:
+    """编码一个 `data: <text>` SSE 帧"""
+    # 单次格式化 + 单次编码，比分段编码后拼接 bytes 少两次内存分配
+    return f"data: {text}\n\n".encode("utf-8")
+
+
+def sse_event(event: str, payload: Any) -> bytes:
+    """编码一个具名 SSE 帧，data 为 JSON 负载"""
+    if orjson is not None:
+        return b"event: " + event.encode("utf-8") + b"\ndata: " + orjson.dumps(payload) + b"\n\n"
+    return f"event: {event}\ndata: {_dumps_text(payload)}\n\n".encode("utf-8")
+
+
+def sse_meta(payload: Any) -> bytes:
+    """编码一个 `data: [META] <json>` 元数据帧"""
+    if orjson is not None:
+        return b"data: [META] " + orjson.dumps(payload) + b"\n\n"
+    return f"data: [META] {_dumps_text(payload)}\n\n".encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """使用快速序列化后端的 JSON 响应类"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
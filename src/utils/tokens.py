@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Token 估算模块
+
+纯 Python 本地估算文本的 Token 数，无需网络调用或分词器依赖。
+估算比例参考 DeepSeek 官方说明：1 个中文字符约 0.6 个 Token，
+1 个英文字符（含数字、标点、空白）约 0.3 个 Token。
+"""
+
+import math
+import re
+
+# 中文字符（含 CJK 统一表意文字、扩展 A 区、兼容表意文字）及全角标点
+_CJK_PATTERN = re.compile(
+    "[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]"
+)
+
+# 每个字符对应的 Token 数
+CJK_TOKENS_PER_CHAR = 0.6
+OTHER_TOKENS_PER_CHAR = 0.3
+
+
+def estimate_tokens(text: str) -> int:
+    """估算文本的 Token 数
+
+    Args:
+        text: 待估算的文本
+
+    Returns:
+        估算的 Token 数（向上取整）
+    """
+    if not text:
+        return 0
+    # subn 只返回替换次数，避免构造匹配列表
+    cjk_count = _CJK_PATTERN.subn("", text)[1]
+    other_count = len(text) - cjk_count
+    return math.ceil(cjk_count * CJK_TOKENS_PER_CHAR + other_count * OTHER_TOKENS_PER_CHAR)
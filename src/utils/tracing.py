@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+链路追踪模块
+
+轻量的 span 埋点，接口与 OpenTelemetry 的 Tracer / Span 保持一致
+（start_as_current_span、start_span、set_attribute、add_event、set_status、record_exception），
+需要接入外部 collector 时可直接替换为 OpenTelemetry SDK：
+- 追踪上下文按 W3C Trace Context 从请求头 `traceparent` 继承，并在响应头中返回
+- 当前 span 保存在 contextvars 中，请求内创建的任务（如流式响应）自动继承
+- 关闭时 Tracer 返回不记录任何数据的 span，埋点开销只有一次属性判断
+- 结束的 span 序列化为单行 JSON，由后台线程写入 stderr 或文件，不依赖外部 collector
+
+异步生成器在多次 yield 之间可能被不同的任务驱动或回收，其中的 span 使用 start_span
+并在 finally 中 end()，不修改当前 span；不跨 yield 的代码段使用 start_as_current_span。
+"""
+
+import os
+import time
+import logging
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional
+
+from src.utils.jsonl import JsonLineWriter
+
+logger = logging.getLogger(__name__)
+
+# W3C Trace Context 请求头
+TRACEPARENT_HEADER = "traceparent"
+
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    """span 的传播上下文"""
+
+    trace_id: str  # 32 位十六进制
+    span_id: str   # 16 位十六进制
+    sampled: bool = True
+
+    @property
+    def is_valid(self) -> bool:
+        return self.trace_id != _INVALID_TRACE_ID and self.span_id != _INVALID_SPAN_ID
+
+
+INVALID_SPAN_CONTEXT = SpanContext(_INVALID_TRACE_ID, _INVALID_SPAN_ID, False)
+
+
+def _is_hex(value: str, length: int) -> bool:
+    return len(value) == length and all(c in "0123456789abcdef" for c in value)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[SpanContext]:
+    """解析 traceparent 请求头（格式错误时返回 None，按新链路处理）"""
+    if not header:
+        return None
+    parts = header.strip().lower().split("-")
+    if len(parts) < 4:
+        return None
+    version, trace_id, span_id, flags = parts[:4]
+    if not _is_hex(version, 2) or version == "ff" or (version == "00" and len(parts) != 4):
+        return None
+    if not _is_hex(trace_id, 32) or not _is_hex(span_id, 16) or not _is_hex(flags, 2):
+        return None
+    context = SpanContext(trace_id, span_id, bool(int(flags, 16) & 0x01))
+    return context if context.is_valid else None
+
+
+def format_traceparent(context: SpanContext) -> str:
+    """生成 traceparent 请求头"""
+    return f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+
+
+class Span:
+    """记录中的 span"""
+
+    is_recording = True
+
+    def __init__(
+        self,
+        name: str,
+        context: SpanContext,
+        parent_id: Optional[str],
+        exporter: Optional["SpanExporter"],
+        attributes: Optional[dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes: dict[str, Any] = dict(attributes or {})
+        self.events: list[dict[str, Any]] = []
+        self.status = "unset"
+        self.status_description: Optional[str] = None
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self._started_at = time.perf_counter()
+        self._duration: Optional[float] = None
+        self._exporter = exporter
+
+    def get_span_context(self) -> SpanContext:
+        return self.context
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, attributes: Optional[dict[str, Any]] = None) -> None:
+        """记录事件（时间为相对 span 开始的毫秒数）"""
+        event: dict[str, Any] = {"name": name, "offset_ms": round((time.perf_counter() - self._started_at) * 1000, 3)}
+        if attributes:
+            event["attributes"] = attributes
+        self.events.append(event)
+
+    def set_status(self, status: str, description: Optional[str] = None) -> None:
+        """设置状态：ok / error"""
+        self.status = status
+        self.status_description = description
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.add_event("exception", {"type": type(exception).__name__, "message": str(exception)})
+
+    def end(self) -> None:
+        """结束 span 并导出（重复调用无效）"""
+        if self.end_time_ns is not None:
+            return
+        self._duration = time.perf_counter() - self._started_at
+        self.end_time_ns = self.start_time_ns + int(self._duration * 1e9)
+        if self._exporter is not None:
+            self._exporter.export(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "name": self.name,
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_time_ns,
+            "end_time_unix_nano": self.end_time_ns,
+            "duration_ms": round(self._duration * 1000, 3) if self._duration is not None else None,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+        if self.status_description:
+            data["status_description"] = self.status_description
+        if self.events:
+            data["events"] = self.events
+        return data
+
+
+class NonRecordingSpan(Span):
+    """不记录任何数据的 span（追踪关闭时使用，或仅用于传播上下文）"""
+
+    is_recording = False
+
+    def __init__(self, context: SpanContext = INVALID_SPAN_CONTEXT):
+        self.context = context
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[dict[str, Any]] = None) -> None:
+        pass
+
+    def set_status(self, status: str, description: Optional[str] = None) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def to_dict(self) -> dict[str, Any]:
+        return {}
+
+
+INVALID_SPAN = NonRecordingSpan()
+
+_current_span: contextvars.ContextVar[Span] = contextvars.ContextVar("current_span", default=INVALID_SPAN)
+
+
+def get_current_span() -> Span:
+    """当前上下文中的 span（没有时为 INVALID_SPAN）"""
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    """当前上下文的 trace ID（未追踪时为 None）"""
+    context = _current_span.get().context
+    return context.trace_id if context.is_valid else None
+
+
+@contextmanager
+def use_span(span: Span, end_on_exit: bool = False) -> Iterator[Span]:
+    """将 span 设为当前 span（退出时恢复，异常时记录到 span）"""
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        span.set_status("error", type(e).__name__)
+        raise
+    finally:
+        _current_span.reset(token)
+        if end_on_exit:
+            span.end()
+
+
+class Tracer:
+    """span 的创建入口"""
+
+    def __init__(self, exporter: Optional["SpanExporter"] = None, enabled: bool = True):
+        """初始化 Tracer
+
+        Args:
+            exporter: span 导出器，None 时只传播上下文不导出
+            enabled: 关闭时所有 span 都不记录
+        """
+        self.exporter = exporter
+        self.enabled = enabled
+
+    def start_span(
+        self,
+        name: str,
+        context: Optional[SpanContext] = None,
+        attributes: Optional[dict[str, Any]] = None,
+    ) -> Span:
+        """创建 span（不修改当前 span，需调用 end()）
+
+        Args:
+            name: span 名称
+            context: 父 span 的上下文（如来自 traceparent），默认为当前 span
+            attributes: 初始属性
+        """
+        if not self.enabled:
+            return INVALID_SPAN
+        parent = context or get_current_span().context
+        if parent.is_valid:
+            span_context = SpanContext(parent.trace_id, os.urandom(8).hex(), parent.sampled)
+            parent_id = parent.span_id
+        else:
+            span_context = SpanContext(os.urandom(16).hex(), os.urandom(8).hex())
+            parent_id = None
+        return Span(name, span_context, parent_id, self.exporter, attributes)
+
+    @contextmanager
+    def start_as_current_span(
+        self,
+        name: str,
+        context: Optional[SpanContext] = None,
+        attributes: Optional[dict[str, Any]] = None,
+    ) -> Iterator[Span]:
+        """创建 span 并设为当前 span，退出时结束"""
+        span = self.start_span(name, context, attributes)
+        if not span.is_recording:
+            yield span
+            return
+        with use_span(span, end_on_exit=True):
+            yield span
+
+    def shutdown(self) -> None:
+        """写出剩余的 span"""
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+class SpanExporter:
+    """span 导出器：结束的 span 放入内存队列，序列化与写出由后台线程完成"""
+
+    def __init__(self, writer: JsonLineWriter):
+        self._writer = writer
+
+    def export(self, span: Span) -> None:
+        self._writer.write(span.to_dict())
+
+    def shutdown(self) -> None:
+        self._writer.close()
+
+
+class ConsoleSpanExporter(SpanExporter):
+    """将 span 写入 stderr"""
+
+    def __init__(self, stream=None):
+        super().__init__(JsonLineWriter(stream=stream))
+
+
+class FileSpanExporter(SpanExporter):
+    """将 span 写入按大小轮转的 JSONL 文件"""
+
+    def __init__(self, path: str, max_bytes: int = 0, backup_count: int = 0):
+        """初始化文件导出器
+
+        Args:
+            path: 文件路径，`{pid}` 替换为进程号（多 worker 时各进程写各自的文件）
+            max_bytes: 单个文件的最大字节数，超过后轮转，0 表示不轮转
+            backup_count: 保留的轮转文件数
+        """
+        super().__init__(JsonLineWriter(path, max_bytes=max_bytes, backup_count=backup_count))
+        self.path = self._writer.path
+
+
+class TraceIdFilter(logging.Filter):
+    """为日志记录附加当前 trace ID（在调用线程中读取上下文）"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace_id = current_trace_id()
+        if trace_id is not None:
+            record.trace_id = trace_id
+        return True
+
+
+class TracingMiddleware:
+    """ASGI 中间件：为每个 HTTP 请求创建服务端 span
+
+    span 覆盖整个请求（包括流式响应写完为止），请求内的埋点都是它的子 span；
+    响应头返回本次请求的 traceparent，客户端可据此关联日志与 span。
+    """
+
+    def __init__(self, app, get_tracer: Callable[[], Tracer]):
+        self.app = app
+        self.get_tracer = get_tracer
+
+    async def __call__(self, scope, receive, send):
+        tracer = self.get_tracer()
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or ())
+        parent = parse_traceparent(headers.get(TRACEPARENT_HEADER.encode(), b"").decode("latin-1"))
+        span = tracer.start_span(
+            f"{scope['method']} {scope['path']}",
+            context=parent,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        traceparent = format_traceparent(span.context).encode()
+
+        async def send_with_trace(message):
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                span.set_attribute("http.status_code", status_code)
+                span.set_status("error" if status_code >= 500 else "ok")
+                message = {**message, "headers": [*message.get("headers", []), (b"traceparent", traceparent)]}
+            await send(message)
+
+        with use_span(span, end_on_exit=True):
+            await self.app(scope, receive, send_with_trace)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+缓存预热命令
+
+按频次翻译最常见的输入，写入意图识别与翻译结果缓存，完成后输出统计结果（JSON）。
+多 worker 部署时配合 sqlite 缓存后端，在启动服务前执行一次即可，各 worker 共享预热结果。
+
+运行方式：
+    python -m src.warmup --source file --path data/warmup.jsonl --limit 200
+"""
+
+import asyncio
+import argparse
+
+from src.config import get_settings, configure_logging
+from src.services import CacheWarmer, get_result_cache
+from src.services.warmup import WARMUP_SOURCES, load_warmup_entries
+from src.utils import dumps_str
+
+
+async def _warm(args: argparse.Namespace) -> dict:
+    entries = await load_warmup_entries(args.source, args.path, args.limit)
+    warmer = CacheWarmer(rate_per_second=args.rate, timeout=args.timeout)
+    try:
+        report = await warmer.run(entries)
+    finally:
+        get_result_cache().close()
+    return report.to_dict()
+
+
+def main(argv: list[str] = None) -> None:
+    """执行缓存预热"""
+    configure_logging()
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="预热意图识别与翻译结果缓存")
+    parser.add_argument("--source", choices=WARMUP_SOURCES, default=settings.warmup_source, help="输入来源")
+    parser.add_argument("--path", default=settings.warmup_path, help="来源为 file 时的 JSON Lines 文件路径")
+    parser.add_argument("--limit", type=int, default=settings.warmup_limit, help="最多预热的条目数，0 表示不限制")
+    parser.add_argument("--rate", type=float, default=settings.warmup_rate_per_second, help="每秒最多发起的上游调用数")
+    parser.add_argument("--timeout", type=float, default=0, help="最长时长（秒），0 表示不限制")
+    args = parser.parse_args(argv)
+
+    print(dumps_str(asyncio.run(_warm(args))))
+
+
+if __name__ == "__main__":
+    main()
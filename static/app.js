@@ -17,13 +17,17 @@ const themeToggle = document.getElementById('theme-toggle');
 const CONFIG = {
     MIN_LENGTH: 10,
     MAX_LENGTH: 2000,
-    API_ENDPOINT: '/api/translate'
+    API_ENDPOINT: '/api/translate',
+    STREAM_FORMAT: 'sections'  // 按分节接收事件，仅重新渲染变化的分节
 };
 
 // 状态管理
 let isTranslating = false;
 let eventSource = null;
-let outputBuffer = '';  // 累积流式输出内容用于 Markdown 渲染
+let outputBuffer = '';  // 累积流式输出内容（用于复制）
+let sseBuffer = '';     // 尚未组成完整 SSE 帧的数据
+let sections = [];      // 分节渲染状态: { el, heading, text }
+let lastRevisionId = null;  // 上一次翻译的修订 ID（再次提交时只重新生成受修改影响的分节）
 
 /**
  * 初始化应用
@@ -31,6 +35,7 @@ let outputBuffer = '';  // 累积流式输出内容用于 Markdown 渲染
 function init() {
     // 绑定事件监听器
     inputContent.addEventListener('input', handleInputChange);
+    inputContent.addEventListener('paste', handleInputPaste);
     translateBtn.addEventListener('click', handleTranslate);
     directionSelect.addEventListener('change', handleDirectionChange);
     copyBtn.addEventListener('click', handleCopyResult);
@@ -78,6 +83,21 @@ function updateThemeToggleText() {
  */
 function handleInputChange() {
     updateCharCount();
+
+    // 清空输入后重新开始，不再引用上一次的翻译
+    if (!inputContent.value.trim()) {
+        lastRevisionId = null;
+    }
+}
+
+/**
+ * 处理粘贴：整段替换输入内容时视为新文档，不再引用上一次的翻译
+ */
+function handleInputPaste() {
+    const { selectionStart, selectionEnd, value } = inputContent;
+    if (!value.trim() || (selectionStart === 0 && selectionEnd === value.length)) {
+        lastRevisionId = null;
+    }
 }
 
 /**
@@ -196,7 +216,8 @@ async function sendTranslateRequest(content, direction) {
     const autoDetect = isAutoDetectMode();
     const requestBody = {
         content: content,
-        auto_detect: autoDetect
+        auto_detect: autoDetect,
+        stream_format: CONFIG.STREAM_FORMAT
     };
 
     // 仅在手动模式时设置 direction
@@ -204,6 +225,11 @@ async function sendTranslateRequest(content, direction) {
         requestBody.direction = direction;
     }
 
+    // 修改后重新提交：引用上一次的翻译（方向不同或已过期时服务端自动整篇翻译）
+    if (lastRevisionId) {
+        requestBody.previous_revision = lastRevisionId;
+    }
+
     // 使用 fetch 发送 POST 请求
     const response = await fetch(CONFIG.API_ENDPOINT, {
         method: 'POST',
@@ -241,17 +267,85 @@ async function sendTranslateRequest(content, direction) {
 
 /**
  * 处理 SSE 数据块
+ *
+ * 分节模式下正文以 JSON 编码，帧内不含空行，因此可以按 \n\n 切分；
+ * 跨网络分块的不完整帧暂存在 sseBuffer 中，等待后续数据补齐。
  */
 function processSSEChunk(chunk) {
-    // 使用正则分割：只在 \n\n 后跟 data: 或字符串结尾处分割
-    // 这样可以保留内容中的换行符（如 AI 输出的 \n 不会丢失）
-    const messages = chunk.split(/\n\n(?=data: |$)/);
-
-    for (const message of messages) {
-        if (message.startsWith('data: ')) {
-            const data = message.slice(6);  // 移除 "data: " 前缀
-            handleSSEData(data);
+    sseBuffer += chunk;
+
+    let boundary;
+    while ((boundary = sseBuffer.indexOf('\n\n')) !== -1) {
+        const frame = sseBuffer.slice(0, boundary);
+        sseBuffer = sseBuffer.slice(boundary + 2);
+        handleSSEFrame(frame);
+    }
+}
+
+/**
+ * 解析单个 SSE 帧（event 与 data 字段）
+ */
+function handleSSEFrame(frame) {
+    let eventType = 'message';
+    const dataLines = [];
+
+    for (const line of frame.split('\n')) {
+        if (line.startsWith('event: ')) {
+            eventType = line.slice(7);
+        } else if (line.startsWith('data: ')) {
+            dataLines.push(line.slice(6));  // 移除 "data: " 前缀
+        }
+    }
+
+    const data = dataLines.join('\n');
+    if (eventType.startsWith('section_')) {
+        try {
+            handleSectionEvent(eventType, JSON.parse(data));
+        } catch (e) {
+            console.error('Failed to parse section event:', e);
+        }
+        return;
+    }
+
+    handleSSEData(data);
+}
+
+/**
+ * 处理分节事件：每个分节独立渲染，避免每个分块都重新渲染整个文档
+ */
+function handleSectionEvent(eventType, payload) {
+    if (eventType === 'section_start') {
+        // 移除占位文本
+        const placeholder = outputArea.querySelector('.placeholder-text');
+        if (placeholder) {
+            placeholder.remove();
         }
+
+        const el = document.createElement('section');
+        el.className = 'output-section';
+        outputArea.appendChild(el);
+
+        const heading = payload.title ? `## ${payload.title}\n` : '';
+        sections[payload.index] = { el, heading, text: '' };
+        outputBuffer += heading;
+        el.innerHTML = marked.parse(heading);
+        return;
+    }
+
+    const section = sections[payload.index];
+    if (!section) {
+        return;
+    }
+
+    if (eventType === 'section_delta') {
+        section.text += payload.text;
+        outputBuffer += payload.text;
+
+        // 仅重新渲染当前分节
+        section.el.innerHTML = marked.parse(section.heading + section.text);
+        outputArea.scrollTop = outputArea.scrollHeight;
+    } else if (eventType === 'section_end') {
+        section.el.classList.add('complete');
     }
 }
 
@@ -282,7 +376,11 @@ function handleSSEData(data) {
         const metaJson = data.slice(7).trim();
         try {
             const meta = JSON.parse(metaJson);
-            displayIntentMeta(meta);
+            if (meta.revision_id) {
+                lastRevisionId = meta.revision_id;
+            } else {
+                displayIntentMeta(meta);
+            }
         } catch (e) {
             console.error('Failed to parse META data:', e);
         }
@@ -297,6 +395,12 @@ function handleSSEData(data) {
  * 显示意图识别元数据
  */
 function displayIntentMeta(meta) {
+    // 流式意图识别会在翻译开始后补发判断依据
+    if (!meta.detected_direction) {
+        updateIntentReasoning(meta.reasoning);
+        return;
+    }
+
     const directionLabel = meta.detected_direction === 'product_to_dev'
         ? '产品需求 → 技术语言'
         : '技术方案 → 业务语言';
@@ -320,6 +424,17 @@ function displayIntentMeta(meta) {
 
     // 插入元数据显示
     outputArea.insertAdjacentHTML('beforeend', metaHtml);
+    updateIntentReasoning(meta.reasoning);
+}
+
+/**
+ * 更新意图识别的判断依据（鼠标悬停显示）
+ */
+function updateIntentReasoning(reasoning) {
+    const metaEl = outputArea.querySelector('.intent-meta');
+    if (metaEl && reasoning) {
+        metaEl.title = `判断依据: ${reasoning}`;
+    }
 }
 
 /**
@@ -347,6 +462,8 @@ function appendOutput(text) {
  */
 function clearOutput() {
     outputBuffer = '';  // 重置 Markdown 缓冲区
+    sseBuffer = '';
+    sections = [];
     outputArea.innerHTML = '';
     outputArea.classList.remove('typing');
 }
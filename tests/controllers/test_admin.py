@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+管理控制器测试
+"""
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from src.app import app
+from src.config import get_settings, set_settings
+from src.prompts import get_prompts, set_prompts
+
+
+@pytest.fixture
+def admin_token():
+    """启用管理接口，测试结束后恢复原配置"""
+    settings, prompts = get_settings(), get_prompts()
+    set_settings(settings.model_copy(update={"admin_token": "secret"}))
+    yield "secret"
+    set_settings(settings)
+    set_prompts(prompts)
+
+
+async def _post_reload(headers=None):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/api/admin/reload", headers=headers or {})
+
+
+class TestAdminReload:
+    """热加载接口测试"""
+
+    @pytest.mark.asyncio
+    async def test_disabled_without_token(self):
+        """测试未配置管理令牌时接口不可用"""
+        response = await _post_reload({"X-Admin-Token": ""})
+        assert response.status_code == 404
+        assert response.json()["error_code"] == "ADMIN_DISABLED"
+
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_token(self, admin_token):
+        """测试令牌错误时拒绝"""
+        response = await _post_reload({"X-Admin-Token": "wrong"})
+        assert response.status_code == 403
+        assert response.json()["error_code"] == "FORBIDDEN"
+
+    @pytest.mark.asyncio
+    async def test_reload(self, admin_token, monkeypatch):
+        """测试热加载成功返回新的提示词版本"""
+        monkeypatch.setenv("ADMIN_TOKEN", admin_token)
+        response = await _post_reload({"X-Admin-Token": admin_token})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["reason"] == "manual"
+        assert data["prompt_version"] == get_prompts().version
@@ -33,3 +33,81 @@ class TestHealthEndpoint:
 
         data = response.json()
         assert data["version"] == "1.0.0"
+
+    @pytest.mark.asyncio
+    async def test_health_check_returns_503_while_draining(self, monkeypatch):
+        """测试停机排空期间返回 503"""
+        from src.controllers import health as health_controller
+        from src.services.drain import DrainController
+
+        drain = DrainController()
+        drain.draining = True
+        monkeypatch.setattr(health_controller, "get_drain_controller", lambda: drain)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/health")
+
+        assert response.status_code == 503
+        assert response.json()["status"] == "draining"
+
+    @pytest.mark.asyncio
+    async def test_health_check_returns_503_while_warming(self, monkeypatch):
+        """测试缓存预热完成前返回 503"""
+        from src.controllers import health as health_controller
+        from src.services.warmup import CacheWarmer
+
+        warmer = CacheWarmer()
+        warmer.warming = True
+        monkeypatch.setattr(health_controller, "get_cache_warmer", lambda: warmer)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/health")
+
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming"
+
+
+class TestColdStart:
+    """冷启动测试"""
+
+    def test_app_import_defers_heavy_dependencies(self):
+        """测试导入应用时不加载 openai（客户端延迟到首次使用或启动后构造）"""
+        import os
+        import subprocess
+        import sys
+        from pathlib import Path
+
+        code = "import sys, src.app; print('openai' in sys.modules)"
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).parent.parent.parent,
+            env={**os.environ, "DEEPSEEK_API_KEY": "test-key"},
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "False"
+
+    def test_app_import_has_no_side_effects(self):
+        """测试导入应用时不读取配置、不启动日志线程、不加载静态资源"""
+        import subprocess
+        import sys
+        from pathlib import Path
+
+        code = (
+            "import threading, src.app, src.config; "
+            "print(int(src.config._current_settings is not None), threading.active_count(), "
+            "src.app.get_static_assets.cache_info().currsize)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).parent.parent.parent,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.split() == ["0", "1", "0"]
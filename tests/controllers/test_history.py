@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+翻译历史控制器测试
+"""
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from src.app import app
+from src.controllers import history as history_controller
+from src.models import TranslationDirection
+from src.services.history import HistoryStore
+
+
+class TestHistorySearch:
+    """翻译历史检索接口测试"""
+
+    @pytest.mark.asyncio
+    async def test_search_returns_matches(self, monkeypatch, tmp_path):
+        """测试返回匹配的历史"""
+        store = HistoryStore(str(tmp_path / "history.sqlite3"), flush_interval=0)
+        store.record("我们需要一个智能推荐功能，提升用户停留时长", TranslationDirection.PRODUCT_TO_DEV, "推荐系统方案")
+        store.close()
+        monkeypatch.setattr(history_controller, "get_history_store", lambda: store)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/history/search", params={"q": "智能推荐"})
+
+        assert response.status_code == 200
+        [item] = response.json()["items"]
+        assert item["direction"] == "product_to_dev"
+        assert item["output"] == "推荐系统方案"
+        assert item["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_returns_404(self, monkeypatch):
+        """测试未启用时返回 404"""
+        monkeypatch.setattr(history_controller, "get_history_store", lambda: None)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/history/search", params={"q": "推荐"})
+
+        assert response.status_code == 404
+        assert response.json()["error_code"] == "HISTORY_DISABLED"
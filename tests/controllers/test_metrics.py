@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+指标控制器测试
+"""
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from src.app import app
+from src.services import get_metrics
+
+
+class TestMetricsEndpoint:
+    """指标接口测试"""
+
+    @pytest.mark.asyncio
+    async def test_metrics_returns_snapshot(self):
+        """测试指标接口返回快照结构"""
+        get_metrics().inc("translation_requests_total", route="default")
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/metrics")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data) >= {"counters", "gauges", "histograms"}
+        assert "translation_requests_total" in data["counters"]
@@ -3,10 +3,35 @@
 翻译控制器测试
 """
 
+import json
+
 import pytest
 from httpx import AsyncClient, ASGITransport
 
 from src.app import app
+from src.config import get_settings
+from src.controllers import translate as translate_controller
+
+
+class _FakeTranslator:
+    """按预设分块输出的翻译器替身"""
+
+    def __init__(self, chunks, revision=None):
+        self.chunks = chunks
+        self.revision = revision
+        self.revision_requests = []
+
+    def revision_id(self, content, direction, confidence=None):
+        return self.revision
+
+    async def translate_stream(self, content, direction, confidence=None, on_usage=None):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def translate_stream_revision(self, content, direction, previous_revision, confidence=None, on_usage=None):
+        self.revision_requests.append(previous_revision)
+        for chunk in self.chunks:
+            yield chunk
 
 
 class TestTranslateEndpointValidation:
@@ -136,6 +161,101 @@ class TestTranslateEndpointIntegration:
             assert "error_code" in data
 
 
+class TestTranslateSectionStreaming:
+    """分节流式输出测试"""
+
+    @pytest.mark.asyncio
+    async def test_sections_format_emits_named_events(self, monkeypatch):
+        """测试 sections 格式输出分节事件并保留结束标记"""
+        monkeypatch.setattr(get_settings(), "deepseek_api_key", "test-key")
+        fake = _FakeTranslator(["## 技术实现", "建议\n- 方案", " A\n## 性能考量\n", "高并发", "[DONE]"])
+        monkeypatch.setattr(translate_controller, "get_translator", lambda: fake)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/translate",
+                json={
+                    "content": "我们需要一个智能推荐功能，提升用户停留时长",
+                    "direction": "product_to_dev",
+                    "stream_format": "sections",
+                }
+            )
+
+        assert response.status_code == 200
+        frames = [frame for frame in response.text.split("\n\n") if frame]
+        events = []
+        for frame in frames:
+            lines = frame.split("\n")
+            if lines[0].startswith("event: "):
+                events.append((lines[0][7:], json.loads(lines[1][6:])))
+
+        assert events[0] == ("section_start", {"index": 0, "title": "技术实现建议"})
+        assert ("section_end", {"index": 0}) in events
+        assert ("section_start", {"index": 1, "title": "性能考量"}) in events
+        assert events[-1] == ("section_end", {"index": 1})
+        deltas = "".join(payload["text"] for name, payload in events if name == "section_delta")
+        assert deltas == "- 方案 A\n高并发"
+        assert frames[-1] == "data: [DONE]"
+
+    @pytest.mark.asyncio
+    async def test_text_format_is_default(self, monkeypatch):
+        """测试默认仍输出原始文本分块"""
+        monkeypatch.setattr(get_settings(), "deepseek_api_key", "test-key")
+        fake = _FakeTranslator(["## 标题\n", "内容", "[DONE]"])
+        monkeypatch.setattr(translate_controller, "get_translator", lambda: fake)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/translate",
+                json={
+                    "content": "我们需要一个智能推荐功能，提升用户停留时长",
+                    "direction": "product_to_dev",
+                }
+            )
+
+        assert response.text == "data: ## 标题\n\n\ndata: 内容\n\ndata: [DONE]\n\n"
+
+
+class TestTranslateStreamingIntent:
+    """流式意图识别接入测试"""
+
+    @pytest.mark.asyncio
+    async def test_reasoning_sent_as_follow_up_meta(self, monkeypatch):
+        """测试方向先行发送，reasoning 以追加的 [META] 帧补发"""
+        import asyncio
+        from src.models import TranslationDirection
+        from src.services import IntentResult
+
+        monkeypatch.setattr(get_settings(), "deepseek_api_key", "test-key")
+        monkeypatch.setattr(get_settings(), "intent_streaming", True)
+
+        class _FakeRouter:
+            async def detect_intent_streaming(self, content, fast=False):
+                async def reasoning():
+                    return "包含业务目标"
+                result = IntentResult(direction=TranslationDirection.PRODUCT_TO_DEV, confidence=0.9)
+                return result, asyncio.create_task(reasoning())
+
+        monkeypatch.setattr(translate_controller, "get_intent_router", lambda: _FakeRouter())
+        monkeypatch.setattr(translate_controller, "get_translator", lambda: _FakeTranslator(["正文", "[DONE]"]))
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/translate",
+                json={"content": "我们需要一个智能推荐功能，提升用户停留时长", "auto_detect": True}
+            )
+
+        frames = [frame for frame in response.text.split("\n\n") if frame]
+        metas = [json.loads(frame[len("data: [META] "):]) for frame in frames if frame.startswith("data: [META]")]
+        assert metas[0]["detected_direction"] == "product_to_dev"
+        assert metas[0]["reasoning"] == ""
+        assert metas[1] == {"reasoning": "包含业务目标"}
+        assert frames[-1] == "data: [DONE]"
+
+
 class TestRootEndpoint:
     """首页接口测试"""
 
@@ -159,3 +279,317 @@ class TestRootEndpoint:
         # 检查是否包含 HTML 内容
         content = response.text
         assert "<!DOCTYPE html>" in content or "沟通翻译助手" in content
+
+
+class TestTranslateDraining:
+    """停机排空测试"""
+
+    @pytest.mark.asyncio
+    async def test_rejects_new_requests_while_draining(self, monkeypatch):
+        """测试排空期间新的翻译请求返回 503"""
+        from src.services.drain import DrainController
+
+        drain = DrainController()
+        drain.draining = True
+        monkeypatch.setattr(translate_controller, "get_drain_controller", lambda: drain)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/translate",
+                json={"content": "我们需要一个智能推荐功能，提升用户停留时长", "direction": "product_to_dev"}
+            )
+
+        assert response.status_code == 503
+        assert response.json()["error_code"] == "SERVICE_DRAINING"
+
+
+class TestTranslateCompression:
+    """SSE 压缩测试"""
+
+    @pytest.mark.asyncio
+    async def test_gzip_when_enabled_and_accepted(self, monkeypatch):
+        """测试开启压缩且客户端支持 gzip 时压缩响应"""
+        monkeypatch.setattr(get_settings(), "deepseek_api_key", "test-key")
+        monkeypatch.setattr(get_settings(), "sse_compression", True)
+        fake = _FakeTranslator(["## 标题\n", "内容", "[DONE]"])
+        monkeypatch.setattr(translate_controller, "get_translator", lambda: fake)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/translate",
+                json={"content": "我们需要一个智能推荐功能，提升用户停留时长", "direction": "product_to_dev"},
+                headers={"Accept-Encoding": "gzip"},
+            )
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.text == "data: ## 标题\n\n\ndata: 内容\n\ndata: [DONE]\n\n"
+
+    @pytest.mark.asyncio
+    async def test_uncompressed_by_default(self, monkeypatch):
+        """测试默认不压缩"""
+        monkeypatch.setattr(get_settings(), "deepseek_api_key", "test-key")
+        fake = _FakeTranslator(["内容", "[DONE]"])
+        monkeypatch.setattr(translate_controller, "get_translator", lambda: fake)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/translate",
+                json={"content": "我们需要一个智能推荐功能，提升用户停留时长", "direction": "product_to_dev"},
+                headers={"Accept-Encoding": "gzip"},
+            )
+
+        assert "content-encoding" not in response.headers
+
+
+class TestTranslateJournal:
+    """请求日志测试"""
+
+    @pytest.mark.asyncio
+    async def test_stream_recorded_in_journal(self, monkeypatch, tmp_path):
+        """测试流式翻译结束后写入请求日志"""
+        from src.services.journal import RequestJournal
+
+        monkeypatch.setattr(get_settings(), "deepseek_api_key", "test-key")
+        journal = RequestJournal(str(tmp_path / "journal.jsonl"))
+        monkeypatch.setattr(translate_controller, "get_request_journal", lambda: journal)
+        fake = _FakeTranslator(["## 标题\n", "内容", "[DONE]"])
+        monkeypatch.setattr(translate_controller, "get_translator", lambda: fake)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post(
+                "/api/translate",
+                json={"content": "我们需要一个智能推荐功能，提升用户停留时长", "direction": "product_to_dev"},
+            )
+        journal.close()
+
+        [entry] = [json.loads(line) for line in (tmp_path / "journal.jsonl").read_text(encoding="utf-8").splitlines()]
+        assert entry["status"] == "ok"
+        assert entry["chunk_sizes"] == [6, 2]
+        assert entry["direction"] == "product_to_dev"
+
+
+class TestTranslateBothDirections:
+    """双向翻译测试"""
+
+    @pytest.mark.asyncio
+    async def test_both_directions_multiplexed_with_tags(self, monkeypatch):
+        """测试双向模式输出带方向标签的事件且不做意图识别"""
+        from src.models import TranslationDirection
+
+        class _FakeBothTranslator:
+            async def translate_stream_both(self, content, parallel_sections=False, on_usage=None):
+                yield TranslationDirection.PRODUCT_TO_DEV, "技术"
+                yield TranslationDirection.DEV_TO_PRODUCT, "业务"
+                yield TranslationDirection.DEV_TO_PRODUCT, "[DONE]"
+                yield TranslationDirection.PRODUCT_TO_DEV, "[ERROR] 请求超时"
+
+        def fail_intent_router():
+            raise AssertionError("intent detection should be skipped")
+
+        monkeypatch.setattr(get_settings(), "deepseek_api_key", "test-key")
+        monkeypatch.setattr(translate_controller, "get_translator", lambda: _FakeBothTranslator())
+        monkeypatch.setattr(translate_controller, "get_intent_router", fail_intent_router)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/translate",
+                json={
+                    "content": "我们需要一个智能推荐功能，提升用户停留时长",
+                    "direction": "both",
+                    "auto_detect": True,
+                }
+            )
+
+        assert response.status_code == 200
+        frames = [frame for frame in response.text.split("\n\n") if frame]
+        events = []
+        for frame in frames[:-1]:
+            name, data = frame.split("\n")
+            events.append((name[7:], json.loads(data[6:])))
+
+        assert events == [
+            ("translation_delta", {"direction": "product_to_dev", "text": "技术"}),
+            ("translation_delta", {"direction": "dev_to_product", "text": "业务"}),
+            ("translation_end", {"direction": "dev_to_product", "status": "done"}),
+            ("translation_end", {"direction": "product_to_dev", "status": "error", "message": "请求超时"}),
+        ]
+        assert frames[-1] == "data: [DONE]"
+
+
+class TestTranslateRevision:
+    """修订翻译测试"""
+
+    @pytest.mark.asyncio
+    async def test_revision_id_sent_and_previous_revision_used(self, monkeypatch):
+        """测试先发送修订 ID，提供 previous_revision 时走修订翻译"""
+        monkeypatch.setattr(get_settings(), "deepseek_api_key", "test-key")
+        fake = _FakeTranslator(["内容", "[DONE]"], revision="b" * 64)
+        monkeypatch.setattr(translate_controller, "get_translator", lambda: fake)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/translate",
+                json={
+                    "content": "我们需要一个智能推荐功能，提升用户停留时长",
+                    "direction": "product_to_dev",
+                    "previous_revision": "a" * 64,
+                }
+            )
+
+        frames = [frame for frame in response.text.split("\n\n") if frame]
+        assert frames[0] == 'data: [META] {"revision_id":"' + "b" * 64 + '"}'
+        assert frames[1:] == ["data: 内容", "data: [DONE]"]
+        assert fake.revision_requests == ["a" * 64]
+
+
+class TestTranslateTracing:
+    """链路追踪测试"""
+
+    @pytest.mark.asyncio
+    async def test_trace_id_sent_in_meta(self, monkeypatch):
+        """测试开启追踪时在 [META] 中返回请求的 trace ID"""
+        from src.utils.tracing import Tracer, TracingMiddleware
+
+        monkeypatch.setattr(get_settings(), "deepseek_api_key", "test-key")
+        fake = _FakeTranslator(["内容", "[DONE]"])
+        monkeypatch.setattr(translate_controller, "get_translator", lambda: fake)
+        tracer = Tracer()
+
+        transport = ASGITransport(app=TracingMiddleware(app, get_tracer=lambda: tracer))
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/translate",
+                json={"content": "我们需要一个智能推荐功能，提升用户停留时长", "direction": "product_to_dev"},
+                headers={"traceparent": "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"},
+            )
+
+        frames = [frame for frame in response.text.split("\n\n") if frame]
+        assert frames[0] == 'data: [META] {"trace_id":"0af7651916cd43dd8448eb211c80319c"}'
+        assert frames[1:] == ["data: 内容", "data: [DONE]"]
+
+
+class TestTranslateHistory:
+    """翻译历史记录与复用测试"""
+
+    @pytest.mark.asyncio
+    async def test_completed_translation_recorded_and_reused(self, monkeypatch, tmp_path):
+        """测试完成的翻译写入历史，携带 history_id 时直接输出历史译文"""
+        from src.services.history import HistoryStore
+
+        monkeypatch.setattr(get_settings(), "deepseek_api_key", "test-key")
+        store = HistoryStore(str(tmp_path / "history.sqlite3"), flush_interval=0)
+        monkeypatch.setattr(translate_controller, "get_history_store", lambda: store)
+        fake = _FakeTranslator(["## 标题\n", "内容", "[DONE]"])
+        monkeypatch.setattr(translate_controller, "get_translator", lambda: fake)
+        content = "我们需要一个智能推荐功能，提升用户停留时长"
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/api/translate", json={"content": content, "direction": "product_to_dev"})
+            store.close()
+            [entry] = await store.search("智能推荐")
+
+            fake.chunks = ["不应调用上游", "[DONE]"]
+            response = await client.post(
+                "/api/translate",
+                json={"content": content, "auto_detect": True, "history_id": entry.id},
+            )
+            missing = await client.post(
+                "/api/translate",
+                json={"content": content, "direction": "product_to_dev", "history_id": entry.id + 1},
+            )
+
+        assert entry.output == "## 标题\n内容"
+        assert entry.first_chunk_ms is not None
+        frames = [frame for frame in response.text.split("\n\n") if frame]
+        assert frames[0] == f'data: [META] {{"history_id":{entry.id}}}'
+        assert frames[-1] == "data: [DONE]"
+        assert "不应调用上游" not in response.text
+        assert missing.status_code == 404
+        assert missing.json()["error_code"] == "HISTORY_NOT_FOUND"
+
+
+class TestTranslateTenants:
+    """租户配额测试"""
+
+    @pytest.mark.asyncio
+    async def test_usage_recorded_and_quota_enforced(self, monkeypatch, tmp_path):
+        """测试按 API Key 计入租户用量，用尽配额后返回 429，未知 API Key 返回 401"""
+        from src.models import TokenUsage
+        from src.services.tenants import TenantConfig, UsageLedger
+
+        class _UsageTranslator(_FakeTranslator):
+            async def translate_stream(self, content, direction, confidence=None, on_usage=None):
+                on_usage(TokenUsage(prompt_tokens=10, completion_tokens=5, total_tokens=15))
+                for chunk in self.chunks:
+                    yield chunk
+
+        monkeypatch.setattr(get_settings(), "deepseek_api_key", "test-key")
+        tenant = TenantConfig(name="team-a", api_key="key-a", daily_request_quota=1)
+        ledger = UsageLedger([tenant], str(tmp_path / "usage.sqlite3"))
+        monkeypatch.setattr(translate_controller, "get_usage_ledger", lambda: ledger)
+        monkeypatch.setattr(translate_controller, "get_translator", lambda: _UsageTranslator(["内容", "[DONE]"]))
+        payload = {"content": "我们需要一个智能推荐功能，提升用户停留时长", "direction": "product_to_dev"}
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/api/translate", json=payload, headers={"X-API-Key": "key-a"})
+            second = await client.post("/api/translate", json=payload, headers={"X-API-Key": "key-a"})
+            unknown = await client.post("/api/translate", json=payload, headers={"X-API-Key": "other"})
+        ledger.close()
+
+        assert first.status_code == 200
+        [report] = ledger.report()
+        assert (report["day"]["requests"], report["day"]["prompt_tokens"], report["day"]["completion_tokens"]) == (1, 10, 5)
+        assert second.status_code == 429
+        assert second.json()["error_code"] == "QUOTA_EXCEEDED"
+        assert unknown.status_code == 401
+        assert unknown.json()["error_code"] == "INVALID_API_KEY"
+
+
+class TestTranslateStale:
+    """过期优先模式测试"""
+
+    @pytest.mark.asyncio
+    async def test_stale_translation_marked_in_meta(self, monkeypatch):
+        """测试旧译文在正文之前以 [META] 标记，不作为正文输出"""
+        monkeypatch.setattr(get_settings(), "deepseek_api_key", "test-key")
+        monkeypatch.setattr(translate_controller, "get_translator", lambda: _FakeTranslator(["[STALE]", "旧译文", "[DONE]"]))
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/translate",
+                json={"content": "我们需要一个智能推荐功能，提升用户停留时长", "direction": "product_to_dev"},
+            )
+
+        frames = [frame for frame in response.text.split("\n\n") if frame]
+        assert frames == ['data: [META] {"stale":true}', "data: 旧译文", "data: [DONE]"]
+
+    @pytest.mark.asyncio
+    async def test_stale_translation_not_recorded_in_history(self, monkeypatch, tmp_path):
+        """测试旧译文不写入翻译历史"""
+        from src.services.history import HistoryStore
+
+        monkeypatch.setattr(get_settings(), "deepseek_api_key", "test-key")
+        store = HistoryStore(str(tmp_path / "history.sqlite3"), flush_interval=0)
+        monkeypatch.setattr(translate_controller, "get_history_store", lambda: store)
+        monkeypatch.setattr(translate_controller, "get_translator", lambda: _FakeTranslator(["[STALE]", "旧译文", "[DONE]"]))
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/translate",
+                json={"content": "我们需要一个智能推荐功能，提升用户停留时长", "direction": "product_to_dev"},
+            )
+        store.close()
+
+        assert response.text.endswith("data: [DONE]\n\n")
+        assert await store.search("智能推荐") == []
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+用量控制器测试
+"""
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from src.app import app
+from src.config import get_settings
+from src.controllers import usage as usage_controller
+from src.services.tenants import TenantConfig, UsageLedger
+
+
+@pytest.fixture
+def ledger(monkeypatch, tmp_path):
+    """两个租户的账本"""
+    usage = UsageLedger(
+        [TenantConfig(name="team-a", api_key="key-a"), TenantConfig(name="team-b", api_key="key-b")],
+        str(tmp_path / "usage.sqlite3"),
+    )
+    usage.record_request(usage.tenants["team-a"])
+    monkeypatch.setattr(usage_controller, "get_usage_ledger", lambda: usage)
+    yield usage
+    usage.close()
+
+
+class TestUsageReport:
+    """用量报告接口测试"""
+
+    @pytest.mark.asyncio
+    async def test_api_key_sees_own_usage(self, ledger):
+        """测试携带 API Key 时只返回该租户的用量"""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/usage", headers={"X-API-Key": "key-a"})
+
+        assert response.status_code == 200
+        [tenant] = response.json()["tenants"]
+        assert tenant["tenant"] == "team-a"
+        assert tenant["day"]["requests"] == 1
+
+    @pytest.mark.asyncio
+    async def test_admin_token_sees_all_tenants(self, monkeypatch, ledger):
+        """测试携带管理令牌时返回全部租户，令牌错误时返回 403"""
+        monkeypatch.setattr(get_settings(), "admin_token", "secret")
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/usage", headers={"X-Admin-Token": "secret"})
+            forbidden = await client.get("/api/usage", headers={"X-Admin-Token": "wrong"})
+
+        assert [tenant["tenant"] for tenant in response.json()["tenants"]] == ["team-a", "team-b"]
+        assert forbidden.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_unknown_api_key_returns_401(self, ledger):
+        """测试无法识别的 API Key 返回 401"""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/usage", headers={"X-API-Key": "other"})
+
+        assert response.status_code == 401
+        assert response.json()["error_code"] == "INVALID_API_KEY"
+
+    @pytest.mark.asyncio
+    async def test_disabled_returns_404(self, monkeypatch):
+        """测试未启用时返回 404"""
+        monkeypatch.setattr(usage_controller, "get_usage_ledger", lambda: None)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/usage")
+
+        assert response.status_code == 404
+        assert response.json()["error_code"] == "USAGE_DISABLED"
@@ -5,7 +5,8 @@
 
 import pytest
 
-from src.models import TranslateRequest, TranslationDirection
+from src.config import get_settings
+from src.models import RequestDirection, TranslateRequest, TranslationDirection, TokenUsage
 
 
 class TestTranslateRequest:
@@ -52,3 +53,41 @@ class TestTranslateRequest:
         """测试翻译方向枚举值"""
         assert TranslationDirection.PRODUCT_TO_DEV.value == "product_to_dev"
         assert TranslationDirection.DEV_TO_PRODUCT.value == "dev_to_product"
+
+    def test_both_is_request_only_direction(self):
+        """测试 both 只是请求层的方向，不属于单一翻译方向"""
+        request = TranslateRequest(content="这是一段足够长的测试内容，用于验证请求模型", direction="both")
+        assert request.direction == RequestDirection.BOTH
+        with pytest.raises(ValueError):
+            TranslationDirection("both")
+
+    def test_invalid_content_exceeds_token_budget(self, monkeypatch):
+        """测试内容估算 Token 数超过预算应该失败"""
+        monkeypatch.setattr(get_settings(), "content_max_tokens", 10)
+        with pytest.raises(ValueError):
+            TranslateRequest(
+                content="这是一段超过了十个 Token 预算的测试内容，用于验证请求模型",
+                direction=TranslationDirection.PRODUCT_TO_DEV,
+            )
+
+
+class TestTokenUsage:
+    """TokenUsage 模型测试"""
+
+    def test_from_api_with_valid_usage(self):
+        """测试从 API usage 对象构造"""
+
+        class Usage:
+            prompt_tokens = 120
+            completion_tokens = 30
+            total_tokens = 150
+
+        usage = TokenUsage.from_api(Usage())
+        assert usage.prompt_tokens == 120
+        assert usage.completion_tokens == 30
+        assert usage.total_tokens == 150
+
+    def test_from_api_with_missing_usage(self):
+        """测试 usage 缺失或字段无效时返回 None"""
+        assert TokenUsage.from_api(None) is None
+        assert TokenUsage.from_api(object()) is None
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+微批处理器测试
+"""
+
+import asyncio
+
+import pytest
+
+from src.services.batching import MicroBatcher
+
+
+class TestMicroBatcher:
+    """微批处理器测试"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_merged_within_window(self):
+        """测试窗口内的并发请求合并为一批，结果按顺序分发"""
+        batches = []
+
+        async def handler(items):
+            batches.append(items)
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(handler, window=0.01, max_size=10)
+        results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(3))), timeout=1)
+
+        assert results == [0, 2, 4]
+        assert batches == [[0, 1, 2]]
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushed_immediately(self):
+        """测试攒满 max_size 时不等待窗口结束"""
+        batches = []
+
+        async def handler(items):
+            batches.append(items)
+            return items
+
+        batcher = MicroBatcher(handler, window=10, max_size=2)
+        results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(4))), timeout=1)
+
+        assert results == [0, 1, 2, 3]
+        assert batches == [[0, 1], [2, 3]]
+
+    @pytest.mark.asyncio
+    async def test_handler_error_propagates_to_waiters(self):
+        """测试处理函数异常时所有等待方收到该异常"""
+        async def handler(items):
+            raise RuntimeError("boom")
+
+        batcher = MicroBatcher(handler, window=0.01, max_size=10)
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True), timeout=1
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_batch_releases_waiters(self):
+        """测试批处理任务被取消时等待方不会挂起"""
+        started = asyncio.Event()
+
+        async def handler(items):
+            started.set()
+            await asyncio.sleep(10)
+
+        batcher = MicroBatcher(handler, window=0.01, max_size=10)
+        waiter = asyncio.ensure_future(batcher.submit(1))
+        await asyncio.wait_for(started.wait(), timeout=1)
+        for task in list(batcher._tasks):
+            task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(waiter, timeout=1)
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+结果缓存单元测试
+"""
+
+import time
+import multiprocessing
+
+import pytest
+
+from src.services.cache import (
+    CacheBackend,
+    MemoryCacheBackend,
+    SqliteCacheBackend,
+    ResultCache,
+    create_cache_backend,
+    make_cache_key,
+)
+from src.services.metrics import MetricsRegistry
+
+
+def _write_from_process(path, key, value):
+    """在子进程中写入缓存条目"""
+    backend = SqliteCacheBackend(path)
+    backend.set(key, value, ttl=60)
+    backend.close()
+
+
+class TestCacheKey:
+    """缓存键测试"""
+
+    def test_key_is_deterministic(self):
+        """测试相同输入生成相同缓存键"""
+        assert make_cache_key("translation", "a", "b") == make_cache_key("translation", "a", "b")
+
+    def test_key_depends_on_every_part(self):
+        """测试任一字段变化都会改变缓存键"""
+        base = make_cache_key("translation", "product_to_dev", "model", "v1", "内容")
+        assert base.startswith("translation:")
+        assert base != make_cache_key("translation", "product_to_dev", "model", "v2", "内容")
+        assert base != make_cache_key("intent", "product_to_dev", "model", "v1", "内容")
+
+    def test_key_parts_are_separated(self):
+        """测试字段边界参与哈希，避免拼接歧义"""
+        assert make_cache_key("k", "ab", "c") != make_cache_key("k", "a", "bc")
+
+
+class TestMemoryCacheBackend:
+    """内存后端测试"""
+
+    def test_get_set(self):
+        """测试读写"""
+        backend = MemoryCacheBackend()
+        assert backend.get("k") is None
+        backend.set("k", "v", ttl=60)
+        assert backend.get("k") == "v"
+
+    def test_expired_entry_is_dropped(self):
+        """测试过期条目不可读"""
+        backend = MemoryCacheBackend()
+        backend.set("k", "v", ttl=-1)
+        assert backend.get("k") is None
+
+    def test_evicts_least_recently_used(self):
+        """测试超出容量时淘汰最久未使用的条目"""
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set("a", "1", ttl=60)
+        backend.set("b", "2", ttl=60)
+        backend.get("a")
+        backend.set("c", "3", ttl=60)
+        assert backend.get("a") == "1"
+        assert backend.get("b") is None
+        assert backend.get("c") == "3"
+
+
+class TestSqliteCacheBackend:
+    """SQLite 后端测试"""
+
+    def test_get_set_and_expiry(self, tmp_path):
+        """测试读写与过期"""
+        backend = SqliteCacheBackend(str(tmp_path / "cache.sqlite3"))
+        backend.set("k", "翻译结果", ttl=60)
+        backend.set("old", "v", ttl=-1)
+        assert backend.get("k") == "翻译结果"
+        assert backend.get("old") is None
+        backend.delete("k")
+        assert backend.get("k") is None
+        backend.close()
+
+    def test_uses_wal_mode(self, tmp_path):
+        """测试启用 WAL 模式"""
+        backend = SqliteCacheBackend(str(tmp_path / "cache.sqlite3"))
+        mode = backend._connect().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode.lower() == "wal"
+        backend.close()
+
+    def test_shared_across_processes(self, tmp_path):
+        """测试一个进程写入的条目可被另一个进程读取"""
+        path = str(tmp_path / "cache.sqlite3")
+        backend = SqliteCacheBackend(path)
+
+        process = multiprocessing.get_context("spawn").Process(
+            target=_write_from_process, args=(path, "shared", "来自其他 worker")
+        )
+        process.start()
+        process.join(timeout=30)
+
+        assert process.exitcode == 0
+        assert backend.get("shared") == "来自其他 worker"
+        backend.close()
+
+
+class TestCreateCacheBackend:
+    """后端工厂测试"""
+
+    def test_backend_names(self, tmp_path):
+        """测试根据名称创建后端"""
+        assert create_cache_backend("none").name == "none"
+        assert create_cache_backend("memory").name == "memory"
+        assert create_cache_backend("SQLITE", str(tmp_path / "c.sqlite3")).name == "sqlite"
+
+    def test_unknown_backend_disables_cache(self):
+        """测试未知后端名称退化为不缓存"""
+        assert type(create_cache_backend("redis")) is CacheBackend
+
+
+class TestResultCache:
+    """结果缓存门面测试"""
+
+    @pytest.mark.asyncio
+    async def test_records_hit_and_miss(self, tmp_path):
+        """测试读写 SQLite 后端并记录命中指标"""
+        cache = ResultCache(SqliteCacheBackend(str(tmp_path / "cache.sqlite3")), ttl=60)
+        cache.metrics = MetricsRegistry()
+
+        assert await cache.get("translation", "k") is None
+        await cache.set("translation", "k", "v")
+        assert await cache.get("translation", "k") == "v"
+
+        assert cache.metrics.get_counter("cache_requests_total", kind="translation", result="miss") == 1
+        assert cache.metrics.get_counter("cache_requests_total", kind="translation", result="hit") == 1
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_disabled_cache_is_noop(self):
+        """测试未启用缓存时不读写也不记录指标"""
+        cache = ResultCache(CacheBackend(), ttl=60)
+        cache.metrics = MetricsRegistry()
+
+        await cache.set("intent", "k", "v")
+        assert not cache.enabled
+        assert await cache.get("intent", "k") is None
+        assert cache.metrics.snapshot()["counters"] == {}
+
+    @pytest.mark.asyncio
+    async def test_backend_errors_are_swallowed(self):
+        """测试后端异常不影响请求"""
+        class BrokenBackend(CacheBackend):
+            name = "broken"
+
+            def get(self, key):
+                raise RuntimeError("disk error")
+
+            def set(self, key, value, ttl):
+                raise RuntimeError("disk error")
+
+        cache = ResultCache(BrokenBackend(), ttl=60)
+        await cache.set("intent", "k", "v")
+        assert await cache.get("intent", "k") is None
+
+    @pytest.mark.asyncio
+    async def test_custom_ttl(self):
+        """测试单条目自定义有效期"""
+        cache = ResultCache(MemoryCacheBackend(), ttl=60)
+        await cache.set("intent", "k", "v", ttl=0.01)
+        time.sleep(0.02)
+        assert await cache.get("intent", "k") is None
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+优雅停机单元测试
+"""
+
+import asyncio
+
+import pytest
+
+from src.services.drain import DRAIN_ERROR_CHUNK, DrainController
+from src.services.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def drain():
+    """使用独立指标注册表的排空控制器"""
+    controller = DrainController()
+    controller.metrics = MetricsRegistry()
+    return controller
+
+
+async def _chunks(*items, block: bool = False):
+    """按顺序输出分块，block=True 时随后一直阻塞（模拟上游卡住）"""
+    for item in items:
+        yield item
+    if block:
+        await asyncio.Event().wait()
+
+
+class TestDrainController:
+    """排空控制器测试"""
+
+    def test_enter_and_exit_track_in_flight(self, drain):
+        """测试进行中的流数量与指标"""
+        drain.enter()
+        drain.enter()
+        assert drain.in_flight == 2
+        assert drain.metrics.get_gauge("translation_streams_in_flight") == 2
+
+        drain.exit()
+        drain.exit()
+        assert drain.in_flight == 0
+        assert drain.metrics.get_gauge("translation_streams_in_flight") == 0
+
+    @pytest.mark.asyncio
+    async def test_guard_forwards_chunks(self, drain):
+        """测试正常运行时原样转发"""
+        chunks = [chunk async for chunk in drain.guard(_chunks("a", "b", "[DONE]"))]
+        assert chunks == ["a", "b", "[DONE]"]
+
+    @pytest.mark.asyncio
+    async def test_drain_when_idle_completes_immediately(self, drain):
+        """测试没有进行中的流时立即完成"""
+        aborted = await asyncio.wait_for(drain.drain(grace_seconds=5), timeout=1)
+        assert aborted == 0
+        assert drain.draining
+        assert drain.metrics.get_gauge("service_draining") == 1
+
+    @pytest.mark.asyncio
+    async def test_drain_is_idempotent(self, drain):
+        """测试重复调用返回同一个排空任务"""
+        assert drain.drain(grace_seconds=5) is drain.drain(grace_seconds=5)
+        await drain.drain(grace_seconds=5)
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_for_stream_to_finish(self, drain):
+        """测试宽限期内等待进行中的流自然结束"""
+        release = asyncio.Event()
+
+        async def upstream():
+            yield "a"
+            await release.wait()
+            yield "[DONE]"
+
+        async def consume():
+            drain.enter()
+            try:
+                return [chunk async for chunk in drain.guard(upstream())]
+            finally:
+                drain.exit()
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        task = drain.drain(grace_seconds=5)
+        await asyncio.sleep(0.01)
+        assert not task.done()
+
+        release.set()
+        assert await asyncio.wait_for(consumer, timeout=1) == ["a", "[DONE]"]
+        assert await asyncio.wait_for(task, timeout=1) == 0
+
+    @pytest.mark.asyncio
+    async def test_grace_timeout_ends_stream_with_error(self, drain):
+        """测试宽限期结束后阻塞的流以 [ERROR] 结束"""
+        async def consume():
+            drain.enter()
+            try:
+                return [chunk async for chunk in drain.guard(_chunks("a", block=True))]
+            finally:
+                drain.exit()
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        aborted = await asyncio.wait_for(drain.drain(grace_seconds=0.05), timeout=2)
+
+        assert aborted == 1
+        assert await consumer == ["a", DRAIN_ERROR_CHUNK]
+        assert drain.in_flight == 0
+        assert drain.metrics.get_counter("translation_streams_aborted_total") == 1
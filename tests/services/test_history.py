@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+翻译历史存储测试
+"""
+
+import pytest
+
+from src.models import TranslationDirection
+from src.services.history import HistoryStore
+
+P2D = TranslationDirection.PRODUCT_TO_DEV
+D2P = TranslationDirection.DEV_TO_PRODUCT
+
+
+@pytest.fixture
+def store(tmp_path):
+    """写入间隔为 0 的历史存储（测试结束时关闭）"""
+    history = HistoryStore(str(tmp_path / "history.sqlite3"), flush_interval=0)
+    yield history
+    history.close()
+
+
+def _fill(store, *entries):
+    """写入记录并等待后台线程完成"""
+    for content, direction, output in entries:
+        store.record(content, direction, output, duration_ms=1200.0, first_chunk_ms=300.0)
+    store.close()
+
+
+class TestHistoryStore:
+    """翻译历史存储测试"""
+
+    @pytest.mark.asyncio
+    async def test_full_text_search_matches_content_and_output(self, store):
+        """测试按原文或译文中的子串检索"""
+        _fill(
+            store,
+            ("我们需要一个智能推荐功能，提升用户停留时长", P2D, "## 技术实现建议\n协同过滤"),
+            ("我们优化了数据库查询，QPS提升了30%", D2P, "## 业务价值\n页面更快"),
+        )
+
+        by_content = await store.search("智能推荐")
+        by_output = await store.search("协同过滤")
+
+        assert [entry.content for entry in by_content] == ["我们需要一个智能推荐功能，提升用户停留时长"]
+        assert [entry.id for entry in by_output] == [by_content[0].id]
+        assert by_content[0].direction == P2D
+        assert by_content[0].duration_ms == 1200.0
+
+    @pytest.mark.asyncio
+    async def test_all_terms_required_and_direction_filter(self, store):
+        """测试多个关键词需同时匹配，可按方向过滤"""
+        _fill(
+            store,
+            ("我们需要一个智能推荐功能，提升用户停留时长", P2D, "推荐系统方案"),
+            ("推荐接口的响应时间从 800ms 降到 120ms", D2P, "推荐结果更快出现"),
+        )
+
+        assert len(await store.search("推荐 停留时长")) == 1
+        assert [entry.direction for entry in await store.search("推荐", direction=D2P)] == [D2P]
+
+    @pytest.mark.asyncio
+    async def test_short_terms_fall_back_to_like(self, store):
+        """测试少于 3 个字符的关键词按子串匹配"""
+        _fill(store, ("我们优化了数据库查询，QPS提升了30%", D2P, "页面更快"), ("需要支持 100% 的_覆盖", P2D, "x"))
+
+        assert len(await store.search("QPS")) == 1
+        assert len(await store.search("查询")) == 1
+        assert len(await store.search("_")) == 1
+        assert await store.search("不存在") == []
+
+    @pytest.mark.asyncio
+    async def test_same_content_keeps_latest_output(self, store):
+        """测试同一方向的相同原文只保留最新译文并累计次数"""
+        _fill(
+            store,
+            ("我们需要一个智能推荐功能，提升用户停留时长", P2D, "旧译文"),
+            ("我们需要一个智能推荐功能，提升用户停留时长", P2D, "新译文"),
+        )
+
+        [entry] = await store.search("智能推荐")
+        assert entry.output == "新译文"
+        assert entry.hits == 2
+        assert await store.search("旧译文") == []
+        assert (await store.get(entry.id)).output == "新译文"
+        assert await store.get(entry.id + 1) is None
+
+    @pytest.mark.asyncio
+    async def test_top_ranked_by_hits(self, store):
+        """测试按翻译次数列出最常用的历史"""
+        _fill(
+            store,
+            ("偶尔出现的输入", D2P, "译文"),
+            ("经常出现的输入", P2D, "译文"),
+            ("经常出现的输入", P2D, "译文"),
+        )
+
+        top = await store.top(limit=10)
+
+        assert [(entry.content, entry.hits) for entry in top] == [("经常出现的输入", 2), ("偶尔出现的输入", 1)]
@@ -3,10 +3,13 @@
 意图路由器单元测试
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 
 from src.services.intent_router import IntentRouter, IntentResult, get_intent_router
+from src.services.cache import MemoryCacheBackend, ResultCache
 from src.models import TranslationDirection
 
 
@@ -197,6 +200,268 @@ class TestIntentRouter:
             assert result.confidence == 1.0
 
 
+def _delta_chunk(text):
+    """构造流式文本分块"""
+    chunk = MagicMock()
+    chunk.choices = [MagicMock()]
+    chunk.choices[0].delta.content = text
+    chunk.usage = None
+    return chunk
+
+
+class _FakeStream:
+    """可记录读取进度与关闭状态的模拟流"""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.consumed = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        for piece in self.pieces:
+            self.consumed += 1
+            yield _delta_chunk(piece)
+
+    async def close(self):
+        self.closed = True
+
+
+JSON_PIECES = [
+    '{"direction": "dev_', 'to_product", ', '"confidence": 0.', '87', ',\n',
+    '"reasoning": "涉及', '数据库索引"}',
+]
+
+
+class TestStreamingIntentDetection:
+    """流式意图识别测试"""
+
+    @pytest.mark.asyncio
+    async def test_resolves_before_reasoning_arrives(self):
+        """测试方向与置信度确定后立即返回，reasoning 由后台任务补齐"""
+        router = IntentRouter(api_key="test-key")
+        stream = _FakeStream(JSON_PIECES)
+
+        with patch.object(router.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = stream
+
+            result, reasoning_task = await router.detect_intent_streaming("我们优化了数据库索引")
+
+            assert result.direction == TranslationDirection.DEV_TO_PRODUCT
+            assert result.confidence == 0.87
+            assert result.reasoning == ""
+            # 只读取到置信度之后的分隔符为止
+            assert stream.consumed == 5
+
+            assert await reasoning_task == "涉及数据库索引"
+            assert stream.closed
+            assert mock_create.call_args.kwargs["stream"] is True
+
+    @pytest.mark.asyncio
+    async def test_fast_mode_closes_stream(self):
+        """测试快速模式确定方向后关闭上游流"""
+        router = IntentRouter(api_key="test-key")
+        stream = _FakeStream(JSON_PIECES)
+
+        with patch.object(router.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = stream
+
+            result, reasoning_task = await router.detect_intent_streaming("我们优化了数据库索引", fast=True)
+
+            assert result.direction == TranslationDirection.DEV_TO_PRODUCT
+            assert reasoning_task is None
+            assert stream.closed
+            assert stream.consumed == 5
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_full_parse(self):
+        """测试无法提前确定时按完整文本解析"""
+        router = IntentRouter(api_key="test-key")
+        stream = _FakeStream(["```json\n", '{"direction": "dev_to_product", ', '"reasoning": "缺少置信度"}', "\n```"])
+
+        with patch.object(router.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = stream
+
+            result, reasoning_task = await router.detect_intent_streaming("测试内容")
+
+            assert reasoning_task is None
+            assert result.direction == TranslationDirection.DEV_TO_PRODUCT
+            assert result.confidence == 0.5
+            assert result.reasoning == "缺少置信度"
+
+    @pytest.mark.asyncio
+    async def test_api_error_returns_zero_confidence(self):
+        """测试 API 错误时返回零置信度"""
+        router = IntentRouter(api_key="test-key")
+
+        from openai import OpenAIError
+
+        with patch.object(router.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.side_effect = OpenAIError("API connection failed")
+
+            result, reasoning_task = await router.detect_intent_streaming("测试内容")
+
+            assert result.confidence == 0.0
+            assert reasoning_task is None
+
+
+class TestIntentCache:
+    """意图识别结果缓存测试"""
+
+    @pytest.mark.asyncio
+    async def test_detect_intent_served_from_cache(self):
+        """测试相同内容第二次识别直接返回缓存结果"""
+        router = IntentRouter(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = (
+            '{"direction": "dev_to_product", "confidence": 0.9, "reasoning": "技术方案"}'
+        )
+
+        with patch.object(router.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = mock_response
+            first = await router.detect_intent("我们优化了数据库索引")
+            second, reasoning_task = await router.detect_intent_streaming("我们优化了数据库索引")
+
+        assert mock_create.call_count == 1
+        assert second == first
+        assert reasoning_task is None
+
+    @pytest.mark.asyncio
+    async def test_streaming_result_cached_after_reasoning(self):
+        """测试流式识别在 reasoning 读取完成后写入完整结果"""
+        router = IntentRouter(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+
+        with patch.object(router.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = _FakeStream(JSON_PIECES)
+            _, reasoning_task = await router.detect_intent_streaming("我们优化了数据库索引")
+            await reasoning_task
+            cached = await router.detect_intent("我们优化了数据库索引")
+
+        assert mock_create.call_count == 1
+        assert cached.direction == TranslationDirection.DEV_TO_PRODUCT
+        assert cached.reasoning == "涉及数据库索引"
+
+    @pytest.mark.asyncio
+    async def test_api_error_not_cached(self):
+        """测试 API 错误降级结果不写入缓存"""
+        from openai import OpenAIError
+
+        router = IntentRouter(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+
+        with patch.object(router.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.side_effect = OpenAIError("API Error")
+            await router.detect_intent("测试内容")
+            await router.detect_intent("测试内容")
+
+        assert mock_create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_truncated_response_not_cached(self):
+        """测试被截断的响应返回默认结果但不写入缓存，下一次有效响应不受影响"""
+        router = IntentRouter(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+
+        with patch.object(router.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.side_effect = [
+                _completion('{"direction": "dev_to_product", "confidence": 0.9, "reasoning": "涉及数据'),
+                _completion('{"direction": "dev_to_product", "confidence": 0.9, "reasoning": "涉及数据库"}'),
+            ]
+            first = await router.detect_intent("我们优化了数据库索引")
+            second = await router.detect_intent("我们优化了数据库索引")
+
+        assert first.confidence == 0.3
+        assert second.confidence == 0.9
+        assert mock_create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_truncated_reasoning_keeps_early_result(self):
+        """测试流式识别的 reasoning 无法解析时沿用已确定的方向与置信度，reasoning 为空"""
+        router = IntentRouter(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+        pieces = ['{"direction": "dev_to_product", ', '"confidence": 0.87', ', "reasoning": "涉及数据']
+
+        with patch.object(router.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = _FakeStream(pieces)
+            _, reasoning_task = await router.detect_intent_streaming("我们优化了数据库索引")
+            assert await reasoning_task == ""
+            cached = await router.detect_intent("我们优化了数据库索引")
+
+        assert mock_create.call_count == 1
+        assert cached.confidence == 0.87
+        assert cached.reasoning == ""
+
+
+def _completion(text):
+    """构造非流式补全响应"""
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = text
+    response.usage = None
+    return response
+
+
+class TestIntentBatching:
+    """意图识别微批处理测试"""
+
+    @pytest.fixture
+    def batching(self, monkeypatch):
+        from src.config import get_settings
+
+        monkeypatch.setattr(get_settings(), "intent_batch_window_ms", 10)
+        monkeypatch.setattr(get_settings(), "intent_batch_max_size", 8)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_completion(self, batching):
+        """测试并发请求合并为一次补全，结果按序号分发"""
+        router = IntentRouter(api_key="test-key")
+        reply = (
+            '[{"index": 1, "direction": "dev_to_product", "confidence": 0.8, "reasoning": "技术"},'
+            ' {"index": 0, "direction": "product_to_dev", "confidence": 0.9, "reasoning": "需求"}]'
+        )
+
+        with patch.object(router.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = _completion(reply)
+            first, second = await asyncio.wait_for(asyncio.gather(
+                router.detect_intent("我们需要一个推荐功能"),
+                router.detect_intent("我们优化了数据库索引"),
+            ), timeout=1)
+
+        assert mock_create.call_count == 1
+        messages = mock_create.call_args.kwargs["messages"]
+        assert messages[0]["content"] == router.prompts.intent
+        assert '<item index="1">\n我们优化了数据库索引\n</item>' in messages[1]["content"]
+        assert (first.direction, first.confidence) == (TranslationDirection.PRODUCT_TO_DEV, 0.9)
+        assert (second.direction, second.confidence) == (TranslationDirection.DEV_TO_PRODUCT, 0.8)
+
+    @pytest.mark.asyncio
+    async def test_unparseable_batch_falls_back_to_single_calls(self, batching):
+        """测试批量响应无法解析时逐条识别"""
+        router = IntentRouter(api_key="test-key")
+        single = '{"direction": "dev_to_product", "confidence": 0.7, "reasoning": "技术"}'
+
+        with patch.object(router.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.side_effect = [_completion('[{"direction": "dev_to_product"}]'), _completion(single),
+                                       _completion(single)]
+            results = await asyncio.wait_for(asyncio.gather(
+                router.detect_intent("第一段技术内容"),
+                router.detect_intent("第二段技术内容"),
+            ), timeout=1)
+
+        assert mock_create.call_count == 3
+        assert [result.confidence for result in results] == [0.7, 0.7]
+
+    @pytest.mark.asyncio
+    async def test_single_request_uses_regular_prompt(self, batching):
+        """测试窗口内只有一个请求时按单条识别"""
+        router = IntentRouter(api_key="test-key")
+
+        with patch.object(router.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = _completion('{"direction": "product_to_dev", "confidence": 0.9}')
+            result = await asyncio.wait_for(router.detect_intent("我们需要一个推荐功能"), timeout=1)
+
+        assert mock_create.call_args.kwargs["messages"][1]["content"] == "我们需要一个推荐功能"
+        assert result.confidence == 0.9
+
+
 class TestGetIntentRouter:
     """get_intent_router 单例测试"""
 
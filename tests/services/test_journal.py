@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+请求日志单元测试
+"""
+
+import json
+
+import pytest
+
+from src.models import TranslateRequest, TranslationDirection
+from src.services.intent_router import IntentResult
+from src.services.journal import RequestJournal
+
+CONTENT = "我们需要一个智能推荐功能，提升用户停留时长"
+
+
+def _read(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+@pytest.fixture
+def request_body():
+    return TranslateRequest(content=CONTENT, direction=TranslationDirection.PRODUCT_TO_DEV)
+
+
+class TestRequestJournal:
+    """请求日志测试"""
+
+    def test_records_shape_and_timeline(self, tmp_path, request_body):
+        """测试记录请求形状与输出块时间线"""
+        journal = RequestJournal(str(tmp_path / "journal.jsonl"))
+        record = journal.record(request_body)
+        record.translation_started()
+        record.chunk("## 技术")
+        record.chunk("方案")
+        record.finish("ok")
+        journal.close()
+
+        [entry] = _read(tmp_path / "journal.jsonl")
+        assert entry["content_length"] == len(CONTENT)
+        assert entry["direction"] == "product_to_dev"
+        assert entry["auto_detect"] is False
+        assert entry["status"] == "ok"
+        assert entry["chunk_sizes"] == [5, 2]
+        assert len(entry["chunk_offsets_ms"]) == 2
+        assert entry["first_chunk_ms"] == entry["chunk_offsets_ms"][0]
+        assert CONTENT not in json.dumps(entry, ensure_ascii=False)
+
+    def test_hash_mode_identifies_repeated_content(self, tmp_path, request_body):
+        """测试 hash 模式下相同内容的哈希相同"""
+        journal = RequestJournal(str(tmp_path / "journal.jsonl"))
+        for _ in range(2):
+            journal.record(request_body).finish("ok")
+        journal.close()
+
+        first, second = _read(tmp_path / "journal.jsonl")
+        assert first["content_sha256"] == second["content_sha256"]
+
+    def test_redact_mode_omits_hash(self, tmp_path, request_body):
+        """测试 redact 模式只记录长度"""
+        journal = RequestJournal(str(tmp_path / "journal.jsonl"), content_mode="redact")
+        journal.record(request_body).finish("ok")
+        journal.close()
+
+        [entry] = _read(tmp_path / "journal.jsonl")
+        assert "content_sha256" not in entry
+        assert entry["content_length"] == len(CONTENT)
+
+    def test_records_intent(self, tmp_path):
+        """测试记录意图识别结果与耗时"""
+        journal = RequestJournal(str(tmp_path / "journal.jsonl"))
+        record = journal.record(TranslateRequest(content=CONTENT, auto_detect=True))
+        record.intent_detected(IntentResult(
+            direction=TranslationDirection.DEV_TO_PRODUCT, confidence=0.9, reasoning=""
+        ))
+        record.finish("ok")
+        journal.close()
+
+        [entry] = _read(tmp_path / "journal.jsonl")
+        assert entry["direction"] is None
+        assert entry["detected_direction"] == "dev_to_product"
+        assert entry["intent_ms"] >= 0
+
+    def test_rotates_by_size(self, tmp_path, request_body):
+        """测试超过大小后轮转"""
+        journal = RequestJournal(str(tmp_path / "journal.jsonl"), max_bytes=200, backup_count=2)
+        for _ in range(5):
+            journal.record(request_body).finish("ok")
+        journal.close()
+
+        assert (tmp_path / "journal.jsonl.1").exists()
+
+    def test_pid_placeholder(self, tmp_path):
+        """测试路径中的 {pid} 替换为进程号"""
+        import os
+
+        journal = RequestJournal(str(tmp_path / "requests-{pid}.jsonl"))
+        journal.close()
+        assert journal.path.name == f"requests-{os.getpid()}.jsonl"
+
+    def test_unknown_content_mode_raises(self, tmp_path):
+        """测试未知的内容记录方式"""
+        with pytest.raises(ValueError):
+            RequestJournal(str(tmp_path / "journal.jsonl"), content_mode="raw")
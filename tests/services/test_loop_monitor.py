@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+事件循环延迟监控测试
+"""
+
+import time
+import asyncio
+import logging
+
+import pytest
+
+from src.services.loop_monitor import LoopMonitor
+from src.services.metrics import MetricsRegistry
+
+
+def _block_loop(seconds):
+    """同步阻塞事件循环线程"""
+    time.sleep(seconds)
+
+
+class TestLoopMonitor:
+    """事件循环延迟监控测试"""
+
+    @pytest.mark.asyncio
+    async def test_lag_sampled_into_histogram(self):
+        """测试空闲时持续采样调度延迟"""
+        metrics = MetricsRegistry()
+        monitor = LoopMonitor(interval=0.01, slow_threshold=0, metrics=metrics)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await asyncio.wait_for(monitor.stop(), timeout=1)
+
+        histogram = metrics.get_histogram("event_loop_lag_seconds")
+        assert histogram["count"] >= 3
+        assert metrics.get_counter("event_loop_slow_callbacks_total") == 0
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_reported_with_stack(self, caplog):
+        """测试阻塞事件循环时记录阻塞位置的调用栈与慢回调计数"""
+        metrics = MetricsRegistry()
+        monitor = LoopMonitor(interval=0.01, slow_threshold=0.05, metrics=metrics)
+        monitor.start()
+        await asyncio.sleep(0.03)
+
+        with caplog.at_level(logging.WARNING, logger="src.services.loop_monitor"):
+            _block_loop(0.3)
+            await asyncio.sleep(0.05)
+            await asyncio.wait_for(monitor.stop(), timeout=1)
+
+        stacks = [record.getMessage() for record in caplog.records if "loop thread stack" in record.getMessage()]
+        assert len(stacks) == 1
+        assert "_block_loop" in stacks[0]
+        assert metrics.get_counter("event_loop_slow_callbacks_total") == 1
+        assert metrics.get_histogram("event_loop_lag_seconds")["max"] >= 0.25
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+指标注册表单元测试
+"""
+
+from src.models import TokenUsage
+from src.services.metrics import MetricsRegistry, get_metrics, record_prompt_cache_usage
+
+
+class TestMetricsRegistry:
+    """MetricsRegistry 测试"""
+
+    def test_counter_accumulates_per_label_set(self):
+        """测试计数器按标签分别累加"""
+        metrics = MetricsRegistry()
+        metrics.inc("requests", route="short")
+        metrics.inc("requests", 2, route="short")
+        metrics.inc("requests", route="long")
+
+        assert metrics.get_counter("requests", route="short") == 3
+        assert metrics.get_counter("requests", route="long") == 1
+        assert metrics.get_counter("requests", route="missing") == 0
+
+    def test_histogram_summary(self):
+        """测试直方图摘要统计"""
+        metrics = MetricsRegistry()
+        for value in [0.1, 0.2, 0.3, 0.4]:
+            metrics.observe("latency", value, route="short")
+
+        summary = metrics.get_histogram("latency", route="short")
+        assert summary["count"] == 4
+        assert summary["min"] == 0.1
+        assert summary["max"] == 0.4
+        assert abs(summary["avg"] - 0.25) < 1e-9
+
+    def test_gauge_set_and_add(self):
+        """测试仪表设置与增减"""
+        metrics = MetricsRegistry()
+        metrics.set_gauge("inflight", 3)
+        metrics.add_gauge("inflight", -1)
+        assert metrics.get_gauge("inflight") == 2
+
+    def test_snapshot_structure(self):
+        """测试快照包含全部指标类型"""
+        metrics = MetricsRegistry()
+        metrics.inc("requests", route="short")
+        metrics.observe("latency", 0.5, route="short")
+
+        snapshot = metrics.snapshot()
+        assert snapshot["counters"]["requests"] == [{"labels": {"route": "short"}, "value": 1}]
+        assert snapshot["histograms"]["latency"][0]["labels"] == {"route": "short"}
+        assert snapshot["gauges"] == {}
+
+    def test_singleton_pattern(self):
+        """测试单例模式"""
+        assert get_metrics() is get_metrics()
+
+
+class TestPromptCacheMetrics:
+    """前缀缓存命中指标测试"""
+
+    def test_record_prompt_cache_usage_per_direction(self):
+        """测试按方向累计命中/未命中 Token 并计算命中率"""
+        metrics = get_metrics()
+        metrics.reset()
+        usage = TokenUsage(
+            prompt_tokens=100,
+            completion_tokens=10,
+            total_tokens=110,
+            prompt_cache_hit_tokens=75,
+            prompt_cache_miss_tokens=25,
+        )
+
+        record_prompt_cache_usage(usage, "product_to_dev", "v1-test")
+
+        labels = {"direction": "product_to_dev", "prompt_version": "v1-test"}
+        assert metrics.get_counter("prompt_cache_hit_tokens_total", **labels) == 75
+        assert metrics.get_counter("prompt_cache_miss_tokens_total", **labels) == 25
+        assert metrics.get_gauge("prompt_cache_hit_ratio", **labels) == 0.75
+
+    def test_usage_without_cache_fields_is_ignored(self):
+        """测试缺少缓存字段时不记录"""
+        metrics = get_metrics()
+        metrics.reset()
+        record_prompt_cache_usage(TokenUsage(prompt_tokens=10), "intent", "v1-test")
+        assert metrics.snapshot()["counters"] == {}
+
+    def test_token_usage_reads_deepseek_cache_fields(self):
+        """测试从 DeepSeek usage 读取缓存命中字段"""
+
+        class Usage:
+            prompt_tokens = 64
+            completion_tokens = 8
+            total_tokens = 72
+            prompt_cache_hit_tokens = 60
+            prompt_cache_miss_tokens = 4
+
+        usage = TokenUsage.from_api(Usage())
+        assert usage.prompt_cache_hit_tokens == 60
+        assert usage.prompt_cache_miss_tokens == 4
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+模型路由器单元测试
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.models import TranslationDirection
+from src.services.model_router import ModelRoute, ModelRouter, DEFAULT_ROUTE_NAME
+from src.services.translator import Translator
+
+
+class TestModelRoute:
+    """ModelRoute 匹配规则测试"""
+
+    def test_route_without_conditions_matches_everything(self):
+        """测试无条件路由匹配任意请求"""
+        route = ModelRoute(name="any")
+        assert route.matches(5000, TranslationDirection.DEV_TO_PRODUCT, None)
+
+    def test_route_length_bounds(self):
+        """测试长度边界（含边界值）"""
+        route = ModelRoute(name="short", min_length=10, max_length=200)
+        assert route.matches(10, TranslationDirection.PRODUCT_TO_DEV)
+        assert route.matches(200, TranslationDirection.PRODUCT_TO_DEV)
+        assert not route.matches(201, TranslationDirection.PRODUCT_TO_DEV)
+        assert not route.matches(9, TranslationDirection.PRODUCT_TO_DEV)
+
+    def test_route_direction_filter(self):
+        """测试方向过滤"""
+        route = ModelRoute(name="p2d", directions=["product_to_dev"])
+        assert route.matches(100, TranslationDirection.PRODUCT_TO_DEV)
+        assert not route.matches(100, TranslationDirection.DEV_TO_PRODUCT)
+
+    def test_route_rejects_request_only_direction(self):
+        """测试路由规则不接受 both（两个方向分别按各自的方向路由）"""
+        with pytest.raises(ValueError):
+            ModelRoute(name="both", directions=["both"])
+
+    def test_route_min_confidence_only_applies_when_known(self):
+        """测试置信度条件仅在智能模式下生效"""
+        route = ModelRoute(name="confident", min_confidence=0.8)
+        assert not route.matches(100, TranslationDirection.PRODUCT_TO_DEV, 0.6)
+        assert route.matches(100, TranslationDirection.PRODUCT_TO_DEV, 0.9)
+        assert route.matches(100, TranslationDirection.PRODUCT_TO_DEV, None)
+
+
+class TestModelRouter:
+    """ModelRouter 选择逻辑测试"""
+
+    def test_first_matching_route_wins(self):
+        """测试按顺序命中第一个路由"""
+        router = ModelRouter(
+            routes=[
+                ModelRoute(name="short", max_length=20, model="fast-model", max_tokens=512),
+                ModelRoute(name="catch_all", model="big-model"),
+            ],
+            default_model="deepseek-chat",
+        )
+        assert router.select("短文本", TranslationDirection.PRODUCT_TO_DEV).name == "short"
+        assert router.select("长" * 100, TranslationDirection.PRODUCT_TO_DEV).name == "catch_all"
+
+    def test_falls_back_to_default_route(self):
+        """测试未命中时使用默认路由"""
+        router = ModelRouter(
+            routes=[ModelRoute(name="short", max_length=5)],
+            default_model="deepseek-chat",
+        )
+        route = router.select("这是一段较长的输入内容", TranslationDirection.DEV_TO_PRODUCT)
+        assert route.name == DEFAULT_ROUTE_NAME
+        assert route.model == "deepseek-chat"
+
+    def test_route_without_model_uses_default_model(self):
+        """测试路由未指定模型时补全为默认模型"""
+        router = ModelRouter(
+            routes=[ModelRoute(name="tuned", temperature=0.3)],
+            default_model="deepseek-chat",
+        )
+        route = router.select("任意内容", TranslationDirection.PRODUCT_TO_DEV)
+        assert route.name == "tuned"
+        assert route.model == "deepseek-chat"
+        assert route.temperature == 0.3
+
+
+class TestTranslatorRouting:
+    """Translator 使用路由参数调用 API 的测试"""
+
+    @pytest.mark.asyncio
+    async def test_translate_stream_uses_route_parameters(self):
+        """测试翻译请求携带路由选择的模型、max_tokens 与 temperature"""
+        router = ModelRouter(
+            routes=[ModelRoute(name="short", max_length=50, model="fast-model", max_tokens=256, temperature=0.2)],
+            default_model="deepseek-chat",
+        )
+        translator = Translator(api_key="test-key", model_router=router)
+
+        mock_chunk = MagicMock()
+        mock_chunk.choices = [MagicMock()]
+        mock_chunk.choices[0].delta.content = "结果"
+
+        async def mock_stream():
+            yield mock_chunk
+
+        with patch.object(translator.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = mock_stream()
+
+            chunks = [
+                chunk async for chunk in translator.translate_stream(
+                    "我们需要一个智能推荐功能", TranslationDirection.PRODUCT_TO_DEV, 0.9
+                )
+            ]
+
+            assert chunks[-1] == "[DONE]"
+            kwargs = mock_create.call_args.kwargs
+            assert kwargs["model"] == "fast-model"
+            assert kwargs["max_tokens"] == 256
+            assert kwargs["temperature"] == 0.2
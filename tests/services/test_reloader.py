@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+配置热加载单元测试
+"""
+
+import asyncio
+
+import pytest
+
+from src.config import get_settings, set_settings
+from src.clients import get_deepseek_client
+from src.models import TranslationDirection
+from src.prompts import BUILTIN_PROMPTS, get_prompts, get_prompt_version, load_prompts, set_prompts
+from src.services.reloader import ConfigReloader, restart_required
+from src.services.translator import get_translator
+from src.services.intent_router import get_intent_router
+from src.services.model_router import get_model_router
+
+
+@pytest.fixture
+def restore_config():
+    """测试结束后恢复原配置、提示词与服务单例"""
+    settings, prompts = get_settings(), get_prompts()
+    yield
+    set_settings(settings)
+    set_prompts(prompts)
+    for factory in (get_deepseek_client, get_model_router, get_translator, get_intent_router):
+        factory.cache_clear()
+
+
+@pytest.fixture
+def prompts_dir(tmp_path):
+    """只覆盖产品→开发模板的外部提示词目录"""
+    (tmp_path / "product_to_dev.md").write_text("你是一位架构师。\n\n## 技术方案\n\n## 风险\n", encoding="utf-8")
+    return tmp_path
+
+
+class TestLoadPrompts:
+    """外部提示词加载测试"""
+
+    def test_without_directory_returns_builtin(self):
+        """测试未配置目录时使用内置模板"""
+        assert load_prompts(None) is BUILTIN_PROMPTS
+
+    def test_missing_files_fall_back_to_builtin(self, prompts_dir):
+        """测试目录中缺失的模板使用内置模板"""
+        prompts = load_prompts(str(prompts_dir))
+        assert prompts.product_to_dev.startswith("你是一位架构师")
+        assert prompts.dev_to_product == BUILTIN_PROMPTS.dev_to_product
+        assert prompts.intent == BUILTIN_PROMPTS.intent
+        assert prompts.source == str(prompts_dir)
+
+    def test_version_changes_with_content(self, prompts_dir):
+        """测试模板内容变化时版本标识随之变化"""
+        assert load_prompts(str(prompts_dir)).version != BUILTIN_PROMPTS.version
+
+    def test_missing_directory_raises(self, tmp_path):
+        """测试目录不存在时报错"""
+        with pytest.raises(FileNotFoundError):
+            load_prompts(str(tmp_path / "missing"))
+
+
+class TestConfigReloader:
+    """热加载测试"""
+
+    @pytest.mark.asyncio
+    async def test_reload_swaps_prompts_and_services(self, monkeypatch, prompts_dir, restore_config):
+        """测试热加载替换提示词与服务单例，进行中的请求保留旧实例"""
+        old_translator = get_translator()
+        old_version = get_prompt_version()
+
+        monkeypatch.setenv("PROMPTS_DIR", str(prompts_dir))
+        result = await ConfigReloader().reload()
+
+        new_translator = get_translator()
+        assert new_translator is not old_translator
+        assert result["previous_prompt_version"] == old_version
+        assert result["prompt_version"] == get_prompt_version() != old_version
+        assert get_settings().prompts_dir == str(prompts_dir)
+
+        # 旧实例继续使用旧模板，新实例使用新模板，缓存键随之不同
+        route = old_translator.model_router.select("内容", TranslationDirection.PRODUCT_TO_DEV)
+        assert old_translator.prompts.version == old_version
+        assert new_translator.prompts.product_to_dev.startswith("你是一位架构师")
+        assert old_translator.cache_key("内容", TranslationDirection.PRODUCT_TO_DEV, route) != \
+            new_translator.cache_key("内容", TranslationDirection.PRODUCT_TO_DEV, route)
+
+    @pytest.mark.asyncio
+    async def test_previous_client_closed_after_in_flight_requests(self, restore_config):
+        """测试旧客户端在进行中的请求结束后才关闭"""
+        old_client = get_deepseek_client()
+        old_client.acquire()
+
+        result = await ConfigReloader().reload()
+
+        assert result["in_flight_on_previous_client"] == 1
+        assert get_deepseek_client() is not old_client
+        assert not old_client.client.is_closed()
+
+        old_client.release()
+        await old_client._close_task
+        assert old_client.client.is_closed()
+
+    @pytest.mark.asyncio
+    async def test_invalid_config_keeps_current(self, monkeypatch, restore_config):
+        """测试配置无效时保留原配置与服务实例"""
+        settings, translator = get_settings(), get_translator()
+        monkeypatch.setenv("MODEL_ROUTES", '[{"max_tokens": "many"}]')
+
+        with pytest.raises(Exception):
+            await ConfigReloader().reload()
+
+        assert get_settings() is settings
+        assert get_translator() is translator
+
+    @pytest.mark.asyncio
+    async def test_restart_required_settings_reported(self, monkeypatch, restore_config, caplog):
+        """测试启动时创建的组件的配置变化时记录警告并在结果中列出"""
+        monkeypatch.setenv("HISTORY_MAX_ENTRIES", str(get_settings().history_max_entries + 1))
+        monkeypatch.setenv("DEEPSEEK_MODEL", "deepseek-reasoner")
+
+        with caplog.at_level("WARNING", logger="src.services.reloader"):
+            result = await ConfigReloader().reload()
+
+        assert result["restart_required"] == ["history_max_entries"]
+        assert "history_max_entries" in caplog.text
+
+    def test_restart_required_ignores_reloadable_settings(self):
+        """测试可热加载的配置变化不要求重启"""
+        settings = get_settings()
+        changed = settings.model_copy(update={
+            "deepseek_model": "other",
+            "cache_stale_ttl_seconds": settings.cache_stale_ttl_seconds + 1,
+            "tracing_enabled": not settings.tracing_enabled,
+        })
+        assert restart_required(settings, changed) == ["tracing_enabled"]
+
+    def test_detects_prompt_file_changes(self, monkeypatch, prompts_dir, restore_config):
+        """测试监视提示词目录中的文件变化"""
+        settings = get_settings().model_copy(update={"prompts_dir": str(prompts_dir)})
+        set_settings(settings)
+        reloader = ConfigReloader()
+        assert not reloader.changed()
+
+        (prompts_dir / "intent.md").write_text("新的意图识别模板", encoding="utf-8")
+        assert reloader.changed()
+
+    @pytest.mark.asyncio
+    async def test_watch_records_unchanged_polls(self, restore_config):
+        """测试文件未变化的轮询以 result=unchanged 计入指标，且不触发重新加载"""
+        reloader = ConfigReloader()
+        translator = get_translator()
+        before = reloader.metrics.get_counter("config_reloads_total", reason="file_change", result="unchanged")
+
+        task = asyncio.create_task(reloader.watch(0.01))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert reloader.metrics.get_counter("config_reloads_total", reason="file_change", result="unchanged") > before
+        assert reloader.metrics.get_counter("config_reloads_total", reason="file_change", result="ok") == 0
+        assert get_translator() is translator
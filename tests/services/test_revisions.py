@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+修订翻译辅助函数测试
+"""
+
+from src.services.revisions import (
+    changed_ratio,
+    describe_changes,
+    diff_paragraphs,
+    split_paragraphs,
+    split_sections,
+)
+
+
+class TestParagraphDiff:
+    """段落比较测试"""
+
+    def test_split_ignores_blank_lines_and_whitespace(self):
+        """测试切分段落时忽略空行与首尾空白"""
+        assert split_paragraphs("第一段\n\n  第二段  \n") == ["第一段", "第二段"]
+
+    def test_unchanged_content_has_no_changes(self):
+        """测试只调整空行时没有变更"""
+        assert diff_paragraphs("第一段\n第二段", "第一段\n\n第二段\n") == []
+
+    def test_replace_insert_and_delete(self):
+        """测试修改、新增与删除段落"""
+        changes = diff_paragraphs("甲\n乙\n丙\n丁", "甲\n乙二\n丙\n丁\n戊")
+        assert [(c.op, c.old, c.new) for c in changes] == [
+            ("replace", ("乙",), ("乙二",)),
+            ("insert", (), ("戊",)),
+        ]
+        assert describe_changes(changes) == "- 修改：「乙」→「乙二」\n- 新增：「戊」"
+        [deleted] = diff_paragraphs("甲\n乙", "甲")
+        assert deleted.describe() == "- 删除：「乙」"
+
+
+    def test_changed_ratio(self):
+        """测试变更比例按字符数计算，新旧两侧取较大者"""
+        old, new = "甲甲甲\n乙", "甲甲甲\n丙丙丙"
+        assert changed_ratio(diff_paragraphs(old, new), old, new) == 0.5
+        assert changed_ratio(diff_paragraphs(old, old), old, old) == 0.0
+
+
+class TestSplitSections:
+    """翻译结果分节切分测试"""
+
+    def test_split_by_titles(self):
+        """测试按标题切分，未定义的二级标题归入当前分节"""
+        output = "## 甲\n正文一\n\n## 其他\n补充\n\n## 乙\n正文二\n\n"
+        assert split_sections(output, ["甲", "乙"]) == {"甲": "正文一\n\n## 其他\n补充", "乙": "正文二"}
+
+    def test_missing_title_returns_none(self):
+        """测试缺少分节时返回 None"""
+        assert split_sections("## 甲\n正文", ["甲", "乙"]) is None
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown 分节解析器单元测试
+"""
+
+from src.services.sections import SectionParser, SECTION_START, SECTION_DELTA, SECTION_END
+
+DOCUMENT = (
+    "## 技术实现建议\n- 推荐方案\n### 细节\n\n"
+    "## 数据需求分析\n内容中的 ## 不是标题\n##也不是\n"
+    "## 性能考量\n最后一行"
+)
+
+
+def _parse(chunks):
+    """按给定分块依次解析，返回全部事件"""
+    parser = SectionParser()
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    events.extend(parser.close())
+    return events
+
+
+def _rebuild(events):
+    """由事件重建原始文本"""
+    parts = []
+    for event in events:
+        if event.type == SECTION_START and event.title:
+            parts.append(f"## {event.title}\n")
+        elif event.type == SECTION_DELTA:
+            parts.append(event.text)
+    return "".join(parts)
+
+
+class TestSectionParser:
+    """SectionParser 测试"""
+
+    def test_emits_sections_in_order(self):
+        """测试按二级标题切分分节"""
+        events = _parse([DOCUMENT])
+        starts = [(e.index, e.title) for e in events if e.type == SECTION_START]
+        ends = [e.index for e in events if e.type == SECTION_END]
+
+        assert starts == [(0, "技术实现建议"), (1, "数据需求分析"), (2, "性能考量")]
+        assert ends == [0, 1, 2]
+
+    def test_result_independent_of_chunk_boundaries(self):
+        """测试任意切分方式（含逐字符）结果一致"""
+        whole = _parse([DOCUMENT])
+        per_char = _parse(list(DOCUMENT))
+        assert _rebuild(per_char) == DOCUMENT
+        assert [(e.type, e.index, e.title) for e in per_char if e.type != SECTION_DELTA] == [
+            (e.type, e.index, e.title) for e in whole if e.type != SECTION_DELTA
+        ]
+
+    def test_heading_marker_split_across_chunks(self):
+        """测试标题标记被拆分到多个分块"""
+        events = _parse(["正文\n#", "#", " 业务", "价值\n内容"])
+        titles = [e.title for e in events if e.type == SECTION_START]
+        assert titles == ["", "业务价值"]
+
+    def test_deltas_carry_current_section_index(self):
+        """测试正文事件携带当前分节序号"""
+        events = _parse(["## 一\n甲", "乙\n## 二\n丙"])
+        deltas = [(e.index, e.text) for e in events if e.type == SECTION_DELTA]
+        assert deltas == [(0, "甲"), (0, "乙\n"), (1, "丙")]
+
+    def test_leading_whitespace_is_dropped(self):
+        """测试首个标题前的空白不产生导语分节"""
+        events = _parse(["\n\n## 标题\n内容"])
+        assert events[0].type == SECTION_START
+        assert events[0].title == "标题"
+
+    def test_lead_in_whitespace_independent_of_chunk_boundaries(self):
+        """测试导语的前导空白无论是否单独成块都被丢弃"""
+        text = "\n \n导语\n## 标题\n内容"
+        expected = _parse([text])
+        assert [e.text for e in expected if e.type == SECTION_DELTA][0] == "导语\n"
+        for split in range(1, len(text)):
+            events = _parse([text[:split], text[split:]])
+            assert _rebuild(events) == _rebuild(expected), split
+            assert [(e.type, e.index, e.title) for e in events if e.type != SECTION_DELTA] == [
+                (e.type, e.index, e.title) for e in expected if e.type != SECTION_DELTA
+            ]
+
+    def test_feed_processes_only_new_chunk(self):
+        """测试每次 feed 只输出本分块对应的增量"""
+        parser = SectionParser()
+        parser.feed("## 标题\n" + "旧内容" * 100)
+        events = parser.feed("新")
+        assert [(e.type, e.text) for e in events] == [(SECTION_DELTA, "新")]
+
+    def test_event_payload_excludes_type_and_empty_fields(self):
+        """测试事件负载只包含有效字段"""
+        events = _parse(["## 标题\n内容"])
+        assert events[0].payload() == {"index": 0, "title": "标题"}
+        assert events[-1].payload() == {"index": 0}
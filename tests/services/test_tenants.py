@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+租户用量账本测试
+"""
+
+import pytest
+
+from src.models import TokenUsage
+from src.services.tenants import ANONYMOUS_TENANT, TenantConfig, UsageLedger
+
+TEAM_A = TenantConfig(name="team-a", api_key="key-a", daily_request_quota=2, monthly_token_quota=1000)
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    """单租户账本（测试结束时关闭）"""
+    usage = UsageLedger([TEAM_A], str(tmp_path / "usage.sqlite3"), prompt_price=1.0, completion_price=2.0)
+    yield usage
+    usage.close()
+
+
+class TestUsageLedger:
+    """租户用量账本测试"""
+
+    def test_resolve_tenant_by_api_key(self, tmp_path):
+        """测试按 API Key 识别租户，未携带时按配置归入匿名租户或拒绝"""
+        ledger = UsageLedger([TEAM_A], str(tmp_path / "a.sqlite3"))
+        strict = UsageLedger([TEAM_A], str(tmp_path / "b.sqlite3"), require_api_key=True)
+
+        assert ledger.resolve("key-a") is TEAM_A
+        assert ledger.resolve(None).name == ANONYMOUS_TENANT
+        assert ledger.resolve("unknown") is None
+        assert strict.resolve(None) is None
+
+    def test_request_quota_exceeded(self, ledger):
+        """测试请求数达到日配额后拒绝"""
+        ledger.record_request(TEAM_A)
+        assert ledger.exceeded_quota(TEAM_A) is None
+
+        ledger.record_request(TEAM_A)
+        assert "每日请求数配额" in ledger.exceeded_quota(TEAM_A)
+
+    def test_token_quota_exceeded(self, ledger):
+        """测试 Token 达到月配额后拒绝"""
+        ledger.record_usage(TEAM_A, TokenUsage(prompt_tokens=600, completion_tokens=400, total_tokens=1000))
+
+        assert "每月 Token 配额" in ledger.exceeded_quota(TEAM_A)
+
+    def test_report_includes_cost_and_quota(self, ledger):
+        """测试报告按单价折算费用并带配额"""
+        ledger.record_request(TEAM_A)
+        ledger.record_usage(TEAM_A, TokenUsage(prompt_tokens=500_000, completion_tokens=250_000, total_tokens=750_000))
+
+        [report] = ledger.report()
+
+        assert report["tenant"] == "team-a"
+        assert report["day"]["requests"] == 1
+        assert report["day"]["total_tokens"] == 750_000
+        assert report["day"]["cost"] == 1.0
+        assert report["day"]["request_quota"] == 2
+        assert report["month"]["token_quota"] == 1000
+
+    @pytest.mark.asyncio
+    async def test_flush_shares_usage_across_workers(self, tmp_path):
+        """测试写入后其他 worker 的账本读到合计用量"""
+        path = str(tmp_path / "usage.sqlite3")
+        first = UsageLedger([TEAM_A], path)
+        second = UsageLedger([TEAM_A], path)
+
+        first.record_request(TEAM_A)
+        await first.flush()
+        second.record_request(TEAM_A)
+        await second.flush()
+
+        assert second.report()[0]["day"]["requests"] == 2
+        assert "每日请求数配额" in second.exceeded_quota(TEAM_A)
+        first.close()
+        second.close()
+
+    def test_close_persists_pending_usage(self, tmp_path):
+        """测试关闭时写入尚未写入的增量"""
+        path = str(tmp_path / "usage.sqlite3")
+        ledger = UsageLedger([TEAM_A], path)
+        ledger.record_request(TEAM_A)
+        ledger.close()
+
+        reopened = UsageLedger([TEAM_A], path)
+        assert reopened.report()[0]["day"]["requests"] == 1
+        reopened.close()
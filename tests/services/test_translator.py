@@ -9,7 +9,16 @@ import asyncio
 
 from src.models import TranslationDirection
 from src.services.translator import Translator, get_translator
-from src.prompts import get_system_prompt
+from src.services.cache import MemoryCacheBackend, ResultCache, create_cache_backend
+from src.prompts import (
+    PromptSet,
+    get_system_prompt,
+    build_messages,
+    build_intent_messages,
+    build_section_messages,
+    get_prompt_sections,
+    get_prompt_version,
+)
 
 
 class TestTranslatorModule:
@@ -114,6 +123,518 @@ class TestProductToDevTranslation:
             assert any("超时" in chunk or "[ERROR]" in chunk for chunk in chunks)
 
 
+class TestTranslatorUsage:
+    """Token 用量与生成上限测试"""
+
+    @pytest.mark.asyncio
+    async def test_translate_stream_reports_usage_from_final_chunk(self):
+        """测试从最后一个分块读取用量并回调"""
+        translator = Translator(api_key="test-key")
+
+        text_chunk = MagicMock()
+        text_chunk.choices = [MagicMock()]
+        text_chunk.choices[0].delta.content = "翻译结果"
+        text_chunk.usage = None
+
+        usage_chunk = MagicMock()
+        usage_chunk.choices = []
+        usage_chunk.usage = MagicMock(prompt_tokens=100, completion_tokens=20, total_tokens=120)
+
+        async def mock_stream():
+            yield text_chunk
+            yield usage_chunk
+
+        reported = []
+        with patch.object(translator.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = mock_stream()
+
+            chunks = [
+                chunk async for chunk in translator.translate_stream(
+                    "我们需要一个智能推荐功能",
+                    TranslationDirection.PRODUCT_TO_DEV,
+                    on_usage=reported.append,
+                )
+            ]
+
+            assert chunks == ["翻译结果", "[DONE]"]
+            assert len(reported) == 1
+            assert reported[0].prompt_tokens == 100
+            assert reported[0].completion_tokens == 20
+
+            kwargs = mock_create.call_args.kwargs
+            assert kwargs["stream_options"] == {"include_usage": True}
+            assert kwargs["max_tokens"] == translator.completion_max_tokens
+
+
+class TestTranslatorTracing:
+    """翻译阶段 span 测试"""
+
+    @pytest.mark.asyncio
+    async def test_stages_recorded_as_spans(self):
+        """测试建立上游流、生成与整体翻译各记录一个 span"""
+        from src.utils.tracing import Tracer
+
+        spans = []
+        translator = Translator(api_key="test-key")
+        translator.tracer = Tracer(MagicMock(export=spans.append))
+
+        async def mock_stream():
+            yield _text_chunk("翻译结果")
+
+        with patch.object(translator.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = mock_stream()
+            with translator.tracer.start_as_current_span("request") as request_span:
+                chunks = [
+                    chunk async for chunk in translator.translate_stream(
+                        "我们需要一个智能推荐功能", TranslationDirection.PRODUCT_TO_DEV
+                    )
+                ]
+
+        assert chunks == ["翻译结果", "[DONE]"]
+        by_name = {span.name: span for span in spans}
+        assert set(by_name) == {"llm.open_stream", "translation.generate", "translation", "request"}
+        assert by_name["translation.generate"].status == "ok"
+        assert by_name["translation.generate"].attributes["chunks"] == 1
+        assert [event["name"] for event in by_name["translation.generate"].events] == ["first_token"]
+        assert all(span.context.trace_id == request_span.context.trace_id for span in spans)
+
+
+def _text_chunk(text):
+    """构造只包含文本的流式分块"""
+    chunk = MagicMock()
+    chunk.choices = [MagicMock()]
+    chunk.choices[0].delta.content = text
+    chunk.choices[0].finish_reason = None
+    chunk.usage = None
+    return chunk
+
+
+def _stop_chunk(finish_reason="stop"):
+    """构造补全结束的流式分块"""
+    chunk = MagicMock()
+    chunk.choices = [MagicMock()]
+    chunk.choices[0].delta.content = None
+    chunk.choices[0].finish_reason = finish_reason
+    chunk.usage = None
+    return chunk
+
+
+class TestParallelSectionTranslation:
+    """并行分节生成测试"""
+
+    @pytest.mark.asyncio
+    async def test_sections_emitted_in_prompt_order(self):
+        """测试各分节并发生成但按提示词顺序输出"""
+        translator = Translator(api_key="test-key")
+        titles = get_prompt_sections("product_to_dev")
+
+        async def fake_create(*, messages, **kwargs):
+            title = next(t for t in titles if f"「{t}」" in messages[-1]["content"])
+            delay = 0.02 if title == titles[0] else 0.0  # 第一节最慢，其余分节先完成并被缓冲
+
+            async def stream():
+                await asyncio.sleep(delay)
+                yield _text_chunk(f"{title}-正文")
+
+            return stream()
+
+        with patch.object(translator.client.chat.completions, 'create', side_effect=fake_create) as mock_create:
+            chunks = [
+                chunk async for chunk in translator.translate_stream_parallel(
+                    "我们需要一个智能推荐功能", TranslationDirection.PRODUCT_TO_DEV
+                )
+            ]
+
+        assert mock_create.call_count == len(titles)
+        assert chunks[-1] == "[DONE]"
+        expected = "".join(f"## {title}\n{title}-正文\n\n" for title in titles)
+        assert "".join(chunks[:-1]) == expected
+
+    @pytest.mark.asyncio
+    async def test_section_failure_yields_error(self):
+        """测试任一分节失败时输出错误标记"""
+        translator = Translator(api_key="test-key")
+
+        async def fake_create(*, messages, **kwargs):
+            raise asyncio.TimeoutError()
+
+        with patch.object(translator.client.chat.completions, 'create', side_effect=fake_create):
+            chunks = [
+                chunk async for chunk in translator.translate_stream_parallel(
+                    "我们优化了数据库查询", TranslationDirection.DEV_TO_PRODUCT
+                )
+            ]
+
+        assert chunks[-1].startswith("[ERROR]")
+        assert "超时" in chunks[-1]
+
+    def test_section_messages_share_prefix(self):
+        """测试分节请求与整篇请求共享系统提示词与用户输入前缀"""
+        full = build_messages("product_to_dev", "用户输入")
+        section = build_section_messages("product_to_dev", "用户输入", "性能考量")
+        assert section[0] == full[0]
+        assert section[1]["content"].startswith(full[1]["content"])
+        assert "性能考量" in section[1]["content"]
+
+    def test_prompt_sections(self):
+        """测试从提示词中解析分节标题"""
+        assert get_prompt_sections("product_to_dev")[0] == "技术实现建议"
+        assert len(get_prompt_sections("dev_to_product")) == 5
+
+
+class TestBothDirectionTranslation:
+    """双向并发翻译测试"""
+
+    @pytest.mark.asyncio
+    async def test_both_directions_run_concurrently(self):
+        """测试两个方向并发生成，整体耗时约为较慢一路"""
+        translator = Translator(api_key="test-key")
+        product_prompt = get_system_prompt("product_to_dev")
+
+        async def fake_create(*, messages, **kwargs):
+            label = "dev" if messages[0]["content"] == product_prompt else "product"
+
+            async def stream():
+                for index in range(3):
+                    await asyncio.sleep(0.05)
+                    yield _text_chunk(f"{label}{index}")
+
+            return stream()
+
+        with patch.object(translator.client.chat.completions, 'create', side_effect=fake_create):
+            started_at = asyncio.get_running_loop().time()
+            items = [item async for item in translator.translate_stream_both("我们需要一个智能推荐功能")]
+            elapsed = asyncio.get_running_loop().time() - started_at
+
+        assert elapsed < 0.25  # 串行约 0.3 秒
+        by_direction = {
+            direction: [chunk for d, chunk in items if d == direction]
+            for direction in (TranslationDirection.PRODUCT_TO_DEV, TranslationDirection.DEV_TO_PRODUCT)
+        }
+        assert by_direction[TranslationDirection.PRODUCT_TO_DEV] == ["dev0", "dev1", "dev2", "[DONE]"]
+        assert by_direction[TranslationDirection.DEV_TO_PRODUCT] == ["product0", "product1", "product2", "[DONE]"]
+        # 两路输出交错
+        assert items[0][0] != items[1][0]
+
+    @pytest.mark.asyncio
+    async def test_one_direction_failure_does_not_stop_other(self):
+        """测试一个方向失败时另一个方向继续完成"""
+        translator = Translator(api_key="test-key")
+        product_prompt = get_system_prompt("product_to_dev")
+
+        async def fake_create(*, messages, **kwargs):
+            if messages[0]["content"] == product_prompt:
+                raise asyncio.TimeoutError()
+
+            async def stream():
+                yield _text_chunk("业务价值")
+
+            return stream()
+
+        with patch.object(translator.client.chat.completions, 'create', side_effect=fake_create):
+            items = [item async for item in translator.translate_stream_both("我们优化了数据库查询")]
+
+        finals = {direction: chunk for direction, chunk in items if chunk == "[DONE]" or chunk.startswith("[ERROR]")}
+        assert finals[TranslationDirection.PRODUCT_TO_DEV].startswith("[ERROR]")
+        assert finals[TranslationDirection.DEV_TO_PRODUCT] == "[DONE]"
+        assert (TranslationDirection.DEV_TO_PRODUCT, "业务价值") in items
+
+
+class TestTranslationCache:
+    """翻译结果缓存测试"""
+
+    @pytest.mark.asyncio
+    async def test_second_request_served_from_cache(self):
+        """测试相同内容第二次请求直接返回缓存结果，不调用上游"""
+        translator = Translator(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+
+        async def fake_create(**kwargs):
+            async def stream():
+                yield _text_chunk("第一段")
+                yield _text_chunk("第二段")
+                yield _stop_chunk()
+            return stream()
+
+        with patch.object(translator.client.chat.completions, 'create', side_effect=fake_create) as mock_create:
+            first = [c async for c in translator.translate_stream("缓存内容", TranslationDirection.PRODUCT_TO_DEV)]
+            await asyncio.gather(*translator._background_tasks)
+            second = [c async for c in translator.translate_stream("缓存内容", TranslationDirection.PRODUCT_TO_DEV)]
+
+        assert first == ["第一段", "第二段", "[DONE]"]
+        assert second == ["第一段第二段", "[DONE]"]
+        assert mock_create.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_truncated_output_not_cached(self):
+        """测试被 max_tokens 截断（finish_reason=length）的结果不写入缓存"""
+        translator = Translator(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+
+        async def fake_create(**kwargs):
+            async def stream():
+                yield _text_chunk("写到一半")
+                yield _stop_chunk("length")
+            return stream()
+
+        with patch.object(translator.client.chat.completions, 'create', side_effect=fake_create) as mock_create:
+            for _ in range(2):
+                chunks = [c async for c in translator.translate_stream("长内容", TranslationDirection.PRODUCT_TO_DEV)]
+                await asyncio.gather(*translator._background_tasks)
+                assert chunks == ["写到一半", "[DONE]"]
+
+        assert mock_create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        """测试失败的翻译不写入缓存"""
+        translator = Translator(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+
+        with patch.object(translator.client.chat.completions, 'create', side_effect=asyncio.TimeoutError()) as mock_create:
+            for _ in range(2):
+                chunks = [c async for c in translator.translate_stream("内容", TranslationDirection.DEV_TO_PRODUCT)]
+                assert chunks[-1].startswith("[ERROR]")
+
+        assert mock_create.call_count == 2
+
+    def test_cache_key_includes_prompt_version_and_model(self):
+        """测试缓存键随模型变化"""
+        translator = Translator(api_key="test-key")
+        route = translator.model_router.select("内容", TranslationDirection.PRODUCT_TO_DEV)
+        other = route.model_copy(update={"model": "other-model"})
+        key = translator.cache_key("内容", TranslationDirection.PRODUCT_TO_DEV, route)
+        assert key != translator.cache_key("内容", TranslationDirection.PRODUCT_TO_DEV, other)
+        assert key != translator.cache_key("内容", TranslationDirection.DEV_TO_PRODUCT, route)
+
+
+class TestStaleWhileRevalidate:
+    """过期优先模式测试"""
+
+    @pytest.mark.asyncio
+    async def test_stale_served_and_refreshed_once(self):
+        """测试缓存失效后先返回旧译文，多个请求只触发一次后台刷新"""
+        translator = Translator(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+        translator.stale_while_revalidate = True
+        direction = TranslationDirection.PRODUCT_TO_DEV
+        outputs = iter(["旧译文", "新译文"])
+
+        async def fake_create(**kwargs):
+            text = next(outputs)
+
+            async def stream():
+                yield _text_chunk(text)
+                yield _stop_chunk()
+            return stream()
+
+        with patch.object(translator.client.chat.completions, 'create', side_effect=fake_create) as mock_create:
+            [c async for c in translator.translate_stream("缓存内容", direction)]
+            await asyncio.gather(*translator._background_tasks)
+            # 模拟过期：删除翻译结果，旧译文仍在
+            route = translator.model_router.select("缓存内容", direction)
+            translator.cache.backend.delete(translator.cache_key("缓存内容", direction, route))
+
+            first = [c async for c in translator.translate_stream("缓存内容", direction)]
+            second = [c async for c in translator.translate_stream("缓存内容", direction)]
+            while translator._background_tasks:
+                await asyncio.gather(*translator._background_tasks)
+            refreshed = [c async for c in translator.translate_stream("缓存内容", direction)]
+
+        assert first == second == ["[STALE]", "旧译文", "[DONE]"]
+        assert refreshed == ["新译文", "[DONE]"]
+        assert mock_create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_survives_prompt_change(self):
+        """测试提示词版本变化后仍返回旧译文"""
+        translator = Translator(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+        translator.stale_while_revalidate = True
+        direction = TranslationDirection.DEV_TO_PRODUCT
+
+        async def fake_create(**kwargs):
+            async def stream():
+                yield _text_chunk("业务价值")
+                yield _stop_chunk()
+            return stream()
+
+        with patch.object(translator.client.chat.completions, 'create', side_effect=fake_create):
+            [c async for c in translator.translate_stream("内容", direction)]
+            await asyncio.gather(*translator._background_tasks)
+            prompts = translator.prompts
+            translator.prompts = PromptSet(
+                intent=prompts.intent, product_to_dev=prompts.product_to_dev, dev_to_product=prompts.dev_to_product + "\n"
+            )
+            chunks = [c async for c in translator.translate_stream("内容", direction)]
+            while translator._background_tasks:
+                await asyncio.gather(*translator._background_tasks)
+
+        assert chunks == ["[STALE]", "业务价值", "[DONE]"]
+
+    @pytest.mark.asyncio
+    async def test_refresh_deduplicated_across_instances(self):
+        """测试热加载替换翻译器实例后，同一缓存键的后台刷新仍只触发一次"""
+        cache = ResultCache(MemoryCacheBackend(), ttl=60)
+        old = Translator(api_key="test-key", cache=cache)
+        new = Translator(api_key="test-key", cache=cache)
+        old.stale_while_revalidate = new.stale_while_revalidate = True
+        direction = TranslationDirection.PRODUCT_TO_DEV
+        release = asyncio.Event()
+        outputs = iter(["旧译文", "新译文"])
+
+        async def fake_create(**kwargs):
+            text = next(outputs)
+            if text == "新译文":
+                await release.wait()
+
+            async def stream():
+                yield _text_chunk(text)
+                yield _stop_chunk()
+            return stream()
+
+        with patch.object(old.client.chat.completions, 'create', side_effect=fake_create) as mock_create:
+            [c async for c in old.translate_stream("缓存内容", direction)]
+            await asyncio.gather(*old._background_tasks)
+            route = old.model_router.select("缓存内容", direction)
+            cache.backend.delete(old.cache_key("缓存内容", direction, route))
+
+            # 旧实例发起的刷新尚未完成时，新实例不再重复刷新
+            first = [c async for c in old.translate_stream("缓存内容", direction)]
+            second = [c async for c in new.translate_stream("缓存内容", direction)]
+            assert not new._background_tasks
+            release.set()
+            while old._background_tasks:
+                await asyncio.gather(*old._background_tasks)
+            refreshed = [c async for c in new.translate_stream("缓存内容", direction)]
+
+        assert first == second == ["[STALE]", "旧译文", "[DONE]"]
+        assert refreshed == ["新译文", "[DONE]"]
+        assert mock_create.call_count == 2
+
+
+class TestRevisionTranslation:
+    """修订翻译测试"""
+
+    @staticmethod
+    async def _translate_original(translator, titles):
+        """先完成一次并行分节翻译，返回其修订 ID"""
+        async def fake_create(*, messages, **kwargs):
+            title = next(t for t in titles if f"「{t}」" in messages[-1]["content"])
+
+            async def stream():
+                yield _text_chunk(f"{title}-旧")
+                yield _stop_chunk()
+            return stream()
+
+        content = "我们需要一个智能推荐功能\n首页和商品详情页都需要展示推荐结果\n目标是提升用户停留时长"
+        with patch.object(translator.client.chat.completions, 'create', side_effect=fake_create):
+            [c async for c in translator.translate_stream_parallel(content, TranslationDirection.PRODUCT_TO_DEV)]
+        await asyncio.gather(*translator._background_tasks)
+        return translator.revision_id(content, TranslationDirection.PRODUCT_TO_DEV)
+
+    @pytest.mark.asyncio
+    async def test_unaffected_sections_reused(self):
+        """测试只重新生成受影响的分节，其余分节沿用上一次的结果"""
+        translator = Translator(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+        titles = get_prompt_sections("product_to_dev")
+        revision = await self._translate_original(translator, titles)
+
+        async def fake_create(*, messages, **kwargs):
+            title = next(t for t in titles if f"「{t}」" in messages[-1]["content"])
+            assert "- 修改：「目标是提升用户停留时长」→「目标是提升用户留存率」" in messages[-1]["content"]
+            assert f"{title}-旧" in messages[-1]["content"]
+            text = f"{title}-新" if title == titles[1] else "[UNCHANGED]"
+
+            async def stream():
+                yield _text_chunk(text[:3])
+                yield _text_chunk(text[3:])
+                yield _stop_chunk()
+            return stream()
+
+        content = "我们需要一个智能推荐功能\n首页和商品详情页都需要展示推荐结果\n目标是提升用户留存率"
+        with patch.object(translator.client.chat.completions, 'create', side_effect=fake_create) as mock_create:
+            chunks = [
+                c async for c in translator.translate_stream_revision(
+                    content, TranslationDirection.PRODUCT_TO_DEV, revision
+                )
+            ]
+
+        assert mock_create.call_count == len(titles)
+        assert chunks[-1] == "[DONE]"
+        expected = "".join(
+            f"## {title}\n{title}-{'新' if title == titles[1] else '旧'}\n\n" for title in titles
+        )
+        assert "".join(chunks[:-1]) == expected
+
+    @pytest.mark.asyncio
+    async def test_unchanged_paragraphs_skip_upstream(self):
+        """测试段落没有变化时直接沿用上一次的结果"""
+        translator = Translator(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+        titles = get_prompt_sections("product_to_dev")
+        revision = await self._translate_original(translator, titles)
+
+        content = "我们需要一个智能推荐功能\n\n首页和商品详情页都需要展示推荐结果\n目标是提升用户停留时长\n"
+        with patch.object(translator.client.chat.completions, 'create') as mock_create:
+            chunks = [
+                c async for c in translator.translate_stream_revision(
+                    content, TranslationDirection.PRODUCT_TO_DEV, revision
+                )
+            ]
+
+        mock_create.assert_not_called()
+        assert chunks[-1] == "[DONE]"
+        assert "".join(chunks[:-1]) == "".join(f"## {title}\n{title}-旧\n\n" for title in titles)
+
+    @pytest.mark.asyncio
+    async def test_large_edit_falls_back_to_full_translation(self):
+        """测试修改范围过大（如粘贴了另一份文档）时整篇翻译"""
+        translator = Translator(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+        revision = await self._translate_original(translator, get_prompt_sections("product_to_dev"))
+        content = "我们优化了数据库索引\n查询耗时下降了一半"
+
+        async def fake_create(*, messages, **kwargs):
+            assert messages == build_messages("product_to_dev", content)
+
+            async def stream():
+                yield _text_chunk("整篇")
+            return stream()
+
+        with patch.object(translator.client.chat.completions, 'create', side_effect=fake_create) as mock_create:
+            chunks = [
+                c async for c in translator.translate_stream_revision(
+                    content, TranslationDirection.PRODUCT_TO_DEV, revision
+                )
+            ]
+
+        assert mock_create.call_count == 1
+        assert chunks == ["整篇", "[DONE]"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_revision_falls_back_to_full_translation(self):
+        """测试修订不存在时退化为整篇翻译"""
+        translator = Translator(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+
+        async def fake_create(*, messages, **kwargs):
+            assert messages == build_messages("product_to_dev", "修改后的需求内容")
+
+            async def stream():
+                yield _text_chunk("整篇")
+            return stream()
+
+        with patch.object(translator.client.chat.completions, 'create', side_effect=fake_create) as mock_create:
+            chunks = [
+                c async for c in translator.translate_stream_revision(
+                    "修改后的需求内容", TranslationDirection.PRODUCT_TO_DEV, "0" * 64
+                )
+            ]
+
+        assert mock_create.call_count == 1
+        assert chunks == ["整篇", "[DONE]"]
+
+    def test_revision_id_requires_cache(self):
+        """测试缓存未开启时不返回修订 ID"""
+        enabled = Translator(api_key="test-key", cache=ResultCache(MemoryCacheBackend(), ttl=60))
+        disabled = Translator(api_key="test-key", cache=ResultCache(create_cache_backend("none"), ttl=60))
+        assert len(enabled.revision_id("内容", TranslationDirection.PRODUCT_TO_DEV)) == 64
+        assert disabled.revision_id("内容", TranslationDirection.PRODUCT_TO_DEV) is None
+
+
 class TestDevToProductTranslation:
     """开发→产品翻译测试"""
 
@@ -163,3 +684,26 @@ class TestTranslatorValidation:
         """测试无效方向抛出异常"""
         with pytest.raises(ValueError):
             get_system_prompt("invalid_direction")
+
+
+class TestPromptPrefixStability:
+    """提示词前缀稳定性测试"""
+
+    def test_build_messages_puts_static_system_prompt_first(self):
+        """测试系统提示词在前且与模板逐字一致"""
+        messages = build_messages("product_to_dev", "用户输入")
+        assert messages[0] == {"role": "system", "content": get_system_prompt("product_to_dev")}
+        assert messages[1] == {"role": "user", "content": "用户输入"}
+
+    def test_system_message_does_not_vary_per_request(self):
+        """测试不同输入的系统消息完全相同"""
+        first = build_messages("dev_to_product", "第一段输入内容")
+        second = build_messages("dev_to_product", "另一段完全不同的输入")
+        assert first[0] == second[0]
+        assert build_intent_messages("甲")[0] == build_intent_messages("乙")[0]
+
+    def test_prompt_version_is_deterministic(self):
+        """测试提示词版本标识稳定且包含版本号"""
+        version = get_prompt_version()
+        assert version == get_prompt_version()
+        assert version.startswith("v")
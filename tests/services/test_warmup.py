@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+缓存预热测试
+"""
+
+import time
+
+import pytest
+
+from src.models import TranslationDirection
+from src.services.cache import MemoryCacheBackend, ResultCache
+from src.services.intent_router import IntentResult
+from src.services.warmup import CacheWarmer, WarmupEntry, example_entries, load_file_entries, rank_entries
+
+P2D = TranslationDirection.PRODUCT_TO_DEV
+D2P = TranslationDirection.DEV_TO_PRODUCT
+
+
+class _FakeIntentRouter:
+    """记录调用的意图识别替身（识别结果按内容缓存）"""
+
+    def __init__(self, confidence=0.9):
+        self.confidence = confidence
+        self.cached: set[str] = set()
+        self.calls = 0
+
+    async def is_cached(self, content):
+        return content in self.cached
+
+    async def detect_intent(self, content):
+        if content not in self.cached:
+            self.calls += 1
+            self.cached.add(content)
+        return IntentResult(direction=D2P, confidence=self.confidence, reasoning="")
+
+
+class _FakeTranslator:
+    """记录调用的翻译器替身（翻译结果按内容与方向缓存）"""
+
+    def __init__(self, fail=()):
+        self.cache = ResultCache(MemoryCacheBackend(), ttl=60)
+        self.cached: set[tuple[str, TranslationDirection]] = set()
+        self.fail = fail
+        self.calls = []
+        self.call_times = []
+
+    async def is_cached(self, content, direction, confidence=None):
+        return (content, direction) in self.cached
+
+    async def translate_stream(self, content, direction, confidence=None, on_usage=None):
+        self.calls.append((content, direction))
+        self.call_times.append(time.monotonic())
+        if content in self.fail:
+            yield "[ERROR] 上游错误"
+            return
+        self.cached.add((content, direction))
+        yield "译文"
+        yield "[DONE]"
+
+    async def wait_background_tasks(self):
+        pass
+
+
+class TestWarmupInputs:
+    """预热输入读取测试"""
+
+    def test_file_entries_ranked_by_count(self, tmp_path):
+        """测试读取 JSON Lines 文件，合并重复输入并按频次排序，跳过无效行"""
+        path = tmp_path / "warmup.jsonl"
+        path.write_text(
+            '{"content": "少见的输入", "direction": "dev_to_product", "count": 1}\n'
+            '{"content": "常见的输入", "count": 5}\n'
+            "not json\n"
+            '{"content": "少见的输入", "direction": "dev_to_product", "count": 2}\n'
+            '{"content": "无效方向", "direction": "sideways"}\n',
+            encoding="utf-8",
+        )
+
+        ranked = rank_entries(load_file_entries(str(path)), limit=0)
+
+        assert [(entry.content, entry.direction, entry.count) for entry in ranked] == [
+            ("常见的输入", None, 5),
+            ("少见的输入", D2P, 3),
+        ]
+        assert len(rank_entries(ranked, limit=1)) == 1
+
+    def test_request_examples_available(self):
+        """测试请求模型中的示例可作为预热输入"""
+        entries = example_entries()
+
+        assert entries
+        assert all(entry.content for entry in entries)
+
+
+class TestCacheWarmer:
+    """缓存预热任务测试"""
+
+    @pytest.mark.asyncio
+    async def test_warms_translation_and_intent_caches(self):
+        """测试预热意图识别与翻译结果，已缓存的条目不调用上游，失败与低置信度分别计数"""
+        translator = _FakeTranslator(fail=("失败的输入",))
+        translator.cached.add(("已缓存的输入", P2D))
+        intent_router = _FakeIntentRouter()
+        warmer = CacheWarmer(translator=translator, intent_router=intent_router)
+
+        report = await warmer.run([
+            WarmupEntry("智能模式的输入"),
+            WarmupEntry("手动方向的输入", P2D),
+            WarmupEntry("已缓存的输入", P2D),
+            WarmupEntry("失败的输入", P2D),
+        ])
+
+        assert translator.calls == [("智能模式的输入", D2P), ("手动方向的输入", P2D), ("失败的输入", P2D)]
+        assert report.entries == 4
+        assert report.translations_warmed == 2
+        assert report.intents_warmed == 4
+        assert report.already_cached == 1
+        assert report.failed == 1
+        assert warmer.report is report
+        assert not warmer.warming
+
+    @pytest.mark.asyncio
+    async def test_low_confidence_entries_skipped(self):
+        """测试识别置信度过低的输入不预热翻译结果"""
+        translator = _FakeTranslator()
+        warmer = CacheWarmer(translator=translator, intent_router=_FakeIntentRouter(confidence=0.3))
+
+        report = await warmer.run([WarmupEntry("含糊的输入")])
+
+        assert report.skipped == 1
+        assert translator.calls == []
+
+    @pytest.mark.asyncio
+    async def test_upstream_calls_rate_limited(self):
+        """测试上游调用按速率限制间隔发起"""
+        translator = _FakeTranslator()
+        intent_router = _FakeIntentRouter()
+        intent_router.cached.update({"输入一", "输入二", "输入三"})
+        warmer = CacheWarmer(rate_per_second=20, translator=translator, intent_router=intent_router)
+
+        await warmer.run([WarmupEntry("输入一", P2D), WarmupEntry("输入二", P2D), WarmupEntry("输入三", P2D)])
+
+        gaps = [later - earlier for earlier, later in zip(translator.call_times, translator.call_times[1:])]
+        assert all(gap >= 0.045 for gap in gaps)
+
+    @pytest.mark.asyncio
+    async def test_start_marks_warming_until_finished(self, tmp_path):
+        """测试后台预热开始即标记为未就绪，完成后恢复"""
+        path = tmp_path / "warmup.jsonl"
+        path.write_text('{"content": "常见的输入", "direction": "product_to_dev"}\n', encoding="utf-8")
+        translator = _FakeTranslator()
+        warmer = CacheWarmer(translator=translator, intent_router=_FakeIntentRouter())
+
+        warmer.start("file", str(path))
+        assert warmer.warming
+        await warmer._task
+
+        assert not warmer.warming
+        assert warmer.report.translations_warmed == 1
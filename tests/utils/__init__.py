@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""工具层测试"""
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+静态资源构建与服务单元测试
+"""
+
+import gzip
+import json
+
+import pytest
+
+from src.utils.assets import (
+    IMMUTABLE_CACHE_CONTROL,
+    MANIFEST_NAME,
+    REVALIDATE_CACHE_CONTROL,
+    StaticAssets,
+    build_assets,
+    hashed_name,
+)
+
+_APP_JS = "console.log('沟通翻译助手');\n" * 40
+
+
+@pytest.fixture
+def build_dir(tmp_path):
+    """构建好的静态资源目录"""
+    source = tmp_path / "static"
+    source.mkdir()
+    (source / "index.html").write_text(
+        '<link rel="stylesheet" href="/static/style.css"><script src="/static/app.js"></script>',
+        encoding="utf-8",
+    )
+    (source / "app.js").write_text(_APP_JS, encoding="utf-8")
+    (source / "style.css").write_text("body{}", encoding="utf-8")
+    output = source / "dist"
+    build_assets(source, output)
+    return output
+
+
+class TestBuildAssets:
+    """构建测试"""
+
+    def test_hashed_name_depends_on_content(self):
+        """测试文件名哈希随内容变化"""
+        assert hashed_name("app.js", b"a") != hashed_name("app.js", b"b")
+        assert hashed_name("app.js", b"a").startswith("app.")
+        assert hashed_name("app.js", b"a").endswith(".js")
+
+    def test_manifest_and_rewritten_index(self, build_dir):
+        """测试清单与入口页面引用改写"""
+        manifest = json.loads((build_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+        assert manifest["index.html"] == "index.html"
+        assert manifest["app.js"] == hashed_name("app.js", _APP_JS.encode("utf-8"))
+
+        index = (build_dir / "index.html").read_text(encoding="utf-8")
+        assert f"/static/{manifest['app.js']}" in index
+        assert f"/static/{manifest['style.css']}" in index
+
+    def test_precompresses_large_text_files(self, build_dir):
+        """测试只为足够大的文本文件生成 gzip 文件"""
+        manifest = json.loads((build_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+        compressed = build_dir / (manifest["app.js"] + ".gz")
+        assert gzip.decompress(compressed.read_bytes()).decode("utf-8") == _APP_JS
+        assert not (build_dir / (manifest["style.css"] + ".gz")).exists()
+
+    def test_load_without_build_returns_none(self, tmp_path):
+        """测试未构建时不加载"""
+        assert StaticAssets.load(tmp_path) is None
+
+
+class TestStaticAssets:
+    """资源响应测试"""
+
+    def test_hashed_asset_is_immutable(self, build_dir):
+        """测试带哈希的文件名使用长期缓存"""
+        assets = StaticAssets.load(build_dir)
+        response = assets.response(hashed_name("app.js", _APP_JS.encode("utf-8")), {})
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        assert response.body == _APP_JS.encode("utf-8")
+
+    def test_entry_and_original_names_revalidate(self, build_dir):
+        """测试入口页面与旧文件名每次协商"""
+        assets = StaticAssets.load(build_dir)
+        assert assets.response("index.html", {}).headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+        assert assets.response("app.js", {}).headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+
+    def test_serves_gzip_when_accepted(self, build_dir):
+        """测试按 Accept-Encoding 返回预压缩内容"""
+        assets = StaticAssets.load(build_dir)
+        response = assets.response("app.js", {"accept-encoding": "gzip, deflate"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert gzip.decompress(response.body).decode("utf-8") == _APP_JS
+
+    def test_gzip_refused_by_q_zero(self, build_dir):
+        """测试 q=0 时不使用该编码"""
+        assets = StaticAssets.load(build_dir)
+        response = assets.response("app.js", {"accept-encoding": "gzip;q=0"})
+        assert "content-encoding" not in response.headers
+
+    def test_etag_differs_per_encoding(self, build_dir):
+        """测试不同编码的表示使用不同的强 ETag"""
+        assets = StaticAssets.load(build_dir)
+        plain = assets.response("app.js", {}).headers["etag"]
+        gzipped = assets.response("app.js", {"accept-encoding": "gzip"}).headers["etag"]
+        assert plain != gzipped
+        assert not plain.startswith("W/")
+
+    def test_if_none_match_returns_304(self, build_dir):
+        """测试 ETag 命中时返回 304"""
+        assets = StaticAssets.load(build_dir)
+        etag = assets.response("index.html", {}).headers["etag"]
+        response = assets.response("index.html", {"if-none-match": f'"other", {etag}'})
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == etag
+
+    def test_missing_asset_returns_none(self, build_dir):
+        """测试资源不存在"""
+        assert StaticAssets.load(build_dir).response("missing.js", {}) is None
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+流式响应缓冲单元测试
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils.backpressure import buffered_stream
+
+
+class _Source:
+    """可观察关闭状态的输入流"""
+
+    def __init__(self, frames, delay=0.0):
+        self.frames = frames
+        self.delay = delay
+        self.closed = False
+
+    async def _generate(self):
+        try:
+            for frame in self.frames:
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                yield frame
+        finally:
+            self.closed = True
+
+    def __aiter__(self):
+        self._gen = self._generate()
+        return self._gen
+
+    async def aclose(self):
+        await self._gen.aclose()
+
+
+class TestBufferedStream:
+    """缓冲读写解耦测试"""
+
+    async def test_passthrough_in_order(self):
+        """测试数据按顺序原样写出并报告统计"""
+        reports = []
+        source = _Source([b"a" * 10, b"b" * 10, b"c" * 10])
+        stream = buffered_stream(source, max_bytes=1024, stall_timeout=1, on_finish=reports.append)
+
+        chunks = await asyncio.wait_for(_collect(stream), 2)
+
+        assert chunks == [b"a" * 10, b"b" * 10, b"c" * 10]
+        assert source.closed
+        assert len(reports) == 1
+        assert reports[0].total_bytes == 30
+        assert reports[0].drain_seconds is not None
+        assert not reports[0].stalled
+
+    async def test_upstream_released_before_slow_client(self):
+        """测试慢速客户端读完之前上游已读完"""
+        reports = []
+        source = _Source([b"x"] * 5)
+        stream = buffered_stream(source, max_bytes=1024, stall_timeout=1, on_finish=reports.append)
+
+        async def slow_consume():
+            chunks = []
+            async for chunk in stream:
+                chunks.append(chunk)
+                await asyncio.sleep(0.02)
+            return chunks
+
+        chunks = await asyncio.wait_for(slow_consume(), 2)
+
+        assert len(chunks) == 5
+        report = reports[0]
+        assert report.upstream_seconds < report.drain_seconds
+        assert report.peak_buffered_bytes > 1
+
+    async def test_source_paused_at_byte_limit(self):
+        """测试缓冲区达到上限后暂停读取输入流"""
+        source = _Source([b"x" * 10] * 10)
+        stream = buffered_stream(source, max_bytes=25, stall_timeout=1)
+
+        first = await asyncio.wait_for(stream.__anext__(), 1)
+        await asyncio.sleep(0.05)
+
+        assert first == b"x" * 10
+        assert not source.closed
+        await stream.aclose()
+        assert source.closed
+
+    async def test_stalled_client_dropped(self):
+        """测试客户端停滞超时后关闭输入流并中止写出"""
+        reports = []
+        source = _Source([b"x" * 10] * 10)
+        stream = buffered_stream(source, max_bytes=15, stall_timeout=0.05, on_finish=reports.append)
+
+        async def stalled_consume():
+            async for _ in stream:
+                # 模拟阻塞在写出上的客户端
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(stalled_consume())
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, 2)
+
+        assert source.closed
+        assert reports[0].stalled
+        assert reports[0].drain_seconds is None
+
+    async def test_source_error_propagated_after_buffered_data(self):
+        """测试输入流异常在已缓冲数据写出后抛出"""
+        async def failing():
+            yield b"ok"
+            raise RuntimeError("upstream failed")
+
+        stream = buffered_stream(failing(), max_bytes=1024, stall_timeout=1)
+
+        assert await asyncio.wait_for(stream.__anext__(), 1) == b"ok"
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(stream.__anext__(), 1)
+
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+压缩工具单元测试
+"""
+
+import gzip
+import zlib
+import asyncio
+
+import pytest
+
+from src.utils.compression import accepts_encoding, gzip_stream, parse_accept_encoding
+
+
+async def _frames(*frames):
+    for frame in frames:
+        yield frame
+
+
+class TestAcceptEncoding:
+    """Accept-Encoding 协商测试"""
+
+    def test_parse_quality_values(self):
+        """测试解析 q 值"""
+        assert parse_accept_encoding("gzip, br;q=0.8") == {"gzip": 1.0, "br": 0.8}
+
+    @pytest.mark.parametrize("header,expected", [
+        ("gzip, deflate", True),
+        ("br;q=1.0, gzip;q=0.5", True),
+        ("gzip;q=0", False),
+        ("*", True),
+        ("identity", False),
+        ("", False),
+    ])
+    def test_accepts_gzip(self, header, expected):
+        """测试是否接受 gzip"""
+        assert accepts_encoding(header, "gzip") is expected
+
+
+class TestGzipStream:
+    """SSE 流式压缩测试"""
+
+    @pytest.mark.asyncio
+    async def test_each_chunk_decodes_immediately(self):
+        """测试每个输出块都能立即解压出对应的完整帧"""
+        frames = [b"data: ## \xe6\x8a\x80\xe6\x9c\xaf\n\n", b"data: chunk\n\n", b"data: [DONE]\n\n"]
+        decompressor = zlib.decompressobj(31)
+        pieces = [piece async for piece in gzip_stream(_frames(*frames))]
+
+        for frame, piece in zip(frames, pieces):
+            assert decompressor.decompress(piece) == frame
+
+    @pytest.mark.asyncio
+    async def test_output_is_valid_gzip(self):
+        """测试完整输出是合法的 gzip 数据"""
+        frames = [f"data: 第 {i} 段内容\n\n".encode("utf-8") for i in range(50)]
+        body = b"".join([piece async for piece in gzip_stream(_frames(*frames))])
+        assert gzip.decompress(body) == b"".join(frames)
+        assert len(body) < len(b"".join(frames))
+
+    @pytest.mark.asyncio
+    async def test_close_propagates_to_source(self):
+        """测试关闭压缩流时同时关闭内层生成器"""
+        closed = []
+
+        async def source():
+            try:
+                yield b"data: a\n\n"
+                yield b"data: b\n\n"
+            finally:
+                closed.append(True)
+
+        stream = gzip_stream(source())
+        await stream.__anext__()
+        await stream.aclose()
+        assert closed == [True]
+
+    @pytest.mark.asyncio
+    async def test_window_coalesces_ready_chunks(self):
+        """测试合并窗口内的输入块合并后刷新一次"""
+        frames = [f"data: {i}\n\n".encode("utf-8") for i in range(10)]
+        pieces = [piece async for piece in gzip_stream(_frames(*frames), flush_interval=0.05)]
+        # 第一块立即刷新，其余在流结束时与 gzip 尾部一起输出
+        assert len(pieces) == 2
+        assert gzip.decompress(b"".join(pieces)) == b"".join(frames)
+
+    @pytest.mark.asyncio
+    async def test_window_flushes_buffered_data_on_stall(self):
+        """测试上游停顿时在窗口到期后输出已合并的数据"""
+        decompressor = zlib.decompressobj(31)
+        release = asyncio.Event()
+
+        async def source():
+            yield b"data: a\n\n"
+            yield b"data: b\n\n"
+            await release.wait()
+            yield b"data: c\n\n"
+
+        stream = gzip_stream(source(), flush_interval=0.02)
+        assert decompressor.decompress(await stream.__anext__()) == b"data: a\n\n"
+        # b 在窗口内到达，窗口到期后输出，不等待 c
+        assert decompressor.decompress(await asyncio.wait_for(stream.__anext__(), timeout=1)) == b"data: b\n\n"
+        release.set()
+        rest = b"".join([piece async for piece in stream])
+        assert decompressor.decompress(rest) == b"data: c\n\n"
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+JSON Lines 写入工具单元测试
+"""
+
+import io
+import json
+import os
+
+from src.utils.jsonl import JsonLineWriter
+
+
+class TestJsonLineWriter:
+    """JSON Lines 写入器测试"""
+
+    def test_writes_one_line_per_entry(self, tmp_path):
+        """测试每条记录写为一行 JSON，关闭时写出队列中剩余的记录"""
+        writer = JsonLineWriter(str(tmp_path / "out" / "data.jsonl"))
+        writer.write({"n": 1, "text": "中文"})
+        writer.write({"n": 2})
+        writer.close()
+
+        lines = (tmp_path / "out" / "data.jsonl").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == [{"n": 1, "text": "中文"}, {"n": 2}]
+
+    def test_path_templated_with_pid(self, tmp_path):
+        """测试路径中的 {pid} 替换为进程号"""
+        writer = JsonLineWriter(str(tmp_path / "data-{pid}.jsonl"))
+        writer.close()
+        assert writer.path == tmp_path / f"data-{os.getpid()}.jsonl"
+
+    def test_rotates_by_size(self, tmp_path):
+        """测试超过大小上限后轮转"""
+        writer = JsonLineWriter(str(tmp_path / "data.jsonl"), max_bytes=100, backup_count=2)
+        for n in range(20):
+            writer.write({"n": n, "padding": "x" * 20})
+        writer.close()
+        assert (tmp_path / "data.jsonl.1").exists()
+        assert not (tmp_path / "data.jsonl.3").exists()
+
+    def test_writes_to_stream_and_ignores_after_close(self):
+        """测试未指定路径时写入输出流，关闭后的写入被忽略"""
+        stream = io.StringIO()
+        writer = JsonLineWriter(stream=stream)
+        writer.write({"n": 1})
+        writer.close()
+        writer.write({"n": 2})
+        writer.close()
+
+        assert writer.path is None
+        assert [json.loads(line) for line in stream.getvalue().splitlines()] == [{"n": 1}]
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+日志管道单元测试
+"""
+
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from src.config import get_settings
+from src.utils.log import JsonFormatter, SamplingFilter, setup_logging, shutdown_logging
+
+
+def _record(name="src.test", level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    """构造日志记录"""
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture
+def log_stream():
+    """将日志管道输出重定向到内存流，测试结束后恢复默认配置"""
+    stream = io.StringIO()
+    yield stream
+    settings = get_settings()
+    setup_logging(settings.get_log_level(), settings.log_format, settings.log_sampling)
+
+
+class TestJsonFormatter:
+    """JSON 格式化测试"""
+
+    def test_formats_message_and_extra_fields(self):
+        """测试输出单行 JSON，包含消息与 extra 字段"""
+        line = JsonFormatter().format(_record(route="default"))
+        data = json.loads(line)
+        assert data["message"] == "hello world"
+        assert data["level"] == "INFO"
+        assert data["logger"] == "src.test"
+        assert data["route"] == "default"
+        assert "\n" not in line
+
+    def test_includes_exception(self):
+        """测试包含异常堆栈"""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            import sys
+            record = logging.LogRecord("src.test", logging.ERROR, __file__, 1, "failed", (), sys.exc_info())
+        data = json.loads(JsonFormatter().format(record))
+        assert "ValueError: boom" in data["exc_info"]
+
+    def test_non_ascii_and_unserializable_values(self):
+        """测试中文不转义，不可序列化的字段转为字符串"""
+        data = json.loads(JsonFormatter().format(_record(msg="翻译完成", args=(), obj=object())))
+        assert data["message"] == "翻译完成"
+        assert data["obj"].startswith("<object")
+
+
+class TestSamplingFilter:
+    """日志采样测试"""
+
+    def test_keeps_one_in_n_info_records(self):
+        """测试按采样率保留 INFO 日志"""
+        sampler = SamplingFilter({"src.controllers.health": 0.1})
+        kept = sum(sampler.filter(_record(name="src.controllers.health")) for _ in range(100))
+        assert kept == 10
+
+    def test_warnings_always_kept(self):
+        """测试 WARNING 及以上级别不采样"""
+        sampler = SamplingFilter({"src": 0})
+        assert sampler.filter(_record(level=logging.WARNING))
+        assert not sampler.filter(_record(level=logging.INFO))
+
+    def test_rule_applies_to_child_loggers(self):
+        """测试规则按 logger 层级匹配，未匹配的 logger 不受影响"""
+        sampler = SamplingFilter({"src.controllers": 0})
+        assert not sampler.filter(_record(name="src.controllers.health"))
+        assert sampler.filter(_record(name="src.services.translator"))
+
+
+class TestSetupLogging:
+    """非阻塞日志管道测试"""
+
+    def test_records_written_by_background_thread(self, log_stream):
+        """测试日志在监听线程中格式化与写出，而不是在调用线程"""
+        written_in = []
+
+        class Probe:
+            def __str__(self):
+                return "probe"
+
+        class ThreadRecordingStream(io.StringIO):
+            def write(self, text):
+                written_in.append(threading.current_thread())
+                return super().write(text)
+
+        stream = ThreadRecordingStream()
+        setup_logging("INFO", "json", stream=stream)
+        logging.getLogger("src.test").info("value=%s", Probe())
+        shutdown_logging()
+
+        assert json.loads(stream.getvalue())["message"] == "value=probe"
+        assert written_in
+        assert all(thread is not threading.current_thread() for thread in written_in)
+
+    def test_filtered_records_are_not_formatted(self, log_stream):
+        """测试被级别过滤的日志不做格式化"""
+        class Probe:
+            def __str__(self):
+                raise AssertionError("should not be formatted")
+
+        setup_logging("WARNING", "text", stream=log_stream)
+        logging.getLogger("src.test").info("value=%s", Probe())
+        shutdown_logging()
+        assert log_stream.getvalue() == ""
+
+    def test_sampling_applied_to_pipeline(self, log_stream):
+        """测试采样规则作用于日志管道"""
+        setup_logging("INFO", "text", sample_rates={"src.controllers.health": 0}, stream=log_stream)
+        logging.getLogger("src.controllers.health").info("Health check requested")
+        logging.getLogger("src.controllers.translate").info("Translation request received")
+        shutdown_logging()
+
+        output = log_stream.getvalue()
+        assert "Health check requested" not in output
+        assert "Translation request received" in output
+
+    def test_uvicorn_loggers_routed_through_queue(self, log_stream):
+        """测试 uvicorn 自带 handler 被移除并汇入根 logger"""
+        access = logging.getLogger("uvicorn.access")
+        access.addHandler(logging.StreamHandler(io.StringIO()))
+        access.propagate = False
+
+        setup_logging("INFO", "text", stream=log_stream)
+        assert access.handlers == []
+        assert access.propagate
+        shutdown_logging()
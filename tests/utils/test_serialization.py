@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+序列化工具单元测试
+"""
+
+import json
+
+import pytest
+
+from src.utils import serialization
+from src.utils.serialization import FastJSONResponse, dumps, dumps_str, sse_data, sse_event, sse_meta
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    """分别在 orjson 与标准库回退两种后端下运行"""
+    if request.param == "orjson":
+        if serialization.orjson is None:
+            pytest.skip("orjson 未安装")
+    else:
+        monkeypatch.setattr(serialization, "orjson", None)
+    return request.param
+
+
+class TestSerialization:
+    """序列化函数测试"""
+
+    def test_dumps_keeps_non_ascii(self, backend):
+        """测试中文不被转义且输出紧凑"""
+        assert dumps({"a": "中文", "b": 1}) == '{"a":"中文","b":1}'.encode("utf-8")
+        assert dumps_str({"a": "中文"}) == '{"a":"中文"}'
+
+    def test_sse_data_frame(self, backend):
+        """测试文本帧格式"""
+        assert sse_data("片段") == "data: 片段\n\n".encode("utf-8")
+
+    def test_sse_event_frame(self, backend):
+        """测试具名事件帧格式"""
+        frame = sse_event("section_start", {"index": 0, "title": "性能考量"}).decode("utf-8")
+        event_line, data_line = frame[:-2].split("\n")
+        assert event_line == "event: section_start"
+        assert json.loads(data_line[len("data: "):]) == {"index": 0, "title": "性能考量"}
+        assert frame.endswith("\n\n")
+
+    def test_sse_meta_frame(self, backend):
+        """测试元数据帧格式"""
+        frame = sse_meta({"confidence": 0.9}).decode("utf-8")
+        assert frame.startswith("data: [META] ")
+        assert json.loads(frame[len("data: [META] "):]) == {"confidence": 0.9}
+
+    def test_fast_json_response_render(self, backend):
+        """测试响应类使用快速序列化"""
+        response = FastJSONResponse({"detail": "错误"})
+        assert response.body == '{"detail":"错误"}'.encode("utf-8")
+        assert response.media_type == "application/json"
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Token 估算单元测试
+"""
+
+from src.utils.tokens import estimate_tokens
+
+
+class TestEstimateTokens:
+    """estimate_tokens 测试"""
+
+    def test_empty_text(self):
+        """测试空文本返回 0"""
+        assert estimate_tokens("") == 0
+
+    def test_chinese_text(self):
+        """测试中文按约 0.6 Token/字估算"""
+        assert estimate_tokens("中" * 100) == 60
+
+    def test_english_text(self):
+        """测试英文按约 0.3 Token/字符估算"""
+        assert estimate_tokens("a" * 100) == 30
+
+    def test_mixed_text_rounds_up(self):
+        """测试中英混合文本向上取整"""
+        # 2 个中文 (1.2) + 3 个英文字符 (0.9) = 2.1 -> 3
+        assert estimate_tokens("中文abc") == 3
+
+    def test_fullwidth_punctuation_counts_as_cjk(self):
+        """测试全角标点按中文字符计算"""
+        assert estimate_tokens("，。") == estimate_tokens("中文")
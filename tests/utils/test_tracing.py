@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+链路追踪单元测试
+"""
+
+import json
+import logging
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from src.utils.tracing import (
+    FileSpanExporter,
+    SpanContext,
+    TraceIdFilter,
+    Tracer,
+    TracingMiddleware,
+    current_trace_id,
+    format_traceparent,
+    get_current_span,
+    parse_traceparent,
+)
+
+_TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+class _CollectingExporter:
+    """收集结束的 span"""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def shutdown(self):
+        pass
+
+
+class TestTraceparent:
+    """traceparent 解析测试"""
+
+    def test_round_trip(self):
+        """测试解析后原样生成"""
+        context = parse_traceparent(_TRACEPARENT)
+
+        assert context == SpanContext("0af7651916cd43dd8448eb211c80319c", "b7ad6b7169203331", True)
+        assert format_traceparent(context) == _TRACEPARENT
+
+    @pytest.mark.parametrize("header", [
+        None,
+        "",
+        "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331",
+        "ff-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01",
+        "00-00000000000000000000000000000000-b7ad6b7169203331-01",
+        "00-0af7651916cd43dd8448eb211c80319c-0000000000000000-01",
+        "00-xyz7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01",
+        "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01-extra",
+    ])
+    def test_invalid_headers_ignored(self, header):
+        """测试格式错误时按新链路处理"""
+        assert parse_traceparent(header) is None
+
+    def test_future_version_with_extra_fields(self):
+        """测试更高版本允许附加字段"""
+        assert parse_traceparent("01-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-00-extra").sampled is False
+
+
+class TestTracer:
+    """span 创建与导出测试"""
+
+    def test_disabled_tracer_records_nothing(self):
+        """测试关闭时返回不记录的 span"""
+        exporter = _CollectingExporter()
+        tracer = Tracer(exporter, enabled=False)
+
+        with tracer.start_as_current_span("noop") as span:
+            span.set_attribute("key", "value")
+            assert current_trace_id() is None
+
+        assert not span.is_recording
+        assert exporter.spans == []
+
+    def test_child_spans_share_trace(self):
+        """测试子 span 继承当前 span 的 trace ID"""
+        exporter = _CollectingExporter()
+        tracer = Tracer(exporter)
+
+        with tracer.start_as_current_span("parent", context=parse_traceparent(_TRACEPARENT)) as parent:
+            assert current_trace_id() == "0af7651916cd43dd8448eb211c80319c"
+            with tracer.start_as_current_span("child"):
+                pass
+            detached = tracer.start_span("detached")
+            detached.end()
+
+        child, detached, parent_span = exporter.spans
+        assert parent_span is parent
+        assert parent.parent_id == "b7ad6b7169203331"
+        assert child.parent_id == parent.context.span_id
+        assert detached.parent_id == parent.context.span_id
+        assert {span.context.trace_id for span in exporter.spans} == {"0af7651916cd43dd8448eb211c80319c"}
+        assert get_current_span().is_recording is False
+
+    def test_exception_recorded(self):
+        """测试异常记录在 span 上并继续抛出"""
+        exporter = _CollectingExporter()
+        tracer = Tracer(exporter)
+
+        with pytest.raises(RuntimeError):
+            with tracer.start_as_current_span("failing"):
+                raise RuntimeError("boom")
+
+        [span] = exporter.spans
+        assert span.status == "error"
+        assert span.to_dict()["events"][0]["attributes"] == {"type": "RuntimeError", "message": "boom"}
+
+    def test_file_exporter_writes_json_lines(self, tmp_path):
+        """测试文件导出器写入单行 JSON"""
+        exporter = FileSpanExporter(str(tmp_path / "spans.jsonl"))
+        tracer = Tracer(exporter)
+
+        with tracer.start_as_current_span("stage", attributes={"route": "default"}) as span:
+            span.add_event("first_token")
+        tracer.shutdown()
+
+        [entry] = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text(encoding="utf-8").splitlines()]
+        assert entry["name"] == "stage"
+        assert entry["attributes"] == {"route": "default"}
+        assert entry["events"][0]["name"] == "first_token"
+        assert entry["duration_ms"] >= 0
+
+    def test_log_records_tagged_with_trace_id(self):
+        """测试 span 内的日志记录附带 trace ID"""
+        tracer = Tracer()
+        record = logging.LogRecord("src.test", logging.INFO, __file__, 1, "hello", (), None)
+
+        with tracer.start_as_current_span("stage") as span:
+            TraceIdFilter().filter(record)
+
+        assert record.trace_id == span.context.trace_id
+
+
+class TestTracingMiddleware:
+    """请求 span 中间件测试"""
+
+    @pytest.mark.asyncio
+    async def test_request_span_continues_incoming_trace(self):
+        """测试继承请求头中的链路并在响应头返回"""
+        exporter = _CollectingExporter()
+        tracer = Tracer(exporter)
+        inner = FastAPI()
+
+        @inner.get("/ping")
+        async def ping():
+            return {"trace_id": current_trace_id()}
+
+        transport = ASGITransport(app=TracingMiddleware(inner, get_tracer=lambda: tracer))
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/ping", headers={"traceparent": _TRACEPARENT})
+
+        [span] = exporter.spans
+        assert response.json() == {"trace_id": "0af7651916cd43dd8448eb211c80319c"}
+        assert response.headers["traceparent"] == format_traceparent(span.context)
+        assert span.name == "GET /ping"
+        assert span.attributes["http.status_code"] == 200